@@ -0,0 +1,242 @@
+# app/agents/context_assembler.py
+import os
+import re
+import math
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import List, Dict, Any, Optional
+
+from app.service.dedup_service import minhash, jaccard_estimate
+
+try:
+    import tiktoken
+
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:  # tiktoken 미설치/인코딩 파일 다운로드 불가 시 근사치 사용
+    _ENCODING = None
+
+_HEADER_RE = re.compile(r"^(Title|PublishedAt|URL|Publisher|CorpCode|Year):\s*(.*)$", re.MULTILINE)
+_SECTION_RE = re.compile(r"^\[(NEWS|ARTICLE|FINANCIALS)\]\s*$", re.MULTILINE)
+_HANGUL_RE = re.compile(r"[가-힣]")
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?다])\s")
+
+
+def count_tokens(text: str) -> int:
+    """프롬프트 토큰 수 추정 (tiktoken cl100k 기준, 없으면 한글 1글자≈1토큰 / 그 외 4글자≈1토큰)"""
+    if not text:
+        return 0
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text, disallowed_special=()))
+    hangul = len(_HANGUL_RE.findall(text))
+    return hangul + math.ceil((len(text) - hangul) / 4)
+
+
+def _parse_datetime(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        dt = parsedate_to_datetime(value)  # 네이버 API pubDate (RFC 822)
+    except (TypeError, ValueError):
+        try:
+            dt = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+@dataclass
+class Passage:
+    doc_id: str
+    text: str
+    metadata: Dict[str, Any]
+    rank: int
+    title: Optional[str] = None
+    url: Optional[str] = None
+    published_at: Optional[str] = None
+    score: float = 0.0
+
+    @property
+    def citation(self) -> Dict[str, Any]:
+        return {
+            "doc_id": self.doc_id,
+            "type": self.metadata.get("type"),
+            "title": self.title,
+            "published_at": self.published_at,
+            "url": self.url,
+        }
+
+
+@dataclass
+class AssembledContext:
+    text: str
+    citations: List[Dict[str, Any]] = field(default_factory=list)
+    tokens: int = 0
+    dropped_duplicates: int = 0
+    truncated: int = 0
+
+    @property
+    def doc_ids(self) -> List[str]:
+        return [c["doc_id"] for c in self.citations]
+
+
+class ContextAssembler:
+    """
+    검색 결과 → 분석 프롬프트용 {context} 조립.
+
+    1) KB 문서 헤더(Title/PublishedAt/URL)에서 인용 정보 추출 후 본문만 남김
+    2) 같은 URL(스니펫/본문) 또는 MinHash 유사도가 높은 문서는 하나만 유지
+    3) 검색 순위 + 최신성 가중치로 재정렬
+    4) token_budget 안에서 순서대로 채우고, 넘치는 문서는 문장 단위로 잘라 넣음
+    """
+
+    def __init__(
+        self,
+        token_budget: int = 3000,
+        recency_weight: float = 0.3,
+        recency_half_life_days: float = 14.0,
+        near_dup_threshold: float = 0.6,
+        min_passage_tokens: int = 80,
+        max_passage_tokens: Optional[int] = None,
+    ):
+        self.token_budget = token_budget
+        self.recency_weight = recency_weight
+        self.recency_half_life_days = recency_half_life_days
+        self.near_dup_threshold = near_dup_threshold
+        self.min_passage_tokens = min_passage_tokens
+        # 긴 기사 하나가 예산을 독차지하지 않도록 문서당 상한 (기본: 예산의 1/3)
+        self.max_passage_tokens = max_passage_tokens or max(token_budget // 3, min_passage_tokens)
+
+    def _to_passage(self, rank: int, doc_id: str, document: str, metadata: Dict[str, Any]) -> Passage:
+        headers = {k: v.strip() for k, v in _HEADER_RE.findall(document)}
+        body = _HEADER_RE.sub("", _SECTION_RE.sub("", document)).strip()
+        if metadata.get("type") == "financials":
+            # 재무 문서는 CorpCode/Year 줄 자체가 내용이므로 그대로 유지
+            body = _SECTION_RE.sub("", document).strip()
+            title = " ".join(
+                str(v) for v in (metadata.get("company_name"), metadata.get("bsns_year"), metadata.get("report_type")) if v
+            ) + " 재무제표"
+        else:
+            title = headers.get("Title")
+
+        return Passage(
+            doc_id=doc_id,
+            text=body,
+            metadata=metadata,
+            rank=rank,
+            title=title,
+            url=metadata.get("url") or headers.get("URL") or None,
+            published_at=metadata.get("published_at") or headers.get("PublishedAt") or None,
+        )
+
+    def _dedup(self, passages: List[Passage]) -> List[Passage]:
+        # 같은 URL은 더 긴 쪽(기사 본문)을 남기되 순위는 더 높은 쪽을 따름
+        by_url: Dict[str, Passage] = {}
+        kept: List[Passage] = []
+        for p in passages:
+            if p.url and p.url in by_url:
+                prev = by_url[p.url]
+                if len(p.text) > len(prev.text):
+                    p.rank = min(p.rank, prev.rank)
+                    kept[kept.index(prev)] = p
+                    by_url[p.url] = p
+                continue
+            if p.url:
+                by_url[p.url] = p
+            kept.append(p)
+
+        result: List[Passage] = []
+        sigs = []
+        for p in kept:
+            sig = minhash(p.text)
+            if any(jaccard_estimate(sig, s) >= self.near_dup_threshold for s in sigs):
+                continue
+            sigs.append(sig)
+            result.append(p)
+        return result
+
+    def _score(self, passages: List[Passage], now: datetime):
+        # rank는 중복 제거 전 검색 순위 (0부터)
+        n = max((p.rank for p in passages), default=0) + 1
+        for p in passages:
+            relevance = 1.0 - p.rank / n
+            dt = _parse_datetime(p.published_at)
+            if dt is None:
+                recency = 0.5  # 날짜 없는 문서(재무제표 등)는 중립
+            else:
+                age_days = max((now - dt).total_seconds() / 86400, 0.0)
+                recency = 0.5 ** (age_days / self.recency_half_life_days)
+            p.score = (1 - self.recency_weight) * relevance + self.recency_weight * recency
+
+    def _truncate(self, text: str, max_tokens: int) -> str:
+        sentences = _SENTENCE_END_RE.split(text)
+        out, used = [], 0
+        for sentence in sentences:
+            t = count_tokens(sentence)
+            if used + t > max_tokens:
+                break
+            out.append(sentence)
+            used += t
+        if out:
+            return " ".join(out) + " …"
+        # 첫 문장부터 예산을 넘으면 글자 수 비율로 자름
+        ratio = max_tokens / max(count_tokens(text), 1)
+        return text[: int(len(text) * ratio)] + "…"
+
+    @staticmethod
+    def _format(idx: int, p: Passage, body: str) -> str:
+        head = f"[{idx}] {p.title or '(제목 없음)'}"
+        if p.published_at:
+            head += f" | {p.published_at}"
+        if p.url:
+            head += f" | {p.url}"
+        return f"{head}\n{body}"
+
+    def assemble(self, results: Dict[str, Any], now: Optional[datetime] = None) -> AssembledContext:
+        """results: VectorService.search 반환값 (ids/documents/metadatas)"""
+        now = now or datetime.now(timezone.utc)
+        ids = results.get("ids") or []
+        documents = results.get("documents") or []
+        metadatas = results.get("metadatas") or [{}] * len(documents)
+
+        passages = [
+            self._to_passage(rank, doc_id, doc, meta or {})
+            for rank, (doc_id, doc, meta) in enumerate(zip(ids, documents, metadatas))
+            if doc
+        ]
+        deduped = self._dedup(passages)
+        self._score(deduped, now)
+        deduped.sort(key=lambda p: p.score, reverse=True)
+
+        blocks: List[str] = []
+        citations: List[Dict[str, Any]] = []
+        used = truncated = 0
+        for p in deduped:
+            block = self._format(len(blocks) + 1, p, p.text)
+            tokens = count_tokens(block)
+            remaining = min(self.token_budget - used, self.max_passage_tokens)
+            if tokens > remaining:
+                if remaining < self.min_passage_tokens:
+                    continue  # 뒤쪽의 짧은 문서(스니펫 등)는 아직 들어갈 수 있음
+                header_tokens = count_tokens(self._format(len(blocks) + 1, p, ""))
+                block = self._format(len(blocks) + 1, p, self._truncate(p.text, remaining - header_tokens))
+                tokens = count_tokens(block)
+                truncated += 1
+            blocks.append(block)
+            citations.append(p.citation)
+            used += tokens
+
+        return AssembledContext(
+            text="\n\n".join(blocks),
+            citations=citations,
+            tokens=used,
+            dropped_duplicates=len(passages) - len(deduped),
+            truncated=truncated,
+        )
+
+
+def get_context_assembler() -> ContextAssembler:
+    return ContextAssembler(
+        token_budget=int(os.getenv("ANALYSIS_CONTEXT_TOKEN_BUDGET", "3000")),
+        recency_weight=float(os.getenv("ANALYSIS_CONTEXT_RECENCY_WEIGHT", "0.3")),
+    )
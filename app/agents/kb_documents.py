@@ -0,0 +1,107 @@
+# app/agents/kb_documents.py
+"""
+KB(VectorDB)에 저장하는 문서(본문 + 메타데이터) 형식.
+InfoCollector 서브그래프와 대량 백필(scripts.backfill_kb)이 같은 형식/ID로 저장하도록 공용으로 둡니다.
+"""
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+
+# ✅ 현재 날짜 기준으로 가장 최신 보고서(연도, 타입)를 계산하는 함수
+def latest_report_params(now: Optional[datetime] = None) -> Dict[str, Any]:
+    now = now or datetime.now()
+    year = now.year
+    month = now.month
+    day = now.day
+
+    # DART 제출 기한을 보수적으로 적용하여 타겟 설정
+    if month < 4:
+        # 1월~3월: 작년 사업보고서(FY)도 아직 안 나옴 -> 작년 3분기(Q3)가 최신
+        return {"bsns_year": year - 1, "report_type": "Q3"}
+
+    elif month == 4 or (month == 5 and day <= 15):
+        # 4월 ~ 5월 15일: 작년 사업보고서(FY) 확정됨
+        return {"bsns_year": year - 1, "report_type": "FY"}
+
+    elif month < 8 or (month == 8 and day <= 14):
+        # 5월 16일 ~ 8월 14일: 올해 1분기 보고서(Q1) 확정됨
+        return {"bsns_year": year, "report_type": "Q1"}
+
+    elif month < 11 or (month == 11 and day <= 14):
+        # 8월 15일 ~ 11월 14일: 올해 반기 보고서(H1) 확정됨
+        return {"bsns_year": year, "report_type": "H1"}
+
+    else:
+        # 11월 15일 ~ 12월: 올해 3분기 보고서(Q3) 확정됨
+        return {"bsns_year": year, "report_type": "Q3"}
+
+
+def news_snippet_document(item: Dict[str, Any], company: Dict[str, Any]) -> Dict[str, Any]:
+    """search_news 결과 항목 → KB 문서"""
+    save_text = (
+        "[NEWS]\n"
+        f"Title: {item.get('title')}\n"
+        f"PublishedAt: {item.get('published_at')}\n"
+        f"URL: {item.get('url')}\n"
+        f"Summary: {item.get('summary')}\n"
+    )
+    return {
+        "content": save_text,
+        "metadata": {
+            "type": "news_snippet",
+            "url": item.get("url"),
+            "id": item.get("id"),
+            "published_at": item.get("published_at"),
+            "company_name": company.get("company_name"),
+            "stock_code": company.get("stock_code"),
+            "corp_code": company.get("corp_code"),
+            "source": item.get("source"),
+        }
+    }
+
+
+def news_article_document(article: Dict[str, Any], company: Dict[str, Any]) -> Dict[str, Any]:
+    """fetch_article_from_url 결과 → KB 문서"""
+    body = article.get("body") or ""
+    save_text = (
+        "[ARTICLE]\n"
+        f"Title: {article.get('title')}\n"
+        f"PublishedAt: {article.get('published_at')}\n"
+        f"URL: {article.get('url')}\n"
+        f"Publisher: {article.get('publisher')}\n\n"
+        f"{body}"
+    )
+    return {
+        "content": save_text,
+        "metadata": {
+            "type": "news_article",
+            "url": article.get("url"),
+            "published_at": article.get("published_at"),
+            "company_name": company.get("company_name"),
+            "stock_code": company.get("stock_code"),
+            "corp_code": company.get("corp_code"),
+            "publisher": article.get("publisher"),
+        }
+    }
+
+
+def financials_document(content: Dict[str, Any], company: Dict[str, Any]) -> Dict[str, Any]:
+    """get_financial_statement 결과 → KB 문서"""
+    ka = content.get("key_accounts") or {}
+    save_text = (
+        "[FINANCIALS]\n"
+        f"CorpCode: {content.get('corp_code')}\n"
+        f"Year: {content.get('bsns_year')} Report: {content.get('report_type')}\n"
+        f"KeyAccounts: {ka}"
+    )
+    return {
+        "content": save_text,
+        "metadata": {
+            "type": "financials",
+            "corp_code": company.get("corp_code"),
+            "company_name": company.get("company_name"),
+            "stock_code": company.get("stock_code"),
+            "bsns_year": content.get("bsns_year"),
+            "report_type": content.get("report_type"),
+        }
+    }
@@ -0,0 +1,262 @@
+# app/agents/kb_sources.py
+"""
+외부 수집원(네이버 뉴스 검색 API / 기사 HTML / DART 주요계정 API) 응답 파서.
+InfoCollector 도구(app.agents.tools)와 대량 백필(app.service.backfill_service)이 함께 쓰며,
+LLM/임베딩 클라이언트를 만들지 않으므로 서비스 계층에서 가볍게 import 할 수 있습니다.
+"""
+import re
+import html
+import json
+import hashlib
+from typing import Optional, Dict, Any, List, Literal
+
+from bs4 import BeautifulSoup
+
+NAVER_NEWS_URL = "https://openapi.naver.com/v1/search/news.json"
+DART_SINGLE_ACCOUNT_URL = "https://opendart.fss.or.kr/api/fnlttSinglAcnt.json"
+
+ReportType = Literal["Q1", "H1", "Q3", "FY"]
+
+REPRT_CODE_MAP = {
+    "Q1": "11013",
+    "H1": "11012",
+    "Q3": "11014",
+    "FY": "11011",
+}
+
+
+def clean_html(text: str) -> str:
+    text = html.unescape(text or "")
+    text = re.sub(r"<[^>]+>", "", text)
+    return text.strip()
+
+
+def make_id(url: str) -> str:
+    return hashlib.sha256((url or "").encode("utf-8")).hexdigest()
+
+
+def parse_naver_news_items(topic: str, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """네이버 뉴스 검색 API 응답 → 뉴스 항목 리스트 (URL 중복 제거)"""
+    results: List[Dict[str, Any]] = []
+    seen_urls = set()
+
+    for item in data.get("items", []):
+        url = item.get("link")
+        if not url or url in seen_urls:
+            continue
+        seen_urls.add(url)
+
+        results.append({
+            "id": make_id(url),
+            "topic": topic,
+            "title": clean_html(item.get("title", "")),
+            "summary": clean_html(item.get("description", "")),
+            "url": url,
+            "published_at": item.get("pubDate"),
+            "source": "NAVER",
+        })
+    return results
+
+
+def _clean_text(s: str) -> str:
+    s = (s or "").strip()
+    s = re.sub(r"\n{3,}", "\n\n", s)
+    return s
+
+
+def _extract_json_ld(soup: BeautifulSoup) -> Dict[str, Any]:
+    out: Dict[str, Any] = {}
+    for tag in soup.find_all("script", attrs={"type": "application/ld+json"}):
+        raw = tag.string
+        if not raw:
+            continue
+        try:
+            data = json.loads(raw)
+        except Exception:
+            continue
+
+        candidates = data if isinstance(data, list) else [data]
+        for c in candidates:
+            if not isinstance(c, dict):
+                continue
+            t = c.get("@type")
+            if t in ("NewsArticle", "Article", "ReportageNewsArticle"):
+                out["title"] = out.get("title") or c.get("headline")
+                out["published_at"] = out.get("published_at") or c.get("datePublished")
+                out["modified_at"] = out.get("modified_at") or c.get("dateModified")
+                pub = c.get("publisher")
+                if isinstance(pub, dict):
+                    out["publisher"] = out.get("publisher") or pub.get("name")
+                author = c.get("author")
+                if isinstance(author, dict):
+                    out["author"] = out.get("author") or author.get("name")
+                elif isinstance(author, list) and author and isinstance(author[0], dict):
+                    out["author"] = out.get("author") or author[0].get("name")
+    return out
+
+
+def _parse_naver_news(soup: BeautifulSoup) -> Dict[str, Any]:
+    title = None
+    for sel in ["h2#title_area", "h2.media_end_head_headline"]:
+        el = soup.select_one(sel)
+        if el and el.get_text(strip=True):
+            title = el.get_text(" ", strip=True)
+            break
+
+    body_el = soup.select_one("#dic_area") or soup.select_one("div#articeBody")
+    body = body_el.get_text("\n", strip=True) if body_el else None
+
+    publisher = None
+    press_el = soup.select_one(".media_end_head_top_logo img")
+    if press_el and press_el.get("alt"):
+        publisher = press_el.get("alt")
+
+    published_at = None
+    time_el = soup.select_one("span.media_end_head_info_datestamp_time")
+    if time_el and time_el.get("data-date-time"):
+        published_at = time_el.get("data-date-time")
+
+    return {"title": title, "body": body, "publisher": publisher, "published_at": published_at}
+
+
+ARTICLE_REQUEST_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (compatible; invest-agent/1.0)",
+    "Accept-Language": "ko-KR,ko;q=0.9,en;q=0.8",
+}
+
+
+def parse_article_html(url: str, raw_html: str, collected_at: str) -> Dict[str, Any]:
+    """기사 HTML → 제목/본문/언론사/게시일 (네이버 뉴스는 전용 파서 사용)"""
+    soup = BeautifulSoup(raw_html, "html.parser")
+
+    canonical_url = None
+    canon = soup.find("link", rel="canonical")
+    if canon and canon.get("href"):
+        canonical_url = canon.get("href").strip()
+
+    ld = _extract_json_ld(soup)
+
+    if "news.naver.com" in (url or ""):
+        parsed = _parse_naver_news(soup)
+        title = parsed.get("title") or ld.get("title")
+        body = parsed.get("body")
+        publisher = parsed.get("publisher") or ld.get("publisher")
+        author = ld.get("author")
+        published_at = parsed.get("published_at") or ld.get("published_at")
+    else:
+        og_title = None
+        mt = soup.find("meta", property="og:title")
+        if mt and mt.get("content"):
+            og_title = mt.get("content").strip()
+
+        title = ld.get("title") or og_title or (soup.title.get_text(strip=True) if soup.title else None)
+        publisher = ld.get("publisher")
+        author = ld.get("author")
+        published_at = ld.get("published_at")
+        body = soup.get_text("\n", strip=True)
+
+    body = _clean_text(body or "")
+    ok = bool(body and len(body) >= 200)
+
+    return {
+        "status": "success" if ok else "error",
+        "url": url,
+        "canonical_url": canonical_url,
+        "title": title,
+        "body": body if body else None,
+        "publisher": publisher,
+        "author": author,
+        "published_at": published_at,
+        "collected_at": collected_at,
+        "error": None if ok else "extracted_body_too_short_or_empty",
+    }
+
+
+def parse_financial_statement_payload(
+    payload: Dict[str, Any],
+    corp_code: str,
+    bsns_year: int,
+    report_type: ReportType,
+) -> Dict[str, Any]:
+    """DART 단일회사 주요계정 API 응답 → 주요 계정 정규화 결과"""
+    status = payload.get("status")
+    if status != "000":
+        return {
+            "status": "error",
+            "message": payload.get("message"),
+            "dart_status": status,
+            "corp_code": corp_code,
+            "bsns_year": bsns_year,
+            "report_type": report_type,
+        }
+
+    rows: List[Dict[str, Any]] = payload.get("list", [])
+    normalized = _normalize_key_accounts(rows)
+
+    return {
+        "status": "success",
+        "corp_code": corp_code,
+        "bsns_year": bsns_year,
+        "report_type": report_type,
+        "reprt_code": REPRT_CODE_MAP[report_type],
+        "raw_count": len(rows),
+        "key_accounts": normalized,
+        "raw": rows,
+    }
+
+
+def _to_int_safe(v: Any) -> Optional[int]:
+    if v is None:
+        return None
+    s = str(v).strip()
+    if s in ("", "-", "null", "None"):
+        return None
+    s = s.replace(",", "")
+    if re.match(r"^\(.*\)$", s):
+        s = "-" + s.strip("()")
+    try:
+        return int(float(s))
+    except Exception:
+        return None
+
+
+def _normalize_key_accounts(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    result: Dict[str, Any] = {
+        "revenue": None,
+        "operating_income": None,
+        "net_income": None,
+        "total_assets": None,
+        "total_liabilities": None,
+        "total_equity": None,
+        "unit": None,
+        "fs_div": None,
+    }
+
+    for r in rows:
+        account = (r.get("account_nm") or "").strip()
+        amount = _to_int_safe(r.get("thstrm_amount"))
+        unit = r.get("currency") or r.get("currency_nm")
+        if unit and not result["unit"]:
+            result["unit"] = unit
+
+        fs_div = r.get("fs_div")
+        if fs_div and not result["fs_div"]:
+            result["fs_div"] = fs_div
+
+        if amount is None:
+            continue
+
+        if result["revenue"] is None and ("매출" in account):
+            result["revenue"] = amount
+        elif result["operating_income"] is None and ("영업이익" in account):
+            result["operating_income"] = amount
+        elif result["net_income"] is None and ("당기순이익" in account or "순이익" in account):
+            result["net_income"] = amount
+        elif result["total_assets"] is None and ("자산총계" in account or account == "자산총계"):
+            result["total_assets"] = amount
+        elif result["total_liabilities"] is None and ("부채총계" in account or account == "부채총계"):
+            result["total_liabilities"] = amount
+        elif result["total_equity"] is None and ("자본총계" in account or account == "자본총계"):
+            result["total_equity"] = amount
+
+    return result
@@ -1,15 +1,29 @@
+import os
 import json
-from typing import Dict, Any, List, Literal  # Literal 추가
+import operator
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Annotated
 from langgraph.graph import StateGraph, END
 from langgraph.prebuilt import ToolNode
+from langgraph.types import Send
+from langgraph.config import get_stream_writer
 from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
+from sqlalchemy.orm import Session
 
 from app.agents.tools import (
     get_portfolio_stocks,
     resolve_ticker,
-    analyze_stock_info
+    analyze_stock,
+    analyze_stocks_batch,
+    default_context_query,
+    ANALYSIS_SEARCH_RESULTS,
+    ANALYSIS_MODEL,
+    ANALYSIS_PROMPT_VERSION,
 )
+from app.repository.stock_report import get_fresh_report
 from app.core.logger import log_agent_step
+from app.agents.utils import is_generic_question
 
 
 # -------------------------
@@ -20,6 +34,69 @@ class InfoAnalysisAgentState(Dict):
     user_id: str
     analysis_data: Dict[str, Any]
     analysis_results: List[Dict[str, Any]]
+    # 병렬 분석 브랜치들이 각자 1건씩 추가 (완료 순서대로 쌓이므로 reduce에서 index로 정렬)
+    analysis_partials: Annotated[List[Dict[str, Any]], operator.add]
+
+
+# 동시에 실행할 종목 분석(LLM 호출) 수. 호출 측 config["max_concurrency"]가 있으면 그 값이 우선
+ANALYSIS_MAX_CONCURRENCY = int(os.getenv("ANALYSIS_MAX_CONCURRENCY", "5"))
+
+# 야간 배치(scripts.build_daily_digests)가 만든 다이제스트를 일반 질문에 그대로 제공할지 여부 / 허용 나이(일)
+ANALYSIS_SERVE_DIGESTS = os.getenv("ANALYSIS_SERVE_DIGESTS", "1") == "1"
+DIGEST_MAX_AGE_DAYS = int(os.getenv("DIGEST_MAX_AGE_DAYS", "1"))
+
+def _load_digest(config: RunnableConfig, stock_name: str):
+    """현재 모델/프롬프트 버전으로 만들어진 최근 다이제스트(generation="digest")가 있으면 반환"""
+    configurable = config.get("configurable") or {}
+    if not configurable.get("serve_digests", ANALYSIS_SERVE_DIGESTS):
+        return None
+    db_engine = configurable.get("db_engine")
+    if db_engine is None:
+        return None
+
+    since = datetime.now().date() - timedelta(days=DIGEST_MAX_AGE_DAYS)
+    with Session(db_engine) as db:
+        # 델타/전체 리포트는 특정 질문에 맞춰 생성된 것일 수 있어 일반 질문 응답에는 다이제스트만 사용
+        row = get_fresh_report(db, stock_name, since, generation="digest")
+    if row is None or row.model != ANALYSIS_MODEL or row.prompt_version != ANALYSIS_PROMPT_VERSION:
+        return None
+    return row
+
+
+def _digest_report(config: RunnableConfig, user_query: str, stock_name: str):
+    """일반 질문이면 다이제스트 리포트를 반환 (없거나 조회 실패 시 None)"""
+    if not is_generic_question(user_query, [stock_name]):
+        return None
+    try:
+        digest = _load_digest(config, stock_name)
+    except Exception as e:
+        log_agent_step("InfoAnalysis", f"digest lookup failed for {stock_name}", {"error": str(e)})
+        return None
+    return digest.report if digest is not None else None
+
+
+def _use_batch_tool(targets: List[Dict[str, Any]], config: RunnableConfig) -> bool:
+    """
+    종목별 스트리밍이 필요 없는 실행(configurable["batch_analysis"])에서 여러 종목이면
+    analyze_stocks_batch 도구 한 번으로 검색/생성을 묶어서 처리.
+    저장 리포트 재사용 모드(incremental/delta)는 종목별 analyze_stock에서만 지원하므로 Send 맵-리듀스를 유지.
+    """
+    configurable = config.get("configurable") or {}
+    report_mode = configurable.get("report_mode") or os.getenv("ANALYSIS_REPORT_MODE", "fresh")
+    return bool(configurable.get("batch_analysis")) and len(targets) >= 2 and report_mode == "fresh"
+
+
+def _target_entry(idx: int, target: Dict[str, Any], report: str, source: str, total: int) -> Dict[str, Any]:
+    entry = {
+        "index": idx,
+        "stock_name": target["name"],
+        "stock_code": target["code"],
+        "analysis_report": report,
+        "source": source,
+    }
+    # reduce를 기다리지 않고 종목별 완료 즉시 custom 스트림으로 내보냄
+    get_stream_writer()({"type": "stock_analyzed", "total": total, **entry})
+    return entry
 
 
 # -------------------------
@@ -27,14 +104,12 @@ class InfoAnalysisAgentState(Dict):
 # -------------------------
 def plan_analysis(state: InfoAnalysisAgentState):
     messages = state.get("messages", [])
-    data = state.get("analysis_data") or {"targets": [], "current_idx": 0, "phase": "setup"}
+    data = state.get("analysis_data") or {"targets": [], "phase": "setup"}
     results = state.get("analysis_results") or []
     user_id = state.get("user_id")
 
-    if data.get("phase") == "analyzing":
-        return loop_analysis(state)
-
     user_query = messages[-1].content if messages else ""
+    data["user_query"] = user_query
 
     if "포트폴리오" in user_query or "내 종목" in user_query:
         return {
@@ -59,7 +134,7 @@ def plan_analysis(state: InfoAnalysisAgentState):
 # -------------------------
 # Node 2: Setup Result
 # -------------------------
-def process_setup_result(state: InfoAnalysisAgentState):
+def process_setup_result(state: InfoAnalysisAgentState, config: RunnableConfig):
     messages = state.get("messages")
     data = state.get("analysis_data")
     last_msg = messages[-1]
@@ -72,6 +147,9 @@ def process_setup_result(state: InfoAnalysisAgentState):
     except:
         content = {}
 
+    if last_msg.name == "analyze_stocks_batch":
+        return _process_batch_result(data, content if isinstance(content, dict) else {})
+
     targets = []
     if last_msg.name == "get_portfolio_stocks" and content.get("status") == "success":
         for h in content.get("holdings", []):
@@ -79,7 +157,7 @@ def process_setup_result(state: InfoAnalysisAgentState):
     elif last_msg.name == "resolve_ticker" and content.get("status") == "success":
         targets.append({"name": content.get("company_name"), "code": content.get("stock_code")})
 
-    # 실패 시에도 루프 탈출을 위해 analyzing으로 강제 전환
+    # 실패 시에도 reduce로 바로 넘어가 종료되도록 analyzing으로 전환
     if not targets:
         error_json = json.dumps({"status": "error", "message": "No targets found"})
         data["phase"] = "analyzing"
@@ -90,67 +168,101 @@ def process_setup_result(state: InfoAnalysisAgentState):
 
     data["targets"] = targets
     data["phase"] = "analyzing"
-    data["current_idx"] = 0
 
-    return {"analysis_data": data}
+    if not _use_batch_tool(targets, config):
+        return {"analysis_data": data}
+
+    # 다이제스트로 답할 수 있는 종목은 바로 결과로 두고 나머지만 배치 도구로 생성
+    partials, pending = [], []
+    for idx, target in enumerate(targets):
+        report = _digest_report(config, data.get("user_query", ""), target["name"])
+        if report is not None:
+            partials.append(_target_entry(idx, target, report, "digest", len(targets)))
+        else:
+            pending.append(idx)
+
+    data["batch_indices"] = pending
+    data["phase"] = "batching" if pending else "batch_done"
+    update: Dict[str, Any] = {"analysis_data": data, "analysis_partials": partials}
+    if pending:
+        update["messages"] = [AIMessage(
+            content="Analyze Stocks Batch",
+            tool_calls=[{
+                "name": "analyze_stocks_batch",
+                "args": {"stock_names": [targets[i]["name"] for i in pending]},
+                "id": "batch_call",
+            }],
+        )]
+    return update
+
+
+def _process_batch_result(data: Dict[str, Any], content: Dict[str, Any]):
+    """analyze_stocks_batch 결과를 종목별 partial로 변환 (도구 자체가 실패하면 종목마다 같은 오류 메시지)"""
+    targets = data.get("targets") or []
+    indices = data.get("batch_indices") or []
+    results = content.get("results") or []
+    message = content.get("message") or "리포트 생성 중 오류 발생"
+
+    partials = []
+    for pos, idx in enumerate(indices):
+        result = results[pos] if pos < len(results) else {}
+        report = result.get("report") if result.get("status") != "error" else None
+        partials.append(_target_entry(
+            idx, targets[idx], report if report is not None else (result.get("error") or message), "live", len(targets)
+        ))
+
+    data["phase"] = "batch_done"
+    return {"analysis_data": data, "analysis_partials": partials}
+
+
 
 
 # -------------------------
-# Node 3: Loop Analysis
+# Node 3: Analyze Target (map)
 # -------------------------
-def loop_analysis(state: InfoAnalysisAgentState):
-    data = state.get("analysis_data", {})
-    targets = data.get("targets", [])
-    idx = data.get("current_idx", 0)
-    results = state.get("analysis_results") or []
+def analyze_target(state: Dict[str, Any], config: RunnableConfig):
+    """Send로 종목마다 하나씩 실행되는 분석 브랜치 (브랜치끼리 병렬 실행)"""
+    target = state["target"]
+    stock_name = target["name"]
+    source = "live"
 
-    # 종료 조건
-    if idx >= len(targets):
-        final_json_str = json.dumps(results, ensure_ascii=False, indent=2)
-        return {
-            "analysis_results": results,
-            "messages": [AIMessage(content=final_json_str)]
-        }
+    report = _digest_report(config, state.get("user_query", ""), stock_name)
+    if report is not None:
+        source = "digest"
+    else:
+        try:
+            report = analyze_stock(
+                stock_name,
+                default_context_query(stock_name),
+                config,
+                results=state.get("results"),
+            )
+        except Exception as e:
+            report = f"리포트 생성 중 오류 발생: {e}"
 
-    # 분석 결과 저장 로직
-    last_msg = state["messages"][-1]
-    if isinstance(last_msg, ToolMessage) and last_msg.name == "analyze_stock_info":
-        current_target = targets[idx]
-        analyzed_entry = {
-            "stock_name": current_target["name"],
-            "stock_code": current_target["code"],
-            "analysis_report": last_msg.content
-        }
-        results.append(analyzed_entry)
-        data["current_idx"] = idx + 1
-        return {
-            "analysis_data": data,
-            "analysis_results": results
-        }
+    return {"analysis_partials": [_target_entry(state["index"], target, report, source, state["total"])]}
 
-    # 다음 분석 실행
-    target = targets[idx]
-    stock_name = target["name"]
 
+# -------------------------
+# Node 4: Reduce Analysis
+# -------------------------
+def reduce_analysis(state: InfoAnalysisAgentState):
+    """완료 순서와 무관하게 targets 순서대로 결과를 정리"""
+    partials = sorted(state.get("analysis_partials") or [], key=lambda r: r["index"])
+    results = (state.get("analysis_results") or []) + [
+        {k: v for k, v in r.items() if k != "index"} for r in partials
+    ]
+
+    final_json_str = json.dumps(results, ensure_ascii=False, indent=2)
     return {
-        "messages": [AIMessage(
-            content=f"Analyzing {stock_name}...",
-            tool_calls=[{
-                "name": "analyze_stock_info",
-                "args": {
-                    "stock_name": stock_name,
-                    "context_query": f"{stock_name} 최근 주요 뉴스 실적 재무제표 이슈"
-                },
-                "id": f"analyze_{idx}"
-            }]
-        )]
+        "analysis_results": results,
+        "messages": [AIMessage(content=final_json_str)]
     }
 
 
 # -------------------------
-# ✅ [NEW] Routing Logics
+# Routing Logics
 # -------------------------
-
 def route_main(state: InfoAnalysisAgentState):
     """Plan 단계에서 툴 호출인지 판단"""
     messages = state.get("messages")
@@ -163,43 +275,41 @@ def route_main(state: InfoAnalysisAgentState):
     return END  # 비정상 상황
 
 
-def route_after_tools(state: InfoAnalysisAgentState) -> Literal["process_setup_result", "loop_analysis"]:
+def _prefetch_results(targets: List[Dict[str, Any]], config: RunnableConfig) -> List[Any]:
     """
-    🛠️ 핵심 수정: Tools 실행 후 어디로 갈지 결정하는 라우터
+    여러 종목이면 KB 검색을 search_many로 한 번에 수행 (쿼리 임베딩 1회 + collection.query 1회).
+    실패하거나 단일 종목이면 None → 각 브랜치가 개별 검색
     """
-    messages = state.get("messages")
-    last_msg = messages[-1]  # ToolMessage
-    tool_name = last_msg.name
-
-    # 1. 셋업 툴(종목확인, 포트폴리오)이면 -> 결과 처리 노드로
-    if tool_name in ["resolve_ticker", "get_portfolio_stocks"]:
-        return "process_setup_result"
-
-    # 2. 분석 툴이면 -> 루프 노드로 (결과 저장 및 다음 종목)
-    elif tool_name == "analyze_stock_info":
-        return "loop_analysis"
-
-    return "loop_analysis"  # 기본값
-
-
-def route_after_loop(state: InfoAnalysisAgentState):
-    """Loop 단계에서 계속할지, 툴 호출할지, 끝낼지 결정"""
-    messages = state.get("messages")
-    last_msg = messages[-1]
-
-    # 최종 결과(AIMessage + No tool call) -> 끝
-    if isinstance(last_msg, AIMessage) and not last_msg.tool_calls:
-        return END
-
-    # 툴 호출(analyze_stock_info) -> Tools
-    if isinstance(last_msg, AIMessage) and last_msg.tool_calls:
+    vector_service = (config.get("configurable") or {}).get("vector_service")
+    if len(targets) < 2 or vector_service is None:
+        return [None] * len(targets)
+    try:
+        return vector_service.search_many(
+            [default_context_query(t["name"]) for t in targets], n_results=ANALYSIS_SEARCH_RESULTS
+        )
+    except Exception as e:
+        log_agent_step("InfoAnalysis", "batched search failed, falling back to per-target search", {"error": str(e)})
+        return [None] * len(targets)
+
+
+def fan_out_targets(state: InfoAnalysisAgentState, config: RunnableConfig):
+    """종목마다 analyze_target 브랜치를 하나씩 띄움 (map). 대상이 없거나 배치 도구로 처리하면 tools/reduce로"""
+    data = state.get("analysis_data") or {}
+    targets = data.get("targets") or []
+    if data.get("phase") == "batching":
         return "tools"
+    if not targets or data.get("phase") == "batch_done":
+        return "reduce_analysis"
 
-    # ToolMessage가 왔으면(분석완료) -> 다시 Loop로
-    if isinstance(last_msg, ToolMessage):
-        return "loop_analysis"
-
-    return END
+    user_query = data.get("user_query", "")
+    prefetched = _prefetch_results(targets, config)
+    return [
+        Send("analyze_target", {
+            "target": target, "index": idx, "total": len(targets),
+            "user_query": user_query, "results": results,
+        })
+        for idx, (target, results) in enumerate(zip(targets, prefetched))
+    ]
 
 
 # -------------------------
@@ -209,37 +319,26 @@ workflow = StateGraph(InfoAnalysisAgentState)
 
 workflow.add_node("plan_analysis", plan_analysis)
 workflow.add_node("process_setup_result", process_setup_result)
-workflow.add_node("loop_analysis", loop_analysis)
-workflow.add_node("tools", ToolNode([get_portfolio_stocks, resolve_ticker, analyze_stock_info]))
+workflow.add_node("analyze_target", analyze_target)
+workflow.add_node("reduce_analysis", reduce_analysis)
+workflow.add_node("tools", ToolNode([get_portfolio_stocks, resolve_ticker, analyze_stocks_batch]))
 
 workflow.set_entry_point("plan_analysis")
 
-# 1. Plan -> Tools (툴 호출 시)
+# 1. Plan -> Tools (종목확인 / 포트폴리오 조회, 배치 모드면 SetupResult -> Tools(analyze_stocks_batch)도 거침)
 workflow.add_conditional_edges("plan_analysis", route_main, {"tools": "tools", END: END})
 
-# 2. Tools -> (분기) -> SetupResult 또는 LoopAnalysis
-# ✅ 여기가 수정됨: 무조건 loop_analysis가 아니라 조건부 이동
-workflow.add_conditional_edges(
-    "tools",
-    route_after_tools,
-    {
-        "process_setup_result": "process_setup_result",
-        "loop_analysis": "loop_analysis"
-    }
-)
-
-# 3. SetupResult -> LoopAnalysis (셋업 끝났으니 분석 시작)
-workflow.add_edge("process_setup_result", "loop_analysis")
+# 2. Tools -> SetupResult
+workflow.add_edge("tools", "process_setup_result")
 
-# 4. LoopAnalysis -> (분기) -> Tools 또는 END
+# 3. SetupResult -> (종목별 병렬) AnalyzeTarget -> Reduce
 workflow.add_conditional_edges(
-    "loop_analysis",
-    route_after_loop,
-    {
-        "tools": "tools",
-        "loop_analysis": "loop_analysis",
-        END: END
-    }
+    "process_setup_result",
+    fan_out_targets,
+    ["analyze_target", "reduce_analysis", "tools"],
 )
+workflow.add_edge("analyze_target", "reduce_analysis")
+workflow.add_edge("reduce_analysis", END)
 
-info_analysis_graph = workflow.compile()
\ No newline at end of file
+# 병렬 브랜치 수 상한: 동기 invoke 시 스레드 풀 크기도 이 값으로 정해짐
+info_analysis_graph = workflow.compile().with_config(max_concurrency=ANALYSIS_MAX_CONCURRENCY)
@@ -1,14 +1,15 @@
 # app/agents/subgraphs/info_collector.py
 
 from typing import Dict, Any, List, Optional
-from datetime import datetime
 import uuid
 import json
 import ast
 
 from langgraph.graph import StateGraph, END
 from langgraph.prebuilt import ToolNode
-from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage, RemoveMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.config import get_stream_writer
 
 from app.agents.state import InfoCollectorAgentState
 from app.agents.tools import (
@@ -20,8 +21,13 @@ from app.agents.tools import (
     get_financial_statement,
     add_many_to_invest_kb,
 )
+from app.agents.kb_documents import (
+    latest_report_params,
+    news_snippet_document,
+    news_article_document,
+    financials_document,
+)
 from app.core.logger import log_agent_step
-from app.core.db import engine
 
 # -------------------------
 # 0) 간단 휴리스틱
@@ -40,35 +46,6 @@ def _wants_financials(user_query: str) -> bool:
     return any(k.lower() in q for k in FIN_KEYWORDS)
 
 
-# ✅ [신규] 현재 날짜 기준으로 가장 최신 보고서(연도, 타입)를 계산하는 함수
-def _get_latest_report_params() -> Dict[str, Any]:
-    now = datetime.now()
-    year = now.year
-    month = now.month
-    day = now.day
-
-    # DART 제출 기한을 보수적으로 적용하여 타겟 설정
-    if month < 4:
-        # 1월~3월: 작년 사업보고서(FY)도 아직 안 나옴 -> 작년 3분기(Q3)가 최신
-        return {"bsns_year": year - 1, "report_type": "Q3"}
-
-    elif month == 4 or (month == 5 and day <= 15):
-        # 4월 ~ 5월 15일: 작년 사업보고서(FY) 확정됨
-        return {"bsns_year": year - 1, "report_type": "FY"}
-
-    elif month < 8 or (month == 8 and day <= 14):
-        # 5월 16일 ~ 8월 14일: 올해 1분기 보고서(Q1) 확정됨
-        return {"bsns_year": year, "report_type": "Q1"}
-
-    elif month < 11 or (month == 11 and day <= 14):
-        # 8월 15일 ~ 11월 14일: 올해 반기 보고서(H1) 확정됨
-        return {"bsns_year": year, "report_type": "H1"}
-
-    else:
-        # 11월 15일 ~ 12월: 올해 3분기 보고서(Q3) 확정됨
-        return {"bsns_year": year, "report_type": "Q3"}
-
-
 def _tool_call(name: str, args: Dict[str, Any]) -> Dict[str, Any]:
     return {"name": name, "args": args, "id": str(uuid.uuid4())}
 
@@ -88,6 +65,49 @@ def _reset_company_scope(collected: Dict[str, Any]):
     collected["articles"] = []
     collected["financials"] = None
     collected["fetch_article_index"] = 0
+    collected["holding_done"] = False
+
+
+def _kb_save_message(collected: Dict[str, Any]) -> AIMessage:
+    queue = collected["kb_save_queue"]
+    contents = [q["content"] for q in queue]
+    metadatas = [q["metadata"] for q in queue]
+    log_agent_step("InvestmentInfoCollector", "Plan: add_many_to_invest_kb", {"count": len(contents)})
+    return AIMessage(
+        content="Saving collected documents to KB...",
+        tool_calls=[_tool_call("add_many_to_invest_kb", {"contents": contents, "metadatas": metadatas})],
+    )
+
+
+# 종목 1건 수집에 쓰이는 도구 (종목이 끝나면 호출/결과 메시지를 state에서 지울 수 있음)
+HOLDING_TOOLS = {
+    "resolve_ticker", "search_news", "extract_urls_from_search_result",
+    "fetch_article_from_url", "get_financial_statement", "add_many_to_invest_kb",
+}
+
+
+def _holding_messages(messages: List[Any]) -> List[RemoveMessage]:
+    """종목별 도구 호출(AIMessage)과 결과(ToolMessage)를 지우는 RemoveMessage 목록 (기사 본문이 messages 채널에 남지 않도록)"""
+    removals = []
+    for m in messages:
+        if not getattr(m, "id", None):
+            continue
+        if isinstance(m, ToolMessage):
+            if getattr(m, "name", None) in HOLDING_TOOLS:
+                removals.append(RemoveMessage(id=m.id))
+        elif isinstance(m, AIMessage) and m.tool_calls:
+            if all(tc["name"] in HOLDING_TOOLS for tc in m.tool_calls):
+                removals.append(RemoveMessage(id=m.id))
+    return removals
+
+
+def _holding_summary(result: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "company": result["company"],
+        "news_count": len(result["news"]),
+        "article_count": len(result["articles"]),
+        "financials_status": (result["financials"] or {}).get("status"),
+    }
 
 
 # -------------------------
@@ -148,17 +168,13 @@ def plan_next_action(state: InfoCollectorAgentState):
 
         if idx >= len(holdings):
             if collected.get("kb_save_queue"):
-                queue = collected["kb_save_queue"]
-                contents = [q["content"] for q in queue]
-                metadatas = [q["metadata"] for q in queue]
-                log_agent_step("InvestmentInfoCollector", "Plan: add_many_to_invest_kb", {"count": len(contents)})
-                msg = AIMessage(
-                    content="Saving collected documents to KB...",
-                    tool_calls=[_tool_call("add_many_to_invest_kb", {"contents": contents, "metadatas": metadatas})],
-                )
-                return {"collected": collected, "messages": [msg]}
+                return {"collected": collected, "messages": [_kb_save_message(collected)]}
             return {"collected": collected, "messages": [AIMessage(content="END")]}
 
+        # 수집이 끝난 종목의 문서는 다음 종목으로 넘어가기 전에 저장 (본문이 포트폴리오 끝까지 state에 쌓이지 않도록)
+        if collected.get("holding_done") and collected.get("kb_save_queue"):
+            return {"collected": collected, "messages": [_kb_save_message(collected)]}
+
         if not collected.get("company"):
             h = holdings[idx]
             user_input = h.get("ticker") or h.get("name") or h.get("stock_id")
@@ -222,7 +238,7 @@ def plan_next_action(state: InfoCollectorAgentState):
     if _wants_financials(user_query) and collected.get("financials") is None:
         corp_code = company.get("corp_code")
         # ✅ [수정] 가장 최근 보고서 파라미터 계산
-        target_params = _get_latest_report_params()
+        target_params = latest_report_params()
         bsns_year = target_params["bsns_year"]
         report_type = target_params["report_type"]
 
@@ -241,15 +257,7 @@ def plan_next_action(state: InfoCollectorAgentState):
 
     # 6) KB 저장 큐 처리
     if collected.get("kb_save_queue"):
-        queue = collected["kb_save_queue"]
-        contents = [q["content"] for q in queue]
-        metadatas = [q["metadata"] for q in queue]
-        log_agent_step("InvestmentInfoCollector", "Plan: add_many_to_invest_kb", {"count": len(contents)})
-        msg = AIMessage(
-            content="Saving collected documents to KB...",
-            tool_calls=[_tool_call("add_many_to_invest_kb", {"contents": contents, "metadatas": metadatas})],
-        )
-        return {"collected": collected, "messages": [msg]}
+        return {"collected": collected, "messages": [_kb_save_message(collected)]}
 
     # 7) 끝
     log_agent_step("InvestmentInfoCollector", "Plan: end", {"phase": collected.get("phase")})
@@ -259,7 +267,7 @@ def plan_next_action(state: InfoCollectorAgentState):
 # -------------------------
 # 2) Tool 결과 누적 (Accumulate)
 # -------------------------
-def accumulate(state: InfoCollectorAgentState):
+def accumulate(state: InfoCollectorAgentState, config: RunnableConfig):
     messages = state.get("messages", [])
     collected: Dict[str, Any] = state.get("collected") or {}
 
@@ -322,26 +330,7 @@ def accumulate(state: InfoCollectorAgentState):
 
             company = collected.get("company") or {}
             for it in items:
-                save_text = (
-                    "[NEWS]\n"
-                    f"Title: {it.get('title')}\n"
-                    f"PublishedAt: {it.get('published_at')}\n"
-                    f"URL: {it.get('url')}\n"
-                    f"Summary: {it.get('summary')}\n"
-                )
-                collected["kb_save_queue"].append({
-                    "content": save_text,
-                    "metadata": {
-                        "type": "news_snippet",
-                        "url": it.get("url"),
-                        "id": it.get("id"),
-                        "published_at": it.get("published_at"),
-                        "company_name": company.get("company_name"),
-                        "stock_code": company.get("stock_code"),
-                        "corp_code": company.get("corp_code"),
-                        "source": it.get("source"),
-                    }
-                })
+                collected["kb_save_queue"].append(news_snippet_document(it, company))
         else:
             collected["news"] = []
             collected["phase"] = "news_not_found"
@@ -369,27 +358,7 @@ def accumulate(state: InfoCollectorAgentState):
             collected["phase"] = "article_fetched"
 
             company = collected.get("company") or {}
-            body = content.get("body") or ""
-            save_text = (
-                "[ARTICLE]\n"
-                f"Title: {content.get('title')}\n"
-                f"PublishedAt: {content.get('published_at')}\n"
-                f"URL: {content.get('url')}\n"
-                f"Publisher: {content.get('publisher')}\n\n"
-                f"{body}"
-            )
-            collected["kb_save_queue"].append({
-                "content": save_text,
-                "metadata": {
-                    "type": "news_article",
-                    "url": content.get("url"),
-                    "published_at": content.get("published_at"),
-                    "company_name": company.get("company_name"),
-                    "stock_code": company.get("stock_code"),
-                    "corp_code": company.get("corp_code"),
-                    "publisher": content.get("publisher"),
-                }
-            })
+            collected["kb_save_queue"].append(news_article_document(content, company))
         else:
             collected.setdefault("article_errors", []).append(content)
             collected["phase"] = "article_fetch_error"
@@ -399,29 +368,16 @@ def accumulate(state: InfoCollectorAgentState):
         collected["phase"] = "financials_done"
         if content.get("status") == "success":
             company = collected.get("company") or {}
-            ka = content.get("key_accounts") or {}
-            save_text = (
-                "[FINANCIALS]\n"
-                f"CorpCode: {content.get('corp_code')}\n"
-                f"Year: {content.get('bsns_year')} Report: {content.get('report_type')}\n"
-                f"KeyAccounts: {ka}"
-            )
-            collected["kb_save_queue"].append({
-                "content": save_text,
-                "metadata": {
-                    "type": "financials",
-                    "corp_code": company.get("corp_code"),
-                    "company_name": company.get("company_name"),
-                    "stock_code": company.get("stock_code"),
-                    "bsns_year": content.get("bsns_year"),
-                    "report_type": content.get("report_type"),
-                }
-            })
+            collected["kb_save_queue"].append(financials_document(content, company))
         else:
             collected["errors"].append({"tool": "get_financial_statement", "content": content})
 
-    elif tool_name == "add_many_to_invest_kb" and isinstance(content, dict):
-        collected.setdefault("kb_saved", []).append(content)
+    elif tool_name == "add_many_to_invest_kb":
+        # 저장이 실패해도 같은 문서를 다시 보내지 않도록 큐는 비움 (실패 내용은 errors에 기록)
+        if isinstance(content, dict):
+            collected.setdefault("kb_saved", []).append(content)
+        else:
+            collected["errors"].append({"tool": tool_name, "content": content})
         collected["kb_save_queue"] = []
         collected["phase"] = "kb_saved"
 
@@ -444,17 +400,35 @@ def accumulate(state: InfoCollectorAgentState):
             articles = collected.get("articles") or []
             done = (len(articles) >= 2) or (fetch_idx >= len(urls) and collected.get("urls") is not None)
 
-        if done and idx < len(holdings):
+        if done and idx < len(holdings) and collected.get("kb_save_queue"):
+            # 이 종목 문서를 먼저 KB에 저장하고, 저장 결과가 돌아오면 종목을 마무리
+            collected["holding_done"] = True
+        elif done and idx < len(holdings):
             company = collected.get("company") or {}
-            collected["portfolio_results"].append({
+            holding_result = {
                 "company": company,
                 "news": collected.get("news") or [],
                 "articles": collected.get("articles") or [],
                 "financials": collected.get("financials"),
+            }
+            # 종목 하나가 끝나는 즉시 custom 스트림으로 내보냄 (stream_mode="custom"이 아니면 no-op)
+            get_stream_writer()({
+                "type": "holding_collected",
+                "index": idx,
+                "total": len(holdings),
+                **holding_result,
             })
+            # 스트림으로 이미 내보낸 본문은 state에 계속 들고 있지 않도록 요약만 남기고,
+            # 같은 본문을 담은 도구 메시지(fetch_article / search_news 결과 등)도 messages 채널에서 제거
+            release = (config.get("configurable") or {}).get("release_streamed_holdings")
+            if release:
+                holding_result = _holding_summary(holding_result)
+            collected["portfolio_results"].append(holding_result)
             collected["portfolio_index"] = idx + 1
             _reset_company_scope(collected)
             collected["phase"] = "portfolio_next"
+            if release:
+                return {"collected": collected, "messages": _holding_messages(messages)}
 
     return {"collected": collected}
 
@@ -493,18 +467,3 @@ workflow.add_edge("tools", "accumulate")
 workflow.add_edge("accumulate", "plan_next_action")
 
 info_collect_graph = workflow.compile()
-
-result = info_collect_graph.invoke(
-    {
-        "messages": [HumanMessage(content="내 포트폴리오 기준으로 뉴스랑 재무제표 가져와줘")],
-        "collected": {},
-        "user_id": "u123",  # ✅ state에 user_id 넣기
-    },
-    config={
-        "configurable": {
-            "db_engine": engine,
-            "join_stock_master": True,
-            # vector_service, ticker_resolver 등도 필요하면 여기에 추가
-        }
-    }
-)
\ No newline at end of file
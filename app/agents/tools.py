@@ -1,40 +1,47 @@
 # app/agents/tools.py
 
-from typing import Optional, Dict, Any, List, Literal, Union
+from typing import Optional, Dict, Any, List, Union
 import os
 import re
 import httpx
-import html
-import json
-import hashlib
-from datetime import datetime
+from datetime import datetime, timedelta
 
-from bs4 import BeautifulSoup
 from langchain.tools import tool
-from langchain_core.runnables import RunnableConfig
-
-from app.core.llm import get_solar_chat, get_upstage_embeddings
-from app.service.vector_service import VectorService
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+
+from app.core.llm import get_solar_chat, get_upstage_embeddings, get_chat_model, llm_slot
+from app.service.vector_service import VectorService, make_doc_id
+from app.service.dedup_service import get_near_duplicate_detector
+from app.repository.kb_outbox import enqueue_documents
+from app.repository.stock_report import get_fresh_report, upsert_report
+from app.agents.context_assembler import get_context_assembler
+from app.agents.kb_sources import (
+    NAVER_NEWS_URL,
+    DART_SINGLE_ACCOUNT_URL,
+    ReportType,
+    REPRT_CODE_MAP,
+    ARTICLE_REQUEST_HEADERS,
+    parse_naver_news_items,
+    parse_article_html,
+    parse_financial_statement_payload,
+)
 
 from sqlalchemy import text
+from sqlalchemy.orm import Session
 
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
-from langchain_upstage import ChatUpstage
 
 embedding_fn = get_upstage_embeddings()
 solar_chat = get_solar_chat()
 
-NAVER_NEWS_URL = "https://openapi.naver.com/v1/search/news.json"
-
-ReportType = Literal["Q1", "H1", "Q3", "FY"]
-
-REPRT_CODE_MAP = {
-    "Q1": "11013",
-    "H1": "11012",
-    "Q3": "11014",
-    "FY": "11011",
-}
+# analyze_stock_info 리포트 생성 LLM 호출에 붙는 태그 (토큰 스트리밍 필터용)
+ANALYSIS_REPORT_TAG = "analysis_report"
+ANALYSIS_MODEL = "solar-pro"
+# 분석 프롬프트를 바꾸면 올려서 이전 캐시 리포트가 재사용되지 않도록 함
+ANALYSIS_PROMPT_VERSION = "v2"
+# 종목 분석 시 KB에서 가져오는 후보 문서 수 (context 조립 전)
+ANALYSIS_SEARCH_RESULTS = 10
 
 @tool
 def search_invest_kb(query: str, config: RunnableConfig) -> str:
@@ -44,28 +51,21 @@ def search_invest_kb(query: str, config: RunnableConfig) -> str:
         vector_service: VectorService = config["configurable"].get("vector_service")
         if not vector_service:
             return "Error: VectorService not found in config"
-        docs = vector_service.search(query, n_results=5)
+        results = vector_service.search(query, n_results=5)
+        docs = results.get("documents") or []
         print(f"[Tool: Internal KB Search] Found {len(docs)} documents.")
 
         context_parts = []
         for i, d in enumerate(docs):
-            content_preview = d.page_content[:100].replace('\n', ' ') if d.page_content else ""
+            content_preview = d[:100].replace('\n', ' ') if d else ""
             print(f" - Document {i + 1}: {content_preview}...")
+            if d:
+                context_parts.append(d)
         return "\n\n".join(context_parts)
     except Exception as e:
         print(f"[Tool: Internal KB Search] Error: {e}")
         return f"Search Error: {e}"
 
-def clean_html(text: str) -> str:
-    text = html.unescape(text or "")
-    text = re.sub(r"<[^>]+>", "", text)
-    return text.strip()
-
-
-def make_id(url: str) -> str:
-    return hashlib.sha256((url or "").encode("utf-8")).hexdigest()
-
-
 @tool
 def add_to_invest_kb(
     content: str,
@@ -108,8 +108,9 @@ def add_many_to_invest_kb(
     print(f"\n[Tool: Add Many Knowledge] Adding {len(contents)} docs to KB...")
 
     try:
+        ingest_mode = config["configurable"].get("kb_ingest_mode") or os.getenv("KB_INGEST_MODE", "inline")
         vector_service: VectorService = config["configurable"].get("vector_service")
-        if not vector_service:
+        if not vector_service and ingest_mode != "outbox":
             return {"status": "error", "message": "VectorService not found in config", "saved": 0}
 
         # ✅ 빈 문자열/공백 문서 제거 (품질/에러 방지)
@@ -135,12 +136,29 @@ def add_many_to_invest_kb(
         if not filtered:
             return {"status": "success", "message": "No valid contents to add.", "saved": 0}
 
-        vector_service.add_documents(filtered, filtered_meta)
+        # ✅ outbox 모드: DB 대기열에만 넣고 반환 (임베딩/중복 제거는 scripts.run_kb_outbox_worker가 배치로 처리)
+        if ingest_mode == "outbox":
+            db_engine = config["configurable"].get("db_engine")
+            if db_engine is None:
+                return {"status": "error", "message": "db_engine not found in config", "saved": 0}
+            with Session(db_engine) as db:
+                queued = enqueue_documents(db, filtered, filtered_meta, [make_doc_id(c) for c in filtered])
+            return {
+                "status": "success",
+                "message": "Queued documents for knowledge base ingestion.",
+                "saved": 0,
+                "queued": queued,
+            }
+
+        # ✅ 근접 중복(같은 기사 재배포, 동일 헤드라인) 제거 후 원본만 임베딩
+        detector = config["configurable"].get("near_dup_detector") or get_near_duplicate_detector()
+        plan = vector_service.add_documents_deduped(detector, filtered, filtered_meta)
 
         return {
             "status": "success",
             "message": "Successfully added documents to investment knowledge base.",
-            "saved": len(filtered),
+            "saved": len(plan.contents),
+            "duplicates_skipped": plan.skipped,
         }
 
     except Exception as e:
@@ -164,25 +182,7 @@ def search_naver_news(topic: str, max_results: int = 20, sort: str = "date") ->
         resp.raise_for_status()
         data = resp.json()
 
-    results: List[Dict[str, Any]] = []
-    seen_urls = set()
-
-    for item in data.get("items", []):
-        url = item.get("link")
-        if not url or url in seen_urls:
-            continue
-        seen_urls.add(url)
-
-        results.append({
-            "id": make_id(url),
-            "topic": topic,
-            "title": clean_html(item.get("title", "")),
-            "summary": clean_html(item.get("description", "")),
-            "url": url,
-            "published_at": item.get("pubDate"),
-            "source": "NAVER",
-        })
-    return results
+    return parse_naver_news_items(topic, data)
 
 
 @tool
@@ -230,67 +230,6 @@ def extract_urls_from_search_result(result: Union[str, Dict[str, Any]]) -> List[
     return unique
 
 
-def _clean_text(s: str) -> str:
-    s = (s or "").strip()
-    s = re.sub(r"\n{3,}", "\n\n", s)
-    return s
-
-
-def _extract_json_ld(soup: BeautifulSoup) -> Dict[str, Any]:
-    out: Dict[str, Any] = {}
-    for tag in soup.find_all("script", attrs={"type": "application/ld+json"}):
-        raw = tag.string
-        if not raw:
-            continue
-        try:
-            data = json.loads(raw)
-        except Exception:
-            continue
-
-        candidates = data if isinstance(data, list) else [data]
-        for c in candidates:
-            if not isinstance(c, dict):
-                continue
-            t = c.get("@type")
-            if t in ("NewsArticle", "Article", "ReportageNewsArticle"):
-                out["title"] = out.get("title") or c.get("headline")
-                out["published_at"] = out.get("published_at") or c.get("datePublished")
-                out["modified_at"] = out.get("modified_at") or c.get("dateModified")
-                pub = c.get("publisher")
-                if isinstance(pub, dict):
-                    out["publisher"] = out.get("publisher") or pub.get("name")
-                author = c.get("author")
-                if isinstance(author, dict):
-                    out["author"] = out.get("author") or author.get("name")
-                elif isinstance(author, list) and author and isinstance(author[0], dict):
-                    out["author"] = out.get("author") or author[0].get("name")
-    return out
-
-
-def _parse_naver_news(soup: BeautifulSoup) -> Dict[str, Any]:
-    title = None
-    for sel in ["h2#title_area", "h2.media_end_head_headline"]:
-        el = soup.select_one(sel)
-        if el and el.get_text(strip=True):
-            title = el.get_text(" ", strip=True)
-            break
-
-    body_el = soup.select_one("#dic_area") or soup.select_one("div#articeBody")
-    body = body_el.get_text("\n", strip=True) if body_el else None
-
-    publisher = None
-    press_el = soup.select_one(".media_end_head_top_logo img")
-    if press_el and press_el.get("alt"):
-        publisher = press_el.get("alt")
-
-    published_at = None
-    time_el = soup.select_one("span.media_end_head_info_datestamp_time")
-    if time_el and time_el.get("data-date-time"):
-        published_at = time_el.get("data-date-time")
-
-    return {"title": title, "body": body, "publisher": publisher, "published_at": published_at}
-
-
 @tool
 def fetch_article_from_url(url: str) -> Dict[str, Any]:
     """
@@ -300,58 +239,12 @@ def fetch_article_from_url(url: str) -> Dict[str, Any]:
     collected_at = datetime.now().isoformat()
 
     try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (compatible; invest-agent/1.0)",
-            "Accept-Language": "ko-KR,ko;q=0.9,en;q=0.8",
-        }
-        with httpx.Client(timeout=20, headers=headers, follow_redirects=True) as client:
+        with httpx.Client(timeout=20, headers=ARTICLE_REQUEST_HEADERS, follow_redirects=True) as client:
             resp = client.get(url)
             resp.raise_for_status()
             raw_html = resp.text
 
-        soup = BeautifulSoup(raw_html, "html.parser")
-
-        canonical_url = None
-        canon = soup.find("link", rel="canonical")
-        if canon and canon.get("href"):
-            canonical_url = canon.get("href").strip()
-
-        ld = _extract_json_ld(soup)
-
-        if "news.naver.com" in (url or ""):
-            parsed = _parse_naver_news(soup)
-            title = parsed.get("title") or ld.get("title")
-            body = parsed.get("body")
-            publisher = parsed.get("publisher") or ld.get("publisher")
-            author = ld.get("author")
-            published_at = parsed.get("published_at") or ld.get("published_at")
-        else:
-            og_title = None
-            mt = soup.find("meta", property="og:title")
-            if mt and mt.get("content"):
-                og_title = mt.get("content").strip()
-
-            title = ld.get("title") or og_title or (soup.title.get_text(strip=True) if soup.title else None)
-            publisher = ld.get("publisher")
-            author = ld.get("author")
-            published_at = ld.get("published_at")
-            body = soup.get_text("\n", strip=True)
-
-        body = _clean_text(body or "")
-        ok = bool(body and len(body) >= 200)
-
-        return {
-            "status": "success" if ok else "error",
-            "url": url,
-            "canonical_url": canonical_url,
-            "title": title,
-            "body": body if body else None,
-            "publisher": publisher,
-            "author": author,
-            "published_at": published_at,
-            "collected_at": collected_at,
-            "error": None if ok else "extracted_body_too_short_or_empty",
-        }
+        return parse_article_html(url, raw_html, collected_at)
 
     except Exception as e:
         print(f"[Tool: Fetch Article] Error: {e}")
@@ -407,7 +300,7 @@ def get_financial_statement(
     if not dart_api_key:
         return {"status": "error", "message": "DART_API_KEY not found (env or config)"}
 
-    url = "https://opendart.fss.or.kr/api/fnlttSinglAcnt.json"
+    url = DART_SINGLE_ACCOUNT_URL
     params = {
         "crtfc_key": dart_api_key,
         "corp_code": corp_code,
@@ -421,30 +314,7 @@ def get_financial_statement(
             resp.raise_for_status()
             payload = resp.json()
 
-        status = payload.get("status")
-        if status != "000":
-            return {
-                "status": "error",
-                "message": payload.get("message"),
-                "dart_status": status,
-                "corp_code": corp_code,
-                "bsns_year": bsns_year,
-                "report_type": report_type,
-            }
-
-        rows: List[Dict[str, Any]] = payload.get("list", [])
-        normalized = _normalize_key_accounts(rows)
-
-        return {
-            "status": "success",
-            "corp_code": corp_code,
-            "bsns_year": bsns_year,
-            "report_type": report_type,
-            "reprt_code": REPRT_CODE_MAP[report_type],
-            "raw_count": len(rows),
-            "key_accounts": normalized,
-            "raw": rows,
-        }
+        return parse_financial_statement_payload(payload, corp_code, bsns_year, report_type)
 
     except Exception as e:
         print(f"[Tool: DART Financials] Error: {e}")
@@ -457,64 +327,6 @@ def get_financial_statement(
         }
 
 
-def _to_int_safe(v: Any) -> Optional[int]:
-    if v is None:
-        return None
-    s = str(v).strip()
-    if s in ("", "-", "null", "None"):
-        return None
-    s = s.replace(",", "")
-    if re.match(r"^\(.*\)$", s):
-        s = "-" + s.strip("()")
-    try:
-        return int(float(s))
-    except Exception:
-        return None
-
-
-def _normalize_key_accounts(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
-    result: Dict[str, Any] = {
-        "revenue": None,
-        "operating_income": None,
-        "net_income": None,
-        "total_assets": None,
-        "total_liabilities": None,
-        "total_equity": None,
-        "unit": None,
-        "fs_div": None,
-    }
-
-    for r in rows:
-        account = (r.get("account_nm") or "").strip()
-        amount = _to_int_safe(r.get("thstrm_amount"))
-        unit = r.get("currency") or r.get("currency_nm")
-        if unit and not result["unit"]:
-            result["unit"] = unit
-
-        fs_div = r.get("fs_div")
-        if fs_div and not result["fs_div"]:
-            result["fs_div"] = fs_div
-
-        if amount is None:
-            continue
-
-        if result["revenue"] is None and ("매출" in account):
-            result["revenue"] = amount
-        elif result["operating_income"] is None and ("영업이익" in account):
-            result["operating_income"] = amount
-        elif result["net_income"] is None and ("당기순이익" in account or "순이익" in account):
-            result["net_income"] = amount
-        elif result["total_assets"] is None and ("자산총계" in account or account == "자산총계"):
-            result["total_assets"] = amount
-        elif result["total_liabilities"] is None and ("부채총계" in account or account == "부채총계"):
-            result["total_liabilities"] = amount
-        elif result["total_equity"] is None and ("자본총계" in account or account == "자본총계"):
-            result["total_equity"] = amount
-
-    return result
-
-
-
 @tool
 def get_portfolio_stocks(user_id: str, config: RunnableConfig) -> Dict[str, Any]:
     """
@@ -554,49 +366,14 @@ def get_portfolio_stocks(user_id: str, config: RunnableConfig) -> Dict[str, Any]
         return {"status": "error", "user_id": user_id, "count": 0, "holdings": [], "error": str(e)}
 
 
-@tool
-def analyze_stock_info(stock_name: str, context_query: str, config: RunnableConfig) -> str:
-    """
-    특정 종목에 대해 VectorDB를 조회한 후, Solar LLM을 사용하여 전문적인 투자 분석 리포트를 작성합니다.
-    반환값은 Markdown 형식의 텍스트 리포트입니다.
-
-    Args:
-        stock_name: 분석할 종목명 (예: 삼성전자)
-        context_query: DB 검색 정확도를 높이기 위한 쿼리 (예: 삼성전자 최근 실적 및 주요 뉴스)
-    """
-    print(f"\n[Tool: Analyze Stock Info] Target: {stock_name}")
-
-    # 1. VectorDB 조회 (RAG)
-    try:
-        vector_service = config["configurable"].get("vector_service")
-        if not vector_service:
-            return "Error: VectorService not found in config"
-
-        # 분석을 위해 문서를 넉넉하게(7개) 가져옵니다.
-        docs = vector_service.search(context_query, n_results=7)
-
-        if not docs:
-            return f"'{stock_name}'에 대한 분석 가능한 데이터가 내부 DB에 없습니다."
-
-        # 문서 내용을 하나의 텍스트로 합침
-        context_text = "\n\n".join([d.page_content for d in docs])
-
-    except Exception as e:
-        return f"데이터 조회 중 오류 발생: {e}"
-
-    # 2. 분석용 LLM 설정 (Upstage Solar Pro 사용)
-    # .env 파일에 UPSTAGE_API_KEY 설정이 되어 있어야 합니다.
-    # 분석의 일관성을 위해 temperature=0으로 설정합니다.
-    llm = ChatUpstage(model="solar-pro", temperature=0)
-
-    # 3. 분석 프롬프트 (Analyst Persona)
-    prompt = PromptTemplate.from_template("""
+# 분석 프롬프트 (Analyst Persona) - 모듈 로드 시 한 번만 생성
+ANALYSIS_PROMPT = PromptTemplate.from_template("""
     당신은 20년 경력의 냉철한 주식 애널리스트입니다. 
     아래 [Context]는 '{stock_name}'와 관련하여 내부 데이터베이스에서 수집된 최신 정보입니다.
 
     이를 바탕으로 투자자를 위한 **투자 분석 리포트**를 작성하세요.
 
-    [Context - 수집된 정보]
+    [Context - 수집된 정보] (각 문서는 [번호] 제목 | 게시일 | URL 형식의 머리말로 시작)
     {context}
 
     [Reporting Format]
@@ -607,7 +384,7 @@ def analyze_stock_info(stock_name: str, context_query: str, config: RunnableConf
     - **핵심 요약:** (가장 중요한 이슈 3가지 이내 요약)
     - **시장 반응:** (긍정 / 부정 / 중립)
     - **상세 근거:** (뉴스 내용의 팩트와 수치를 인용하여 설명)
-    - **출처:** (기사 제목이나 날짜가 있다면 명시)
+    - **출처:** (근거로 쓴 문서의 [번호], 제목, 날짜를 명시)
 
     #### 📊 펀더멘털 분석 (재무 정보 존재 시)
     - **실적 추이:** (매출, 영업이익 등 재무 지표 변화)
@@ -619,14 +396,341 @@ def analyze_stock_info(stock_name: str, context_query: str, config: RunnableConf
     2. 출력은 반드시 Markdown 형식을 준수하시오.
     """)
 
-    # 4. Chain 실행
-    chain = prompt | llm | StrOutputParser()
 
-    try:
-        result = chain.invoke({
+# delta 리포트에 덧붙이는 업데이트 섹션 제목 / 누적 상한 (넘으면 전체 재생성으로 리포트를 다시 압축)
+DELTA_SECTION_HEADER = "#### 🔄 업데이트"
+DELTA_MAX_SECTIONS = int(os.getenv("ANALYSIS_DELTA_MAX_SECTIONS", "3"))
+DELTA_MAX_CHARS = int(os.getenv("ANALYSIS_DELTA_MAX_CHARS", "8000"))
+# 이보다 오래된 저장 리포트는 재사용/델타 대상에서 제외하고 전체 재생성
+REPORT_MAX_AGE_DAYS = int(os.getenv("ANALYSIS_REPORT_MAX_AGE_DAYS", "7"))
+# 델타로 누적하는 근거 문서 ID 상한 (최근 것만 유지)
+REPORT_MAX_DOC_IDS = int(os.getenv("ANALYSIS_REPORT_MAX_DOC_IDS", "200"))
+
+
+def _delta_exhausted(report: str) -> bool:
+    return report.count(DELTA_SECTION_HEADER) >= DELTA_MAX_SECTIONS or len(report) >= DELTA_MAX_CHARS
+
+
+# 저장된 리포트 이후 새로 들어온 문서만으로 업데이트를 작성하는 프롬프트 (report_mode="delta")
+ANALYSIS_DELTA_PROMPT = PromptTemplate.from_template("""
+    당신은 20년 경력의 냉철한 주식 애널리스트입니다.
+    아래는 '{stock_name}'에 대해 이전에 작성한 [기존 리포트]와, 그 이후 새로 수집된 [신규 정보]입니다.
+
+    [기존 리포트]
+    {previous_report}
+
+    [신규 정보] (각 문서는 [번호] 제목 | 게시일 | URL 형식의 머리말로 시작)
+    {context}
+
+    신규 정보만 요약해 기존 리포트에 덧붙일 업데이트를 작성하세요.
+    1. 기존 리포트와 중복되는 내용은 쓰지 마시오.
+    2. 기존 평가(시장 반응, 재무 평가)가 바뀌어야 한다면 그 이유를 명시하시오.
+    3. 근거 문서의 [번호]와 날짜를 명시하고, 신규 정보에 없는 내용은 지어내지 마시오(No Hallucination).
+    4. Markdown 글머리표 5개 이내로 작성하시오.
+    """)
+
+
+def build_analysis_chain(prompt: PromptTemplate = ANALYSIS_PROMPT):
+    """분석 프롬프트 | 풀링된 Solar 모델 | 문자열 파서 (일관성을 위해 temperature=0)"""
+    return prompt | get_chat_model(ANALYSIS_MODEL, temperature=0) | StrOutputParser()
+
+
+def default_context_query(stock_name: str) -> str:
+    return f"{stock_name} 최근 주요 뉴스 실적 재무제표 이슈"
+
+
+def _prepare_analysis(stock_name: str, results: Dict[str, Any], llm_cache) -> Dict[str, Any]:
+    """
+    검색 결과 → 프롬프트 입력 + 캐시 조회.
+    반환: {"status": "no_data" | "cached" | "pending", "stock_name", "context", "doc_ids", "cache_key", "report"}
+    """
+    assembled = get_context_assembler().assemble(results)
+    if not assembled.citations:
+        return {
+            "status": "no_data",
             "stock_name": stock_name,
-            "context": context_text
-        })
+            "report": f"'{stock_name}'에 대한 분석 가능한 데이터가 내부 DB에 없습니다.",
+        }
+
+    # 실제로 프롬프트에 들어간 문서만 캐시 키에 반영
+    prepared = {
+        "status": "pending",
+        "stock_name": stock_name,
+        "context": assembled.text,
+        "doc_ids": assembled.doc_ids,
+        "cache_key": None,
+    }
+
+    # 같은 종목 + 같은 근거 문서면 이전 리포트 재사용 (LLM 호출 생략)
+    if llm_cache is not None:
+        prepared["cache_key"], cached = llm_cache.lookup(
+            ANALYSIS_MODEL, ANALYSIS_PROMPT_VERSION, stock_name, prepared["doc_ids"]
+        )
+        if cached is not None:
+            prepared.update(status="cached", report=cached)
+    return prepared
+
+
+def _store_analysis(llm_cache, prepared: Dict[str, Any], report: str):
+    if llm_cache is not None and prepared.get("cache_key") is not None:
+        llm_cache.store(
+            prepared["cache_key"], ANALYSIS_MODEL, ANALYSIS_PROMPT_VERSION,
+            prepared["stock_name"], prepared["doc_ids"], report,
+        )
+
+
+def _run_analysis_chain(
+    inputs: Dict[str, Any],
+    config: RunnableConfig,
+    prompt: PromptTemplate = ANALYSIS_PROMPT,
+) -> str:
+    """
+    리포트 생성 1건. 모델별 동시 호출 수 제한 (초과 시 슬롯이 날 때까지 대기)
+    config(콜백)를 넘겨야 그래프 stream(messages 모드)/astream_events로 토큰이 흘러나가고,
+    태그/메타데이터로 어느 종목의 리포트 토큰인지 구분
+    """
+    chain = build_analysis_chain(prompt).with_config(
+        run_name="analysis_report",
+        tags=[ANALYSIS_REPORT_TAG],
+        metadata={"stock_name": inputs["stock_name"]},
+    )
+    with llm_slot(ANALYSIS_MODEL):
+        return chain.invoke(inputs, config=config)
+
+
+def _subset_results(results: Dict[str, Any], keep_ids: List[str]) -> Dict[str, Any]:
+    keep = set(keep_ids)
+    rows = [
+        row for row in zip(results.get("ids") or [], results.get("documents") or [], results.get("metadatas") or [])
+        if row[0] in keep
+    ]
+    return {
+        "ids": [r[0] for r in rows],
+        "documents": [r[1] for r in rows],
+        "metadatas": [r[2] for r in rows],
+    }
+
+
+def _incremental_report(
+    stock_name: str,
+    results: Dict[str, Any],
+    prepared: Dict[str, Any],
+    db_engine,
+    config: RunnableConfig,
+    llm_cache,
+    delta: bool,
+) -> str:
+    """
+    stock_reports에 저장된 최신 리포트와 근거 문서 ID를 비교해
+    - 새 문서가 없으면 저장된 리포트를 그대로 반환 (LLM 호출 없음)
+    - 새 문서가 있으면 전체 재생성, delta=True면 신규 문서만으로 업데이트 섹션을 덧붙임
+      (업데이트 섹션이 DELTA_MAX_SECTIONS개 이상이거나 리포트가 DELTA_MAX_CHARS자를 넘으면 전체 재생성)
+    - REPORT_MAX_AGE_DAYS일보다 오래된 리포트는 없는 것으로 보고 전체 재생성
+    """
+    today = datetime.now().date()
+    with Session(db_engine) as db:
+        stored = get_fresh_report(db, stock_name, today - timedelta(days=REPORT_MAX_AGE_DAYS))
+    if stored is not None and (stored.model, stored.prompt_version) != (ANALYSIS_MODEL, ANALYSIS_PROMPT_VERSION):
+        stored = None  # 프롬프트/모델이 바뀌면 이전 리포트는 재사용하지 않음
+
+    if prepared["status"] == "no_data":
+        return stored.report if stored is not None else prepared["report"]
+
+    stored_ids = list(stored.doc_ids or []) if stored is not None else []
+    stored_set = set(stored_ids)
+    new_ids = [doc_id for doc_id in prepared["doc_ids"] if doc_id not in stored_set]
+    if stored is not None and not new_ids:
+        print(f"[Tool: Analyze Stock Info] stored report reused: {stock_name}")
+        return stored.report
+
+    if stored is not None and delta and not _delta_exhausted(stored.report):
+        new_context = get_context_assembler().assemble(_subset_results(results, new_ids)).text
+        update = _run_analysis_chain(
+            {"stock_name": stock_name, "previous_report": stored.report, "context": new_context},
+            config,
+            prompt=ANALYSIS_DELTA_PROMPT,
+        )
+        report, generation = f"{stored.report}\n\n{DELTA_SECTION_HEADER} ({today.isoformat()})\n{update}", "delta"
+    elif prepared["status"] == "cached":
+        report, generation = prepared["report"], "full"
+    else:
+        report = _run_analysis_chain({"stock_name": stock_name, "context": prepared["context"]}, config)
+        _store_analysis(llm_cache, prepared, report)
+        generation = "full"
+
+    if generation == "delta":
+        # 검색 순위 변동으로 같은 문서가 "신규"로 반복 잡히지 않도록 델타 동안은 누적 ID로 저장 (최근 것만 상한까지)
+        doc_ids = (stored_ids + new_ids)[-REPORT_MAX_DOC_IDS:]
+    else:
+        # 전체 재생성 리포트의 근거는 이번 context 문서뿐이므로 누적을 초기화
+        doc_ids = list(prepared["doc_ids"])
+    with Session(db_engine) as db:
+        upsert_report(
+            db, stock_name, today, report, doc_ids,
+            model=ANALYSIS_MODEL, prompt_version=ANALYSIS_PROMPT_VERSION, generation=generation,
+        )
+    return report
+
+
+@tool
+def analyze_stock_info(stock_name: str, context_query: str, config: RunnableConfig) -> str:
+    """
+    특정 종목에 대해 VectorDB를 조회한 후, Solar LLM을 사용하여 전문적인 투자 분석 리포트를 작성합니다.
+    반환값은 Markdown 형식의 텍스트 리포트입니다.
+
+    Args:
+        stock_name: 분석할 종목명 (예: 삼성전자)
+        context_query: DB 검색 정확도를 높이기 위한 쿼리 (예: 삼성전자 최근 실적 및 주요 뉴스)
+    """
+    print(f"\n[Tool: Analyze Stock Info] Target: {stock_name}")
+    return analyze_stock(stock_name, context_query, config)
+
+
+def analyze_stock(
+    stock_name: str,
+    context_query: str,
+    config: RunnableConfig,
+    results: Optional[Dict[str, Any]] = None,
+) -> str:
+    """
+    analyze_stock_info 본문. results가 있으면(여러 종목을 search_many로 미리 검색한 경우) KB 검색을 생략합니다.
+    """
+    # 1. VectorDB 조회 (RAG)
+    try:
+        if results is None:
+            vector_service = config["configurable"].get("vector_service")
+            if not vector_service:
+                return "Error: VectorService not found in config"
+
+            # 후보는 넉넉하게(10개) 가져오고, 중복 제거 + 토큰 예산 안에서 context를 조립합니다.
+            results = vector_service.search(context_query, n_results=ANALYSIS_SEARCH_RESULTS)
+        llm_cache = config["configurable"].get("llm_cache")
+        prepared = _prepare_analysis(stock_name, results, llm_cache)
+
+    except Exception as e:
+        return f"데이터 조회 중 오류 발생: {e}"
+
+    # 저장 리포트 재사용 모드: incremental(새 문서 있을 때만 재생성) / delta(신규 문서 업데이트만 생성)
+    report_mode = config["configurable"].get("report_mode") or os.getenv("ANALYSIS_REPORT_MODE", "fresh")
+    db_engine = config["configurable"].get("db_engine")
+    if report_mode in ("incremental", "delta") and db_engine is not None:
+        try:
+            return _incremental_report(
+                stock_name, results, prepared, db_engine, config, llm_cache, delta=report_mode == "delta"
+            )
+        except Exception as e:
+            return f"리포트 생성 중 오류 발생: {e}"
+
+    if prepared["status"] != "pending":
+        if prepared["status"] == "cached":
+            print(f"[Tool: Analyze Stock Info] cache hit: {stock_name}")
+        return prepared["report"]
+
+    # 2. Chain 실행
+    try:
+        result = _run_analysis_chain(
+            {"stock_name": stock_name, "context": prepared["context"]},
+            config,
+        )
+        _store_analysis(llm_cache, prepared, result)
         return result
     except Exception as e:
-        return f"리포트 생성 중 오류 발생: {e}"
\ No newline at end of file
+        return f"리포트 생성 중 오류 발생: {e}"
+
+
+def generate_analysis_reports(
+    stock_names: List[str],
+    vector_service: VectorService,
+    llm_cache=None,
+    config: Optional[RunnableConfig] = None,
+    max_concurrency: int = 5,
+) -> List[Dict[str, Any]]:
+    """
+    여러 종목 리포트를 한 번에 생성 (analyze_stocks_batch, 일일 다이제스트 배치에서 공용).
+    반환: 종목 순서대로 {"stock_name", "status": success|cached|no_data|error, "report", "error", "doc_ids"}
+    검색 자체가 실패하면 예외를 그대로 올림.
+    """
+    config = config or {}
+
+    # 1. 검색: 쿼리 임베딩 1회 + 필터별 collection.query 1회
+    all_results = vector_service.search_many(
+        [default_context_query(name) for name in stock_names], n_results=ANALYSIS_SEARCH_RESULTS
+    )
+
+    items: List[Dict[str, Any]] = []
+    for name, results in zip(stock_names, all_results):
+        try:
+            items.append(_prepare_analysis(name, results, llm_cache))
+        except Exception as e:
+            items.append({"status": "error", "stock_name": name, "error": f"데이터 조회 중 오류 발생: {e}"})
+
+    # 2. 캐시에 없는 종목만 chain.batch로 병렬 생성 (항목별 예외는 결과로 받음)
+    pending = [item for item in items if item["status"] == "pending"]
+    if pending:
+        outputs = RunnableLambda(_run_analysis_chain).batch(
+            [{"stock_name": item["stock_name"], "context": item["context"]} for item in pending],
+            config={**config, "max_concurrency": max_concurrency},
+            return_exceptions=True,
+        )
+        for item, output in zip(pending, outputs):
+            if isinstance(output, Exception):
+                item.update(status="error", error=f"리포트 생성 중 오류 발생: {output}")
+            else:
+                item.update(status="success", report=output)
+                _store_analysis(llm_cache, item, output)
+
+    return [
+        {
+            "stock_name": item["stock_name"],
+            "status": item["status"],
+            "report": item.get("report"),
+            "error": item.get("error"),
+            "doc_ids": item.get("doc_ids") or [],
+        }
+        for item in items
+    ]
+
+
+# info_analysis 그래프가 configurable["batch_analysis"] 실행(종목별 스트리밍 없음)에서 여러 종목을 한 번에 분석할 때 사용.
+# 스트리밍 실행과 report_mode(incremental/delta)는 종목별 analyze_stock Send 맵-리듀스를 유지합니다.
+@tool
+def analyze_stocks_batch(stock_names: List[str], config: RunnableConfig) -> Dict[str, Any]:
+    """
+    여러 종목의 투자 분석 리포트를 한 번에 작성합니다.
+    KB 검색은 한 번에 묶어서 수행하고, 리포트 생성은 종목별로 병렬 실행합니다.
+    일부 종목이 실패해도 나머지 결과는 그대로 반환합니다 (종목별 status/error).
+
+    Args:
+        stock_names: 분석할 종목명 리스트 (예: ["삼성전자", "SK하이닉스"])
+    """
+    print(f"\n[Tool: Analyze Stocks Batch] Targets: {stock_names}")
+    if not stock_names:
+        return {"status": "success", "succeeded": 0, "failed": 0, "results": []}
+
+    vector_service = config["configurable"].get("vector_service")
+    if not vector_service:
+        return {"status": "error", "message": "VectorService not found in config", "results": []}
+
+    max_concurrency = int(
+        config["configurable"].get("analysis_batch_concurrency")
+        or os.getenv("ANALYSIS_BATCH_CONCURRENCY", "5")
+    )
+    try:
+        reports = generate_analysis_reports(
+            stock_names,
+            vector_service,
+            llm_cache=config["configurable"].get("llm_cache"),
+            config=config,
+            max_concurrency=max_concurrency,
+        )
+    except Exception as e:
+        return {"status": "error", "message": f"데이터 조회 중 오류 발생: {e}", "results": []}
+
+    results = [{k: r[k] for k in ("stock_name", "status", "report", "error")} for r in reports]
+    failed = sum(1 for r in results if r["status"] == "error")
+    return {
+        "status": "success" if failed < len(results) else "error",
+        "succeeded": len(results) - failed,
+        "failed": failed,
+        "results": results,
+    }
@@ -2,6 +2,7 @@
 import json
 import re
 from datetime import datetime
+from typing import List
 
 def get_current_time_str():
     """
@@ -33,3 +34,23 @@ def clean_and_parse_json(text: str):
     except Exception:
         # 파싱 실패 시 None 반환 (이후 로직에서 에러 처리 유도)
         return None
+
+
+# "삼성전자 요즘 어때?" 같은 일반 질문에서 지워도 되는 표현들
+_GENERIC_QUERY_RE = re.compile(
+    r"포트폴리오|내\s*종목|보유\s*종목|종목|주식|주가|어때|어떤가|어떄|요즘|최근|근황|뉴스|이슈|분석|알려|전망|현황"
+    r"|상황|정리|요약|동향|소식|무슨\s*일|있어|있나|해\s*줘|해줘"
+)
+# 종목명/일반 표현을 지운 뒤 어절에 조사·어미만 남았을 때만 버림 ("이익은", "가치는"의 '이'/'가'는 지우지 않음)
+_PARTICLE_ONLY_RE = re.compile(r"(?:은|는|이|가|을|를|의|도|에|요|좀|줘|들)+")
+_NON_WORD_RE = re.compile(r"[\s\W_]+")
+
+
+def is_generic_question(user_query: str, stock_names: List[str]) -> bool:
+    """종목명/일반 표현을 지우고 조사만 남은 어절을 버린 뒤 남는 게 거의 없으면 특정 관점 없는 일반 질문으로 판단"""
+    text = user_query or ""
+    for name in sorted((n for n in stock_names if n), key=len, reverse=True):
+        text = text.replace(name, " ")
+    text = _GENERIC_QUERY_RE.sub(" ", text)
+    rest = [w for w in _NON_WORD_RE.split(text) if w and not _PARTICLE_ONLY_RE.fullmatch(w)]
+    return len("".join(rest)) <= 1
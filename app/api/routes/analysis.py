@@ -0,0 +1,113 @@
+# app/api/routes/analysis.py
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+
+from app.core.logger import logger
+from app.deps import get_info_analysis_service, get_info_collector_service, get_agent_config, get_current_user_id
+from app.service.agents.info_analysis_service import InfoAnalysisService
+from app.service.agents.info_collector_service import InfoCollectorService
+from app.models.schemas.agent import (
+    AnalysisRequest,
+    ReportTokenStreamEvent,
+    StockAnalyzedStreamEvent,
+    HoldingCollectedStreamEvent,
+    CollectDoneStreamEvent,
+    AnalysisDoneStreamEvent,
+    ErrorStreamEvent,
+)
+
+router = APIRouter(prefix="/analysis", tags=["analysis"])
+
+
+def _sse(event) -> str:
+    return f"data: {event.model_dump_json()}\n\n"
+
+
+def _with_request_options(config: dict, request: AnalysisRequest) -> dict:
+    if request.report_mode:
+        config["configurable"]["report_mode"] = request.report_mode
+    return config
+
+
+def _sse_response(event_generator) -> StreamingResponse:
+    return StreamingResponse(
+        event_generator,
+        media_type="text/event-stream",
+        # 프록시(nginx 등) 버퍼링으로 이벤트가 뭉쳐서 전달되지 않도록
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# =========================
+# 분석 리포트 (한 번에 반환)
+# =========================
+@router.post("")
+def analyze(
+    request: AnalysisRequest,
+    service: InfoAnalysisService = Depends(get_info_analysis_service),
+    config: dict = Depends(get_agent_config),
+    user_id: str = Depends(get_current_user_id),
+):
+    config = _with_request_options(config, request)
+    return service.run(request.query, user_id=user_id, config=config)
+
+
+# =========================
+# 분석 리포트 스트리밍 (SSE)
+# =========================
+@router.post("/stream")
+async def analyze_stream(
+    request: AnalysisRequest,
+    service: InfoAnalysisService = Depends(get_info_analysis_service),
+    config: dict = Depends(get_agent_config),
+    user_id: str = Depends(get_current_user_id),
+):
+    """종목별 리포트 토큰을 Solar가 생성하는 대로 server-sent events로 전송합니다."""
+    config = _with_request_options(config, request)
+
+    async def event_generator():
+        try:
+            async for event in service.astream(request.query, user_id=user_id, config=config):
+                if event["type"] == "report_token":
+                    yield _sse(ReportTokenStreamEvent(stock_name=event["stock_name"], token=event["token"]))
+                elif event["type"] == "stock_analyzed":
+                    yield _sse(StockAnalyzedStreamEvent(**event))
+                elif event["type"] == "done":
+                    yield _sse(AnalysisDoneStreamEvent(analysis_results=event["analysis_results"], usage=event.get("usage")))
+
+            yield "data: [DONE]\n\n"  # 종료 신호
+
+        except Exception as e:
+            logger.error(f"Analysis stream error: {e}")
+            yield _sse(ErrorStreamEvent(error=str(e)))
+
+    return _sse_response(event_generator())
+
+
+# =========================
+# 포트폴리오 정보 수집 스트리밍 (SSE)
+# =========================
+@router.post("/collect/stream")
+async def collect_stream(
+    request: AnalysisRequest,
+    service: InfoCollectorService = Depends(get_info_collector_service),
+    config: dict = Depends(get_agent_config),
+    user_id: str = Depends(get_current_user_id),
+):
+    """보유 종목별 뉴스/기사/재무 수집이 끝나는 대로 한 종목씩 전송합니다."""
+
+    async def event_generator():
+        try:
+            async for event in service.astream(request.query, user_id=user_id, config=config):
+                if event["type"] == "holding_collected":
+                    yield _sse(HoldingCollectedStreamEvent(**event))
+                elif event["type"] == "done":
+                    yield _sse(CollectDoneStreamEvent(collected=event["collected"], usage=event.get("usage")))
+
+            yield "data: [DONE]\n\n"  # 종료 신호
+
+        except Exception as e:
+            logger.error(f"Collect stream error: {e}")
+            yield _sse(ErrorStreamEvent(error=str(e)))
+
+    return _sse_response(event_generator())
@@ -0,0 +1,24 @@
+# app/api/routes/metrics.py
+from fastapi import APIRouter, Depends
+
+from app.deps import require_metrics_access
+from app.core.usage_metrics import get_usage_metrics
+from app.repository.client.llm_client import get_chat_model_pool
+from app.service.llm_cache import get_llm_response_cache
+
+# 유저별 사용량/에러 메시지가 포함되므로 운영자 토큰으로만 조회
+router = APIRouter(prefix="/metrics", tags=["metrics"], dependencies=[Depends(require_metrics_access)])
+
+
+# =========================
+# LLM / 임베딩 사용량 (프로세스 시작 이후 누적)
+# =========================
+@router.get("/usage")
+def usage_metrics():
+    """모델/그래프 노드/유저별 호출 수, 토큰, 지연, 에러 + 모델 풀 대기열 + LLM 응답 캐시 적중률"""
+    llm_cache = get_llm_response_cache()
+    return {
+        "usage": get_usage_metrics().summary(),
+        "llm_pool": get_chat_model_pool().get_stats(),
+        "llm_cache": llm_cache.get_stats() if llm_cache is not None else None,
+    }
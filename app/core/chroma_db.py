@@ -1,7 +1,10 @@
 # app/core/chroma_db.py
 import os
+import time
+import asyncio
+import logging
 import chromadb
-from typing import Optional
+from typing import Optional, Dict, Any
 from dotenv import load_dotenv
 
 # 배포 환경(Kubernetes)에서는 ConfigMap/Secret으로 환경변수가 자동 주입되므로 .env 로드를 건너뜁니다.
@@ -9,6 +12,13 @@ from dotenv import load_dotenv
 if os.getenv("KUBERNETES_SERVICE_HOST") is None:
     load_dotenv()
 
+logger = logging.getLogger("chroma")
+
+
+def _optional_int(name: str) -> Optional[int]:
+    value = os.getenv(name)
+    return int(value) if value else None
+
 
 class ChromaDBConfig:
     def __init__(self):
@@ -17,11 +27,43 @@ class ChromaDBConfig:
         self.port = int(os.getenv("CHROMA_PORT", "8000"))
         self.persist_path = os.getenv("CHROMA_PERSIST_PATH", "./chroma_db")
         self.collection_name = os.getenv("CHROMA_COLLECTION_NAME", "upstage_embeddings")
+        # 샤딩: 문서 타입별 / 종목코드 해시 버킷별 컬렉션 분리 (둘 다 꺼져 있으면 단일 컬렉션)
+        self.shard_by_doc_type = os.getenv("CHROMA_SHARD_BY_DOC_TYPE", "false").lower() == "true"
+        self.stock_shards = int(os.getenv("CHROMA_STOCK_SHARDS", "0"))
+        # HNSW 인덱스 설정 (미설정 항목은 Chroma 기본값: space=l2, M=16, ef_construction=100, ef_search=100)
+        # space/M/ef_construction은 컬렉션 생성 시에만 적용되므로 기존 컬렉션은 마이그레이션 필요
+        self.hnsw_space = os.getenv("CHROMA_HNSW_SPACE")  # "l2" | "cosine" | "ip"
+        self.hnsw_m = _optional_int("CHROMA_HNSW_M")
+        self.hnsw_ef_construction = _optional_int("CHROMA_HNSW_EF_CONSTRUCTION")
+        self.hnsw_ef_search = _optional_int("CHROMA_HNSW_EF_SEARCH")
+
+    @property
+    def sharding_enabled(self) -> bool:
+        return self.shard_by_doc_type or self.stock_shards > 0
+
+    def hnsw_configuration(self) -> Dict[str, Any]:
+        hnsw = {
+            "space": self.hnsw_space,
+            "max_neighbors": self.hnsw_m,
+            "ef_construction": self.hnsw_ef_construction,
+            "ef_search": self.hnsw_ef_search,
+        }
+        return {k: v for k, v in hnsw.items() if v is not None}
+
+    def collection_configuration(self) -> Optional[Dict[str, Any]]:
+        hnsw = self.hnsw_configuration()
+        return {"hnsw": hnsw} if hnsw else None
+
+
+COLLECTION_METADATA = {"description": "Upstage Solar2 embeddings collection"}
 
 
 class ChromaDBConnection:
     _instance: Optional["ChromaDBConnection"] = None
     _client: Optional[chromadb.ClientAPI] = None
+    # 서버 모드 전용 비동기 클라이언트 (이벤트 루프에 묶이므로 루프별로 생성)
+    _async_client = None
+    _async_client_loop: Optional[asyncio.AbstractEventLoop] = None
 
     def __new__(cls):
         if cls._instance is None:
@@ -51,12 +93,103 @@ class ChromaDBConnection:
     def get_collection(self, collection_name: str = None):
         config = ChromaDBConfig()
         name = collection_name or config.collection_name
-        return self._client.get_or_create_collection(
+        collection = self._client.get_or_create_collection(
+            name=name,
+            metadata=COLLECTION_METADATA,
+            configuration=config.collection_configuration(),
+        )
+        sync_ef_search(collection, config)
+        return collection
+
+    def recreate_collection(self, collection_name: str, batch_size: int = 1000, keep_backup: bool = False) -> Dict[str, Any]:
+        """
+        현재 HNSW 설정으로 컬렉션을 다시 만듭니다 (space/M/ef_construction 변경용).
+        임시 컬렉션에 임베딩째 복사(재임베딩 없음) → 건수 검증 → 원본을 백업 이름으로 바꾸고 임시 컬렉션을 원래 이름으로 교체.
+        """
+        config = ChromaDBConfig()
+        started = time.perf_counter()
+        source = self._client.get_collection(collection_name)
+        # 접두어로 붙여 샤드 이름 규칙(base__...)과 겹치지 않게 함
+        tmp_name = f"migrating-{collection_name}"
+        backup_name = f"backup-{int(time.time())}-{collection_name}"
+
+        if tmp_name in [c.name for c in self._client.list_collections()]:
+            self._client.delete_collection(tmp_name)
+        target = self._client.create_collection(
+            name=tmp_name,
+            metadata=source.metadata or COLLECTION_METADATA,
+            configuration=config.collection_configuration(),
+        )
+
+        offset = 0
+        while True:
+            page = source.get(limit=batch_size, offset=offset, include=["documents", "metadatas", "embeddings"])
+            if not page["ids"]:
+                break
+            target.add(
+                ids=page["ids"],
+                documents=page["documents"],
+                metadatas=page["metadatas"],
+                embeddings=page["embeddings"],
+            )
+            offset += len(page["ids"])
+            logger.info(f"[Chroma] {collection_name}: copied {offset} docs")
+
+        if target.count() != source.count():
+            self._client.delete_collection(tmp_name)
+            raise RuntimeError(f"Collection copy mismatch for {collection_name}: {target.count()} != {source.count()}")
+
+        source.modify(name=backup_name)
+        target.modify(name=collection_name)
+        if not keep_backup:
+            self._client.delete_collection(backup_name)
+
+        return {
+            "collection": collection_name,
+            "count": offset,
+            "hnsw": config.hnsw_configuration(),
+            "backup": backup_name if keep_backup else None,
+            "elapsed_sec": round(time.perf_counter() - started, 2),
+        }
+
+    @property
+    def supports_async(self) -> bool:
+        return ChromaDBConfig().mode == "server"
+
+    async def get_async_collection(self, collection_name: str = None):
+        """
+        서버 모드에서 AsyncHttpClient 기반 컬렉션을 반환합니다.
+        로컬(PersistentClient) 모드에는 비동기 클라이언트가 없으므로 호출하지 않습니다.
+        """
+        config = ChromaDBConfig()
+        if config.mode != "server":
+            raise RuntimeError("Async Chroma client is only available in server mode")
+
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_client_loop is not loop:
+            self._async_client = await chromadb.AsyncHttpClient(
+                host=config.host,
+                port=config.port,
+            )
+            self._async_client_loop = loop
+
+        name = collection_name or config.collection_name
+        return await self._async_client.get_or_create_collection(
             name=name,
-            metadata={"description": "Upstage Solar2 embeddings collection"},
+            metadata=COLLECTION_METADATA,
+            configuration=config.collection_configuration(),
         )
 
 
+def sync_ef_search(collection, config: ChromaDBConfig):
+    """ef_search는 생성 후에도 바꿀 수 있으므로, 설정과 다르면 기존 컬렉션에 바로 반영합니다."""
+    if config.hnsw_ef_search is None:
+        return
+    current = ((collection.configuration or {}).get("hnsw") or {}).get("ef_search")
+    if current != config.hnsw_ef_search:
+        collection.modify(configuration={"hnsw": {"ef_search": config.hnsw_ef_search}})
+
+
 def get_chroma_client() -> chromadb.ClientAPI:
     """ChromaDB 클라이언트를 반환하는 의존성 함수"""
     connection = ChromaDBConnection()
@@ -0,0 +1,28 @@
+# app/core/file_lock.py
+import os
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows 로컬 개발 환경: 프로세스 간 잠금 없이 동작
+    fcntl = None
+
+
+@contextmanager
+def file_lock(path: str, shared: bool = False):
+    """
+    fcntl.flock 기반 프로세스 간 잠금.
+    API 서버 / outbox 워커 / 배치 스크립트가 같은 색인 파일을 함께 쓸 때 사용합니다.
+    (같은 호스트 또는 flock을 지원하는 공유 볼륨에서만 유효)
+    """
+    if fcntl is None:
+        yield
+        return
+
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        yield
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
@@ -1,9 +1,17 @@
-from app.repository.client.llm_client import UpstageClient
+from app.repository.client.llm_client import UpstageClient, get_chat_model_pool
 
 _client = UpstageClient()
 
 def get_solar_chat():
     return _client.get_chat_model()
 
+def get_chat_model(model: str, **params):
+    """(model, params)별로 풀에서 재사용되는 ChatUpstage 인스턴스"""
+    return _client.get_chat_model(model, **params)
+
+def llm_slot(model: str):
+    """모델별 동시 호출 제한 슬롯 (with llm_slot("solar-pro"): ...)"""
+    return get_chat_model_pool().slot(model)
+
 def get_upstage_embeddings():
     return _client.get_embedding_model()
\ No newline at end of file
@@ -0,0 +1,293 @@
+# app/core/usage_metrics.py
+import os
+import time
+import threading
+from collections import deque, OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Any, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+
+def _price_for(model: str) -> Optional[tuple]:
+    """LLM_PRICE_SOLAR_PRO="0.15,0.6" 처럼 모델별 (입력, 출력) 1M 토큰당 USD. 없으면 비용 계산 생략"""
+    raw = os.getenv("LLM_PRICE_" + model.upper().replace("-", "_").replace(".", "_"))
+    if not raw:
+        return None
+    try:
+        parts = [float(x) for x in raw.split(",")]
+    except ValueError:
+        return None
+    return (parts[0], parts[-1])
+
+
+# by_user 집계에 유지하는 최대 유저 수 (오래 호출이 없던 유저부터 OTHER_USERS 버킷으로 합침)
+USAGE_METRICS_MAX_USERS = int(os.getenv("USAGE_METRICS_MAX_USERS", "1000"))
+OTHER_USERS = "_other"
+# recent_errors에 남기는 에러 메시지 최대 길이 (프롬프트/응답 본문이 통째로 노출되지 않도록)
+ERROR_MESSAGE_MAX_CHARS = 300
+
+
+def _error_text(error: BaseException) -> str:
+    return f"{type(error).__name__}: {error}"[:ERROR_MESSAGE_MAX_CHARS]
+
+
+def _new_bucket() -> Dict[str, Any]:
+    return {
+        "calls": 0, "errors": 0,
+        "prompt_tokens": 0, "completion_tokens": 0,
+        "total_latency_sec": 0.0, "max_latency_sec": 0.0,
+        "cost_usd": 0.0,
+    }
+
+
+class UsageMetrics:
+    """
+    Solar 채팅/임베딩 호출 사용량 집계 (메모리).
+
+    - 채팅: 모델 / 그래프 노드(langgraph_node) / 유저별 호출 수, 토큰, 지연, 에러, 추정 비용
+      (유저별은 최근 호출 순으로 max_users명까지만 유지하고 나머지는 "_other"에 합산)
+    - 임베딩: 모델별 호출 수, 텍스트 수, 토큰(API가 알려줄 때만), 지연, 에러
+    프로세스 공용 집계는 get_usage_metrics(), 요청 1건 요약은 UsageMetrics()를 따로 만들어 사용
+    """
+
+    def __init__(self, recent_errors: int = 20, max_users: int = USAGE_METRICS_MAX_USERS):
+        self.chat: Dict[str, Dict[str, Dict[str, Any]]] = {"by_model": {}, "by_node": {}, "by_user": OrderedDict()}
+        self.max_users = max_users
+        self.embeddings: Dict[str, Dict[str, Any]] = {}
+        self.recent_errors: deque = deque(maxlen=recent_errors)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _add(bucket: Dict[str, Any], latency: float, prompt_tokens: int, completion_tokens: int,
+             cost: float, error: bool):
+        bucket["calls"] += 1
+        bucket["errors"] += int(error)
+        bucket["prompt_tokens"] += prompt_tokens
+        bucket["completion_tokens"] += completion_tokens
+        bucket["total_latency_sec"] += latency
+        bucket["max_latency_sec"] = max(bucket["max_latency_sec"], latency)
+        bucket["cost_usd"] += cost
+
+    @staticmethod
+    def _merge(into: Dict[str, Any], bucket: Dict[str, Any]):
+        for k in ("calls", "errors", "prompt_tokens", "completion_tokens", "total_latency_sec", "cost_usd"):
+            into[k] += bucket[k]
+        into["max_latency_sec"] = max(into["max_latency_sec"], bucket["max_latency_sec"])
+
+    def _user_bucket(self, user_id: str) -> Dict[str, Any]:
+        """_lock을 잡은 상태에서 호출. LRU로 유저 수를 제한하고 밀려난 유저 집계는 OTHER_USERS에 합침"""
+        users = self.chat["by_user"]
+        bucket = users.get(user_id)
+        if bucket is not None:
+            users.move_to_end(user_id)
+            return bucket
+        bucket = users[user_id] = _new_bucket()
+        while len(users) > self.max_users + (OTHER_USERS in users):
+            evicted_id = next(k for k in users if k != OTHER_USERS)
+            evicted = users.pop(evicted_id)
+            self._merge(users.setdefault(OTHER_USERS, _new_bucket()), evicted)
+        return bucket
+
+    def record_chat(
+        self,
+        model: str,
+        latency: float,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        node: Optional[str] = None,
+        user_id: Optional[str] = None,
+        error: Optional[str] = None,
+    ):
+        price = _price_for(model)
+        cost = (prompt_tokens * price[0] + completion_tokens * price[1]) / 1_000_000 if price else 0.0
+        with self._lock:
+            buckets = [
+                self.chat["by_model"].setdefault(model, _new_bucket()),
+                self.chat["by_node"].setdefault(node or "-", _new_bucket()),
+                self._user_bucket(user_id or "-"),
+            ]
+            for bucket in buckets:
+                self._add(bucket, latency, prompt_tokens, completion_tokens, cost, error is not None)
+            if error is not None:
+                self.recent_errors.append({
+                    "kind": "chat", "model": model, "node": node, "user_id": user_id,
+                    "error": error, "at": time.time(),
+                })
+
+    def record_embedding(
+        self,
+        model: str,
+        latency: float,
+        texts: int,
+        tokens: Optional[int] = None,
+        error: Optional[str] = None,
+    ):
+        with self._lock:
+            bucket = self.embeddings.setdefault(model, {**_new_bucket(), "texts": 0})
+            self._add(bucket, latency, tokens or 0, 0, 0.0, error is not None)
+            bucket["texts"] += texts
+            if error is not None:
+                self.recent_errors.append({"kind": "embedding", "model": model, "error": error, "at": time.time()})
+
+    @staticmethod
+    def _finish(bucket: Dict[str, Any]) -> Dict[str, Any]:
+        ok = bucket["calls"] - bucket["errors"]
+        return {
+            **bucket,
+            "total_latency_sec": round(bucket["total_latency_sec"], 3),
+            "max_latency_sec": round(bucket["max_latency_sec"], 3),
+            "avg_latency_sec": round(bucket["total_latency_sec"] / bucket["calls"], 3) if bucket["calls"] else 0.0,
+            "avg_prompt_tokens": round(bucket["prompt_tokens"] / ok, 1) if ok > 0 else 0.0,
+            "cost_usd": round(bucket["cost_usd"], 6),
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            chat = {
+                dim: {key: self._finish(b) for key, b in buckets.items()}
+                for dim, buckets in self.chat.items()
+            }
+            totals = _new_bucket()
+            for b in self.chat["by_model"].values():
+                self._merge(totals, b)
+            return {
+                "chat": {"total": self._finish(totals), **chat},
+                "embeddings": {model: self._finish(b) for model, b in self.embeddings.items()},
+                "recent_errors": list(self.recent_errors),
+            }
+
+
+class UsageCallbackHandler(BaseCallbackHandler):
+    """
+    채팅 모델 호출마다 토큰/지연/에러를 UsageMetrics에 기록하는 LangChain 콜백.
+    - 노드는 LangGraph가 넣어주는 metadata["langgraph_node"], 유저는 metadata["user_id"] 기준
+    - ChatModelPool이 모든 인스턴스에 프로세스 공용 핸들러를 붙이고,
+      서비스는 요청마다 별도 핸들러를 config["callbacks"]에 넣어 실행 단위 요약을 만듦
+    """
+
+    def __init__(self, metrics: "UsageMetrics", user_id: Optional[str] = None):
+        self.metrics = metrics
+        self.user_id = user_id
+        self._runs: Dict[UUID, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _start(self, run_id: UUID, serialized: Optional[Dict[str, Any]], metadata: Optional[Dict[str, Any]], kwargs):
+        metadata = metadata or {}
+        params = kwargs.get("invocation_params") or {}
+        model = (
+            params.get("model") or params.get("model_name") or metadata.get("ls_model_name")
+            or ((serialized or {}).get("kwargs") or {}).get("model") or "unknown"
+        )
+        with self._lock:
+            self._runs[run_id] = {
+                "model": model,
+                "node": metadata.get("langgraph_node"),
+                "user_id": metadata.get("user_id") or self.user_id,
+                "started": time.perf_counter(),
+            }
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, metadata=None, **kwargs):
+        self._start(run_id, serialized, metadata, kwargs)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, metadata=None, **kwargs):
+        self._start(run_id, serialized, metadata, kwargs)
+
+    def _pop(self, run_id: UUID) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._runs.pop(run_id, None)
+
+    @staticmethod
+    def _token_usage(response: LLMResult) -> tuple:
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        if usage:
+            return usage.get("prompt_tokens") or 0, usage.get("completion_tokens") or 0
+        # 스트리밍 응답은 llm_output이 비어 있고 메시지의 usage_metadata에 실려 옴
+        prompt = completion = 0
+        for generations in response.generations:
+            for gen in generations:
+                meta = getattr(getattr(gen, "message", None), "usage_metadata", None) or {}
+                prompt += meta.get("input_tokens") or 0
+                completion += meta.get("output_tokens") or 0
+        return prompt, completion
+
+    def on_llm_end(self, response: LLMResult, *, run_id, **kwargs):
+        run = self._pop(run_id)
+        if run is None:
+            return
+        prompt_tokens, completion_tokens = self._token_usage(response)
+        self.metrics.record_chat(
+            run["model"], time.perf_counter() - run["started"],
+            prompt_tokens, completion_tokens, node=run["node"], user_id=run["user_id"],
+        )
+
+    def on_llm_error(self, error: BaseException, *, run_id, **kwargs):
+        run = self._pop(run_id)
+        if run is None:
+            return
+        self.metrics.record_chat(
+            run["model"], time.perf_counter() - run["started"],
+            node=run["node"], user_id=run["user_id"], error=_error_text(error),
+        )
+
+
+_usage_metrics: Optional[UsageMetrics] = None
+_usage_handler: Optional[UsageCallbackHandler] = None
+_usage_lock = threading.Lock()
+
+
+def get_usage_metrics() -> UsageMetrics:
+    global _usage_metrics
+    if _usage_metrics is None:
+        with _usage_lock:
+            if _usage_metrics is None:
+                _usage_metrics = UsageMetrics()
+    return _usage_metrics
+
+
+def get_usage_callback_handler() -> UsageCallbackHandler:
+    """프로세스 공용 집계에 기록하는 핸들러 (ChatModelPool 인스턴스에 부착)"""
+    global _usage_handler
+    metrics = get_usage_metrics()
+    if _usage_handler is None:
+        with _usage_lock:
+            if _usage_handler is None:
+                _usage_handler = UsageCallbackHandler(metrics)
+    return _usage_handler
+
+
+def with_run_usage(config: Optional[Dict[str, Any]], user_id: Optional[str] = None) -> tuple:
+    """
+    config에 요청 1건 전용 사용량 핸들러와 user_id 메타데이터를 추가.
+    반환: (새 config, 실행 단위 UsageMetrics) — 실행 후 .summary()로 요약
+    """
+    run_metrics = UsageMetrics()
+    config = dict(config or {})
+    callbacks = config.get("callbacks")
+    config["callbacks"] = list(callbacks or []) + [UsageCallbackHandler(run_metrics, user_id=user_id)]
+    if user_id:
+        config["metadata"] = {**(config.get("metadata") or {}), "user_id": user_id}
+    return config, run_metrics
+
+
+@contextmanager
+def track_embedding(model: str, texts: int):
+    """
+    임베딩 호출 계측 (LangChain 임베딩은 콜백을 지원하지 않아 호출부를 직접 감쌈).
+
+        with track_embedding(model, len(texts)) as usage:
+            response = client.create(...)
+            usage["tokens"] = response.usage.total_tokens
+    """
+    usage: Dict[str, Any] = {"tokens": None}
+    started = time.perf_counter()
+    try:
+        yield usage
+    except Exception as e:
+        get_usage_metrics().record_embedding(
+            model, time.perf_counter() - started, texts, error=_error_text(e)
+        )
+        raise
+    get_usage_metrics().record_embedding(model, time.perf_counter() - started, texts, tokens=usage["tokens"])
@@ -1,4 +1,6 @@
-from sqlalchemy import BigInteger, Text, ForeignKey, UniqueConstraint, Identity
+from datetime import datetime, date
+
+from sqlalchemy import BigInteger, Integer, Text, ForeignKey, UniqueConstraint, Identity, Index, DateTime, Date, func
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 from app.db.base import Base
@@ -45,3 +47,86 @@ class Question(Base):
     )
     session_id: Mapped[str] = mapped_column(Text, nullable=False)
     qa_list: Mapped[dict] = mapped_column(JSONB, nullable=False, server_default="[]")
+
+
+class KbOutbox(Base):
+    """
+    KB(VectorDB) 적재 대기열 (transactional outbox).
+    수집기는 문서를 여기에 넣기만 하고, 워커가 배치로 꺼내 임베딩 + upsert 합니다.
+    """
+    __tablename__ = "kb_outbox"
+    __table_args__ = (
+        Index("kb_outbox_status_available_idx", "status", "available_at"),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, Identity(), primary_key=True)
+    # 콘텐츠 해시 기반 문서 ID (VectorService.make_doc_id) → 재처리돼도 같은 문서로 upsert
+    doc_id: Mapped[str] = mapped_column(Text, nullable=False)
+    content: Mapped[str] = mapped_column(Text, nullable=False)
+    # "metadata"는 DeclarativeBase 예약어라 속성명만 doc_metadata로 사용
+    doc_metadata: Mapped[dict] = mapped_column("metadata", JSONB, nullable=False, server_default="{}")
+    # pending → processing → (삭제) / 재시도 초과 시 failed
+    status: Mapped[str] = mapped_column(Text, nullable=False, server_default="pending")
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    available_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    locked_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+class LlmResponseCache(Base):
+    """
+    LLM 응답 캐시 (analyze_stock_info 리포트 등).
+    키 = sha256(model, prompt_version, stock, context_hash) → 같은 근거 문서면 LLM 호출 없이 재사용
+    """
+    __tablename__ = "llm_response_cache"
+    __table_args__ = (
+        Index("llm_response_cache_expires_at_idx", "expires_at"),
+    )
+
+    cache_key: Mapped[str] = mapped_column(Text, primary_key=True)
+    model: Mapped[str] = mapped_column(Text, nullable=False)
+    prompt_version: Mapped[str] = mapped_column(Text, nullable=False)
+    stock_name: Mapped[str] = mapped_column(Text, nullable=False)
+    # 프롬프트에 들어간 근거 문서 ID 목록의 해시 (문서 ID는 내용 해시라 내용이 바뀌면 같이 바뀜)
+    context_hash: Mapped[str] = mapped_column(Text, nullable=False)
+    response: Mapped[str] = mapped_column(Text, nullable=False)
+    hit_count: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class StockReport(Base):
+    """
+    종목별 일자 단위 분석 리포트 저장소.
+    근거 문서 ID를 함께 저장해, 새 문서가 들어왔을 때만 리포트를 다시 생성합니다.
+    """
+    __tablename__ = "stock_reports"
+    __table_args__ = (
+        UniqueConstraint("stock_name", "report_date", name="stock_reports_stock_date_key"),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, Identity(), primary_key=True)
+    stock_name: Mapped[str] = mapped_column(Text, nullable=False)
+    report_date: Mapped[date] = mapped_column(Date, nullable=False)
+    report: Mapped[str] = mapped_column(Text, nullable=False)
+    # 리포트 근거 KB 문서 ID 목록 (문서 ID는 내용 해시)
+    doc_ids: Mapped[list] = mapped_column(JSONB, nullable=False, server_default="[]")
+    model: Mapped[str] = mapped_column(Text, nullable=False)
+    prompt_version: Mapped[str] = mapped_column(Text, nullable=False)
+    # full: 전체 생성 / delta: 이전 리포트 + 신규 문서 업데이트
+    generation: Mapped[str] = mapped_column(Text, nullable=False, server_default="full")
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+class KbVersion(Base):
+    """
+    KB 컬렉션(namespace)별 변경 버전 카운터.
+    API 서버 / outbox 워커 / 배치 스크립트가 공유해, 어느 프로세스가 문서를 바꿔도 검색 캐시가 무효화됩니다.
+    """
+    __tablename__ = "kb_versions"
+
+    namespace: Mapped[str] = mapped_column(Text, primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default="0")
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
@@ -1,4 +1,7 @@
 # app/deps.py
+import os
+import hmac
+
 from fastapi import Depends, HTTPException
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.core.firebase import verify_firebase_token
@@ -23,10 +26,14 @@ def get_db_engine():
 # =========================
 from app.repository.vector.vector_repo import (
     VectorRepository,
-    ChromaDBRepository,
+    create_vector_repository,
 )
+from app.repository.vector.lexical_index import get_lexical_index
+from app.service.search_cache import get_search_cache
 from app.service.vector_service import VectorService
 from app.service.embedding_service import EmbeddingService
+from app.service.embedding_batcher import get_embedding_batcher
+from app.service.dedup_service import get_near_duplicate_detector
 
 def get_current_claims(
     cred: HTTPAuthorizationCredentials = Depends(security),
@@ -38,8 +45,56 @@ def get_current_claims(
         return verify_firebase_token(cred.credentials)
     except Exception:
         raise HTTPException(status_code=401, detail="Invalid token")
+
+
+def require_metrics_access(
+    cred: HTTPAuthorizationCredentials = Depends(security),
+) -> None:
+    """
+    운영 지표(/api/metrics) 접근 제어. 다음 중 하나면 통과
+    - METRICS_API_TOKEN과 같은 Bearer 토큰 (모니터링 수집기용)
+    - admin 커스텀 클레임이 있거나 uid가 METRICS_ADMIN_UIDS(쉼표 구분)에 있는 Firebase 토큰
+    """
+    if not cred or not cred.credentials:
+        raise HTTPException(status_code=401, detail="Missing bearer token")
+
+    api_token = os.getenv("METRICS_API_TOKEN")
+    if api_token and hmac.compare_digest(cred.credentials, api_token):
+        return
+
+    try:
+        claims = verify_firebase_token(cred.credentials)
+    except Exception:
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    admin_uids = {u.strip() for u in os.getenv("METRICS_ADMIN_UIDS", "").split(",") if u.strip()}
+    if not (claims.get("admin") is True or claims.get("uid") in admin_uids):
+        raise HTTPException(status_code=403, detail="Metrics access requires an admin token")
+
+
+from sqlalchemy.orm import Session
+from app.db.session import get_db
+from app.db.models import User
+
+
+def get_current_user_id(
+    claims: dict = Depends(get_current_claims),
+    db: Session = Depends(get_db),
+) -> str:
+    """
+    인증 토큰의 uid로 users.id를 조회합니다.
+    - 포트폴리오 조회처럼 유저별 데이터를 다루는 API는 요청 body의 user_id 대신 이 값을 사용
+    """
+    uid = claims.get("uid")
+    if not uid:
+        raise HTTPException(status_code=401, detail="Token missing uid")
+
+    user = db.query(User).filter(User.firebase_uid == uid).first()
+    if not user:
+        raise HTTPException(status_code=403, detail="User not registered (call /api/auth/login first)")
+    return str(user.id)
 def get_vector_repository() -> VectorRepository:
-    return ChromaDBRepository()
+    return create_vector_repository()
 
 
 def get_embedding_service() -> EmbeddingService:
@@ -53,6 +108,10 @@ def get_vector_service(
     return VectorService(
         vector_repository=vector_repo,
         embedding_service=embedding_service,
+        lexical_index=get_lexical_index(),
+        search_cache=get_search_cache(),
+        embedding_batcher=get_embedding_batcher(),
+        signature_index=get_near_duplicate_detector().index,
     )
 
 
@@ -92,3 +151,28 @@ def get_info_collector_service() -> InfoCollectorService:
     """
     return InfoCollectorService()
 
+
+from app.service.agents.info_analysis_service import InfoAnalysisService
+from app.service.llm_cache import get_llm_response_cache
+
+
+def get_info_analysis_service() -> InfoAnalysisService:
+    """InfoAnalysisService DI"""
+    return InfoAnalysisService()
+
+
+def get_agent_config(
+    vector_service: VectorService = Depends(get_vector_service),
+    ticker_resolver: TickerResolver = Depends(get_ticker_resolver),
+    db_engine=Depends(get_db_engine),
+) -> dict:
+    """에이전트 그래프 실행용 config (tool 의존성은 configurable로 주입)"""
+    return {
+        "configurable": {
+            "vector_service": vector_service,
+            "ticker_resolver": ticker_resolver,
+            "db_engine": db_engine,
+            "join_stock_master": True,
+            "llm_cache": get_llm_response_cache(),
+        }
+    }
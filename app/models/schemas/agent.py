@@ -1,4 +1,4 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Literal
 from pydantic import BaseModel, Field
 
 # 서비스에서 사용할 요청/응답 규격
@@ -56,6 +56,61 @@ class ErrorStreamEvent(StreamEvent):
     error: str = Field(..., description="에러 메시지")
 
 
+class ReportTokenStreamEvent(StreamEvent):
+    """종목 분석 리포트 토큰 스트림 이벤트 스키마"""
+    type: str = Field("report_token", description="이벤트 타입")
+    stock_name: Optional[str] = Field(None, description="리포트 대상 종목명")
+    token: str = Field(..., description="생성된 리포트 토큰")
+
+
+class StockAnalyzedStreamEvent(StreamEvent):
+    """종목 1개 분석 완료 스트림 이벤트 스키마"""
+    type: str = Field("stock_analyzed", description="이벤트 타입")
+    index: int = Field(..., description="요청 내 종목 순서 (0부터)")
+    total: int = Field(..., description="전체 종목 수")
+    stock_name: Optional[str] = Field(None, description="종목명")
+    stock_code: Optional[str] = Field(None, description="종목코드")
+    analysis_report: str = Field(..., description="Markdown 분석 리포트")
+    source: str = Field("live", description="live: 요청 시 생성 / digest: 야간 배치로 미리 생성된 리포트")
+
+
+class HoldingCollectedStreamEvent(StreamEvent):
+    """보유 종목 1개 정보 수집 완료 스트림 이벤트 스키마"""
+    type: str = Field("holding_collected", description="이벤트 타입")
+    index: int = Field(..., description="포트폴리오 내 종목 순서 (0부터)")
+    total: int = Field(..., description="전체 보유 종목 수")
+    company: Dict[str, Any] = Field(..., description="종목 식별 정보")
+    news: List[Dict[str, Any]] = Field(default_factory=list, description="뉴스 검색 결과")
+    articles: List[Dict[str, Any]] = Field(default_factory=list, description="수집한 기사 본문")
+    financials: Optional[Dict[str, Any]] = Field(None, description="재무 정보")
+
+
+class CollectDoneStreamEvent(StreamEvent):
+    """정보 수집 완료 스트림 이벤트 스키마"""
+    type: str = Field("done", description="이벤트 타입")
+    collected: Optional[Dict[str, Any]] = Field(None, description="수집 결과 요약 (종목별 본문은 이미 스트림으로 전송됨)")
+    usage: Optional[Dict[str, Any]] = Field(None, description="이번 실행의 LLM 호출 수/토큰/지연 요약")
+
+
+class AnalysisDoneStreamEvent(StreamEvent):
+    """분석 완료 스트림 이벤트 스키마"""
+    type: str = Field("done", description="이벤트 타입")
+    analysis_results: List[Dict[str, Any]] = Field(..., description="종목별 최종 분석 결과 (요청 순서)")
+    usage: Optional[Dict[str, Any]] = Field(None, description="이번 실행의 LLM 호출 수/토큰/지연 요약")
+
+
+# ----
+# 분석 관련 스키마 정의
+# ----
+
+class AnalysisRequest(BaseSchema):
+    """종목/포트폴리오 분석 요청 스키마"""
+    query: str = Field(..., description="분석 요청 (종목명 또는 '내 포트폴리오 분석해줘' 등)")
+    report_mode: Optional[Literal["fresh", "incremental", "delta"]] = Field(
+        None, description="fresh: 매번 생성 / incremental: 새 문서가 있을 때만 재생성 / delta: 신규 문서 업데이트만 덧붙임"
+    )
+
+
 # ----
 # 지식 정보 관련 스키마 정의
 # ----
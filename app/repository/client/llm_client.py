@@ -1,23 +1,147 @@
 import os
+import time
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, Tuple
+
 from langchain_upstage import ChatUpstage, UpstageEmbeddings
 from dotenv import load_dotenv
 from app.repository.client.base import BaseClient
+from app.core.usage_metrics import get_usage_callback_handler
 
 if os.getenv("KUBERNETES_SERVICE_HOST") is None:
     load_dotenv()
 
+class LLMQueueTimeout(TimeoutError):
+    """모델 동시 실행 슬롯을 queue_timeout 안에 얻지 못함"""
+
+
+class ChatModelPool:
+    """
+    (model, params)별 ChatUpstage 인스턴스를 재사용하는 풀.
+
+    - 인스턴스마다 내부 HTTP 클라이언트를 가지므로 재사용하면 커넥션도 재사용됨
+    - 모델별 동시 호출 수를 세마포어로 제한하고, 초과 요청은 대기열에서 순서대로 기다림
+      (LLM_MAX_CONCURRENCY 기본값, LLM_MAX_CONCURRENCY_SOLAR_PRO 처럼 모델별 재정의)
+    """
+
+    def __init__(self, api_key: Optional[str], default_limit: int = 4, queue_timeout: float = 120.0):
+        self.api_key = api_key
+        self.default_limit = default_limit
+        self.queue_timeout = queue_timeout
+        self._models: Dict[Tuple, ChatUpstage] = {}
+        self._slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(model: str, params: Dict[str, Any]) -> Tuple:
+        return (model, tuple(sorted(params.items())))
+
+    def _limit_for(self, model: str) -> int:
+        env_key = "LLM_MAX_CONCURRENCY_" + model.upper().replace("-", "_").replace(".", "_")
+        return int(os.getenv(env_key, str(self.default_limit)))
+
+    def get(self, model: str, **params) -> ChatUpstage:
+        key = self._key(model, params)
+        instance = self._models.get(key)
+        if instance is None:
+            with self._lock:
+                instance = self._models.get(key)
+                if instance is None:
+                    # 모든 호출의 토큰/지연/에러를 프로세스 공용 사용량 집계에 기록
+                    instance = ChatUpstage(
+                        api_key=self.api_key, model=model, callbacks=[get_usage_callback_handler()], **params
+                    )
+                    self._models[key] = instance
+        return instance
+
+    def _semaphore(self, model: str) -> threading.BoundedSemaphore:
+        sem = self._slots.get(model)
+        if sem is None:
+            with self._lock:
+                sem = self._slots.get(model)
+                if sem is None:
+                    limit = self._limit_for(model)
+                    sem = threading.BoundedSemaphore(limit)
+                    self._slots[model] = sem
+                    self._stats[model] = {
+                        "limit": limit, "in_flight": 0, "waiting": 0,
+                        "calls": 0, "timeouts": 0, "total_wait_sec": 0.0, "max_wait_sec": 0.0,
+                    }
+        return sem
+
+    @contextmanager
+    def slot(self, model: str):
+        """with pool.slot("solar-pro"): chain.invoke(...) — 모델별 동시 실행 수 제한"""
+        sem = self._semaphore(model)
+        stats = self._stats[model]
+        with self._lock:
+            stats["waiting"] += 1
+
+        started = time.perf_counter()
+        acquired = sem.acquire(timeout=self.queue_timeout)
+        waited = time.perf_counter() - started
+        with self._lock:
+            stats["waiting"] -= 1
+            if not acquired:
+                stats["timeouts"] += 1
+            else:
+                stats["in_flight"] += 1
+                stats["calls"] += 1
+                stats["total_wait_sec"] += waited
+                stats["max_wait_sec"] = max(stats["max_wait_sec"], waited)
+        if not acquired:
+            raise LLMQueueTimeout(f"{model}: no free slot within {self.queue_timeout}s")
+
+        try:
+            yield
+        finally:
+            with self._lock:
+                stats["in_flight"] -= 1
+            sem.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "instances": len(self._models),
+                "models": {
+                    model: {
+                        **s,
+                        "avg_wait_sec": round(s["total_wait_sec"] / s["calls"], 4) if s["calls"] else 0.0,
+                    }
+                    for model, s in self._stats.items()
+                },
+            }
+
+
+_chat_model_pool: Optional[ChatModelPool] = None
+_chat_model_pool_lock = threading.Lock()
+
+
+def get_chat_model_pool() -> ChatModelPool:
+    global _chat_model_pool
+    if _chat_model_pool is None:
+        with _chat_model_pool_lock:
+            if _chat_model_pool is None:
+                _chat_model_pool = ChatModelPool(
+                    api_key=os.getenv("UPSTAGE_API_KEY"),
+                    default_limit=int(os.getenv("LLM_MAX_CONCURRENCY", "4")),
+                    queue_timeout=float(os.getenv("LLM_QUEUE_TIMEOUT_SEC", "120")),
+                )
+    return _chat_model_pool
+
+
 class UpstageClient(BaseClient):
     def __init__(self):
         self.api_key = os.getenv("UPSTAGE_API_KEY")
         self.chat_model_name = os.getenv("UPSTAGE_CHAT_MODEL", "solar-pro2")
         self.embedding_model_name = os.getenv("UPSTAGE_EMBEDDING_MODEL", "solar-embedding-1-large")
-        self._chat_instance = None
         self._embedding_instance = None
 
-    def get_chat_model(self) -> ChatUpstage:
-        if self._chat_instance is None:
-            self._chat_instance = ChatUpstage(api_key = self.api_key, model = self.chat_model_name)
-        return self._chat_instance
+    def get_chat_model(self, model: Optional[str] = None, **params) -> ChatUpstage:
+        # 인스턴스 캐시는 프로세스 공용 풀에서 관리 (UpstageClient를 여러 개 만들어도 공유)
+        return get_chat_model_pool().get(model or self.chat_model_name, **params)
 
     def get_embedding_model(self) -> UpstageEmbeddings:
         if self._embedding_instance is None:
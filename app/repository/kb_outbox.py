@@ -0,0 +1,112 @@
+# app/repository/kb_outbox.py
+from datetime import timedelta
+from typing import List, Dict, Any
+
+from sqlalchemy import select, update, delete, and_, or_, case, func
+from sqlalchemy.orm import Session
+
+from app.db.models import KbOutbox
+
+
+def enqueue_documents(
+    db: Session,
+    contents: List[str],
+    metadatas: List[Dict[str, Any]],
+    doc_ids: List[str],
+) -> int:
+    """수집기에서 호출: 임베딩 없이 INSERT만 하므로 사용자 요청 경로를 막지 않습니다."""
+    db.add_all(
+        [
+            KbOutbox(doc_id=doc_id, content=content, doc_metadata=meta or {})
+            for content, meta, doc_id in zip(contents, metadatas, doc_ids)
+        ]
+    )
+    db.commit()
+    return len(contents)
+
+
+def claim_batch(db: Session, limit: int, lease_seconds: int = 300, max_attempts: int = 5) -> List[KbOutbox]:
+    """
+    처리할 행을 limit개 선점합니다.
+    - FOR UPDATE SKIP LOCKED: 여러 워커가 같은 행을 잡지 않음
+    - processing 상태로 lease_seconds 이상 남은 행(워커 비정상 종료)은 다시 선점 대상
+      단, 이미 max_attempts번 선점된 행은 failed로 돌림 (워커를 죽이는 배치가 끝없이 재선점되지 않도록)
+    """
+    now = func.now()
+    lease_expired = and_(
+        KbOutbox.status == "processing",
+        KbOutbox.locked_at < now - timedelta(seconds=lease_seconds),
+    )
+
+    exhausted = (
+        select(KbOutbox.id)
+        .where(lease_expired, KbOutbox.attempts >= max_attempts)
+        .with_for_update(skip_locked=True)
+    )
+    db.execute(
+        update(KbOutbox)
+        .where(KbOutbox.id.in_(exhausted.scalar_subquery()))
+        .values(status="failed", locked_at=None, last_error=f"lease expired after {max_attempts} attempts")
+        .execution_options(synchronize_session=False)
+    )
+
+    candidates = (
+        select(KbOutbox.id)
+        .where(
+            or_(
+                and_(KbOutbox.status == "pending", KbOutbox.available_at <= now),
+                and_(lease_expired, KbOutbox.attempts < max_attempts),
+            )
+        )
+        .order_by(KbOutbox.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    rows = db.scalars(
+        update(KbOutbox)
+        .where(KbOutbox.id.in_(candidates.scalar_subquery()))
+        .values(status="processing", locked_at=now, attempts=KbOutbox.attempts + 1)
+        .returning(KbOutbox)
+        .execution_options(synchronize_session=False)
+    ).all()
+    db.commit()
+    return sorted(rows, key=lambda r: r.id)
+
+
+def mark_done(db: Session, ids: List[int]) -> None:
+    """적재 완료된 행은 삭제해 테이블을 작게 유지"""
+    if not ids:
+        return
+    db.execute(delete(KbOutbox).where(KbOutbox.id.in_(ids)))
+    db.commit()
+
+
+def mark_failed(
+    db: Session,
+    ids: List[int],
+    error: str,
+    max_attempts: int = 5,
+    backoff_seconds: int = 30,
+) -> None:
+    """재시도 가능하면 지수 백오프 후 pending으로, 횟수를 넘기면 failed로 둡니다."""
+    if not ids:
+        return
+    # attempts는 선점 시 이미 1 증가된 값 → 대기 시간: backoff * 2^(attempts-1), 최대 1시간
+    delay_seconds = func.least(backoff_seconds * func.power(2, KbOutbox.attempts - 1), 3600)
+    db.execute(
+        update(KbOutbox)
+        .where(KbOutbox.id.in_(ids))
+        .values(
+            status=case((KbOutbox.attempts >= max_attempts, "failed"), else_="pending"),
+            last_error=(error or "")[:2000],
+            locked_at=None,
+            available_at=func.now() + func.make_interval(0, 0, 0, 0, 0, 0, delay_seconds),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def count_by_status(db: Session) -> Dict[str, int]:
+    rows = db.execute(select(KbOutbox.status, func.count()).group_by(KbOutbox.status)).all()
+    return {status: count for status, count in rows}
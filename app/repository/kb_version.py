@@ -0,0 +1,23 @@
+# app/repository/kb_version.py
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.db.models import KbVersion
+
+
+def get_version(db: Session, namespace: str) -> int:
+    return db.scalar(select(KbVersion.version).where(KbVersion.namespace == namespace)) or 0
+
+
+def bump_version(db: Session, namespace: str) -> int:
+    """namespace 버전을 1 올리고 새 값을 반환합니다 (행이 없으면 1로 생성)."""
+    stmt = insert(KbVersion).values(namespace=namespace, version=1)
+    version = db.scalar(
+        stmt.on_conflict_do_update(
+            index_elements=[KbVersion.namespace],
+            set_={"version": KbVersion.version + 1, "updated_at": func.now()},
+        ).returning(KbVersion.version)
+    )
+    db.commit()
+    return version
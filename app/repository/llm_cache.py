@@ -0,0 +1,67 @@
+# app/repository/llm_cache.py
+from datetime import timedelta
+from typing import Optional
+
+from sqlalchemy import select, update, delete, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.db.models import LlmResponseCache
+
+
+def get_response(db: Session, cache_key: str) -> Optional[str]:
+    """만료되지 않은 캐시 응답을 조회하고 hit_count를 올립니다."""
+    response = db.scalar(
+        update(LlmResponseCache)
+        .where(LlmResponseCache.cache_key == cache_key, LlmResponseCache.expires_at > func.now())
+        .values(hit_count=LlmResponseCache.hit_count + 1)
+        .returning(LlmResponseCache.response)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return response
+
+
+def put_response(
+    db: Session,
+    cache_key: str,
+    model: str,
+    prompt_version: str,
+    stock_name: str,
+    context_hash: str,
+    response: str,
+    ttl_seconds: int,
+) -> None:
+    """같은 키가 있으면(만료 포함) 응답과 만료 시각을 갱신합니다."""
+    expires_at = func.now() + timedelta(seconds=ttl_seconds)
+    stmt = insert(LlmResponseCache).values(
+        cache_key=cache_key,
+        model=model,
+        prompt_version=prompt_version,
+        stock_name=stock_name,
+        context_hash=context_hash,
+        response=response,
+        expires_at=expires_at,
+    )
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[LlmResponseCache.cache_key],
+            set_={
+                "response": stmt.excluded.response,
+                "hit_count": 0,
+                "created_at": func.now(),
+                "expires_at": stmt.excluded.expires_at,
+            },
+        )
+    )
+    db.commit()
+
+
+def purge_expired(db: Session) -> int:
+    result = db.execute(delete(LlmResponseCache).where(LlmResponseCache.expires_at <= func.now()))
+    db.commit()
+    return result.rowcount or 0
+
+
+def count_entries(db: Session) -> int:
+    return db.scalar(select(func.count()).select_from(LlmResponseCache).where(LlmResponseCache.expires_at > func.now()))
@@ -0,0 +1,62 @@
+# app/repository/stock_report.py
+from datetime import date
+from typing import List, Optional
+
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.db.models import StockReport
+
+
+def get_latest_report(db: Session, stock_name: str) -> Optional[StockReport]:
+    return db.scalar(
+        select(StockReport)
+        .where(StockReport.stock_name == stock_name)
+        .order_by(StockReport.report_date.desc())
+        .limit(1)
+    )
+
+
+def upsert_report(
+    db: Session,
+    stock_name: str,
+    report_date: date,
+    report: str,
+    doc_ids: List[str],
+    model: str,
+    prompt_version: str,
+    generation: str = "full",
+) -> None:
+    """(stock_name, report_date) 당 1건: 같은 날 다시 생성하면 덮어씀"""
+    stmt = insert(StockReport).values(
+        stock_name=stock_name,
+        report_date=report_date,
+        report=report,
+        doc_ids=doc_ids,
+        model=model,
+        prompt_version=prompt_version,
+        generation=generation,
+    )
+    db.execute(
+        stmt.on_conflict_do_update(
+            constraint="stock_reports_stock_date_key",
+            set_={
+                "report": stmt.excluded.report,
+                "doc_ids": stmt.excluded.doc_ids,
+                "model": stmt.excluded.model,
+                "prompt_version": stmt.excluded.prompt_version,
+                "generation": stmt.excluded.generation,
+                "updated_at": func.now(),
+            },
+        )
+    )
+    db.commit()
+
+
+def get_fresh_report(db: Session, stock_name: str, since: date, generation: Optional[str] = None) -> Optional[StockReport]:
+    """since 이후 날짜의 가장 최근 리포트 (generation 지정 시 해당 종류만)"""
+    stmt = select(StockReport).where(StockReport.stock_name == stock_name, StockReport.report_date >= since)
+    if generation is not None:
+        stmt = stmt.where(StockReport.generation == generation)
+    return db.scalar(stmt.order_by(StockReport.report_date.desc()).limit(1))
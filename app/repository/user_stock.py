@@ -69,3 +69,15 @@ def get_all_user_stocks(db: Session, user_id: int) -> list[Stock]:
         .order_by(Stock.stock_id.asc())
         .all()
     )
+
+
+def get_held_stocks(db: Session) -> list[Stock]:
+    """
+    한 명 이상의 유저가 보유 중인 종목 (중복 제거)
+    """
+    return (
+        db.query(Stock)
+        .filter(Stock.stock_id.in_(db.query(UserStock.stock_id)))
+        .order_by(Stock.stock_id.asc())
+        .all()
+    )
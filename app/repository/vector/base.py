@@ -0,0 +1,118 @@
+# app/repository/vector/base.py
+import os
+import asyncio
+import functools
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Callable
+
+# 동기 전용 저장소(로컬 Chroma 등)를 async 경로에서 쓸 때 사용하는 제한된 스레드 풀
+_vector_io_pool = ThreadPoolExecutor(
+    max_workers=int(os.getenv("VECTOR_IO_POOL_SIZE", "8")),
+    thread_name_prefix="vector-io",
+)
+
+
+async def run_in_vector_pool(fn: Callable, *args, **kwargs):
+    """블로킹 벡터 저장소 호출을 이벤트 루프 밖(제한된 스레드 풀)에서 실행합니다."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_vector_io_pool, functools.partial(fn, *args, **kwargs))
+
+
+class VectorRepository(ABC):
+    @property
+    def namespace(self) -> str:
+        """캐시/색인 등에서 저장소를 구분하기 위한 이름"""
+        return type(self).__name__
+
+    @abstractmethod
+    def add_documents(
+        self,
+        documents: List[str],
+        embeddings: List[List[float]],
+        metadatas: List[Dict[str, Any]] = None,
+        ids: List[str] = None,
+    ):
+        pass
+
+    @abstractmethod
+    def upsert_documents(
+        self,
+        documents: List[str],
+        embeddings: List[List[float]],
+        metadatas: List[Dict[str, Any]] = None,
+        ids: List[str] = None,
+    ):
+        """add_documents와 같지만 이미 있는 id는 문서/임베딩/메타데이터를 덮어씀"""
+        pass
+
+    @abstractmethod
+    def query(
+        self,
+        query_embeddings: List[List[float]],
+        n_results: int = 5,
+        include: List[str] = None,
+        where: Dict[str, Any] = None,
+    ) -> Dict[str, Any]:
+        pass
+
+    @abstractmethod
+    def get_documents(
+        self,
+        ids: List[str] = None,
+        where: Dict[str, Any] = None,
+        limit: int = None,
+        offset: int = None,
+        include: List[str] = None,
+    ) -> Dict[str, Any]:
+        pass
+
+    @abstractmethod
+    def update_metadatas(self, ids: List[str], metadatas: List[Dict[str, Any]]):
+        pass
+
+    @abstractmethod
+    def delete_documents(self, ids: List[str]):
+        pass
+
+    @abstractmethod
+    def get_collection_info(self) -> Dict[str, Any]:
+        pass
+
+    # ---- async API: 기본 구현은 스레드 풀 위임, 네이티브 async 클라이언트가 있으면 오버라이드 ----
+    async def aadd_documents(
+        self,
+        documents: List[str],
+        embeddings: List[List[float]],
+        metadatas: List[Dict[str, Any]] = None,
+        ids: List[str] = None,
+    ):
+        return await run_in_vector_pool(
+            self.add_documents, documents, embeddings, metadatas=metadatas, ids=ids
+        )
+
+    async def aquery(
+        self,
+        query_embeddings: List[List[float]],
+        n_results: int = 5,
+        include: List[str] = None,
+        where: Dict[str, Any] = None,
+    ) -> Dict[str, Any]:
+        return await run_in_vector_pool(
+            self.query, query_embeddings, n_results=n_results, include=include, where=where
+        )
+
+    async def aget_documents(
+        self,
+        ids: List[str] = None,
+        where: Dict[str, Any] = None,
+        limit: int = None,
+        offset: int = None,
+        include: List[str] = None,
+    ) -> Dict[str, Any]:
+        return await run_in_vector_pool(
+            self.get_documents, ids=ids, where=where, limit=limit, offset=offset, include=include
+        )
+
+    async def adelete_documents(self, ids: List[str]):
+        return await run_in_vector_pool(self.delete_documents, ids)
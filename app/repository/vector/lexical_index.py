@@ -0,0 +1,381 @@
+# app/repository/vector/lexical_index.py
+import os
+import re
+import json
+import math
+import time
+import heapq
+import logging
+import threading
+from collections import Counter
+from typing import List, Dict, Any, Optional, Tuple, Iterable
+
+from dotenv import load_dotenv
+
+from app.core.file_lock import file_lock
+
+if os.getenv("KUBERNETES_SERVICE_HOST") is None:
+    load_dotenv()
+
+logger = logging.getLogger("lexical_index")
+
+
+# -------------------------
+# 한국어 토크나이저
+# -------------------------
+_TOKEN_RE = re.compile(r"[가-힣]+|[a-zA-Z]+(?:[&.\-][a-zA-Z]+)*|\d+(?:[.,]\d+)*%?")
+_HANGUL_RE = re.compile(r"^[가-힣]+$")
+
+# 명사 뒤에 붙는 대표 조사/어미 (긴 것부터 매칭)
+_JOSA_SUFFIXES = sorted(
+    [
+        "으로부터", "에서부터", "으로서", "으로써", "에게서", "까지는", "에서는", "으로는",
+        "이라는", "라는", "에서", "에게", "으로", "부터", "까지", "보다", "처럼", "마저",
+        "조차", "이나", "이다", "하고", "와의", "과의", "의", "가", "이", "은", "는",
+        "을", "를", "에", "와", "과", "도", "만", "로",
+    ],
+    key=len,
+    reverse=True,
+)
+
+
+def _strip_josa(token: str) -> str:
+    for suffix in _JOSA_SUFFIXES:
+        if len(token) > len(suffix) + 1 and token.endswith(suffix):
+            return token[: -len(suffix)]
+    return token
+
+
+def tokenize_ko(text: str) -> List[str]:
+    """
+    형태소 분석기 없이 동작하는 한국어 친화 토크나이저.
+    - 한글 어절: 조사 제거한 원형 + 글자 bigram (복합명사/띄어쓰기 오류 대응)
+    - 영문/티커: 소문자 정규화
+    - 숫자: 종목코드(005930), 금액(1,234), 비율(3.5%) 형태 그대로 보존
+    """
+    tokens: List[str] = []
+    for raw in _TOKEN_RE.findall(text or ""):
+        if _HANGUL_RE.match(raw):
+            word = _strip_josa(raw)
+            tokens.append(word)
+            if len(word) > 2:
+                tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        elif raw[0].isdigit():
+            tokens.append(raw.replace(",", ""))
+        else:
+            tokens.append(raw.lower())
+    return tokens
+
+
+# -------------------------
+# BM25 역색인
+# -------------------------
+class BM25Index:
+    """
+    Chroma 컬렉션과 나란히 유지되는 로컬 BM25 역색인.
+
+    저장 구조 (persist_path 디렉토리):
+    - snapshot.json : 전체 색인 스냅샷 (문서별 term frequency)
+    - ops.jsonl     : 스냅샷 이후의 add/delete 연산 로그 (append-only)
+    - .lock         : 프로세스 간 잠금 파일
+    로드 시 스냅샷 위에 로그를 재생하고, 로그가 compact_threshold를 넘으면 스냅샷으로 압축합니다.
+
+    API 서버와 outbox 워커/배치 스크립트가 같은 디렉토리를 공유하면, 쓰기는 파일 잠금으로 직렬화되고
+    각 프로세스는 검색 전에(sync_interval 주기) 다른 프로세스가 추가한 로그를 이어서 재생합니다.
+    """
+
+    SNAPSHOT_FILE = "snapshot.json"
+    OPS_FILE = "ops.jsonl"
+    LOCK_FILE = ".lock"
+    SNAPSHOT_FORMAT = 1
+
+    def __init__(
+        self,
+        persist_path: Optional[str] = None,
+        k1: float = 1.5,
+        b: float = 0.75,
+        compact_threshold: int = 50_000,
+        sync_interval: float = 1.0,
+    ):
+        self.persist_path = persist_path
+        self.k1 = k1
+        self.b = b
+        self.compact_threshold = compact_threshold
+        self.sync_interval = sync_interval
+
+        self._reset()
+        self._lock = threading.RLock()
+        self._last_sync = 0.0
+
+        if self.persist_path:
+            os.makedirs(self.persist_path, exist_ok=True)
+            with self._lock, file_lock(self._lock_path(), shared=True):
+                self._sync_locked()
+
+    def _reset(self):
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._doc_terms: Dict[str, Dict[str, int]] = {}
+        self._doc_len: Dict[str, int] = {}
+        self._total_len = 0
+        self._ops_since_snapshot = 0
+        # 지금까지 재생한 ops.jsonl 바이트 위치 / 로드한 스냅샷 파일 식별값
+        self._ops_offset = 0
+        self._snapshot_stamp: Optional[Tuple[int, int, int]] = None
+
+    # ---- 조회용 프로퍼티 ----
+    @property
+    def doc_count(self) -> int:
+        return len(self._doc_len)
+
+    @property
+    def avg_doc_len(self) -> float:
+        return self._total_len / len(self._doc_len) if self._doc_len else 0.0
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._doc_len
+
+    # ---- 색인 갱신 ----
+    def add_documents(self, ids: List[str], documents: List[str]):
+        ops = []
+        for doc_id, doc in zip(ids, documents):
+            ops.append({"op": "add", "id": doc_id, "tf": dict(Counter(tokenize_ko(doc)))})
+        self._write_ops(ops)
+
+    def delete_documents(self, ids: List[str]):
+        self._write_ops([{"op": "delete", "id": doc_id} for doc_id in ids])
+
+    def _apply_op(self, op: Dict[str, Any]):
+        if op["op"] == "add":
+            self._apply_add(op["id"], op["tf"])
+        elif op["op"] == "delete" and op["id"] in self._doc_len:
+            self._apply_delete(op["id"])
+
+    def _apply_add(self, doc_id: str, tf: Dict[str, int]):
+        # 같은 id 재색인(upsert) 시 기존 항목을 먼저 제거
+        if doc_id in self._doc_len:
+            self._apply_delete(doc_id)
+
+        self._doc_terms[doc_id] = tf
+        length = sum(tf.values())
+        self._doc_len[doc_id] = length
+        self._total_len += length
+        for term, freq in tf.items():
+            self._postings.setdefault(term, {})[doc_id] = freq
+
+    def _apply_delete(self, doc_id: str):
+        tf = self._doc_terms.pop(doc_id, {})
+        self._total_len -= self._doc_len.pop(doc_id, 0)
+        for term in tf:
+            posting = self._postings.get(term)
+            if posting is None:
+                continue
+            posting.pop(doc_id, None)
+            if not posting:
+                del self._postings[term]
+
+    # ---- 검색 ----
+    def search(self, query: str, n_results: int = 10) -> List[Tuple[str, float]]:
+        """BM25 점수 상위 n_results개의 (doc_id, score)를 반환합니다."""
+        terms = set(tokenize_ko(query))
+        if not terms:
+            return []
+
+        self.refresh()
+        with self._lock:
+            n_docs = len(self._doc_len)
+            if n_docs == 0:
+                return []
+
+            k1 = self.k1
+            base = k1 * (1 - self.b)
+            per_len = k1 * self.b * n_docs / self._total_len if self._total_len else 0.0
+            doc_len = self._doc_len
+            scores: Dict[str, float] = {}
+            get_score = scores.get
+
+            for term in terms:
+                posting = self._postings.get(term)
+                if not posting:
+                    continue
+                df = len(posting)
+                weight = math.log(1 + (n_docs - df + 0.5) / (df + 0.5)) * (k1 + 1)
+                for doc_id, freq in posting.items():
+                    scores[doc_id] = get_score(doc_id, 0.0) + weight * freq / (freq + base + per_len * doc_len[doc_id])
+
+        return heapq.nlargest(n_results, scores.items(), key=lambda kv: kv[1])
+
+    # ---- 영속화 ----
+    def _snapshot_path(self) -> str:
+        return os.path.join(self.persist_path, self.SNAPSHOT_FILE)
+
+    def _ops_path(self) -> str:
+        return os.path.join(self.persist_path, self.OPS_FILE)
+
+    def _lock_path(self) -> str:
+        return os.path.join(self.persist_path, self.LOCK_FILE)
+
+    @staticmethod
+    def _stamp(path: str) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _load_snapshot(self):
+        if not os.path.exists(self._snapshot_path()):
+            if os.path.exists(os.path.join(self.persist_path, "snapshot.pkl")):
+                logger.warning(
+                    "legacy snapshot.pkl is no longer loaded; run `python -m scripts.rebuild_lexical_index`"
+                )
+            return
+        with open(self._snapshot_path(), "r", encoding="utf-8") as f:
+            snapshot = json.load(f)
+        for doc_id, tf in snapshot["doc_terms"].items():
+            self._apply_add(doc_id, tf)
+
+    def _replay_ops(self):
+        """ops.jsonl에서 아직 재생하지 않은 부분만 이어서 적용합니다 (다른 프로세스가 쓴 연산 포함)."""
+        with open(self._ops_path(), "rb") as f:
+            f.seek(self._ops_offset)
+            data = f.read()
+        # 다른 프로세스가 쓰는 중인 마지막 줄(개행 없음)은 다음 동기화 때 다시 읽음
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            try:
+                op = json.loads(line)
+            except json.JSONDecodeError:
+                # 쓰기 도중 중단된 줄은 무시
+                continue
+            self._apply_op(op)
+            self._ops_since_snapshot += 1
+        self._ops_offset += end
+
+    def _sync_locked(self):
+        """파일 잠금을 잡은 상태에서 디스크의 스냅샷/로그와 메모리 색인을 맞춥니다."""
+        stamp = self._stamp(self._snapshot_path())
+        ops_size = os.path.getsize(self._ops_path()) if os.path.exists(self._ops_path()) else 0
+        # 다른 프로세스가 스냅샷을 새로 썼거나 로그를 비웠으면 처음부터 다시 로드
+        if stamp != self._snapshot_stamp or ops_size < self._ops_offset:
+            self._reset()
+            self._load_snapshot()
+            self._snapshot_stamp = stamp
+        if ops_size > self._ops_offset:
+            self._replay_ops()
+        self._last_sync = time.monotonic()
+
+    def refresh(self, force: bool = False):
+        """다른 프로세스의 변경분을 반영 (sync_interval 이내 재호출은 생략)"""
+        if not self.persist_path:
+            return
+        if not force and time.monotonic() - self._last_sync < self.sync_interval:
+            return
+        with self._lock, file_lock(self._lock_path(), shared=True):
+            self._sync_locked()
+
+    def _write_ops(self, ops: List[Dict[str, Any]]):
+        if not ops:
+            return
+        if not self.persist_path:
+            with self._lock:
+                for op in ops:
+                    self._apply_op(op)
+            return
+
+        with self._lock:
+            with file_lock(self._lock_path()):
+                # 다른 프로세스의 연산을 먼저 재생해야 로그 순서와 메모리 상태가 일치함
+                self._sync_locked()
+                ops = [op for op in ops if op["op"] == "add" or op["id"] in self._doc_len]
+                for op in ops:
+                    self._apply_op(op)
+                with open(self._ops_path(), "a", encoding="utf-8") as f:
+                    for op in ops:
+                        f.write(json.dumps(op, ensure_ascii=False) + "\n")
+                self._ops_offset = os.path.getsize(self._ops_path())
+                self._ops_since_snapshot += len(ops)
+            if self._ops_since_snapshot >= self.compact_threshold:
+                self.compact()
+
+    def _write_snapshot_locked(self):
+        tmp_path = self._snapshot_path() + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"format": self.SNAPSHOT_FORMAT, "doc_terms": self._doc_terms},
+                f, ensure_ascii=False, separators=(",", ":"),
+            )
+        os.replace(tmp_path, self._snapshot_path())
+        open(self._ops_path(), "w").close()
+        self._snapshot_stamp = self._stamp(self._snapshot_path())
+        self._ops_offset = 0
+        self._ops_since_snapshot = 0
+
+    def compact(self):
+        """현재 색인을 스냅샷으로 저장하고 연산 로그를 비웁니다."""
+        if not self.persist_path:
+            return
+        with self._lock, file_lock(self._lock_path()):
+            # 다른 프로세스(API 서버 등)가 그 사이 기록한 연산까지 반영한 뒤 로그를 비워야 유실되지 않음
+            self._sync_locked()
+            self._write_snapshot_locked()
+
+    def rebuild(self, batches: Iterable[Tuple[List[str], List[str]]]) -> int:
+        """
+        (ids, documents) 배치들로 색인을 처음부터 다시 만들어 스냅샷으로 저장합니다.
+        기존 Chroma 컬렉션에서 BM25 색인을 채울 때 사용 (scripts.rebuild_lexical_index).
+        재구축하는 동안 다른 프로세스가 기록한 연산은 마지막에 이어서 재생합니다.
+        """
+        start_offset, start_stamp = 0, None
+        if self.persist_path:
+            start_stamp = self._stamp(self._snapshot_path())
+            if os.path.exists(self._ops_path()):
+                start_offset = os.path.getsize(self._ops_path())
+
+        fresh = BM25Index(k1=self.k1, b=self.b)
+        count = 0
+        for ids, documents in batches:
+            for doc_id, doc in zip(ids, documents):
+                fresh._apply_add(doc_id, dict(Counter(tokenize_ko(doc or ""))))
+            count += len(ids)
+
+        with self._lock:
+            if not self.persist_path:
+                self._postings, self._doc_terms = fresh._postings, fresh._doc_terms
+                self._doc_len, self._total_len = fresh._doc_len, fresh._total_len
+                return count
+
+            with file_lock(self._lock_path()):
+                self._sync_locked()
+                self._postings, self._doc_terms = fresh._postings, fresh._doc_terms
+                self._doc_len, self._total_len = fresh._doc_len, fresh._total_len
+                # 재구축 중 추가된 로그 재생 (도중에 다른 프로세스가 압축했으면 남은 로그 전체)
+                self._ops_offset = start_offset if self._snapshot_stamp == start_stamp else 0
+                if os.path.exists(self._ops_path()):
+                    self._replay_ops()
+                self._write_snapshot_locked()
+        return count
+
+    def get_info(self) -> Dict[str, Any]:
+        return {
+            "doc_count": self.doc_count,
+            "term_count": len(self._postings),
+            "avg_doc_len": round(self.avg_doc_len, 2),
+            "persist_path": self.persist_path,
+        }
+
+
+_lexical_index: Optional[BM25Index] = None
+_lexical_index_lock = threading.Lock()
+
+
+def get_lexical_index() -> BM25Index:
+    """프로세스 단위 BM25 색인 싱글톤 (LEXICAL_INDEX_PATH에 영속화)"""
+    global _lexical_index
+    if _lexical_index is None:
+        with _lexical_index_lock:
+            if _lexical_index is None:
+                _lexical_index = BM25Index(
+                    persist_path=os.getenv("LEXICAL_INDEX_PATH", "./lexical_index"),
+                    sync_interval=float(os.getenv("LEXICAL_INDEX_SYNC_SEC", "1.0")),
+                )
+    return _lexical_index
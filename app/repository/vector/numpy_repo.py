@@ -0,0 +1,635 @@
+# app/repository/vector/numpy_repo.py
+import os
+import json
+import time
+import base64
+import atexit
+import threading
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+from app.repository.vector.base import VectorRepository
+from app.repository.vector.quantization import EmbeddingQuantizer
+
+
+# -------------------------
+# Chroma where 절 평가 (메타데이터 필터)
+# -------------------------
+_COMPARATORS = {
+    "$eq": lambda a, b: a == b,
+    "$ne": lambda a, b: a != b,
+    "$gt": lambda a, b: a is not None and a > b,
+    "$gte": lambda a, b: a is not None and a >= b,
+    "$lt": lambda a, b: a is not None and a < b,
+    "$lte": lambda a, b: a is not None and a <= b,
+    "$in": lambda a, b: a in b,
+    "$nin": lambda a, b: a not in b,
+}
+
+
+def match_where(metadata: Optional[Dict[str, Any]], where: Optional[Dict[str, Any]]) -> bool:
+    """Chroma와 같은 문법의 where 조건($and/$or, $eq/$ne/$gt/$gte/$lt/$lte/$in/$nin)을 평가합니다."""
+    if not where:
+        return True
+    metadata = metadata or {}
+
+    for key, cond in where.items():
+        if key == "$and":
+            if not all(match_where(metadata, c) for c in cond):
+                return False
+        elif key == "$or":
+            if not any(match_where(metadata, c) for c in cond):
+                return False
+        elif isinstance(cond, dict):
+            value = metadata.get(key)
+            for op, operand in cond.items():
+                if op not in _COMPARATORS:
+                    raise ValueError(f"Unsupported where operator: {op}")
+                try:
+                    if not _COMPARATORS[op](value, operand):
+                        return False
+                except TypeError:
+                    return False
+        elif metadata.get(key) != cond:
+            return False
+    return True
+
+
+class NumpyVectorRepository(VectorRepository):
+    """
+    NumPy 기반 인메모리 벡터 저장소 (brute-force 정확 검색).
+
+    - 정규화된 float32 벡터를 연속 행렬에 저장하고, 행렬곱 + argpartition으로 top-k 계산
+    - 거리는 Chroma 컬렉션과 같은 hnsw:space 기준 (space 인자, 기본은 Chroma 기본값인 l2)
+      · l2: 제곱 L2 거리 = 2 - 2·cos (정규화 벡터 기준) / cosine, ip: 1 - cos
+      · 벡터를 정규화해 저장하므로 ip는 단위 벡터 임베딩(Upstage 등)에서만 Chroma와 같은 값
+    - persist_path를 주면 save()/로드를 지원
+    - mmap=True면 벡터 파일(vectors.npy)을 쓰기 가능한 메모리 매핑으로 열어 행 추가/삭제를 파일에 바로 반영
+      (용량이 모자라면 더 큰 파일을 만들어 블록 단위로 복사). 상주 메모리는 OS 페이지 캐시에 맡김
+      벡터 파일을 고치기 전에 행 변경(id/문서/메타데이터/벡터)을 records.journal에 먼저 기록하고,
+      로드 시 재생하므로 save() 전에 프로세스가 죽어도 id와 벡터 행이 어긋나지 않음 (save 때 비움)
+    - autosave=True면 쓰기 후 autosave_interval초마다(및 프로세스 종료 시) 저장.
+      records.json(문서/메타데이터)은 저장할 때마다 전체를 다시 쓰므로 대규모 KB에는 Chroma를 사용
+    테스트, 소규모 단일 노드 배포, 벤치마크 기준선 용도입니다.
+    """
+
+    VECTORS_FILE = "vectors.npy"
+    RECORDS_FILE = "records.json"
+    JOURNAL_FILE = "records.journal"
+    COPY_BLOCK_ROWS = 65536
+
+    def __init__(
+        self,
+        name: str = "numpy_embeddings",
+        persist_path: Optional[str] = None,
+        mmap: bool = False,
+        initial_capacity: int = 1024,
+        autosave: bool = False,
+        autosave_interval: float = 5.0,
+        space: str = "l2",
+    ):
+        if space not in ("l2", "cosine", "ip"):
+            raise ValueError(f"Unsupported space: {space}")
+        self.name = name
+        self.space = space
+        self.persist_path = persist_path
+        self.mmap = mmap and persist_path is not None
+        self.autosave = autosave and persist_path is not None
+        self.autosave_interval = autosave_interval
+        self._dirty = False
+        self._last_save = 0.0
+        self._matrix: Optional[np.ndarray] = None
+        self._size = 0
+        self._ids: List[str] = []
+        self._row_of: Dict[str, int] = {}
+        self._documents: List[Optional[str]] = []
+        self._metadatas: List[Optional[Dict[str, Any]]] = []
+        self._initial_capacity = initial_capacity
+        self._lock = threading.RLock()
+        self._journal_replayed = False
+
+        if persist_path and (
+            os.path.exists(os.path.join(persist_path, self.RECORDS_FILE)) or os.path.exists(self._journal_path())
+        ):
+            self._load(mmap=self.mmap)
+        if self.autosave:
+            atexit.register(self.flush)
+
+    @property
+    def namespace(self) -> str:
+        return self.name
+
+    # ---- 내부 유틸 ----
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def _vectors_path(self) -> str:
+        return os.path.join(self.persist_path, self.VECTORS_FILE)
+
+    def _journal_path(self) -> str:
+        return os.path.join(self.persist_path, self.JOURNAL_FILE)
+
+    def _journal(self, ops: List[Dict[str, Any]]):
+        """mmap 모드에서 벡터 파일을 고치기 전에 호출 (write-ahead). 각 op는 벡터까지 담아 재생만으로 복원 가능"""
+        if not self.mmap or not ops:
+            return
+        with open(self._journal_path(), "a", encoding="utf-8") as f:
+            for op in ops:
+                f.write(json.dumps(op, ensure_ascii=False) + "\n")
+
+    @staticmethod
+    def _put_op(row: int, doc_id: str, doc: Optional[str], meta: Optional[Dict[str, Any]], vec: np.ndarray) -> Dict[str, Any]:
+        return {
+            "op": "put", "row": row, "id": doc_id, "document": doc, "metadata": meta,
+            "vector": base64.b64encode(np.asarray(vec, dtype=np.float32).tobytes()).decode("ascii"),
+        }
+
+    def _replay_journal(self) -> bool:
+        """save() 이후 기록된 행 변경을 재생. 같은 op를 여러 번 적용해도 결과가 같도록 행 번호 기준으로 덮어씀"""
+        if not os.path.exists(self._journal_path()):
+            return False
+        with open(self._journal_path(), "rb") as f:
+            data = f.read()
+        # 기록 도중 중단된 마지막 줄(개행 없음)은 벡터 파일에도 반영되기 전이므로 버림
+        lines = data[: data.rfind(b"\n") + 1].splitlines()
+        for line in lines:
+            try:
+                op = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if op["op"] == "put":
+                row = op["row"]
+                vec = np.frombuffer(base64.b64decode(op["vector"]), dtype=np.float32)
+                if row >= self._size:
+                    self._ensure_capacity(len(vec), row + 1 - self._size)
+                    grow = row + 1 - self._size
+                    self._ids.extend([None] * grow)
+                    self._documents.extend([None] * grow)
+                    self._metadatas.extend([None] * grow)
+                    self._size = row + 1
+                self._ids[row], self._documents[row], self._metadatas[row] = op["id"], op["document"], op["metadata"]
+                self._matrix[row] = vec
+            elif op["op"] == "meta":
+                row = op["row"]
+                if row < self._size and self._ids[row] == op["id"]:
+                    self._metadatas[row] = op["metadata"]
+            elif op["op"] == "size":
+                self._size = min(self._size, op["size"])
+                del self._ids[self._size:], self._documents[self._size:], self._metadatas[self._size:]
+        self._row_of = {doc_id: i for i, doc_id in enumerate(self._ids)}
+        return bool(lines)
+
+    def _allocate(self, capacity: int, dim: int, path: Optional[str] = None) -> np.ndarray:
+        if not self.mmap:
+            return np.empty((capacity, dim), dtype=np.float32)
+        os.makedirs(self.persist_path, exist_ok=True)
+        return np.lib.format.open_memmap(path or self._vectors_path(), mode="w+", dtype=np.float32, shape=(capacity, dim))
+
+    def _ensure_capacity(self, dim: int, extra: int):
+        needed = self._size + extra
+        if self._matrix is None:
+            self._matrix = self._allocate(max(self._initial_capacity, needed), dim)
+            return
+        if self._matrix.shape[1] != dim:
+            raise ValueError(f"Embedding dimension mismatch: {dim} != {self._matrix.shape[1]}")
+        if needed > self._matrix.shape[0]:
+            capacity = max(needed, self._matrix.shape[0] * 2)
+            # mmap 모드는 새 파일에 블록 단위로 복사해 전체 행렬을 메모리에 올리지 않음
+            tmp_path = os.path.join(self.persist_path, "vectors.grow.npy") if self.mmap else None
+            grown = self._allocate(capacity, dim, path=tmp_path)
+            for start in range(0, self._size, self.COPY_BLOCK_ROWS):
+                end = min(start + self.COPY_BLOCK_ROWS, self._size)
+                grown[start:end] = self._matrix[start:end]
+            if self.mmap:
+                grown.flush()
+                os.replace(tmp_path, self._vectors_path())
+            self._matrix = grown
+
+    def _mark_dirty(self):
+        if not self.autosave:
+            return
+        self._dirty = True
+        if time.monotonic() - self._last_save >= self.autosave_interval:
+            self.save()
+
+    def flush(self):
+        """autosave 대기 중인 변경분을 저장합니다 (프로세스 종료 시 자동 호출)."""
+        with self._lock:
+            if self._dirty:
+                self.save()
+
+    def _filter_mask(self, where: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        if not where:
+            return None
+        return np.fromiter(
+            (match_where(m, where) for m in self._metadatas),
+            dtype=bool,
+            count=self._size,
+        )
+
+    # 하위 클래스(압축 저장소)가 보조 인덱스를 행렬과 같이 유지하기 위한 훅
+    def _on_rows_written(self, rows: List[int]):
+        pass
+
+    def _on_row_moved(self, src: int, dst: int):
+        pass
+
+    # ---- VectorRepository 구현 ----
+    def add_documents(
+        self,
+        documents: List[str],
+        embeddings: List[List[float]],
+        metadatas: List[Dict[str, Any]] = None,
+        ids: List[str] = None,
+    ):
+        if ids is None:
+            ids = [f"doc_{i}" for i in range(len(documents))]
+
+        if metadatas is None:
+            metadatas = [{"text": doc} for doc in documents]
+
+        vectors = self._normalize(np.asarray(embeddings, dtype=np.float32))
+
+        with self._lock:
+            self._ensure_capacity(vectors.shape[1], len(ids))
+            rows = []
+            for doc_id, doc, meta in zip(ids, documents, metadatas):
+                row = self._row_of.get(doc_id)
+                if row is None:
+                    row = self._size
+                    self._size += 1
+                    self._row_of[doc_id] = row
+                    self._ids.append(doc_id)
+                    self._documents.append(doc)
+                    self._metadatas.append(meta)
+                else:
+                    self._documents[row] = doc
+                    self._metadatas[row] = meta
+                rows.append(row)
+            self._journal([
+                self._put_op(row, doc_id, doc, meta, vec)
+                for row, doc_id, doc, meta, vec in zip(rows, ids, documents, metadatas, vectors)
+            ])
+            for row, vec in zip(rows, vectors):
+                self._matrix[row] = vec
+            self._on_rows_written(rows)
+            self._mark_dirty()
+
+    def upsert_documents(
+        self,
+        documents: List[str],
+        embeddings: List[List[float]],
+        metadatas: List[Dict[str, Any]] = None,
+        ids: List[str] = None,
+    ):
+        # add_documents가 이미 있는 id를 같은 행에 덮어씀
+        self.add_documents(documents, embeddings, metadatas=metadatas, ids=ids)
+
+    def query(
+        self,
+        query_embeddings: List[List[float]],
+        n_results: int = 5,
+        include: List[str] = None,
+        where: Dict[str, Any] = None,
+    ) -> Dict[str, Any]:
+        if include is None:
+            include = ["documents", "metadatas", "distances"]
+
+        queries = self._normalize(np.asarray(query_embeddings, dtype=np.float32))
+        result: Dict[str, Any] = {"ids": []}
+        for key in include:
+            result[key] = []
+
+        with self._lock:
+            if self._size == 0:
+                for key in result:
+                    result[key] = [[] for _ in range(len(queries))]
+                return result
+
+            sims = queries @ self._matrix[: self._size].T  # (n_queries, n_docs)
+            mask = self._filter_mask(where)
+            if mask is not None:
+                sims[:, ~mask] = -np.inf
+                available = int(mask.sum())
+            else:
+                available = self._size
+            k = min(n_results, available)
+
+            for row_sims in sims:
+                if k == 0:
+                    top = np.empty(0, dtype=np.int64)
+                else:
+                    top = np.argpartition(-row_sims, k - 1)[:k]
+                    top = top[np.argsort(-row_sims[top])]
+
+                self._append_hits(result, include, top, row_sims[top])
+
+        return result
+
+    def _append_hits(self, result: Dict[str, Any], include: List[str], rows: np.ndarray, sims: np.ndarray):
+        result["ids"].append([self._ids[i] for i in rows])
+        if "documents" in include:
+            result["documents"].append([self._documents[i] for i in rows])
+        if "metadatas" in include:
+            result["metadatas"].append([self._metadatas[i] for i in rows])
+        if "distances" in include:
+            distances = 2.0 - 2.0 * sims if self.space == "l2" else 1.0 - sims
+            result["distances"].append(distances.tolist())
+        if "embeddings" in include:
+            result["embeddings"].append(self._matrix[rows].tolist())
+
+    def get_documents(
+        self,
+        ids: List[str] = None,
+        where: Dict[str, Any] = None,
+        limit: int = None,
+        offset: int = None,
+        include: List[str] = None,
+    ) -> Dict[str, Any]:
+        if include is None:
+            include = ["documents", "metadatas"]
+
+        with self._lock:
+            if ids is not None:
+                rows = [self._row_of[i] for i in ids if i in self._row_of]
+            else:
+                rows = list(range(self._size))
+            if where:
+                rows = [r for r in rows if match_where(self._metadatas[r], where)]
+            start = offset or 0
+            rows = rows[start: start + limit] if limit is not None else rows[start:]
+
+            result: Dict[str, Any] = {"ids": [self._ids[r] for r in rows]}
+            if "documents" in include:
+                result["documents"] = [self._documents[r] for r in rows]
+            if "metadatas" in include:
+                result["metadatas"] = [self._metadatas[r] for r in rows]
+            if "embeddings" in include:
+                result["embeddings"] = self._matrix[rows].tolist() if rows else []
+        return result
+
+    def update_metadatas(self, ids: List[str], metadatas: List[Dict[str, Any]]):
+        with self._lock:
+            ops = []
+            for doc_id, meta in zip(ids, metadatas):
+                row = self._row_of.get(doc_id)
+                if row is not None:
+                    self._metadatas[row] = meta
+                    ops.append({"op": "meta", "row": row, "id": doc_id, "metadata": meta})
+            self._journal(ops)
+            self._mark_dirty()
+
+    def delete_documents(self, ids: List[str]):
+        with self._lock:
+            for doc_id in ids:
+                row = self._row_of.pop(doc_id, None)
+                if row is None:
+                    continue
+                last = self._size - 1
+                if row != last:
+                    # 마지막 행을 빈 자리로 옮겨 행렬을 연속으로 유지 (O(1) 삭제, mmap이면 파일에 직접 기록)
+                    moved_id = self._ids[last]
+                    self._journal([
+                        self._put_op(row, moved_id, self._documents[last], self._metadatas[last], self._matrix[last]),
+                        {"op": "size", "size": last},
+                    ])
+                    self._matrix[row] = self._matrix[last]
+                    self._ids[row] = moved_id
+                    self._documents[row] = self._documents[last]
+                    self._metadatas[row] = self._metadatas[last]
+                    self._row_of[moved_id] = row
+                    self._on_row_moved(last, row)
+                else:
+                    self._journal([{"op": "size", "size": last}])
+                self._ids.pop()
+                self._documents.pop()
+                self._metadatas.pop()
+                self._size -= 1
+            self._mark_dirty()
+
+    def get_collection_info(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "count": self._size,
+            "metadata": {
+                "backend": "numpy",
+                "space": self.space,
+                "dim": None if self._matrix is None else int(self._matrix.shape[1]),
+                "matrix_bytes": 0 if self._matrix is None else int(self._size * self._matrix.shape[1] * 4),
+                "persist_path": self.persist_path,
+            },
+        }
+
+    # ---- 영속화 ----
+    def save(self):
+        if not self.persist_path:
+            raise ValueError("persist_path is not set")
+        os.makedirs(self.persist_path, exist_ok=True)
+        with self._lock:
+            if isinstance(self._matrix, np.memmap):
+                # 벡터는 이미 파일에 있음 (용량만큼의 행 중 앞쪽 len(ids)개가 유효)
+                self._matrix.flush()
+            else:
+                matrix = self._matrix[: self._size] if self._matrix is not None else np.empty((0, 0), dtype=np.float32)
+                tmp_vectors = os.path.join(self.persist_path, "vectors.tmp.npy")
+                np.save(tmp_vectors, matrix)
+                os.replace(tmp_vectors, self._vectors_path())
+            records = {"ids": self._ids, "documents": self._documents, "metadatas": self._metadatas}
+            tmp_records = os.path.join(self.persist_path, self.RECORDS_FILE + ".tmp")
+            with open(tmp_records, "w", encoding="utf-8") as f:
+                json.dump(records, f, ensure_ascii=False)
+            os.replace(tmp_records, os.path.join(self.persist_path, self.RECORDS_FILE))
+            if os.path.exists(self._journal_path()):
+                # records.json이 저널 내용까지 반영했으므로 비움 (비우기 전에 죽어도 재생은 멱등)
+                open(self._journal_path(), "w").close()
+            self._dirty = False
+            self._last_save = time.monotonic()
+
+    def _load(self, mmap: bool = False):
+        records_path = os.path.join(self.persist_path, self.RECORDS_FILE)
+        records = {"ids": [], "documents": [], "metadatas": []}
+        if os.path.exists(records_path):
+            with open(records_path, "r", encoding="utf-8") as f:
+                records = json.load(f)
+        self._ids = records["ids"]
+        self._documents = records["documents"]
+        self._metadatas = records["metadatas"]
+        self._row_of = {doc_id: i for i, doc_id in enumerate(self._ids)}
+        self._size = len(self._ids)
+
+        # mmap 모드는 쓰기 가능한 매핑(r+)으로 열어 이후 쓰기도 파일에 바로 반영
+        if os.path.exists(self._vectors_path()):
+            matrix = np.load(self._vectors_path(), mmap_mode="r+" if mmap else None)
+            if mmap or self._size:
+                self._matrix = matrix if matrix.ndim == 2 and matrix.shape[0] else None
+
+        # 저널은 mmap 모드에서만 쓰지만, 남아 있으면 모드와 무관하게 재생해야 벡터와 행이 맞음
+        self._journal_replayed = self._replay_journal()
+        if self._journal_replayed:
+            # 재생 결과를 records.json에 반영하고 저널을 비움
+            NumpyVectorRepository.save(self)
+
+
+class QuantizedVectorRepository(NumpyVectorRepository):
+    """
+    압축 코드로 후보를 고르고 원본 정밀도로 재정렬하는 NumPy 저장소.
+
+    - 1단계: EmbeddingQuantizer 코드(int8/float16, 차원 축소)로 n_results * rerank_factor개 후보 선정
+    - 2단계: 후보만 원본 float32 벡터로 다시 계산해 top-k (rerank_factor=0이면 근사 점수 그대로 사용)
+    - mmap=True로 열면 원본 행렬은 디스크에 두고 후보 행만 읽으므로, 상주 메모리는 대부분 압축 코드입니다
+    - 코덱은 min_fit_rows개 이상 쌓인 뒤 처음 학습하고(그 전에는 원본 정밀도 전체 검색),
+      이후 문서 수가 학습 시점의 2배가 될 때마다 다시 학습합니다
+    """
+
+    CODES_FILE = "codes.npy"
+
+    def __init__(
+        self,
+        quantizer: EmbeddingQuantizer,
+        rerank_factor: int = 4,
+        fit_sample: int = 20000,
+        min_fit_rows: int = 1000,
+        **kwargs,
+    ):
+        self.quantizer = quantizer
+        self.rerank_factor = rerank_factor
+        self.fit_sample = fit_sample
+        self.min_fit_rows = min_fit_rows
+        self._codes: Optional[np.ndarray] = None
+        # 코덱을 마지막으로 학습한 시점의 문서 수
+        self._fitted_size = 0
+        super().__init__(**kwargs)
+
+    def retrain(self):
+        """현재 벡터 샘플로 코덱(PCA/int8 스케일)을 다시 학습하고 전체 코드를 재계산합니다."""
+        with self._lock:
+            if self._size == 0:
+                return
+            if self._size > self.fit_sample:
+                rows = np.sort(np.random.RandomState(0).choice(self._size, self.fit_sample, replace=False))
+                sample = self._matrix[rows]
+            else:
+                sample = self._matrix[: self._size]
+            self.quantizer.fit(sample)
+
+            width = self.quantizer.project(self._matrix[:1]).shape[1]
+            codes = np.empty((self._matrix.shape[0], width), dtype=self.quantizer.dtype)
+            for start in range(0, self._size, self.COPY_BLOCK_ROWS):
+                end = min(start + self.COPY_BLOCK_ROWS, self._size)
+                codes[start:end] = self.quantizer.encode(self._matrix[start:end])
+            self._codes = codes
+            self._fitted_size = self._size
+
+    def _on_rows_written(self, rows: List[int]):
+        if self._codes is None or not self.quantizer.fitted:
+            # 첫 배치 몇 건으로 PCA/int8 스케일을 학습하면 이후 문서의 근사 점수가 크게 틀어지므로
+            # 충분히 쌓일 때까지는 코드를 만들지 않고 원본 정밀도로 검색
+            if self._size >= self.min_fit_rows:
+                self.retrain()
+            return
+        if self._size >= 2 * self._fitted_size:
+            self.retrain()
+            return
+        if self._codes.shape[0] < self._matrix.shape[0]:
+            grown = np.empty((self._matrix.shape[0], self._codes.shape[1]), dtype=self._codes.dtype)
+            grown[: len(self._codes)] = self._codes
+            self._codes = grown
+        self._codes[rows] = self.quantizer.encode(self._matrix[rows])
+
+    def _on_row_moved(self, src: int, dst: int):
+        if self._codes is not None:
+            self._codes[dst] = self._codes[src]
+
+    def query(
+        self,
+        query_embeddings: List[List[float]],
+        n_results: int = 5,
+        include: List[str] = None,
+        where: Dict[str, Any] = None,
+    ) -> Dict[str, Any]:
+        with self._lock:
+            if self._size == 0 or self._codes is None or self._codes.shape[0] < self._size:
+                return super().query(query_embeddings, n_results=n_results, include=include, where=where)
+
+            if include is None:
+                include = ["documents", "metadatas", "distances"]
+            queries = self._normalize(np.asarray(query_embeddings, dtype=np.float32))
+            result: Dict[str, Any] = {"ids": []}
+            for key in include:
+                result[key] = []
+
+            approx = self.quantizer.scores(queries, self._codes[: self._size])
+            mask = self._filter_mask(where)
+            if mask is not None:
+                approx[:, ~mask] = -np.inf
+                available = int(mask.sum())
+            else:
+                available = self._size
+            k = min(n_results, available)
+            n_candidates = min(available, k * max(self.rerank_factor, 1))
+
+            for q, row_approx in zip(queries, approx):
+                if k == 0:
+                    self._append_hits(result, include, np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32))
+                    continue
+
+                candidates = np.argpartition(-row_approx, n_candidates - 1)[:n_candidates]
+                if self.rerank_factor > 0:
+                    # 정렬된 행 순서로 읽어 mmap 페이지 접근을 순차적으로 만듦
+                    candidates = np.sort(candidates)
+                    sims = self._matrix[candidates] @ q
+                else:
+                    sims = row_approx[candidates]
+                order = np.argsort(-sims)[:k]
+                self._append_hits(result, include, candidates[order], sims[order])
+
+        return result
+
+    def get_collection_info(self) -> Dict[str, Any]:
+        info = super().get_collection_info()
+        dim = None if self._matrix is None else int(self._matrix.shape[1])
+        info["metadata"].update(
+            {
+                "backend": "numpy_quantized",
+                "quantization": self.quantizer.config(),
+                "rerank_factor": self.rerank_factor,
+                "code_bytes": 0 if dim is None else int(self._size * self.quantizer.bytes_per_vector(dim)),
+                "full_precision_mmap": isinstance(self._matrix, np.memmap),
+                "codec_fitted_rows": self._fitted_size,
+            }
+        )
+        return info
+
+    # ---- 영속화 ----
+    def save(self):
+        with self._lock:
+            super().save()
+            if self._codes is not None:
+                self.quantizer.save(self.persist_path)
+                tmp_codes = os.path.join(self.persist_path, "codes.tmp.npy")
+                np.save(tmp_codes, self._codes[: self._size])
+                os.replace(tmp_codes, os.path.join(self.persist_path, self.CODES_FILE))
+
+    def _load(self, mmap: bool = False):
+        super()._load(mmap=mmap)
+        if self._size == 0:
+            return
+
+        saved = EmbeddingQuantizer.load(self.persist_path)
+        codes_path = os.path.join(self.persist_path, self.CODES_FILE)
+        # 저널을 재생했으면 codes.npy가 재생된 행을 반영하지 못하므로 다시 학습
+        if (
+            saved is not None and saved.config() == self.quantizer.config() and os.path.exists(codes_path)
+            and not self._journal_replayed
+        ):
+            # 압축 코드는 검색마다 전부 읽으므로 mmap 여부와 무관하게 메모리에 올림
+            self.quantizer = saved
+            self._codes = np.load(codes_path)
+            self._fitted_size = len(self._codes)
+        elif self._size >= self.min_fit_rows:
+            # 설정이 바뀌었거나 코드가 없으면 원본 벡터로 다시 학습
+            self.retrain()
@@ -0,0 +1,108 @@
+# app/repository/vector/quantization.py
+import os
+import json
+from typing import Optional
+
+import numpy as np
+
+SUPPORTED_DTYPES = ("float32", "float16", "int8")
+# 압축 행렬을 float32로 풀어 계산할 때 한 번에 처리하는 행 수 (임시 메모리 상한)
+SCORE_BLOCK_ROWS = 32768
+
+
+class EmbeddingQuantizer:
+    """
+    임베딩 압축 코덱: 차원 축소(앞쪽 절단 또는 PCA) + 스칼라 양자화(float16/int8).
+
+    - dims=None이면 차원 유지, pca=False면 앞쪽 dims개 성분만 남김(절단), pca=True면 주성분 투영
+    - int8은 차원별 대칭 스케일(학습 샘플의 최대 절댓값 / 127)을 사용
+    - 점수는 원본 내적의 근사치이므로 최종 순위는 원본 정밀도로 재정렬하는 것을 전제로 합니다
+    """
+
+    PARAMS_FILE = "quantizer.npz"
+
+    def __init__(self, dtype: str = "int8", dims: Optional[int] = None, pca: bool = False):
+        if dtype not in SUPPORTED_DTYPES:
+            raise ValueError(f"Unsupported quantization dtype: {dtype}")
+        self.dtype = dtype
+        self.dims = dims
+        self.pca = pca
+        self.components: Optional[np.ndarray] = None  # (D, dims) 투영 행렬
+        self.scale: Optional[np.ndarray] = None  # (dims,) int8 스케일
+        self.fitted = False
+
+    # ---- 학습 ----
+    def fit(self, vectors: np.ndarray) -> "EmbeddingQuantizer":
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.pca and self.dims:
+            # 내적 보존이 목적이므로 평균을 빼지 않은 2차 모멘트 행렬의 고유벡터를 사용
+            moment = vectors.T @ vectors
+            _, eigvecs = np.linalg.eigh(moment)
+            self.components = np.ascontiguousarray(eigvecs[:, ::-1][:, : self.dims], dtype=np.float32)
+        else:
+            self.components = None
+
+        if self.dtype == "int8":
+            projected = self.project(vectors)
+            max_abs = np.abs(projected).max(axis=0) if len(projected) else np.ones(projected.shape[1])
+            self.scale = (np.maximum(max_abs, 1e-6) / 127.0).astype(np.float32)
+
+        self.fitted = True
+        return self
+
+    # ---- 변환 ----
+    def project(self, vectors: np.ndarray) -> np.ndarray:
+        if self.components is not None:
+            return vectors @ self.components
+        if self.dims:
+            return vectors[:, : self.dims]
+        return vectors
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        projected = self.project(np.asarray(vectors, dtype=np.float32))
+        if self.dtype == "int8":
+            return np.clip(np.rint(projected / self.scale), -127, 127).astype(np.int8)
+        return projected.astype(self.dtype)
+
+    def scores(self, queries: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """(n_queries, n_codes) 근사 내적. 블록 단위로 풀어서 임시 float32 메모리를 제한합니다."""
+        q = self.project(np.asarray(queries, dtype=np.float32))
+        if self.dtype == "int8":
+            q = q * self.scale
+
+        out = np.empty((len(q), len(codes)), dtype=np.float32)
+        for start in range(0, len(codes), SCORE_BLOCK_ROWS):
+            block = codes[start: start + SCORE_BLOCK_ROWS].astype(np.float32)
+            out[:, start: start + len(block)] = q @ block.T
+        return out
+
+    def bytes_per_vector(self, dim: int) -> int:
+        width = min(self.dims or dim, dim)
+        return width * np.dtype(self.dtype).itemsize
+
+    # ---- 영속화 ----
+    def save(self, directory: str):
+        arrays = {"config": np.frombuffer(json.dumps(self.config()).encode("utf-8"), dtype=np.uint8)}
+        if self.components is not None:
+            arrays["components"] = self.components
+        if self.scale is not None:
+            arrays["scale"] = self.scale
+        tmp = os.path.join(directory, "quantizer.tmp.npz")
+        np.savez(tmp, **arrays)
+        os.replace(tmp, os.path.join(directory, self.PARAMS_FILE))
+
+    @classmethod
+    def load(cls, directory: str) -> Optional["EmbeddingQuantizer"]:
+        path = os.path.join(directory, cls.PARAMS_FILE)
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            config = json.loads(data["config"].tobytes().decode("utf-8"))
+            quantizer = cls(dtype=config["dtype"], dims=config["dims"], pca=config["pca"])
+            quantizer.components = data["components"] if "components" in data else None
+            quantizer.scale = data["scale"] if "scale" in data else None
+        quantizer.fitted = True
+        return quantizer
+
+    def config(self) -> dict:
+        return {"dtype": self.dtype, "dims": self.dims, "pca": self.pca}
@@ -0,0 +1,100 @@
+# app/repository/vector/shard_router.py
+import zlib
+from typing import List, Dict, Any, Optional, Set
+
+KNOWN_DOC_TYPES = ["news_snippet", "news_article", "financials"]
+OTHER_DOC_TYPE = "other"
+NO_STOCK_BUCKET = "none"
+SHARD_SEPARATOR = "__"
+
+
+class ShardRouter:
+    """
+    문서 메타데이터(type, stock_code)로 Chroma 컬렉션(shard)을 결정하는 라우터.
+
+    shard 이름 예: upstage_embeddings__news_article__s03
+    - by_doc_type: 문서 타입별 분리 (알 수 없는 타입은 other)
+    - stock_buckets > 0: 종목코드 해시 버킷별 분리 (종목코드 없는 문서는 none 버킷)
+    """
+
+    def __init__(self, base_name: str, by_doc_type: bool = True, stock_buckets: int = 0):
+        if not by_doc_type and stock_buckets <= 0:
+            raise ValueError("ShardRouter requires by_doc_type or stock_buckets > 0")
+        self.base_name = base_name
+        self.by_doc_type = by_doc_type
+        self.stock_buckets = stock_buckets
+
+    # ---- 쓰기 경로 ----
+    def _doc_type_part(self, doc_type: Optional[str]) -> str:
+        return doc_type if doc_type in KNOWN_DOC_TYPES else OTHER_DOC_TYPE
+
+    def _bucket_part(self, stock_code: Optional[str]) -> str:
+        if not stock_code:
+            return NO_STOCK_BUCKET
+        # 프로세스와 무관하게 고정된 값이 필요하므로 hash() 대신 crc32 사용
+        bucket = zlib.crc32(str(stock_code).encode("utf-8")) % self.stock_buckets
+        return f"s{bucket:02d}"
+
+    def _name(self, doc_type_part: Optional[str], bucket_part: Optional[str]) -> str:
+        parts = [self.base_name]
+        if self.by_doc_type:
+            parts.append(doc_type_part)
+        if self.stock_buckets > 0:
+            parts.append(bucket_part)
+        return SHARD_SEPARATOR.join(parts)
+
+    def shard_for(self, metadata: Optional[Dict[str, Any]]) -> str:
+        metadata = metadata or {}
+        return self._name(
+            self._doc_type_part(metadata.get("type")),
+            self._bucket_part(metadata.get("stock_code")),
+        )
+
+    def is_shard(self, collection_name: str) -> bool:
+        return collection_name.startswith(self.base_name + SHARD_SEPARATOR)
+
+    # ---- 읽기 경로 ----
+    @staticmethod
+    def _equality_values(where: Optional[Dict[str, Any]], key: str) -> Optional[Set[Any]]:
+        """
+        where 절에서 key에 대한 등호/$in 조건 값을 찾습니다.
+        최상위 또는 $and 안의 조건만 해석하고, 그 외($or 등)는 범위를 좁히지 않습니다(None).
+        """
+        if not where:
+            return None
+
+        clauses = where.get("$and") if "$and" in where else [where]
+        for clause in clauses or []:
+            if key not in clause:
+                continue
+            cond = clause[key]
+            if isinstance(cond, dict):
+                if "$eq" in cond:
+                    return {cond["$eq"]}
+                if "$in" in cond:
+                    return set(cond["$in"])
+                return None
+            return {cond}
+        return None
+
+    def candidate_shards(self, where: Optional[Dict[str, Any]], existing: List[str]) -> List[str]:
+        """where 조건과 겹칠 수 있는 shard만 골라 반환합니다 (조건이 없으면 전체 fan-out)."""
+        types = self._equality_values(where, "type") if self.by_doc_type else None
+        stocks = self._equality_values(where, "stock_code") if self.stock_buckets > 0 else None
+
+        allowed_types = {self._doc_type_part(t) for t in types} if types is not None else None
+        allowed_buckets = {self._bucket_part(s) for s in stocks} if stocks is not None else None
+
+        selected = []
+        for name in existing:
+            if not self.is_shard(name):
+                continue
+            parts = name[len(self.base_name) + len(SHARD_SEPARATOR):].split(SHARD_SEPARATOR)
+            type_part = parts[0] if self.by_doc_type else None
+            bucket_part = parts[-1] if self.stock_buckets > 0 else None
+            if allowed_types is not None and type_part not in allowed_types:
+                continue
+            if allowed_buckets is not None and bucket_part not in allowed_buckets:
+                continue
+            selected.append(name)
+        return sorted(selected)
@@ -1,12 +1,32 @@
 # app/repository/vector/vector_repo.py
-from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
 
-from app.core.chroma_db import ChromaDBConnection
+from app.core.chroma_db import ChromaDBConnection, ChromaDBConfig
+from app.repository.vector.base import VectorRepository
+from app.repository.vector.shard_router import ShardRouter
 
+# shard fan-out 전용 풀. aquery는 query 자체를 _vector_io_pool에서 실행하므로
+# 같은 풀에 shard 질의를 다시 제출하면 워커가 모두 대기 상태가 되어 교착될 수 있음
+_shard_fanout_pool = ThreadPoolExecutor(
+    max_workers=int(os.getenv("SHARD_FANOUT_POOL_SIZE", "16")),
+    thread_name_prefix="shard-fanout",
+)
+
+
+class ChromaDBRepository(VectorRepository):
+    def __init__(self, collection_name: str = None):
+        self._connection = ChromaDBConnection()
+        self._collection_name = collection_name
+        self.collection = self._connection.get_collection(collection_name)
+
+    @property
+    def namespace(self) -> str:
+        return self.collection.name
 
-class VectorRepository(ABC):
-    @abstractmethod
     def add_documents(
         self,
         documents: List[str],
@@ -14,72 +34,482 @@ class VectorRepository(ABC):
         metadatas: List[Dict[str, Any]] = None,
         ids: List[str] = None,
     ):
-        pass
+        if ids is None:
+            ids = [f"doc_{i}" for i in range(len(documents))]
+
+        if metadatas is None:
+            metadatas = [{"text": doc} for doc in documents]
+
+        self.collection.add(
+            embeddings=embeddings,
+            documents=documents,
+            metadatas=metadatas,
+            ids=ids,
+        )
+
+    def upsert_documents(
+        self,
+        documents: List[str],
+        embeddings: List[List[float]],
+        metadatas: List[Dict[str, Any]] = None,
+        ids: List[str] = None,
+    ):
+        if ids is None:
+            ids = [f"doc_{i}" for i in range(len(documents))]
+
+        if metadatas is None:
+            metadatas = [{"text": doc} for doc in documents]
+
+        self.collection.upsert(
+            embeddings=embeddings,
+            documents=documents,
+            metadatas=metadatas,
+            ids=ids,
+        )
 
-    @abstractmethod
     def query(
         self,
         query_embeddings: List[List[float]],
         n_results: int = 5,
         include: List[str] = None,
+        where: Dict[str, Any] = None,
     ) -> Dict[str, Any]:
-        pass
+        if include is None:
+            include = ["documents", "metadatas", "distances"]
+
+        return self.collection.query(
+            query_embeddings=query_embeddings,
+            n_results=n_results,
+            include=include,
+            where=where,
+        )
+
+    def get_documents(
+        self,
+        ids: List[str] = None,
+        where: Dict[str, Any] = None,
+        limit: int = None,
+        offset: int = None,
+        include: List[str] = None,
+    ) -> Dict[str, Any]:
+        if include is None:
+            include = ["documents", "metadatas"]
+
+        return self.collection.get(
+            ids=ids,
+            where=where,
+            limit=limit,
+            offset=offset,
+            include=include,
+        )
+
+    def update_metadatas(self, ids: List[str], metadatas: List[Dict[str, Any]]):
+        self.collection.update(ids=ids, metadatas=metadatas)
 
-    @abstractmethod
     def delete_documents(self, ids: List[str]):
-        pass
+        self.collection.delete(ids=ids)
 
-    @abstractmethod
     def get_collection_info(self) -> Dict[str, Any]:
-        pass
+        return {
+            "name": self.collection.name,
+            "count": self.collection.count(),
+            "metadata": self.collection.metadata,
+        }
 
+    # ---- 서버 모드: Chroma AsyncHttpClient 사용 ----
+    async def _aget_collection(self):
+        return await self._connection.get_async_collection(self._collection_name)
 
-class ChromaDBRepository(VectorRepository):
-    def __init__(self, collection_name: str = None):
-        self._connection = ChromaDBConnection()
-        self.collection = self._connection.get_collection(collection_name)
-
-    def add_documents(
+    async def aadd_documents(
         self,
         documents: List[str],
         embeddings: List[List[float]],
         metadatas: List[Dict[str, Any]] = None,
         ids: List[str] = None,
     ):
+        if not self._connection.supports_async:
+            return await super().aadd_documents(documents, embeddings, metadatas=metadatas, ids=ids)
+
         if ids is None:
             ids = [f"doc_{i}" for i in range(len(documents))]
 
         if metadatas is None:
             metadatas = [{"text": doc} for doc in documents]
 
-        self.collection.add(
+        collection = await self._aget_collection()
+        await collection.add(
             embeddings=embeddings,
             documents=documents,
             metadatas=metadatas,
             ids=ids,
         )
 
-    def query(
+    async def aquery(
         self,
         query_embeddings: List[List[float]],
         n_results: int = 5,
         include: List[str] = None,
+        where: Dict[str, Any] = None,
     ) -> Dict[str, Any]:
+        if not self._connection.supports_async:
+            return await super().aquery(query_embeddings, n_results=n_results, include=include, where=where)
+
         if include is None:
             include = ["documents", "metadatas", "distances"]
 
-        return self.collection.query(
+        collection = await self._aget_collection()
+        return await collection.query(
             query_embeddings=query_embeddings,
             n_results=n_results,
             include=include,
+            where=where,
         )
 
+    async def aget_documents(
+        self,
+        ids: List[str] = None,
+        where: Dict[str, Any] = None,
+        limit: int = None,
+        offset: int = None,
+        include: List[str] = None,
+    ) -> Dict[str, Any]:
+        if not self._connection.supports_async:
+            return await super().aget_documents(ids=ids, where=where, limit=limit, offset=offset, include=include)
+
+        if include is None:
+            include = ["documents", "metadatas"]
+
+        collection = await self._aget_collection()
+        return await collection.get(
+            ids=ids,
+            where=where,
+            limit=limit,
+            offset=offset,
+            include=include,
+        )
+
+    async def adelete_documents(self, ids: List[str]):
+        if not self._connection.supports_async:
+            return await super().adelete_documents(ids)
+
+        collection = await self._aget_collection()
+        await collection.delete(ids=ids)
+
+
+class ShardedChromaDBRepository(VectorRepository):
+    """
+    문서를 타입/종목코드 해시 기준으로 여러 Chroma 컬렉션에 나눠 저장하는 저장소.
+    조회 시 where 조건으로 관련 shard만 질의하고, 범위를 특정할 수 없으면 전체 shard에
+    병렬 fan-out 후 거리 기준으로 병합합니다.
+    """
+
+    def __init__(self, router: ShardRouter, refresh_interval_sec: float = 60.0):
+        self._connection = ChromaDBConnection()
+        self.router = router
+        self.refresh_interval_sec = refresh_interval_sec
+        self._collections: Dict[str, Any] = {}
+        self._refreshed_at = 0.0
+        self._lock = threading.Lock()
+        self.refresh_shards()
+
+    @property
+    def namespace(self) -> str:
+        return f"{self.router.base_name}#sharded"
+
+    def refresh_shards(self) -> List[str]:
+        """Chroma에 존재하는 shard 컬렉션 목록을 다시 읽어옵니다."""
+        with self._lock:
+            for col in self._connection.client.list_collections():
+                name = col if isinstance(col, str) else col.name
+                if self.router.is_shard(name) and name not in self._collections:
+                    self._collections[name] = self._connection.get_collection(name)
+            self._refreshed_at = time.monotonic()
+            return sorted(self._collections)
+
+    def _shard(self, name: str):
+        if name not in self._collections:
+            with self._lock:
+                if name not in self._collections:
+                    self._collections[name] = self._connection.get_collection(name)
+        return self._collections[name]
+
+    def _targets(self, where: Dict[str, Any] = None) -> List[str]:
+        # 다른 프로세스가 만든 shard는 refresh_interval_sec 주기로만 반영 (요청마다 list_collections 하지 않음)
+        if time.monotonic() - self._refreshed_at > self.refresh_interval_sec:
+            self.refresh_shards()
+        return self.router.candidate_shards(where, list(self._collections))
+
+    def add_documents(
+        self,
+        documents: List[str],
+        embeddings: List[List[float]],
+        metadatas: List[Dict[str, Any]] = None,
+        ids: List[str] = None,
+    ):
+        if ids is None:
+            ids = [f"doc_{i}" for i in range(len(documents))]
+
+        if metadatas is None:
+            metadatas = [{"text": doc} for doc in documents]
+
+        groups: Dict[str, List[int]] = {}
+        for i, meta in enumerate(metadatas):
+            groups.setdefault(self.router.shard_for(meta), []).append(i)
+
+        for name, idxs in groups.items():
+            self._shard(name).add(
+                embeddings=[embeddings[i] for i in idxs],
+                documents=[documents[i] for i in idxs],
+                metadatas=[metadatas[i] for i in idxs],
+                ids=[ids[i] for i in idxs],
+            )
+
+    def upsert_documents(
+        self,
+        documents: List[str],
+        embeddings: List[List[float]],
+        metadatas: List[Dict[str, Any]] = None,
+        ids: List[str] = None,
+    ):
+        if ids is None:
+            ids = [f"doc_{i}" for i in range(len(documents))]
+
+        if metadatas is None:
+            metadatas = [{"text": doc} for doc in documents]
+
+        groups: Dict[str, List[int]] = {}
+        for i, meta in enumerate(metadatas):
+            groups.setdefault(self.router.shard_for(meta), []).append(i)
+
+        for name, idxs in groups.items():
+            group_ids = [ids[i] for i in idxs]
+            # 메타데이터가 바뀌어 다른 shard로 가는 문서는 이전 shard의 사본을 지워 id당 한 건만 유지
+            for other in self._targets():
+                if other != name:
+                    self._collections[other].delete(ids=group_ids)
+            self._shard(name).upsert(
+                embeddings=[embeddings[i] for i in idxs],
+                documents=[documents[i] for i in idxs],
+                metadatas=[metadatas[i] for i in idxs],
+                ids=group_ids,
+            )
+
+    def query(
+        self,
+        query_embeddings: List[List[float]],
+        n_results: int = 5,
+        include: List[str] = None,
+        where: Dict[str, Any] = None,
+    ) -> Dict[str, Any]:
+        if include is None:
+            include = ["documents", "metadatas", "distances"]
+        # 병합 정렬에 거리가 필요
+        shard_include = list(include) if "distances" in include else list(include) + ["distances"]
+
+        targets = self._targets(where)
+        partials = list(_shard_fanout_pool.map(
+            lambda name: self._collections[name].query(
+                query_embeddings=query_embeddings,
+                n_results=n_results,
+                include=shard_include,
+                where=where,
+            ),
+            targets,
+        ))
+
+        keys = ["ids"] + [k for k in ("documents", "metadatas", "embeddings", "distances") if k in include]
+        merged: Dict[str, Any] = {k: [] for k in keys}
+        for qi in range(len(query_embeddings)):
+            rows = []
+            for part in partials:
+                for j, dist in enumerate(part["distances"][qi]):
+                    rows.append((dist, part, j))
+            rows.sort(key=lambda r: r[0])
+            rows = rows[:n_results]
+            for k in keys:
+                merged[k].append([part[k][qi][j] for _, part, j in rows])
+        return merged
+
+    def get_documents(
+        self,
+        ids: List[str] = None,
+        where: Dict[str, Any] = None,
+        limit: int = None,
+        offset: int = None,
+        include: List[str] = None,
+    ) -> Dict[str, Any]:
+        if include is None:
+            include = ["documents", "metadatas"]
+
+        keys = ["ids"] + list(include)
+        merged: Dict[str, Any] = {k: [] for k in keys}
+        skip = offset or 0
+        remaining = limit
+
+        # shard 이름 순서로 이어 붙인 것처럼 limit/offset을 적용
+        for name in self._targets(where):
+            if remaining is not None and remaining <= 0:
+                break
+            collection = self._collections[name]
+            if skip and ids is None:
+                total = collection.count() if where is None else len(collection.get(where=where, include=[])["ids"])
+                if skip >= total:
+                    skip -= total
+                    continue
+
+            part = collection.get(ids=ids, where=where, limit=remaining, offset=skip or None, include=include)
+            skip = 0
+            for k in keys:
+                merged[k].extend(part.get(k) or [])
+            if remaining is not None:
+                remaining -= len(part["ids"])
+
+        return merged
+
+    def _owners(self, ids: List[str]) -> Dict[str, str]:
+        """id -> 문서가 실제로 저장된 shard 이름 (없는 id는 제외)"""
+        owners: Dict[str, str] = {}
+        for name in self._targets():
+            for doc_id in self._collections[name].get(ids=ids, include=[])["ids"]:
+                owners[doc_id] = name
+        return owners
+
+    def update_metadatas(self, ids: List[str], metadatas: List[Dict[str, Any]]):
+        # 새 메타데이터로 라우팅하면 다른 shard를 가리킬 수 있으므로 문서가 있는 shard를 id로 찾음
+        owners = self._owners(ids)
+        in_place: Dict[str, List[int]] = {}
+        moves: Dict[tuple, List[int]] = {}
+        for i, (doc_id, meta) in enumerate(zip(ids, metadatas)):
+            owner = owners.get(doc_id)
+            if owner is None:
+                continue
+            target = self.router.shard_for(meta)
+            if target == owner:
+                in_place.setdefault(owner, []).append(i)
+            else:
+                moves.setdefault((owner, target), []).append(i)
+
+        for name, idxs in in_place.items():
+            self._collections[name].update(
+                ids=[ids[i] for i in idxs],
+                metadatas=[metadatas[i] for i in idxs],
+            )
+
+        # 라우팅 키(type/stock_code)가 바뀐 문서는 임베딩째 새 shard로 옮김 (재임베딩 없음)
+        for (owner, target), idxs in moves.items():
+            move_ids = [ids[i] for i in idxs]
+            current = self._collections[owner].get(ids=move_ids, include=["documents", "embeddings"])
+            position = {doc_id: j for j, doc_id in enumerate(current["ids"])}
+            self._shard(target).upsert(
+                ids=move_ids,
+                documents=[current["documents"][position[doc_id]] for doc_id in move_ids],
+                embeddings=[current["embeddings"][position[doc_id]] for doc_id in move_ids],
+                metadatas=[metadatas[i] for i in idxs],
+            )
+            self._collections[owner].delete(ids=move_ids)
+
     def delete_documents(self, ids: List[str]):
-        self.collection.delete(ids=ids)
+        # id만으로는 shard를 알 수 없으므로 전체 shard에서 삭제
+        for name in self._targets():
+            self._collections[name].delete(ids=ids)
+
+    def drop_shard(self, name: str):
+        """shard 하나를 통째로 삭제합니다 (재구축/폐기용, 다른 shard는 영향 없음)."""
+        self._connection.client.delete_collection(name)
+        self._collections.pop(name, None)
 
     def get_collection_info(self) -> Dict[str, Any]:
+        shards = {name: self._collections[name].count() for name in self._targets()}
         return {
-            "name": self.collection.name,
-            "count": self.collection.count(),
-            "metadata": self.collection.metadata,
+            "name": self.router.base_name,
+            "count": sum(shards.values()),
+            "metadata": {
+                "sharded": True,
+                "by_doc_type": self.router.by_doc_type,
+                "stock_buckets": self.router.stock_buckets,
+            },
+            "shards": shards,
         }
+
+
+_sharded_repositories: Dict[str, VectorRepository] = {}
+_sharded_repository_lock = threading.Lock()
+
+
+def _get_sharded_repository(config: ChromaDBConfig, collection_name: str = None) -> VectorRepository:
+    # shard 컬렉션 핸들/목록을 요청마다 다시 읽지 않도록 기준 컬렉션 이름별 프로세스 싱글톤으로 유지
+    base_name = collection_name or config.collection_name
+    repository = _sharded_repositories.get(base_name)
+    if repository is None:
+        with _sharded_repository_lock:
+            repository = _sharded_repositories.get(base_name)
+            if repository is None:
+                repository = ShardedChromaDBRepository(
+                    ShardRouter(
+                        base_name=base_name,
+                        by_doc_type=config.shard_by_doc_type,
+                        stock_buckets=config.stock_shards,
+                    ),
+                    refresh_interval_sec=float(os.getenv("SHARD_REFRESH_SEC", "60")),
+                )
+                _sharded_repositories[base_name] = repository
+    return repository
+
+
+_numpy_repository: Optional[VectorRepository] = None
+_numpy_repository_lock = threading.Lock()
+
+
+def _get_numpy_repository() -> VectorRepository:
+    # 인메모리 저장소는 요청마다 새로 만들면 데이터가 사라지므로 프로세스 싱글톤으로 유지
+    global _numpy_repository
+    if _numpy_repository is None:
+        with _numpy_repository_lock:
+            if _numpy_repository is None:
+                from app.repository.vector.numpy_repo import NumpyVectorRepository, QuantizedVectorRepository
+                from app.repository.vector.quantization import EmbeddingQuantizer
+
+                persist_path = os.getenv("NUMPY_VECTOR_PATH")
+                config = ChromaDBConfig()
+                options = dict(
+                    name=config.collection_name,
+                    # 같은 CHROMA_HNSW_SPACE를 써서 Chroma와 NumPy 백엔드의 거리 값이 일치하도록 함
+                    space=config.hnsw_space or "l2",
+                    persist_path=persist_path,
+                    mmap=os.getenv("NUMPY_VECTOR_MMAP", "false").lower() == "true",
+                    autosave=persist_path is not None,
+                    autosave_interval=float(os.getenv("NUMPY_VECTOR_AUTOSAVE_SEC", "5")),
+                )
+                # NUMPY_VECTOR_QUANTIZATION=int8|float16 이면 압축 코드 + 원본 재정렬 저장소 사용
+                quantization = os.getenv("NUMPY_VECTOR_QUANTIZATION")
+                if quantization:
+                    dims = os.getenv("NUMPY_VECTOR_DIMS")
+                    quantizer = EmbeddingQuantizer(
+                        dtype=quantization,
+                        dims=int(dims) if dims else None,
+                        pca=os.getenv("NUMPY_VECTOR_PCA", "false").lower() == "true",
+                    )
+                    _numpy_repository = QuantizedVectorRepository(
+                        quantizer,
+                        rerank_factor=int(os.getenv("NUMPY_VECTOR_RERANK_FACTOR", "4")),
+                        min_fit_rows=int(os.getenv("NUMPY_VECTOR_MIN_FIT_ROWS", "1000")),
+                        **options,
+                    )
+                else:
+                    _numpy_repository = NumpyVectorRepository(**options)
+    return _numpy_repository
+
+
+def create_vector_repository(collection_name: str = None) -> VectorRepository:
+    """
+    환경설정에 따라 저장소를 생성합니다.
+    - VECTOR_BACKEND=numpy: NumPy 인메모리 저장소 (Chroma 불필요)
+    - 그 외: Chroma 단일 컬렉션 또는 샤딩 저장소
+    """
+    if os.getenv("VECTOR_BACKEND", "chroma") == "numpy":
+        return _get_numpy_repository()
+
+    config = ChromaDBConfig()
+    if config.sharding_enabled:
+        return _get_sharded_repository(config, collection_name)
+    return ChromaDBRepository(collection_name)
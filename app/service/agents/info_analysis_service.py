@@ -0,0 +1,79 @@
+# app/service/agents/info_analysis_service.py
+
+from typing import Dict, Any, Optional, AsyncIterator
+
+from langchain_core.messages import HumanMessage
+from langchain_core.runnables import RunnableConfig
+
+from app.agents.subgraphs.info_analysis import info_analysis_graph
+from app.agents.tools import ANALYSIS_REPORT_TAG
+from app.core.usage_metrics import with_run_usage
+
+
+class InfoAnalysisService:
+    def _initial_state(self, user_query: str, user_id: Optional[str]) -> Dict[str, Any]:
+        state: Dict[str, Any] = {"messages": [HumanMessage(content=user_query)]}
+        if user_id:
+            state["user_id"] = user_id
+        return state
+
+    def run(
+        self,
+        user_query: str,
+        user_id: Optional[str] = None,
+        config: Optional[RunnableConfig] = None,
+    ) -> Dict[str, Any]:
+        """
+        InfoAnalysis 서브그래프 실행 (종목별 리포트가 모두 끝난 뒤 한 번에 반환).
+        - config["configurable"]로 tool 의존성 주입 (vector_service, ticker_resolver, db_engine 등)
+        - 여러 종목은 analyze_stocks_batch로 검색 1회 + 리포트 병렬 생성 (batch_analysis=False로 끌 수 있음)
+        - usage: 이번 실행의 LLM 호출 수/토큰/지연 요약 (노드별)
+        """
+        config, run_usage = with_run_usage(config, user_id)
+        # 종목별 스트리밍이 없으므로 여러 종목은 analyze_stocks_batch 도구 한 번으로 묶어서 처리
+        config["configurable"] = {"batch_analysis": True, **(config.get("configurable") or {})}
+        result = info_analysis_graph.invoke(self._initial_state(user_query, user_id), config=config)
+        return {
+            "process_status": "success",
+            "analysis_results": result.get("analysis_results") or [],
+            "usage": run_usage.summary()["chat"],
+        }
+
+    async def astream(
+        self,
+        user_query: str,
+        user_id: Optional[str] = None,
+        config: Optional[RunnableConfig] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        리포트 토큰을 생성되는 즉시 흘려보내는 스트리밍 실행.
+        - {"type": "report_token", "stock_name", "token"}: 종목별 리포트 토큰 (여러 종목이 섞여서 옴)
+        - {"type": "stock_analyzed", "index", "total", "stock_name", "stock_code", "analysis_report"}: 종목 리포트 완료
+        - {"type": "done", "analysis_results", "usage"}: 최종 결과 (targets 순서) + 이번 실행의 LLM 사용량 요약
+        """
+        config, run_usage = with_run_usage(config, user_id)
+        async for mode, chunk in info_analysis_graph.astream(
+            self._initial_state(user_query, user_id),
+            config=config,
+            stream_mode=["messages", "custom", "updates"],
+        ):
+            if mode == "custom":
+                yield chunk
+                continue
+
+            if mode == "messages":
+                message, metadata = chunk
+                # 리포트 생성 LLM 토큰만 전달 (계획/툴 호출 메시지 등은 제외)
+                if ANALYSIS_REPORT_TAG in (metadata.get("tags") or []) and message.content:
+                    yield {
+                        "type": "report_token",
+                        "stock_name": metadata.get("stock_name"),
+                        "token": message.content,
+                    }
+
+            elif mode == "updates" and "reduce_analysis" in chunk:
+                yield {
+                    "type": "done",
+                    "analysis_results": chunk["reduce_analysis"].get("analysis_results") or [],
+                    "usage": run_usage.summary()["chat"],
+                }
@@ -1,27 +1,21 @@
 # app/service/agents/info_collector_service.py
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, AsyncIterator
 
 from langchain_core.messages import HumanMessage, BaseMessage, AIMessage
 from langchain_core.runnables import RunnableConfig
 
 from app.agents.subgraphs.info_collector import info_collect_graph
+from app.core.usage_metrics import with_run_usage
 
 
 class InfoCollectorService:
-    def run(
+    def _build_messages(
         self,
         user_query: str,
-        user_id: Optional[str] = None,  # ✅ 추가
-        build_logs: Optional[List[BaseMessage]] = None,
-        config: Optional[RunnableConfig] = None,
-        history: Optional[List[BaseMessage]] = None,
-    ) -> Dict[str, Any]:
-        """
-        InfoCollector 서브그래프 실행 서비스.
-        - config["configurable"]로 tool 의존성 주입 (vector_service, ticker_resolver, db_engine, dart_api_key 등)
-        """
-
+        build_logs: Optional[List[BaseMessage]],
+        history: Optional[List[BaseMessage]],
+    ) -> List[BaseMessage]:
         # ✅ 실제 그래프/tools 기능과 일치하도록 정리 (search_invest_kb 언급 제거)
         handoff_msg = (
             f'Original User Query: "{user_query}"\n\n'
@@ -46,6 +40,22 @@ class InfoCollectorService:
             messages.extend(history)
 
         messages.append(HumanMessage(content=handoff_msg))
+        return messages
+
+    def run(
+        self,
+        user_query: str,
+        user_id: Optional[str] = None,  # ✅ 추가
+        build_logs: Optional[List[BaseMessage]] = None,
+        config: Optional[RunnableConfig] = None,
+        history: Optional[List[BaseMessage]] = None,
+    ) -> Dict[str, Any]:
+        """
+        InfoCollector 서브그래프 실행 서비스.
+        - config["configurable"]로 tool 의존성 주입 (vector_service, ticker_resolver, db_engine, dart_api_key 등)
+        """
+        messages = self._build_messages(user_query, build_logs, history)
+        config, run_usage = with_run_usage(config, user_id)
 
         # ✅ state에 user_id 넣기 (포트폴리오 질문이면 필수)
         state: Dict[str, Any] = {"messages": messages}
@@ -68,4 +78,37 @@ class InfoCollectorService:
             "extract_logs": new_messages,
             "process_status": "success",
             "collected": sub_result.get("collected"),
+            "usage": run_usage.summary()["chat"],
         }
+
+    async def astream(
+        self,
+        user_query: str,
+        user_id: Optional[str] = None,
+        config: Optional[RunnableConfig] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        포트폴리오 수집을 종목 단위로 흘려보내는 스트리밍 실행.
+        - {"type": "holding_collected", "index", "total", "company", "news", "articles", "financials"}
+        - {"type": "done", "collected", "usage"}: 마지막 상태 (release_streamed_holdings면 종목별 본문 대신 요약만 포함)
+        """
+        # 스트림으로 내보낸 종목 본문은 state(collected와 도구 메시지)에서 바로 비우도록 설정
+        config, run_usage = with_run_usage(config, user_id)
+        config["configurable"] = {**(config.get("configurable") or {}), "release_streamed_holdings": True}
+
+        state: Dict[str, Any] = {"messages": self._build_messages(user_query, None, None)}
+        if user_id:
+            state["user_id"] = user_id
+
+        collected = None
+        async for mode, chunk in info_collect_graph.astream(
+            state,
+            config=config,
+            stream_mode=["custom", "values"],
+        ):
+            if mode == "custom":
+                yield chunk
+            else:
+                collected = chunk.get("collected")
+
+        yield {"type": "done", "collected": collected, "usage": run_usage.summary()["chat"]}
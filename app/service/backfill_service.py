@@ -0,0 +1,319 @@
+# app/service/backfill_service.py
+import io
+import os
+import json
+import time
+import random
+import asyncio
+import logging
+import zipfile
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Callable
+
+import httpx
+
+from app.agents.kb_documents import (
+    latest_report_params,
+    news_snippet_document,
+    news_article_document,
+    financials_document,
+)
+from app.agents.kb_sources import (
+    NAVER_NEWS_URL,
+    DART_SINGLE_ACCOUNT_URL,
+    REPRT_CODE_MAP,
+    ARTICLE_REQUEST_HEADERS,
+    parse_naver_news_items,
+    parse_article_html,
+    parse_financial_statement_payload,
+)
+
+logger = logging.getLogger("backfill")
+
+DART_CORP_CODE_URL = "https://opendart.fss.or.kr/api/corpCode.xml"
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class AsyncRateLimiter:
+    """토큰 버킷: 초당 rate개, 최대 burst개까지 몰아서 허용 (제공자별 쿼터 보호)"""
+
+    def __init__(self, rate_per_sec: float, burst: Optional[int] = None):
+        self.rate = rate_per_sec
+        self.capacity = burst or max(1, int(rate_per_sec))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class BackfillProgress:
+    """
+    종목별 진행 상황을 JSONL로 append 기록합니다 (마지막 기록이 유효).
+    done은 문서가 저장소/대기열에 반영된 뒤에만 기록하므로, 중단 후 재실행하면 나머지만 처리합니다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.records: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    self.records[rec["code"]] = rec
+
+    def completed(self) -> set:
+        return {code for code, rec in self.records.items() if rec.get("status") == "done"}
+
+    def record(self, code: str, status: str, docs: int = 0, error: Optional[str] = None):
+        rec = {"code": code, "status": status, "docs": docs, "error": error, "ts": int(time.time())}
+        self.records[code] = rec
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+
+
+def load_corp_codes(dart_api_key: str, cache_path: str) -> Dict[str, str]:
+    """DART 고유번호(corp_code) 목록을 내려받아 종목코드 → corp_code 매핑을 만듭니다 (파일 캐시)."""
+    if os.path.exists(cache_path):
+        with open(cache_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    resp = httpx.get(DART_CORP_CODE_URL, params={"crtfc_key": dart_api_key}, timeout=60)
+    resp.raise_for_status()
+    with zipfile.ZipFile(io.BytesIO(resp.content)) as zf:
+        root = ET.fromstring(zf.read(zf.namelist()[0]))
+
+    mapping = {}
+    for item in root.iter("list"):
+        stock_code = (item.findtext("stock_code") or "").strip()
+        if stock_code:
+            mapping[stock_code] = (item.findtext("corp_code") or "").strip()
+
+    with open(cache_path, "w", encoding="utf-8") as f:
+        json.dump(mapping, f)
+    return mapping
+
+
+class BackfillService:
+    """
+    종목 universe에 대해 뉴스(네이버) + 재무제표(DART)를 비동기 워커 풀로 수집해 KB에 적재합니다.
+
+    - 제공자별(naver/dart/web) 토큰 버킷 rate limit + 429/5xx 지수 백오프 재시도
+    - 문서는 flush_size 단위로 모아 sink(contents, metadatas)에 넘김 (outbox 적재 또는 즉시 임베딩)
+      sink는 버퍼 잠금 밖에서 한 번에 하나씩 실행되므로, 적재 중에도 다른 워커는 계속 수집/버퍼링
+    - 종목 진행 상황은 BackfillProgress에 기록되어 재실행 시 이어서 처리
+    """
+
+    def __init__(
+        self,
+        sink: Callable[[List[str], List[Dict[str, Any]]], Any],
+        progress: BackfillProgress,
+        naver_credentials: Optional[Dict[str, str]] = None,
+        dart_api_key: Optional[str] = None,
+        corp_codes: Optional[Dict[str, str]] = None,
+        rate_limits: Optional[Dict[str, float]] = None,
+        concurrency: int = 8,
+        news_per_stock: int = 20,
+        articles_per_stock: int = 0,
+        flush_size: int = 256,
+        max_retries: int = 4,
+    ):
+        self.sink = sink
+        self.progress = progress
+        self.naver_credentials = naver_credentials
+        self.dart_api_key = dart_api_key
+        self.corp_codes = corp_codes or {}
+        rate_limits = {"naver": 8.0, "dart": 5.0, "web": 5.0, **(rate_limits or {})}
+        self.limiters = {name: AsyncRateLimiter(rate) for name, rate in rate_limits.items()}
+        self.concurrency = concurrency
+        self.news_per_stock = news_per_stock
+        self.articles_per_stock = articles_per_stock
+        self.flush_size = flush_size
+        self.max_retries = max_retries
+        self.report_params = latest_report_params()
+
+        self._buffer: List[Dict[str, Any]] = []
+        self._buffer_codes: Dict[str, int] = {}
+        self._flush_lock = asyncio.Lock()
+        # sink 호출 직렬화 (sink가 스레드 안전하지 않아도 되도록)
+        self._sink_lock = asyncio.Lock()
+        self.stats: Dict[str, Any] = {
+            "stocks_done": 0,
+            "stocks_failed": 0,
+            "docs": 0,
+            "requests": {name: 0 for name in rate_limits},
+            "throttled": {name: 0 for name in rate_limits},
+        }
+
+    # ---- HTTP ----
+    async def _request(self, client: httpx.AsyncClient, provider: str, url: str, **kwargs) -> httpx.Response:
+        for attempt in range(self.max_retries + 1):
+            await self.limiters[provider].acquire()
+            self.stats["requests"][provider] += 1
+            try:
+                resp = await client.get(url, **kwargs)
+            except httpx.TransportError:
+                if attempt == self.max_retries:
+                    raise
+            else:
+                if resp.status_code not in RETRYABLE_STATUS or attempt == self.max_retries:
+                    resp.raise_for_status()
+                    return resp
+                if resp.status_code == 429:
+                    self.stats["throttled"][provider] += 1
+            await asyncio.sleep(min(30.0, 2 ** attempt) + random.random())
+        raise RuntimeError("unreachable")
+
+    # ---- 종목 단위 수집 ----
+    async def _collect_stock(self, client: httpx.AsyncClient, stock: Dict[str, str]) -> List[Dict[str, Any]]:
+        code, name = stock["Code"], stock["Name"]
+        company = {"company_name": name, "stock_code": code, "corp_code": self.corp_codes.get(code)}
+        docs: List[Dict[str, Any]] = []
+
+        if self.naver_credentials and self.news_per_stock > 0:
+            resp = await self._request(
+                client,
+                "naver",
+                NAVER_NEWS_URL,
+                headers=self.naver_credentials,
+                params={"query": name, "display": min(self.news_per_stock, 100), "start": 1, "sort": "date"},
+            )
+            items = parse_naver_news_items(name, resp.json())
+            docs.extend(news_snippet_document(it, company) for it in items)
+
+            for it in items[: self.articles_per_stock]:
+                try:
+                    page = await self._request(client, "web", it["url"], headers=ARTICLE_REQUEST_HEADERS, follow_redirects=True)
+                except httpx.HTTPError:
+                    continue
+                # BeautifulSoup 파싱은 CPU 작업이라 이벤트 루프 밖에서 실행
+                article = await asyncio.to_thread(parse_article_html, it["url"], page.text, datetime.now().isoformat())
+                if article.get("status") == "success":
+                    docs.append(news_article_document(article, company))
+
+        if self.dart_api_key and company["corp_code"]:
+            bsns_year, report_type = self.report_params["bsns_year"], self.report_params["report_type"]
+            resp = await self._request(
+                client,
+                "dart",
+                DART_SINGLE_ACCOUNT_URL,
+                params={
+                    "crtfc_key": self.dart_api_key,
+                    "corp_code": company["corp_code"],
+                    "bsns_year": str(bsns_year),
+                    "reprt_code": REPRT_CODE_MAP[report_type],
+                },
+            )
+            fin = parse_financial_statement_payload(resp.json(), company["corp_code"], bsns_year, report_type)
+            if fin.get("status") == "success":
+                docs.append(financials_document(fin, company))
+
+        return docs
+
+    # ---- 적재 ----
+    async def _add_to_buffer(self, code: str, docs: List[Dict[str, Any]]):
+        async with self._flush_lock:
+            self._buffer.extend(docs)
+            self._buffer_codes[code] = len(docs)
+            if len(self._buffer) < self.flush_size:
+                return
+            batch, codes = self._take_buffer()
+        # 버퍼만 잠금 안에서 교체하고 sink(임베딩/DB 적재)는 잠금 밖에서 실행
+        await self._flush(batch, codes)
+
+    def _take_buffer(self):
+        """_flush_lock을 잡은 상태에서 호출"""
+        batch, codes = self._buffer, self._buffer_codes
+        self._buffer, self._buffer_codes = [], {}
+        return batch, codes
+
+    async def _flush(self, batch: List[Dict[str, Any]], codes: Dict[str, int]):
+        if not codes:
+            return
+
+        if batch:
+            try:
+                async with self._sink_lock:
+                    await asyncio.to_thread(self.sink, [d["content"] for d in batch], [d["metadata"] for d in batch])
+            except Exception as e:
+                # 버퍼는 이미 비웠으므로 이 배치의 종목을 모두 실패로 기록 (재실행 시 다시 수집)
+                logger.warning(f"[Backfill] flush of {len(batch)} docs ({len(codes)} stocks) failed: {e}")
+                for code in codes:
+                    self.progress.record(code, "failed", error=f"sink: {e}"[:500])
+                self.stats["stocks_failed"] += len(codes)
+                return
+        for code, n in codes.items():
+            self.progress.record(code, "done", docs=n)
+        self.stats["docs"] += len(batch)
+        self.stats["stocks_done"] += len(codes)
+
+    async def _worker(self, client: httpx.AsyncClient, queue: asyncio.Queue):
+        while True:
+            stock = await queue.get()
+            try:
+                docs = await self._collect_stock(client, stock)
+                await self._add_to_buffer(stock["Code"], docs)
+            except Exception as e:
+                self.stats["stocks_failed"] += 1
+                self.progress.record(stock["Code"], "failed", error=str(e)[:500])
+                logger.warning(f"[Backfill] {stock['Code']} {stock['Name']} failed: {e}")
+            finally:
+                queue.task_done()
+
+    async def _reporter(self, total: int, started: float, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            logger.info(f"[Backfill] {self.throughput(total, started)}")
+
+    def throughput(self, total: int, started: float) -> Dict[str, Any]:
+        elapsed = max(time.perf_counter() - started, 1e-9)
+        return {
+            "progress": f"{self.stats['stocks_done'] + self.stats['stocks_failed']}/{total}",
+            "stocks_per_min": round(self.stats["stocks_done"] / elapsed * 60, 1),
+            "docs_per_sec": round(self.stats["docs"] / elapsed, 2),
+            "requests": dict(self.stats["requests"]),
+            "throttled": dict(self.stats["throttled"]),
+        }
+
+    async def run(self, stocks: List[Dict[str, str]], report_interval: float = 30.0) -> Dict[str, Any]:
+        done = self.progress.completed()
+        todo = [s for s in stocks if s["Code"] not in done]
+        logger.info(f"[Backfill] {len(todo)} stocks to process ({len(stocks) - len(todo)} already done)")
+
+        started = time.perf_counter()
+        queue: asyncio.Queue = asyncio.Queue()
+        for stock in todo:
+            queue.put_nowait(stock)
+
+        limits = httpx.Limits(max_connections=self.concurrency * 2, max_keepalive_connections=self.concurrency * 2)
+        async with httpx.AsyncClient(timeout=20.0, limits=limits) as client:
+            workers = [asyncio.create_task(self._worker(client, queue)) for _ in range(self.concurrency)]
+            reporter = asyncio.create_task(self._reporter(len(todo), started, report_interval))
+            await queue.join()
+            for task in workers + [reporter]:
+                task.cancel()
+            await asyncio.gather(*workers, reporter, return_exceptions=True)
+
+        async with self._flush_lock:
+            batch, codes = self._take_buffer()
+        await self._flush(batch, codes)
+
+        return {
+            "skipped_already_done": len(stocks) - len(todo),
+            **self.stats,
+            **self.throughput(len(todo), started),
+            "elapsed_sec": round(time.perf_counter() - started, 2),
+        }
@@ -0,0 +1,351 @@
+# app/service/dedup_service.py
+import os
+import re
+import json
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Tuple
+
+import mmh3
+import numpy as np
+
+from app.core.file_lock import file_lock
+
+# 출처마다 달라지는 줄(URL/게시일/언론사)은 서명 계산에서 제외
+_VOLATILE_LINE_RE = re.compile(r"^(URL|PublishedAt|Publisher|CorpCode):.*$", re.MULTILINE)
+_WS_RE = re.compile(r"\s+")
+
+NUM_PERM = 32
+# 8개 밴드 x 4행 LSH: Jaccard 약 0.6 이상인 쌍이 후보로 잡힘 (최종 판정은 추정 Jaccard로)
+N_BANDS = 8
+ROWS_PER_BAND = NUM_PERM // N_BANDS
+MAX_ALTERNATE_URLS = 20
+
+_MERSENNE_PRIME = (1 << 61) - 1
+# 계수와 shingle 해시(mmh3 32비트)를 모두 2^32 미만으로 두어 a * x + b 가 uint64 안에서 넘치지 않게 함
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+
+
+def _normalize(text: str) -> str:
+    text = _VOLATILE_LINE_RE.sub("", text or "")
+    return _WS_RE.sub(" ", text).strip().lower()
+
+
+def minhash(text: str, shingle_size: int = 4) -> np.ndarray:
+    """
+    글자 n-gram 기반 MinHash 서명 (uint32 x NUM_PERM).
+    형태소 분석 없이도 띄어쓰기/조사/말머리([속보]) 변형에 강합니다.
+    """
+    norm = _normalize(text)
+    if len(norm) < shingle_size:
+        shingles = {norm}
+    else:
+        shingles = {norm[i:i + shingle_size] for i in range(len(norm) - shingle_size + 1)}
+
+    hashes = np.fromiter(
+        (mmh3.hash(sh, signed=False) & 0xFFFFFFFF for sh in shingles), dtype=np.uint64, count=len(shingles)
+    )
+    # (a * x + b) mod p 형태의 해시 함수 NUM_PERM개를 벡터 연산으로 적용
+    # a, x < 2^32 이므로 a * x < 2^64 - 2^33, 곱을 p로 줄인 뒤(< 2^61) b(< 2^32)를 더해도 넘치지 않음
+    permuted = (np.outer(hashes, _PERM_A) % _MERSENNE_PRIME + _PERM_B) % _MERSENNE_PRIME
+    return (permuted.min(axis=0) & 0xFFFFFFFF).astype(np.uint32)
+
+
+def jaccard_estimate(a: np.ndarray, b: np.ndarray) -> float:
+    return float(np.count_nonzero(a == b)) / NUM_PERM
+
+
+def _bands(sig: np.ndarray) -> List[Tuple[int, bytes]]:
+    return [
+        (i, sig[i * ROWS_PER_BAND:(i + 1) * ROWS_PER_BAND].tobytes())
+        for i in range(N_BANDS)
+    ]
+
+
+class SignatureIndex:
+    """
+    KB에 저장된 문서의 MinHash 서명 LSH 색인.
+    append-only JSONL 파일에 영속화하며 (삭제는 tombstone 기록), 로드 시 재생합니다.
+    tombstone과 덮어쓴 기록은 compact()로 정리합니다 (보존 작업에서 주기적으로 호출).
+
+    여러 프로세스(API 서버, outbox 워커 여러 개)가 같은 파일을 공유할 수 있도록
+    쓰기와 중복 판정은 locked() 안에서 파일 잠금을 잡고, 다른 프로세스가 추가한 기록을 먼저 재생합니다.
+    """
+
+    def __init__(self, persist_path: Optional[str] = None):
+        self.persist_path = persist_path
+        self._sigs: Dict[str, np.ndarray] = {}
+        self._buckets: Dict[Tuple[int, bytes], set] = {}
+        self._lock = threading.RLock()
+        self._depth = 0
+        # 지금까지 재생한 파일 바이트 위치와 그 파일의 inode (compact로 교체되면 inode가 바뀜)
+        self._offset = 0
+        self._inode: Optional[int] = None
+
+        if self.persist_path:
+            with self.locked():
+                pass
+
+    def __len__(self) -> int:
+        return len(self._sigs)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._sigs
+
+    def _file_stat(self) -> Tuple[Optional[int], int]:
+        try:
+            st = os.stat(self.persist_path)
+        except FileNotFoundError:
+            return None, 0
+        return st.st_ino, st.st_size
+
+    def _sync_locked(self):
+        inode, size = self._file_stat()
+        if inode != self._inode or size < self._offset:
+            # 파일이 교체(compact)/삭제되었으면 처음부터 다시 로드
+            self._sigs, self._buckets, self._offset = {}, {}, 0
+            self._inode = inode
+        if size == self._offset:
+            return
+
+        with open(self.persist_path, "rb") as f:
+            f.seek(self._offset)
+            data = f.read()
+        # 다른 프로세스가 쓰는 중인 마지막 줄(개행 없음)은 다음 동기화 때 다시 읽음
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            try:
+                rec = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if rec.get("deleted"):
+                self._remove(rec["id"])
+            else:
+                self._insert(rec["id"], np.frombuffer(bytes.fromhex(rec["sig"]), dtype=np.uint32))
+        self._offset += end
+
+    @contextmanager
+    def locked(self):
+        """
+        프로세스 간 배타 구간. 진입 시 다른 프로세스의 기록을 재생하므로
+        안에서 nearest()로 판정하고 add()로 등록하면 동시에 실행되는 다른 워커와 경합하지 않습니다.
+        (같은 스레드에서 중첩 호출 가능)
+        """
+        with self._lock:
+            if self._depth or not self.persist_path:
+                self._depth += 1
+                try:
+                    yield
+                finally:
+                    self._depth -= 1
+                return
+
+            with file_lock(self.persist_path + ".lock"):
+                self._sync_locked()
+                self._depth += 1
+                try:
+                    yield
+                finally:
+                    self._depth -= 1
+
+    def _insert(self, doc_id: str, sig: np.ndarray):
+        self._remove(doc_id)
+        self._sigs[doc_id] = sig
+        for band in _bands(sig):
+            self._buckets.setdefault(band, set()).add(doc_id)
+
+    def _remove(self, doc_id: str):
+        sig = self._sigs.pop(doc_id, None)
+        if sig is None:
+            return
+        for band in _bands(sig):
+            bucket = self._buckets.get(band)
+            if bucket:
+                bucket.discard(doc_id)
+                if not bucket:
+                    del self._buckets[band]
+
+    def _append(self, records: List[Dict[str, Any]]):
+        if not self.persist_path or not records:
+            return
+        with open(self.persist_path, "a", encoding="utf-8") as f:
+            for rec in records:
+                f.write(json.dumps(rec) + "\n")
+        self._inode, self._offset = self._file_stat()
+
+    def compact(self) -> Dict[str, int]:
+        """살아 있는 서명만 새 파일에 다시 써서 tombstone/중복 기록을 정리합니다."""
+        if not self.persist_path:
+            return {"before_bytes": 0, "after_bytes": 0, "signatures": len(self._sigs)}
+        with self.locked():
+            before = self._offset
+            tmp_path = self.persist_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for doc_id, sig in self._sigs.items():
+                    f.write(json.dumps({"id": doc_id, "sig": sig.tobytes().hex()}) + "\n")
+            os.replace(tmp_path, self.persist_path)
+            self._inode, self._offset = self._file_stat()
+            return {"before_bytes": before, "after_bytes": self._offset, "signatures": len(self._sigs)}
+
+    def add(self, ids: List[str], sigs: List[np.ndarray]):
+        with self.locked():
+            for doc_id, sig in zip(ids, sigs):
+                self._insert(doc_id, sig)
+            self._append([{"id": doc_id, "sig": sig.tobytes().hex()} for doc_id, sig in zip(ids, sigs)])
+
+    def remove(self, ids: List[str]):
+        with self.locked():
+            removed = [doc_id for doc_id in ids if doc_id in self._sigs]
+            for doc_id in removed:
+                self._remove(doc_id)
+            self._append([{"id": doc_id, "deleted": True} for doc_id in removed])
+
+    def nearest(self, sig: np.ndarray, threshold: float) -> Optional[str]:
+        """추정 Jaccard 유사도가 threshold 이상인 가장 가까운 문서 id"""
+        with self._lock:
+            best_id, best_sim = None, threshold
+            seen = set()
+            for band in _bands(sig):
+                for doc_id in self._buckets.get(band, ()):
+                    if doc_id in seen:
+                        continue
+                    seen.add(doc_id)
+                    sim = jaccard_estimate(sig, self._sigs[doc_id])
+                    if sim >= best_sim:
+                        best_id, best_sim = doc_id, sim
+            return best_id
+
+
+@dataclass
+class DedupPlan:
+    """KB 저장 전 중복 제거 결과"""
+    contents: List[str] = field(default_factory=list)
+    metadatas: List[Dict[str, Any]] = field(default_factory=list)
+    ids: List[str] = field(default_factory=list)
+    signatures: List[np.ndarray] = field(default_factory=list)
+    # 이미 KB에 있는 원본 문서 id -> 이번에 버려진 대체 문서들의 메타데이터
+    existing_alternates: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+    skipped: int = 0
+    # 같은 id(같은 본문)가 이미 KB에 있어 다시 임베딩하지 않은 문서 수 (skipped에 포함)
+    already_stored: int = 0
+    # partition에서 새로 예약한 서명 (저장 실패 시 release 대상, 기존 문서 재적재분은 제외)
+    reserved_ids: List[str] = field(default_factory=list)
+
+    def drop(self, ids: set):
+        """저장 대상에서 ids를 빼고 이미 저장된 문서로 셉니다 (색인 밖에서 확인된 기존 문서용)."""
+        keep = [i for i, doc_id in enumerate(self.ids) if doc_id not in ids]
+        dropped = len(self.ids) - len(keep)
+        self.contents = [self.contents[i] for i in keep]
+        self.metadatas = [self.metadatas[i] for i in keep]
+        self.ids = [self.ids[i] for i in keep]
+        self.signatures = [self.signatures[i] for i in keep]
+        self.reserved_ids = [doc_id for doc_id in self.reserved_ids if doc_id not in ids]
+        self.skipped += dropped
+        self.already_stored += dropped
+
+
+def add_alternate(metadata: Dict[str, Any], alternate: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    원본 문서 메타데이터에 중복 문서 정보를 기록합니다.
+    Chroma 메타데이터는 스칼라만 허용하므로 URL 목록은 개행 구분 문자열로 저장합니다.
+    """
+    metadata["duplicate_count"] = int(metadata.get("duplicate_count") or 0) + 1
+    url = alternate.get("url")
+    if url:
+        urls = [u for u in (metadata.get("duplicate_urls") or "").split("\n") if u]
+        if url not in urls and len(urls) < MAX_ALTERNATE_URLS:
+            urls.append(url)
+        metadata["duplicate_urls"] = "\n".join(urls)
+    return metadata
+
+
+class NearDuplicateDetector:
+    def __init__(self, index: SignatureIndex, threshold: float = 0.8):
+        self.index = index
+        self.threshold = threshold
+
+    def partition(
+        self,
+        contents: List[str],
+        metadatas: List[Dict[str, Any]],
+        ids: List[str],
+    ) -> DedupPlan:
+        """
+        저장할 문서를 원본(임베딩/저장 대상)과 중복으로 나눕니다.
+        - 기존 KB 문서와 중복: existing_alternates에 기록 (원본 메타데이터 갱신용)
+        - 같은 배치 안의 중복: 먼저 나온 문서를 원본으로 두고 메타데이터에 바로 기록
+        원본 문서의 서명은 판정과 같은 잠금 구간에서 바로 색인에 등록(예약)하므로,
+        동시에 실행 중인 다른 워커도 이 문서들을 중복으로 인식합니다. 저장에 실패하면 release(plan)
+        """
+        with self.index.locked():
+            plan = self._plan(contents, metadatas, ids)
+            plan.reserved_ids = [doc_id for doc_id in plan.ids if doc_id not in self.index]
+            self.index.add(plan.ids, plan.signatures)
+        return plan
+
+    def _plan(
+        self,
+        contents: List[str],
+        metadatas: List[Dict[str, Any]],
+        ids: List[str],
+    ) -> DedupPlan:
+        plan = DedupPlan()
+        batch_index = SignatureIndex()
+        batch_pos: Dict[str, int] = {}
+
+        for content, meta, doc_id in zip(contents, metadatas, ids):
+            # id는 본문 해시이므로 같은 id가 색인에 있으면 이미 저장된 같은 문서 (재수집)
+            if doc_id in self.index:
+                plan.skipped += 1
+                plan.already_stored += 1
+                continue
+            if doc_id in batch_pos:
+                plan.skipped += 1
+                continue
+
+            sig = minhash(content)
+
+            canonical = self.index.nearest(sig, self.threshold)
+            if canonical is not None:
+                plan.existing_alternates.setdefault(canonical, []).append(meta)
+                plan.skipped += 1
+                continue
+
+            in_batch = batch_index.nearest(sig, self.threshold)
+            if in_batch is not None:
+                pos = batch_pos[in_batch]
+                plan.metadatas[pos] = add_alternate(dict(plan.metadatas[pos]), meta)
+                plan.skipped += 1
+                continue
+
+            batch_index.add([doc_id], [sig])
+            batch_pos[doc_id] = len(plan.ids)
+            plan.contents.append(content)
+            plan.metadatas.append(meta)
+            plan.ids.append(doc_id)
+            plan.signatures.append(sig)
+
+        return plan
+
+    def release(self, plan: DedupPlan):
+        """KB 저장이 실패했을 때 partition에서 예약한 서명을 되돌립니다."""
+        self.index.remove(plan.reserved_ids)
+
+
+_detector: Optional[NearDuplicateDetector] = None
+_detector_lock = threading.Lock()
+
+
+def get_near_duplicate_detector() -> NearDuplicateDetector:
+    global _detector
+    if _detector is None:
+        with _detector_lock:
+            if _detector is None:
+                _detector = NearDuplicateDetector(
+                    SignatureIndex(persist_path=os.getenv("NEAR_DUP_INDEX_PATH", "./near_dup_index.jsonl")),
+                    threshold=float(os.getenv("NEAR_DUP_THRESHOLD", "0.8")),
+                )
+    return _detector
@@ -0,0 +1,90 @@
+# app/service/digest_service.py
+import time
+import logging
+from datetime import datetime, date
+from typing import Dict, Any, List, Optional, Callable
+
+from sqlalchemy.orm import Session
+
+from app.agents.tools import generate_analysis_reports, ANALYSIS_MODEL, ANALYSIS_PROMPT_VERSION
+from app.repository.stock_report import upsert_report
+from app.repository.user_stock import get_held_stocks
+from app.service.vector_service import VectorService
+
+logger = logging.getLogger("digest")
+
+DIGEST_GENERATION = "digest"
+
+
+class DailyDigestService:
+    """
+    보유 유저가 1명 이상인 종목마다 일일 다이제스트(뉴스/재무/시장 반응)를 미리 생성해
+    stock_reports(generation="digest")에 저장합니다. 야간 배치로 돌려 피크 시간 LLM 호출을 줄입니다.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        vector_service: VectorService,
+        llm_cache=None,
+        batch_size: int = 20,
+        max_concurrency: int = 4,
+    ):
+        self.session_factory = session_factory
+        self.vector_service = vector_service
+        self.llm_cache = llm_cache
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+
+    def held_stock_names(self) -> List[str]:
+        with self.session_factory() as db:
+            return [s.stock_name for s in get_held_stocks(db)]
+
+    def run(self, stock_names: Optional[List[str]] = None, report_date: Optional[date] = None) -> Dict[str, Any]:
+        stock_names = stock_names if stock_names is not None else self.held_stock_names()
+        report_date = report_date or datetime.now().date()
+        totals = {"stocks": len(stock_names), "stored": 0, "no_data": 0, "failed": 0, "cached": 0}
+        failures: List[Dict[str, Any]] = []
+        started = time.perf_counter()
+
+        for i in range(0, len(stock_names), self.batch_size):
+            batch = stock_names[i:i + self.batch_size]
+            try:
+                reports = generate_analysis_reports(
+                    batch,
+                    self.vector_service,
+                    llm_cache=self.llm_cache,
+                    max_concurrency=self.max_concurrency,
+                )
+            except Exception as e:
+                # 검색 단계 실패는 배치 전체 실패 → 다음 배치는 계속 진행
+                logger.warning(f"[Digest] batch {i // self.batch_size} failed: {e}")
+                totals["failed"] += len(batch)
+                failures.extend({"stock_name": name, "error": str(e)} for name in batch)
+                continue
+
+            with self.session_factory() as db:
+                for r in reports:
+                    if r["status"] in ("success", "cached"):
+                        upsert_report(
+                            db, r["stock_name"], report_date, r["report"], r["doc_ids"],
+                            model=ANALYSIS_MODEL, prompt_version=ANALYSIS_PROMPT_VERSION,
+                            generation=DIGEST_GENERATION,
+                        )
+                        totals["stored"] += 1
+                        totals["cached"] += r["status"] == "cached"
+                    elif r["status"] == "no_data":
+                        totals["no_data"] += 1
+                    else:
+                        totals["failed"] += 1
+                        failures.append({"stock_name": r["stock_name"], "error": r["error"]})
+
+            logger.info(
+                f"[Digest] {min(i + self.batch_size, len(stock_names))}/{len(stock_names)} "
+                f"stored={totals['stored']} failed={totals['failed']}"
+            )
+
+        totals["elapsed_sec"] = round(time.perf_counter() - started, 2)
+        totals["report_date"] = report_date.isoformat()
+        totals["failures"] = failures
+        return totals
@@ -0,0 +1,149 @@
+# app/service/embedding_batcher.py
+import os
+import time
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, InvalidStateError
+from typing import List, Dict, Any, Optional, Tuple
+
+from app.service.embedding_service import EmbeddingService
+
+
+class EmbeddingMicroBatcher:
+    """
+    동시에 들어오는 검색 쿼리 임베딩 요청을 짧은 시간 창(window_ms) 동안 모아
+    create_query_embeddings 한 번으로 보내고, 결과를 각 호출자에게 돌려줍니다.
+
+    - 동기 호출(embed, 툴/스레드 풀)과 비동기 호출(aembed)을 같은 배치로 묶음
+    - max_batch개가 차면 창을 기다리지 않고 바로 전송
+    - 같은 배치 안의 동일 쿼리는 한 번만 임베딩
+    - 배치 처리 중 어떤 예외가 나도 모든 호출자의 Future는 결과 또는 예외로 끝나며,
+      호출자는 timeout_sec 이상 기다리지 않음 (TimeoutError)
+    """
+
+    def __init__(
+        self,
+        embedding_service: EmbeddingService,
+        window_ms: float = 5.0,
+        max_batch: int = 64,
+        max_workers: int = 4,
+        timeout_sec: float = 30.0,
+    ):
+        self.embedding_service = embedding_service
+        self.window_sec = window_ms / 1000
+        self.max_batch = max_batch
+        self.timeout_sec = timeout_sec
+        self._pending: List[Tuple[str, Future]] = []
+        self._scheduled = False
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="embed-batch")
+
+        self._requests = 0
+        self._batches = 0
+        self._embedded = 0
+        self._largest_batch = 0
+
+    def submit(self, text: str) -> Future:
+        future: Future = Future()
+        batch = None
+        with self._lock:
+            self._requests += 1
+            self._pending.append((text, future))
+            if len(self._pending) >= self.max_batch:
+                batch, self._pending = self._pending, []
+            elif not self._scheduled:
+                self._scheduled = True
+                self._executor.submit(self._flush_after_window)
+
+        if batch:
+            self._executor.submit(self._run_batch, batch)
+        return future
+
+    def embed(self, text: str) -> List[float]:
+        future = self.submit(text)
+        try:
+            return future.result(timeout=self.timeout_sec)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    async def aembed(self, text: str) -> List[float]:
+        # wait_for가 시간 초과 시 감싼 Future까지 취소하므로 배치 쪽에서는 취소된 Future를 건너뜀
+        return await asyncio.wait_for(asyncio.wrap_future(self.submit(text)), timeout=self.timeout_sec)
+
+    def _flush_after_window(self):
+        time.sleep(self.window_sec)
+        with self._lock:
+            batch, self._pending = self._pending, []
+            self._scheduled = False
+        if batch:
+            self._run_batch(batch)
+
+    @staticmethod
+    def _resolve(future: Future, result=None, error: Optional[BaseException] = None):
+        if future.done():
+            return
+        try:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+        except InvalidStateError:
+            # 호출자가 시간 초과로 취소한 경우
+            pass
+
+    def _run_batch(self, batch: List[Tuple[str, Future]]):
+        try:
+            unique = list(dict.fromkeys(text for text, _ in batch))
+            embeddings = self.embedding_service.create_query_embeddings(unique)
+            if len(embeddings) != len(unique):
+                raise ValueError(f"Embedding count mismatch: requested {len(unique)}, got {len(embeddings)}")
+            by_text = dict(zip(unique, embeddings))
+            for text, future in batch:
+                self._resolve(future, by_text[text])
+        except BaseException as e:
+            # 실패 지점과 관계없이 아직 끝나지 않은 Future는 모두 예외로 종료 (호출자가 무한 대기하지 않도록)
+            for _, future in batch:
+                self._resolve(future, error=e)
+            if not isinstance(e, Exception):
+                raise
+            return
+
+        with self._lock:
+            self._batches += 1
+            self._embedded += len(unique)
+            self._largest_batch = max(self._largest_batch, len(batch))
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self._requests,
+                "batches": self._batches,
+                "embedded_texts": self._embedded,
+                "avg_batch_size": round(self._requests / self._batches, 2) if self._batches else 0.0,
+                "largest_batch": self._largest_batch,
+                "window_ms": self.window_sec * 1000,
+                "max_batch": self.max_batch,
+            }
+
+
+_batcher: Optional[EmbeddingMicroBatcher] = None
+_batcher_lock = threading.Lock()
+
+
+def get_embedding_batcher() -> Optional[EmbeddingMicroBatcher]:
+    """EMBEDDING_BATCH_WINDOW_MS=0 이면 배칭을 끄고 None을 반환합니다."""
+    global _batcher
+    window_ms = float(os.getenv("EMBEDDING_BATCH_WINDOW_MS", "5"))
+    if window_ms <= 0:
+        return None
+    if _batcher is None:
+        with _batcher_lock:
+            if _batcher is None:
+                _batcher = EmbeddingMicroBatcher(
+                    EmbeddingService(),
+                    window_ms=window_ms,
+                    max_batch=int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "64")),
+                    timeout_sec=float(os.getenv("EMBEDDING_BATCH_TIMEOUT_SEC", "30")),
+                )
+    return _batcher
@@ -1,16 +1,76 @@
 import os
-from typing import List
+from typing import List, Dict, Any
 from openai import OpenAI
 from dotenv import load_dotenv
 
 from app.core.llm import get_upstage_embeddings
+from app.core.usage_metrics import track_embedding
 
 class EmbeddingService:
     def __init__(self):
         self._embeddings = get_upstage_embeddings()
+        # 여러 쿼리를 한 번에 임베딩할 때 사용하는 query 전용 모델명
+        base_model = os.getenv("UPSTAGE_EMBEDDING_MODEL", "solar-embedding-1-large")
+        self._passage_model = base_model
+        self._query_model = os.getenv("UPSTAGE_QUERY_EMBEDDING_MODEL", f"{base_model}-query")
 
     def create_embeddings(self, texts: List[str]) -> List[List[float]]:
-        return self._embeddings.embed_documents(texts)
+        with track_embedding(self._passage_model, len(texts)):
+            return self._embeddings.embed_documents(texts)
 
     def create_embedding(self, text:str) -> List[float]:
-        return self._embeddings.embed_query(text)
\ No newline at end of file
+        with track_embedding(self._query_model, 1):
+            return self._embeddings.embed_query(text)
+
+    def _query_params(self) -> Dict[str, Any]:
+        """UpstageEmbeddings에 설정된 호출 파라미터(dimensions, model_kwargs 등)에 모델만 query 모델로 지정"""
+        params = dict(getattr(self._embeddings, "_invocation_params", None) or {})
+        params["model"] = self._query_model
+        return params
+
+    def _query_chunks(self, texts: List[str]) -> List[List[str]]:
+        size = getattr(self._embeddings, "embed_batch_size", None) or len(texts) or 1
+        return [texts[i:i + size] for i in range(0, len(texts), size)]
+
+    def create_query_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        검색 쿼리 여러 개를 한 번의 API 요청으로 임베딩합니다.
+        embed_documents는 passage 모델을 쓰므로, 설정된 클라이언트/파라미터로 query 모델 배치 요청을 보냅니다
+        (UpstageEmbeddings의 배치 크기 상한을 넘으면 나눠서 요청).
+        """
+        client = getattr(self._embeddings, "client", None)
+        if client is None:
+            return [self.create_embedding(t) for t in texts]
+        params = self._query_params()
+        embeddings: List[List[float]] = []
+        with track_embedding(self._query_model, len(texts)) as usage:
+            tokens = 0
+            for chunk in self._query_chunks(texts):
+                response = client.create(input=chunk, **params)
+                tokens += getattr(getattr(response, "usage", None), "total_tokens", None) or 0
+                embeddings.extend(d.embedding for d in sorted(response.data, key=lambda d: d.index))
+            usage["tokens"] = tokens or None
+        return embeddings
+
+    async def acreate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        with track_embedding(self._passage_model, len(texts)):
+            return await self._embeddings.aembed_documents(texts)
+
+    async def acreate_embedding(self, text: str) -> List[float]:
+        with track_embedding(self._query_model, 1):
+            return await self._embeddings.aembed_query(text)
+
+    async def acreate_query_embeddings(self, texts: List[str]) -> List[List[float]]:
+        async_client = getattr(self._embeddings, "async_client", None)
+        if async_client is None:
+            return [await self.acreate_embedding(t) for t in texts]
+        params = self._query_params()
+        embeddings: List[List[float]] = []
+        with track_embedding(self._query_model, len(texts)) as usage:
+            tokens = 0
+            for chunk in self._query_chunks(texts):
+                response = await async_client.create(input=chunk, **params)
+                tokens += getattr(getattr(response, "usage", None), "total_tokens", None) or 0
+                embeddings.extend(d.embedding for d in sorted(response.data, key=lambda d: d.index))
+            usage["tokens"] = tokens or None
+        return embeddings
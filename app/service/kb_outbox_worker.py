@@ -0,0 +1,101 @@
+# app/service/kb_outbox_worker.py
+import time
+import logging
+from typing import Dict, Any, Optional, Callable
+
+from sqlalchemy.orm import Session
+
+from app.repository.kb_outbox import claim_batch, mark_done, mark_failed, count_by_status
+from app.service.vector_service import VectorService
+from app.service.dedup_service import NearDuplicateDetector
+
+logger = logging.getLogger("kb_outbox")
+
+
+class KbOutboxWorker:
+    """
+    kb_outbox 대기열을 큰 배치로 꺼내 중복 제거 → 임베딩 → VectorDB 저장 하는 워커.
+    문서 id는 본문 해시이므로 이미 저장된 id는 다시 임베딩하지 않고 건너뜁니다 (같은 본문 = 같은 문서).
+    여러 프로세스로 띄워도 SKIP LOCKED 선점 덕분에 같은 문서를 중복 처리하지 않고,
+    처리 도중 워커가 죽어 lease가 만료된 배치는 max_attempts번까지만 다시 선점한 뒤 failed로 둡니다.
+
+    워커가 갱신하는 프로세스 밖 상태:
+    - BM25 색인(LEXICAL_INDEX_PATH) / 중복 서명 색인(NEAR_DUP_INDEX_PATH): 파일 잠금으로 공유.
+      API 서버와 다른 워커는 다음 검색/판정 때 추가분을 재생하므로, 같은 호스트나 flock을 지원하는
+      공유 볼륨에서 같은 경로를 가리켜야 합니다.
+    - 검색 캐시: kb_versions(Postgres) 버전을 올려 API 서버의 캐시를 무효화합니다.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        vector_service: VectorService,
+        detector: NearDuplicateDetector,
+        batch_size: int = 256,
+        max_attempts: int = 5,
+        lease_seconds: int = 300,
+    ):
+        self.session_factory = session_factory
+        self.vector_service = vector_service
+        self.detector = detector
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+
+    def run_once(self) -> Dict[str, Any]:
+        with self.session_factory() as db:
+            rows = claim_batch(
+                db, self.batch_size, lease_seconds=self.lease_seconds, max_attempts=self.max_attempts
+            )
+            if not rows:
+                return {"claimed": 0, "saved": 0, "duplicates_skipped": 0}
+
+            row_ids = [r.id for r in rows]
+            try:
+                plan = self.vector_service.add_documents_deduped(
+                    self.detector,
+                    [r.content for r in rows],
+                    [dict(r.doc_metadata or {}) for r in rows],
+                    ids=[r.doc_id for r in rows],
+                )
+            except Exception as e:
+                logger.warning(f"[KbOutbox] batch of {len(rows)} failed: {e}")
+                mark_failed(db, row_ids, str(e), max_attempts=self.max_attempts)
+                return {"claimed": len(rows), "saved": 0, "duplicates_skipped": 0, "error": str(e)}
+
+            mark_done(db, row_ids)
+            return {"claimed": len(rows), "saved": len(plan.contents), "duplicates_skipped": plan.skipped}
+
+    def run_forever(self, poll_interval: float = 2.0, stop_when_empty: bool = False) -> Dict[str, Any]:
+        totals = {"batches": 0, "claimed": 0, "saved": 0, "duplicates_skipped": 0, "failed_batches": 0}
+        started = time.perf_counter()
+
+        while True:
+            result = self.run_once()
+            if result["claimed"] == 0:
+                if stop_when_empty:
+                    break
+                time.sleep(poll_interval)
+                continue
+
+            totals["batches"] += 1
+            totals["claimed"] += result["claimed"]
+            totals["saved"] += result["saved"]
+            totals["duplicates_skipped"] += result["duplicates_skipped"]
+            if "error" in result:
+                totals["failed_batches"] += 1
+                # 연속 실패 시 임베딩 API를 두드리지 않도록 잠시 대기
+                time.sleep(poll_interval)
+
+            elapsed = time.perf_counter() - started
+            logger.info(
+                f"[KbOutbox] batches={totals['batches']} saved={totals['saved']} "
+                f"({totals['claimed'] / elapsed:.1f} docs/sec)"
+            )
+
+        totals["elapsed_sec"] = round(time.perf_counter() - started, 2)
+        return totals
+
+    def get_stats(self) -> Dict[str, int]:
+        with self.session_factory() as db:
+            return count_by_status(db)
@@ -0,0 +1,123 @@
+# app/service/llm_cache.py
+import os
+import json
+import hashlib
+import logging
+import threading
+from typing import Dict, Any, List, Optional, Callable, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.db import SessionLocal
+from app.repository import llm_cache as llm_cache_repo
+
+logger = logging.getLogger("llm_cache")
+
+
+class LlmResponseCache:
+    """
+    LLM 응답 영속 캐시 (Postgres llm_response_cache).
+
+    키 = (model, prompt_version, stock, 근거 문서 ID 해시). 문서 ID는 내용 해시이므로
+    KB에 새 문서가 들어와 검색 결과가 바뀌면 키가 달라져 자동으로 다시 생성됩니다.
+    캐시 장애는 분석을 막지 않도록 조회/저장 오류를 삼키고 miss로 처리합니다.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], ttl_seconds: int = 21600):
+        self.session_factory = session_factory
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @staticmethod
+    def context_hash(doc_ids: List[str]) -> str:
+        # 프롬프트에 들어가는 순서 그대로 해시 (순서가 바뀌면 프롬프트도 바뀜)
+        return hashlib.sha256("\n".join(doc_ids).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def make_key(model: str, prompt_version: str, stock_name: str, context_hash: str) -> str:
+        raw = json.dumps([model, prompt_version, stock_name, context_hash], ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _count(self, field: str):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def lookup(
+        self,
+        model: str,
+        prompt_version: str,
+        stock_name: str,
+        doc_ids: List[str],
+    ) -> Tuple[str, Optional[str]]:
+        """(cache_key, 캐시된 응답 또는 None)"""
+        context_hash = self.context_hash(doc_ids)
+        key = self.make_key(model, prompt_version, stock_name, context_hash)
+        try:
+            with self.session_factory() as db:
+                response = llm_cache_repo.get_response(db, key)
+        except Exception as e:
+            logger.warning(f"[LlmCache] lookup failed: {e}")
+            self._count("errors")
+            response = None
+
+        self._count("hits" if response is not None else "misses")
+        return key, response
+
+    def store(
+        self,
+        key: str,
+        model: str,
+        prompt_version: str,
+        stock_name: str,
+        doc_ids: List[str],
+        response: str,
+    ) -> None:
+        try:
+            with self.session_factory() as db:
+                llm_cache_repo.put_response(
+                    db,
+                    key,
+                    model=model,
+                    prompt_version=prompt_version,
+                    stock_name=stock_name,
+                    context_hash=self.context_hash(doc_ids),
+                    response=response,
+                    ttl_seconds=self.ttl_seconds,
+                )
+        except Exception as e:
+            logger.warning(f"[LlmCache] store failed: {e}")
+            self._count("errors")
+
+    def purge_expired(self) -> int:
+        with self.session_factory() as db:
+            return llm_cache_repo.purge_expired(db)
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+_llm_cache: Optional[LlmResponseCache] = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_response_cache() -> Optional[LlmResponseCache]:
+    """LLM_CACHE_TTL_SEC=0 이면 캐시를 끄고 None을 반환합니다."""
+    global _llm_cache
+    ttl_seconds = int(os.getenv("LLM_CACHE_TTL_SEC", "21600"))
+    if ttl_seconds <= 0:
+        return None
+    if _llm_cache is None:
+        with _llm_cache_lock:
+            if _llm_cache is None:
+                _llm_cache = LlmResponseCache(SessionLocal, ttl_seconds=ttl_seconds)
+    return _llm_cache
@@ -0,0 +1,161 @@
+# app/service/retention_service.py
+import os
+import json
+import time
+import logging
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from typing import List, Dict, Any, Optional
+
+from app.service.vector_service import VectorService
+
+logger = logging.getLogger("retention")
+
+# 네이버 기사 페이지의 시각(data-date-time)은 타임존 없이 KST로 내려옴
+KST = timezone(timedelta(hours=9))
+
+# 문서 타입별 보존 기간(일). None이면 영구 보존.
+DEFAULT_RETENTION_DAYS: Dict[str, Optional[int]] = {
+    "news_snippet": 30,
+    "news_article": 180,
+    "financials": None,
+}
+
+
+def load_retention_policies() -> Dict[str, Optional[int]]:
+    """KB_RETENTION_POLICIES='{"news_snippet": 14}' 처럼 환경변수로 일부만 덮어쓸 수 있습니다."""
+    policies = dict(DEFAULT_RETENTION_DAYS)
+    raw = os.getenv("KB_RETENTION_POLICIES")
+    if raw:
+        policies.update(json.loads(raw))
+    return policies
+
+
+def parse_doc_timestamp(metadata: Dict[str, Any]) -> Optional[float]:
+    """
+    문서 시각(epoch seconds)을 구합니다.
+    published_at(네이버 RFC 2822 / 기사 ISO 8601)을 우선하고, 없으면 적재 시각(ingested_at)을 씁니다.
+    """
+    published_at = (metadata or {}).get("published_at")
+    if published_at:
+        value = str(published_at).strip()
+        for parse in (parsedate_to_datetime, datetime.fromisoformat):
+            try:
+                dt = parse(value)
+            except (TypeError, ValueError, IndexError):
+                continue
+            if dt.tzinfo is None:
+                dt = dt.replace(tzinfo=KST)
+            return dt.timestamp()
+
+    ingested_at = (metadata or {}).get("ingested_at")
+    if ingested_at is not None:
+        try:
+            return float(ingested_at)
+        except (TypeError, ValueError):
+            return None
+    return None
+
+
+class RetentionService:
+    def __init__(
+        self,
+        vector_service: VectorService,
+        policies: Optional[Dict[str, Optional[int]]] = None,
+        llm_cache=None,
+    ):
+        # 중복 서명 정리는 vector_service.delete_documents가 signature_index로 함께 처리
+        self.vector_service = vector_service
+        self.policies = policies if policies is not None else load_retention_policies()
+        # 만료된 LLM 응답 캐시 행(llm_response_cache)도 같은 주기로 삭제
+        self.llm_cache = llm_cache
+
+    def collection_stats(self) -> Dict[str, Any]:
+        repo = self.vector_service.vector_repository
+        info = repo.get_collection_info()
+        by_type = {}
+        for doc_type in self.policies:
+            by_type[doc_type] = len(repo.get_documents(where={"type": doc_type}, include=[])["ids"])
+        return {"count": info.get("count"), "by_type": by_type}
+
+    def find_expired(self, doc_type: str, days: int, now: float, page_size: int = 1000) -> List[str]:
+        """doc_type 문서를 페이지 단위로 훑어 보존 기간이 지난 id를 모읍니다."""
+        repo = self.vector_service.vector_repository
+        cutoff = now - days * 86400
+        expired: List[str] = []
+        offset = 0
+
+        while True:
+            page = repo.get_documents(
+                where={"type": doc_type},
+                include=["metadatas"],
+                limit=page_size,
+                offset=offset,
+            )
+            ids = page.get("ids") or []
+            if not ids:
+                break
+
+            for doc_id, meta in zip(ids, page.get("metadatas") or []):
+                ts = parse_doc_timestamp(meta)
+                # 시각을 알 수 없는 문서는 지우지 않는다 (보수적)
+                if ts is not None and ts < cutoff:
+                    expired.append(doc_id)
+
+            offset += len(ids)
+
+        return expired
+
+    def run(self, dry_run: bool = False, batch_size: int = 500, now: Optional[float] = None) -> Dict[str, Any]:
+        now = now or time.time()
+        started = time.perf_counter()
+        before = self.collection_stats()
+
+        deleted_by_type: Dict[str, int] = {}
+        for doc_type, days in self.policies.items():
+            if days is None:
+                continue
+
+            expired = self.find_expired(doc_type, days, now)
+            deleted_by_type[doc_type] = len(expired)
+            logger.info(f"[Retention] {doc_type}: {len(expired)} docs older than {days}d")
+
+            if dry_run:
+                continue
+
+            for i in range(0, len(expired), batch_size):
+                batch = expired[i: i + batch_size]
+                self.vector_service.delete_documents(batch)
+
+        # BM25 색인은 대량 삭제 후 스냅샷으로 압축해 로그가 쌓이지 않게 함
+        if not dry_run and self.vector_service.lexical_index is not None and any(deleted_by_type.values()):
+            self.vector_service.lexical_index.compact()
+
+        # 근접 중복 서명 색인(JSONL)도 tombstone이 계속 쌓이므로 같은 주기로 압축
+        near_dup_index = None
+        if not dry_run and self.vector_service.signature_index is not None:
+            try:
+                near_dup_index = self.vector_service.signature_index.compact()
+                logger.info(f"[Retention] near_dup_index compacted: {near_dup_index}")
+            except Exception as e:
+                logger.warning(f"[Retention] near_dup_index compaction failed: {e}")
+
+        llm_cache_purged = None
+        if not dry_run and self.llm_cache is not None:
+            try:
+                llm_cache_purged = self.llm_cache.purge_expired()
+                logger.info(f"[Retention] llm_response_cache: {llm_cache_purged} expired rows purged")
+            except Exception as e:
+                logger.warning(f"[Retention] llm_response_cache purge failed: {e}")
+
+        after = before if dry_run else self.collection_stats()
+        return {
+            "dry_run": dry_run,
+            "policies": self.policies,
+            "expired": deleted_by_type,
+            "llm_cache_purged": llm_cache_purged,
+            "near_dup_index": near_dup_index,
+            "before": before,
+            "after": after,
+            "elapsed_sec": round(time.perf_counter() - started, 2),
+        }
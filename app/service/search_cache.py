@@ -0,0 +1,174 @@
+# app/service/search_cache.py
+import os
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple, Hashable, Callable
+
+from sqlalchemy.orm import Session
+
+from app.repository.kb_version import get_version, bump_version
+
+logger = logging.getLogger("search_cache")
+
+
+class PostgresVersionStore:
+    """kb_versions 테이블에 컬렉션별 버전을 두어 여러 프로세스가 같은 카운터를 보도록 함"""
+
+    def __init__(self, session_factory: Callable[[], Session]):
+        self.session_factory = session_factory
+
+    def get(self, namespace: str) -> int:
+        with self.session_factory() as db:
+            return get_version(db, namespace)
+
+    def bump(self, namespace: str) -> int:
+        with self.session_factory() as db:
+            return bump_version(db, namespace)
+
+
+class SearchResultCache:
+    """
+    VectorService.search 결과용 프로세스 내 LRU + TTL 캐시.
+
+    키에는 컬렉션별 버전 카운터가 포함되므로, add/delete 시 bump()만 호출하면
+    이전 버전의 결과는 자연스럽게 조회되지 않고 LRU에서 밀려납니다.
+    version_store가 있으면 버전을 공유 저장소(Postgres)에 두고 version_check_interval마다 다시 읽으므로,
+    다른 프로세스(outbox 워커, 백필, 보존 정책, 스냅샷 복원)의 쓰기도 그 시간 안에 캐시에 반영됩니다.
+    version_store가 없으면 같은 프로세스 안의 쓰기만 무효화됩니다.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        ttl_seconds: float = 300.0,
+        version_store: Optional[PostgresVersionStore] = None,
+        version_check_interval: float = 2.0,
+    ):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.version_store = version_store
+        self.version_check_interval = version_check_interval
+        self._entries: "OrderedDict[Hashable, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._checked_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _freeze(value: Any) -> str:
+        return json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+
+    def version(self, namespace: str) -> int:
+        if self.version_store is not None:
+            now = time.monotonic()
+            checked_at = self._checked_at.get(namespace)
+            if checked_at is None or now - checked_at >= self.version_check_interval:
+                try:
+                    shared = self.version_store.get(namespace)
+                except Exception as e:
+                    # 공유 버전을 못 읽으면 이번 조회는 캐시를 쓰지 않도록 비움 (오래된 결과 방지)
+                    logger.warning(f"[SearchCache] version read failed: {e}")
+                    self.clear()
+                    shared = None
+                with self._lock:
+                    if shared is not None:
+                        self._versions[namespace] = shared
+                    self._checked_at[namespace] = now
+        return self._versions.get(namespace, 0)
+
+    def bump(self, namespace: str) -> int:
+        """컬렉션 내용이 바뀌었음을 알리고 새 버전을 반환합니다."""
+        shared = None
+        if self.version_store is not None:
+            try:
+                shared = self.version_store.bump(namespace)
+            except Exception as e:
+                # 공유 카운터가 나중에 더 작은 값으로 돌아올 수 있으므로 로컬 항목은 모두 버림
+                logger.warning(f"[SearchCache] version bump failed: {e}")
+                self.clear()
+        with self._lock:
+            self._versions[namespace] = shared if shared is not None else self._versions.get(namespace, 0) + 1
+            self._checked_at[namespace] = time.monotonic()
+            return self._versions[namespace]
+
+    def make_key(
+        self,
+        namespace: str,
+        query: str,
+        n_results: int,
+        where: Optional[Dict[str, Any]] = None,
+        mode: str = "vector",
+    ) -> Hashable:
+        return (namespace, self.version(namespace), mode, query, self._freeze(where), n_results)
+
+    def get(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+        # 호출부에서 리스트를 수정해도 캐시가 오염되지 않도록 얕은 복사
+        return {k: list(v) if isinstance(v, list) else v for k, v in value.items()}
+
+    def set(self, key: Hashable, value: Dict[str, Any]):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "versions": dict(self._versions),
+            "shared_versions": self.version_store is not None,
+        }
+
+
+_search_cache: Optional[SearchResultCache] = None
+_search_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> SearchResultCache:
+    """프로세스 단위 검색 캐시 싱글톤 (요청마다 생성되는 VectorService 간 공유)"""
+    global _search_cache
+    if _search_cache is None:
+        with _search_cache_lock:
+            if _search_cache is None:
+                version_store = None
+                # SEARCH_CACHE_VERSION_STORE=local 이면 프로세스 내 쓰기만 무효화 (DB 없이 실행할 때)
+                if os.getenv("SEARCH_CACHE_VERSION_STORE", "postgres") == "postgres":
+                    from app.core.db import SessionLocal
+
+                    version_store = PostgresVersionStore(SessionLocal)
+                _search_cache = SearchResultCache(
+                    max_size=int(os.getenv("SEARCH_CACHE_MAX_SIZE", "1024")),
+                    ttl_seconds=float(os.getenv("SEARCH_CACHE_TTL_SEC", "300")),
+                    version_store=version_store,
+                    version_check_interval=float(os.getenv("SEARCH_CACHE_VERSION_CHECK_SEC", "2")),
+                )
+    return _search_cache
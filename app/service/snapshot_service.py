@@ -0,0 +1,152 @@
+# app/service/snapshot_service.py
+import json
+import time
+import logging
+from typing import Dict, Any, Optional, Iterator
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from app.service.vector_service import VectorService
+from app.service.dedup_service import SignatureIndex, minhash
+
+logger = logging.getLogger("snapshot")
+
+SNAPSHOT_FORMAT_VERSION = "1"
+
+
+def _snapshot_schema(dim: int) -> pa.Schema:
+    # 메타데이터 키는 문서 타입마다 달라 JSON 문자열 컬럼으로 저장
+    return pa.schema(
+        [
+            ("id", pa.string()),
+            ("document", pa.string()),
+            ("metadata", pa.string()),
+            ("embedding", pa.list_(pa.float32(), dim)),
+        ]
+    )
+
+
+class SnapshotService:
+    """
+    KB 스냅샷 내보내기/가져오기 (Parquet).
+
+    - export: 컬렉션을 페이지 단위로 읽어 id/문서/메타데이터/임베딩을 row group별로 기록
+    - import: row group 단위로 읽어 저장소에 바로 upsert (임베딩 API 호출 없음, 같은 id는 스냅샷 값으로 덮어씀)
+    중복 서명 색인은 가져오면서 함께 채우고, BM25 색인은 적재가 끝난 뒤 컬렉션 기준으로 한 번 재구축합니다.
+    """
+
+    def __init__(
+        self,
+        vector_service: VectorService,
+        signature_index: Optional[SignatureIndex] = None,
+    ):
+        self.vector_service = vector_service
+        self.signature_index = signature_index
+
+    def _iter_pages(self, batch_size: int, include=("documents", "metadatas", "embeddings")) -> Iterator[Dict[str, Any]]:
+        repo = self.vector_service.vector_repository
+        offset = 0
+        while True:
+            page = repo.get_documents(
+                limit=batch_size,
+                offset=offset,
+                include=list(include),
+            )
+            ids = page.get("ids") or []
+            if not ids:
+                return
+            yield page
+            offset += len(ids)
+
+    def _open_writer(self, path: str, dim: int, compression: str) -> pq.ParquetWriter:
+        schema = _snapshot_schema(dim).with_metadata(
+            {
+                "format_version": SNAPSHOT_FORMAT_VERSION,
+                "source": self.vector_service.vector_repository.namespace,
+                "dim": str(dim),
+                "exported_at": str(int(time.time())),
+            }
+        )
+        return pq.ParquetWriter(path, schema, compression=compression)
+
+    def export(self, path: str, batch_size: int = 1000, compression: str = "zstd") -> Dict[str, Any]:
+        started = time.perf_counter()
+        repo = self.vector_service.vector_repository
+        writer = None
+        total = 0
+
+        try:
+            for page in self._iter_pages(batch_size):
+                embeddings = np.asarray(page["embeddings"], dtype=np.float32)
+                dim = embeddings.shape[1]
+                if writer is None:
+                    writer = self._open_writer(path, dim, compression)
+
+                table = pa.Table.from_arrays(
+                    [
+                        pa.array(page["ids"], type=pa.string()),
+                        pa.array(page.get("documents") or [None] * len(page["ids"]), type=pa.string()),
+                        pa.array([json.dumps(m, ensure_ascii=False) for m in page.get("metadatas") or []], type=pa.string()),
+                        pa.FixedSizeListArray.from_arrays(pa.array(embeddings.ravel()), dim),
+                    ],
+                    schema=writer.schema,
+                )
+                writer.write_table(table)
+                total += len(page["ids"])
+                logger.info(f"[Snapshot] exported {total} docs")
+
+            if writer is None:
+                # 빈 컬렉션도 스키마만 있는 스냅샷 파일을 남겨 restore/백업 검증이 같은 경로로 동작하게 함
+                dim = (repo.get_collection_info().get("metadata") or {}).get("dim") or 0
+                writer = self._open_writer(path, int(dim), compression)
+        finally:
+            if writer is not None:
+                writer.close()
+
+        return {
+            "path": path,
+            "source": repo.namespace,
+            "count": total,
+            "elapsed_sec": round(time.perf_counter() - started, 2),
+        }
+
+    def restore(self, path: str, batch_size: int = 1000) -> Dict[str, Any]:
+        started = time.perf_counter()
+        repo = self.vector_service.vector_repository
+        lexical_index = self.vector_service.lexical_index
+        parquet = pq.ParquetFile(path)
+        meta = parquet.schema_arrow.metadata or {}
+        if meta.get(b"format_version", b"").decode() != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot format: {path}")
+        dim = int(meta[b"dim"])
+        total = 0
+
+        for batch in parquet.iter_batches(batch_size=batch_size):
+            ids = batch.column("id").to_pylist()
+            documents = batch.column("document").to_pylist()
+            metadatas = [json.loads(m) for m in batch.column("metadata").to_pylist()]
+            embeddings = batch.column("embedding").flatten().to_numpy().reshape(-1, dim)
+
+            repo.upsert_documents(documents=documents, embeddings=embeddings, metadatas=metadatas, ids=ids)
+            if self.signature_index is not None:
+                self.signature_index.add(ids, [minhash(doc) for doc in documents])
+
+            total += len(ids)
+            logger.info(f"[Snapshot] restored {total}/{parquet.metadata.num_rows} docs")
+
+        if lexical_index is not None:
+            # 배치마다 연산 로그를 쌓지 않고, 기존 문서까지 포함한 컬렉션 전체로 한 번에 재구축
+            lexical_index.rebuild(
+                (page["ids"], page["documents"]) for page in self._iter_pages(batch_size, include=("documents",))
+            )
+        self.vector_service._invalidate_cache()
+
+        return {
+            "path": path,
+            "source": meta.get(b"source", b"").decode(),
+            "target": repo.namespace,
+            "count": total,
+            "elapsed_sec": round(time.perf_counter() - started, 2),
+        }
@@ -1,8 +1,36 @@
 # app/service/vector_service.py
-from typing import List, Dict, Any
+import time
+import asyncio
+import hashlib
+from typing import List, Dict, Any, Optional
 
 from app.service.embedding_service import EmbeddingService
-from app.repository.vector.vector_repo import VectorRepository
+from app.repository.vector.base import VectorRepository, run_in_vector_pool
+from app.repository.vector.lexical_index import BM25Index
+from app.service.search_cache import SearchResultCache
+from app.service.dedup_service import add_alternate, NearDuplicateDetector, DedupPlan, SignatureIndex
+from app.service.embedding_batcher import EmbeddingMicroBatcher
+
+# Reciprocal Rank Fusion 상수 (Cormack et al. 기본값)
+RRF_K = 60
+
+
+def make_doc_id(document: str) -> str:
+    """문서 내용 기반 고정 ID (같은 문서 재저장 시 같은 ID로 upsert 되도록)"""
+    return hashlib.sha256((document or "").encode("utf-8")).hexdigest()
+
+
+def stamp_ingested_at(documents: List[str], metadatas: List[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """보존 정책(retention)에서 쓰는 적재 시각(epoch seconds)을 메타데이터에 기록"""
+    now = int(time.time())
+    if metadatas is None:
+        metadatas = [{} for _ in documents]
+    stamped = []
+    for meta in metadatas:
+        meta = dict(meta or {})
+        meta.setdefault("ingested_at", now)
+        stamped.append(meta)
+    return stamped
 
 
 class VectorService:
@@ -10,9 +38,22 @@ class VectorService:
         self,
         vector_repository: VectorRepository,
         embedding_service: EmbeddingService,
+        lexical_index: Optional[BM25Index] = None,
+        search_cache: Optional[SearchResultCache] = None,
+        embedding_batcher: Optional[EmbeddingMicroBatcher] = None,
+        signature_index: Optional[SignatureIndex] = None,
     ):
         self.vector_repository = vector_repository
         self.embedding_service = embedding_service
+        self.lexical_index = lexical_index
+        self.search_cache = search_cache
+        self.embedding_batcher = embedding_batcher
+        # 근접 중복 서명 색인: 삭제된 문서의 서명이 남으면 같은 내용의 재수집이 계속 중복으로 걸러짐
+        self.signature_index = signature_index
+
+    def _invalidate_cache(self):
+        if self.search_cache is not None:
+            self.search_cache.bump(self.vector_repository.namespace)
 
     def add_documents(
         self,
@@ -20,6 +61,10 @@ class VectorService:
         metadatas: List[Dict[str, Any]] = None,
         ids: List[str] = None,
     ):
+        if ids is None:
+            ids = [make_doc_id(doc) for doc in documents]
+        metadatas = stamp_ingested_at(documents, metadatas)
+
         embeddings = self.embedding_service.create_embeddings(documents)
         self.vector_repository.add_documents(
             documents=documents,
@@ -28,23 +73,354 @@ class VectorService:
             ids=ids,
         )
 
-    def search(self, query: str, n_results: int = 5) -> Dict[str, Any]:
-        query_embedding = self.embedding_service.create_embedding(query)
+        # Chroma 저장이 성공한 문서만 BM25 색인에 반영
+        if self.lexical_index is not None:
+            self.lexical_index.add_documents(ids, documents)
+        self._invalidate_cache()
+
+    def search(
+        self,
+        query: str,
+        n_results: int = 5,
+        mode: str = "vector",
+        where: Dict[str, Any] = None,
+    ) -> Dict[str, Any]:
+        cache_key = None
+        if self.search_cache is not None:
+            cache_key = self.search_cache.make_key(
+                self.vector_repository.namespace, query, n_results, where=where, mode=mode
+            )
+            cached = self.search_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        if mode == "hybrid":
+            result = self.hybrid_search(query, n_results=n_results, where=where)
+        else:
+            result = self._vector_search(query, n_results=n_results, where=where)
+
+        if cache_key is not None:
+            self.search_cache.set(cache_key, result)
+        return result
+
+    def _vector_search(self, query: str, n_results: int = 5, where: Dict[str, Any] = None) -> Dict[str, Any]:
+        # 동시 요청의 쿼리 임베딩은 micro-batcher로 묶어서 한 번에 요청
+        if self.embedding_batcher is not None:
+            query_embedding = self.embedding_batcher.embed(query)
+        else:
+            query_embedding = self.embedding_service.create_embedding(query)
 
         results = self.vector_repository.query(
             query_embeddings=[query_embedding],
             n_results=n_results,
             include=["documents", "metadatas", "distances"],
+            where=where,
         )
+        return self._first_result(results)
+
+    @staticmethod
+    def _first_result(results: Dict[str, Any], i: int = 0) -> Dict[str, Any]:
+        return {
+            "ids": results["ids"][i],
+            "documents": results["documents"][i],
+            "metadatas": results["metadatas"][i],
+            "distances": results["distances"][i],
+        }
+
+    def search_many(
+        self,
+        queries: List[str],
+        filters_per_query: List[Optional[Dict[str, Any]]] = None,
+        n_results: int = 5,
+    ) -> List[Dict[str, Any]]:
+        """
+        여러 쿼리를 한 번에 검색합니다 (포트폴리오 분석 등).
+        - 캐시에 없는 쿼리만 모아 임베딩 API를 1회 호출
+        - 같은 필터를 쓰는 쿼리끼리 묶어 collection.query를 1회씩 호출
+          (Chroma의 where는 요청 단위라 필터가 모두 같으면 총 2번의 왕복으로 끝남)
+        """
+        if filters_per_query is None:
+            filters_per_query = [None] * len(queries)
+        if len(filters_per_query) != len(queries):
+            raise ValueError(
+                f"filters_per_query length mismatch: {len(filters_per_query)} != {len(queries)}"
+            )
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(queries)
+        cache_keys: List[Any] = [None] * len(queries)
+        pending: List[int] = []
+
+        for i, (query, where) in enumerate(zip(queries, filters_per_query)):
+            if self.search_cache is not None:
+                cache_keys[i] = self.search_cache.make_key(
+                    self.vector_repository.namespace, query, n_results, where=where
+                )
+                cached = self.search_cache.get(cache_keys[i])
+                if cached is not None:
+                    results[i] = cached
+                    continue
+            pending.append(i)
+
+        if not pending:
+            return results
+
+        embeddings = self.embedding_service.create_query_embeddings([queries[i] for i in pending])
+        embedding_by_idx = dict(zip(pending, embeddings))
+
+        for where, group in self._group_by_filter(pending, filters_per_query):
+            raw = self.vector_repository.query(
+                query_embeddings=[embedding_by_idx[i] for i in group],
+                n_results=n_results,
+                include=["documents", "metadatas", "distances"],
+                where=where,
+            )
+            for pos, i in enumerate(group):
+                results[i] = self._first_result(raw, pos)
+                if cache_keys[i] is not None:
+                    self.search_cache.set(cache_keys[i], results[i])
+
+        return results
+
+    @staticmethod
+    def _group_by_filter(indices: List[int], filters_per_query: List[Optional[Dict[str, Any]]]):
+        groups: Dict[str, List[int]] = {}
+        filters: Dict[str, Optional[Dict[str, Any]]] = {}
+        for i in indices:
+            key = SearchResultCache._freeze(filters_per_query[i])
+            groups.setdefault(key, []).append(i)
+            filters[key] = filters_per_query[i]
+        return [(filters[key], group) for key, group in groups.items()]
+
+    def hybrid_search(
+        self,
+        query: str,
+        n_results: int = 5,
+        candidate_k: int = None,
+        where: Dict[str, Any] = None,
+    ) -> Dict[str, Any]:
+        """
+        벡터 검색과 BM25 검색 결과를 Reciprocal Rank Fusion으로 합칩니다.
+        티커/종목코드/수치처럼 임베딩이 놓치기 쉬운 정확 일치를 보완합니다.
+        """
+        if self.lexical_index is None:
+            return self._vector_search(query, n_results=n_results, where=where)
+
+        candidate_k = candidate_k or max(n_results * 4, 20)
+
+        dense = self._vector_search(query, n_results=candidate_k, where=where)
+        lexical = self.lexical_index.search(query, n_results=candidate_k)
+        if where:
+            # BM25 색인은 메타데이터를 모르므로 필터가 있으면 저장소에서 후보를 다시 거른다
+            lexical_ids = [doc_id for doc_id, _ in lexical]
+            allowed = set()
+            if lexical_ids:
+                allowed = set(self.vector_repository.get_documents(ids=lexical_ids, where=where, include=[])["ids"])
+            lexical = [(doc_id, score) for doc_id, score in lexical if doc_id in allowed]
+
+        top_ids, fused = self._rank_fusion(dense["ids"], lexical, n_results)
+        missing = self._missing_ids(top_ids, dense)
+        fetched = self.vector_repository.get_documents(ids=missing) if missing else None
+        return self._assemble_hybrid(top_ids, fused, dense, fetched)
+
+    @staticmethod
+    def _rank_fusion(dense_ids: List[str], lexical: List[Any], n_results: int):
+        fused: Dict[str, float] = {}
+        for rank, doc_id in enumerate(dense_ids):
+            fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (RRF_K + rank + 1)
+        for rank, (doc_id, _) in enumerate(lexical):
+            fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (RRF_K + rank + 1)
+
+        top_ids = sorted(fused, key=fused.get, reverse=True)[:n_results]
+        return top_ids, fused
+
+    @staticmethod
+    def _missing_ids(top_ids: List[str], dense: Dict[str, Any]) -> List[str]:
+        # BM25에서만 잡힌 문서는 본문/메타데이터를 저장소에서 가져와야 함
+        dense_ids = set(dense["ids"])
+        return [doc_id for doc_id in top_ids if doc_id not in dense_ids]
+
+    @staticmethod
+    def _assemble_hybrid(
+        top_ids: List[str],
+        fused: Dict[str, float],
+        dense: Dict[str, Any],
+        fetched: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        by_id = {
+            doc_id: (doc, meta, dist)
+            for doc_id, doc, meta, dist in zip(
+                dense["ids"], dense["documents"], dense["metadatas"], dense["distances"]
+            )
+        }
+        if fetched:
+            for doc_id, doc, meta in zip(fetched["ids"], fetched["documents"], fetched["metadatas"]):
+                by_id[doc_id] = (doc, meta, None)
+
+        # 색인에는 있으나 저장소에서 삭제된 문서는 제외
+        top_ids = [doc_id for doc_id in top_ids if doc_id in by_id]
 
         return {
-            "documents": results["documents"][0],
-            "metadatas": results["metadatas"][0],
-            "distances": results["distances"][0],
+            "ids": top_ids,
+            "documents": [by_id[doc_id][0] for doc_id in top_ids],
+            "metadatas": [by_id[doc_id][1] for doc_id in top_ids],
+            "distances": [by_id[doc_id][2] for doc_id in top_ids],
+            "scores": [fused[doc_id] for doc_id in top_ids],
         }
 
+    # -------------------------
+    # Async API (FastAPI 라우트 / async 그래프 노드용)
+    # -------------------------
+    async def aadd_documents(
+        self,
+        documents: List[str],
+        metadatas: List[Dict[str, Any]] = None,
+        ids: List[str] = None,
+    ):
+        if ids is None:
+            ids = [make_doc_id(doc) for doc in documents]
+        metadatas = stamp_ingested_at(documents, metadatas)
+
+        embeddings = await self.embedding_service.acreate_embeddings(documents)
+        await self.vector_repository.aadd_documents(
+            documents=documents,
+            embeddings=embeddings,
+            metadatas=metadatas,
+            ids=ids,
+        )
+
+        if self.lexical_index is not None:
+            await run_in_vector_pool(self.lexical_index.add_documents, ids, documents)
+        self._invalidate_cache()
+
+    async def asearch(
+        self,
+        query: str,
+        n_results: int = 5,
+        mode: str = "vector",
+        where: Dict[str, Any] = None,
+    ) -> Dict[str, Any]:
+        cache_key = None
+        if self.search_cache is not None:
+            cache_key = self.search_cache.make_key(
+                self.vector_repository.namespace, query, n_results, where=where, mode=mode
+            )
+            cached = self.search_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        if mode == "hybrid" and self.lexical_index is not None:
+            result = await self._ahybrid_search(query, n_results=n_results, where=where)
+        else:
+            result = await self._avector_search(query, n_results=n_results, where=where)
+
+        if cache_key is not None:
+            self.search_cache.set(cache_key, result)
+        return result
+
+    async def _avector_search(self, query: str, n_results: int = 5, where: Dict[str, Any] = None) -> Dict[str, Any]:
+        if self.embedding_batcher is not None:
+            query_embedding = await self.embedding_batcher.aembed(query)
+        else:
+            query_embedding = await self.embedding_service.acreate_embedding(query)
+
+        results = await self.vector_repository.aquery(
+            query_embeddings=[query_embedding],
+            n_results=n_results,
+            include=["documents", "metadatas", "distances"],
+            where=where,
+        )
+        return self._first_result(results)
+
+    async def _ahybrid_search(self, query: str, n_results: int = 5, where: Dict[str, Any] = None) -> Dict[str, Any]:
+        candidate_k = max(n_results * 4, 20)
+
+        # 임베딩 HTTP 호출과 BM25 점수 계산(CPU)을 동시에 진행
+        dense, lexical = await asyncio.gather(
+            self._avector_search(query, n_results=candidate_k, where=where),
+            run_in_vector_pool(self.lexical_index.search, query, candidate_k),
+        )
+        if where:
+            lexical_ids = [doc_id for doc_id, _ in lexical]
+            allowed = set()
+            if lexical_ids:
+                allowed = set((await self.vector_repository.aget_documents(ids=lexical_ids, where=where, include=[]))["ids"])
+            lexical = [(doc_id, score) for doc_id, score in lexical if doc_id in allowed]
+
+        top_ids, fused = self._rank_fusion(dense["ids"], lexical, n_results)
+        missing = self._missing_ids(top_ids, dense)
+        fetched = await self.vector_repository.aget_documents(ids=missing) if missing else None
+        return self._assemble_hybrid(top_ids, fused, dense, fetched)
+
+    async def adelete_document(self, doc_id: str):
+        await self.vector_repository.adelete_documents([doc_id])
+        if self.lexical_index is not None:
+            await run_in_vector_pool(self.lexical_index.delete_documents, [doc_id])
+        if self.signature_index is not None:
+            await run_in_vector_pool(self.signature_index.remove, [doc_id])
+        self._invalidate_cache()
+
+    def add_documents_deduped(
+        self,
+        detector: NearDuplicateDetector,
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+        ids: List[str] = None,
+    ) -> DedupPlan:
+        """근접 중복을 걸러 원본만 임베딩/저장하고, 버려진 중복은 원본 메타데이터에 기록합니다."""
+        if ids is None:
+            ids = [make_doc_id(doc) for doc in documents]
+        plan = detector.partition(documents, metadatas, ids)
+        if plan.ids:
+            # 서명 색인이 유실/초기화된 경우에도 이미 컬렉션에 있는 문서는 다시 임베딩하지 않음
+            stored = set(self.vector_repository.get_documents(ids=plan.ids, include=[])["ids"])
+            if stored:
+                plan.drop(stored)
+        if plan.contents:
+            try:
+                self.add_documents(plan.contents, plan.metadatas, ids=plan.ids)
+            except Exception:
+                detector.release(plan)
+                raise
+        self.annotate_duplicates(plan.existing_alternates)
+        return plan
+
+    def annotate_duplicates(self, alternates: Dict[str, List[Dict[str, Any]]]):
+        """이미 저장된 원본 문서의 메타데이터에 중복(대체) 문서 정보를 누적합니다."""
+        if not alternates:
+            return
+
+        current = self.vector_repository.get_documents(ids=list(alternates), include=["metadatas"])
+        ids, metadatas = [], []
+        for doc_id, meta in zip(current["ids"], current["metadatas"]):
+            meta = dict(meta or {})
+            for alt in alternates[doc_id]:
+                meta = add_alternate(meta, alt)
+            ids.append(doc_id)
+            metadatas.append(meta)
+
+        if ids:
+            self.vector_repository.update_metadatas(ids, metadatas)
+            self._invalidate_cache()
+
     def delete_document(self, doc_id: str):
-        self.vector_repository.delete_documents([doc_id])
+        self.delete_documents([doc_id])
+
+    def delete_documents(self, ids: List[str]):
+        if not ids:
+            return
+        self.vector_repository.delete_documents(ids)
+        if self.lexical_index is not None:
+            self.lexical_index.delete_documents(ids)
+        if self.signature_index is not None:
+            self.signature_index.remove(ids)
+        self._invalidate_cache()
 
     def get_collection_info(self) -> Dict[str, Any]:
-        return self.vector_repository.get_collection_info()
+        info = self.vector_repository.get_collection_info()
+        if self.lexical_index is not None:
+            info["lexical_index"] = self.lexical_index.get_info()
+        if self.search_cache is not None:
+            info["search_cache"] = self.search_cache.get_stats()
+        if self.embedding_batcher is not None:
+            info["embedding_batcher"] = self.embedding_batcher.get_stats()
+        return info
@@ -0,0 +1,85 @@
+# benchmarks/bench_lexical.py
+"""
+BM25 색인 벤치마크: 색인 속도, 질의 지연(p50/p95/p99), 스냅샷 로드 시간.
+
+    python -m benchmarks.bench_lexical --docs 100000 --queries 500
+"""
+import os
+import json
+import time
+import argparse
+import tempfile
+import statistics
+
+from app.repository.vector.lexical_index import BM25Index
+from benchmarks.synthetic import generate_news, generate_queries
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def run(n_docs: int, n_queries: int, batch_size: int = 1000) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        index = BM25Index(persist_path=os.path.join(tmp, "bm25"))
+
+        t0 = time.perf_counter()
+        ids, docs = [], []
+        for item in generate_news(n_docs):
+            ids.append(item["id"])
+            docs.append(item["document"])
+            if len(ids) >= batch_size:
+                index.add_documents(ids, docs)
+                ids, docs = [], []
+        if ids:
+            index.add_documents(ids, docs)
+        ingest_sec = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        index.compact()
+        compact_sec = time.perf_counter() - t0
+
+        latencies_ms = []
+        for q in generate_queries(n_queries):
+            t0 = time.perf_counter()
+            index.search(q, n_results=20)
+            latencies_ms.append((time.perf_counter() - t0) * 1000)
+
+        t0 = time.perf_counter()
+        BM25Index(persist_path=index.persist_path)
+        load_sec = time.perf_counter() - t0
+
+        return {
+            "n_docs": n_docs,
+            "n_queries": n_queries,
+            "ingest_docs_per_sec": round(n_docs / ingest_sec, 1),
+            "compact_sec": round(compact_sec, 3),
+            "load_sec": round(load_sec, 3),
+            "query_ms": {
+                "p50": round(statistics.median(latencies_ms), 3),
+                "p95": round(_percentile(latencies_ms, 95), 3),
+                "p99": round(_percentile(latencies_ms, 99), 3),
+            },
+            "index": index.get_info(),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--out", type=str, default=None)
+    args = parser.parse_args()
+
+    result = run(args.docs, args.queries)
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
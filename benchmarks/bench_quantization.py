@@ -0,0 +1,102 @@
+# benchmarks/bench_quantization.py
+"""
+임베딩 압축 벤치마크: 설정별 recall@k(정확 검색 대비), 코드 메모리, 질의 지연.
+
+    python -m benchmarks.bench_quantization --docs 20000 --dim 4096 --queries 200
+"""
+import json
+import time
+import argparse
+import statistics
+
+from app.repository.vector.numpy_repo import NumpyVectorRepository, QuantizedVectorRepository
+from app.repository.vector.quantization import EmbeddingQuantizer
+from benchmarks.synthetic import generate_embeddings
+
+CONFIGS = [
+    {"dtype": "float16"},
+    {"dtype": "int8"},
+    {"dtype": "float16", "dims": 1024},
+    {"dtype": "float16", "dims": 512, "pca": True},
+    {"dtype": "int8", "dims": 512, "pca": True},
+    {"dtype": "int8", "dims": 256, "pca": True},
+]
+RERANK_FACTORS = [0, 4]
+
+
+def _query_all(repo, queries, k):
+    latencies_ms, ids = [], []
+    for q in queries:
+        t0 = time.perf_counter()
+        res = repo.query([q], n_results=k, include=[])
+        latencies_ms.append((time.perf_counter() - t0) * 1000)
+        ids.append(res["ids"][0])
+    return ids, latencies_ms
+
+
+def _recall(truth, got, k):
+    return sum(len(set(t) & set(g)) for t, g in zip(truth, got)) / (k * len(truth))
+
+
+def run(n_docs: int, dim: int, n_queries: int, k: int = 10) -> dict:
+    docs, queries = generate_embeddings(n_docs, n_queries, dim=dim)
+    ids = [f"d{i}" for i in range(n_docs)]
+    placeholders = [""] * n_docs
+    metadatas = [{} for _ in range(n_docs)]
+
+    exact = NumpyVectorRepository(initial_capacity=n_docs)
+    exact.add_documents(placeholders, docs, metadatas, ids)
+    truth, exact_ms = _query_all(exact, queries, k)
+    full_bytes = exact.get_collection_info()["metadata"]["matrix_bytes"]
+
+    results = []
+    for cfg in CONFIGS:
+        repo = QuantizedVectorRepository(EmbeddingQuantizer(**cfg), initial_capacity=n_docs)
+        t0 = time.perf_counter()
+        repo.add_documents(placeholders, docs, metadatas, ids)
+        build_sec = time.perf_counter() - t0
+        code_bytes = repo.get_collection_info()["metadata"]["code_bytes"]
+
+        for factor in RERANK_FACTORS:
+            repo.rerank_factor = factor
+            got, latencies_ms = _query_all(repo, queries, k)
+            results.append({
+                "config": cfg,
+                "rerank_factor": factor,
+                f"recall@{k}": round(_recall(truth, got, k), 4),
+                "code_bytes": code_bytes,
+                "compression": round(full_bytes / code_bytes, 1),
+                "build_sec": round(build_sec, 2),
+                "query_ms_p50": round(statistics.median(latencies_ms), 3),
+            })
+        del repo
+
+    return {
+        "n_docs": n_docs,
+        "dim": dim,
+        "n_queries": n_queries,
+        "float32_bytes": full_bytes,
+        "exact_query_ms_p50": round(statistics.median(exact_ms), 3),
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=20_000)
+    parser.add_argument("--dim", type=int, default=4096)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--out", type=str, default=None)
+    args = parser.parse_args()
+
+    result = run(args.docs, args.dim, args.queries, k=args.k)
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+# benchmarks/bench_vector_store.py
+"""
+벡터 저장소 벤치마크: VectorService 경로로 합성 뉴스 + 결정적 가짜 임베딩을 적재하고
+적재 속도(docs/sec), 질의 지연(p50/p95/p99), recall@k(정확 검색 대비), 메모리를 측정합니다.
+각 케이스는 별도 프로세스에서 실행해 메모리 측정이 섞이지 않게 합니다.
+
+    python -m benchmarks.bench_vector_store --sizes 10000,100000 --backends numpy,chroma
+    python -m benchmarks.bench_vector_store --sizes 1000000 --dim 1024 --backends numpy_int8,chroma \\
+        --hnsw "16:100:10/50/100,32:200:50/100" --out bench_vector_store.json
+
+Chroma는 (M, ef_construction)마다 한 번 적재하고, ef_search 값들은 같은 컬렉션에서 바꿔가며
+질의해 recall/지연 trade-off를 측정합니다.
+"""
+import os
+import json
+import time
+import argparse
+import tempfile
+import resource
+import statistics
+import subprocess
+import multiprocessing
+from typing import List, Dict, Any
+
+import numpy as np
+
+from benchmarks.synthetic import FakeEmbeddingService, generate_news, generate_queries
+
+BACKENDS = ["numpy", "numpy_int8", "chroma"]
+# (M, ef_construction, [ef_search...]) — Chroma 기본값은 M=16, ef_construction=100, ef_search=100
+DEFAULT_HNSW_GRID = [(16, 100, [10, 25, 50, 100, 200])]
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def _rss_mb() -> float:
+    """현재 상주 메모리(MB). /proc이 없으면 최대 상주 메모리로 대체합니다."""
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _dir_size_mb(path: str) -> float:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return total / (1024 * 1024)
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _batches(n_docs: int, batch_size: int):
+    ids, docs, metas = [], [], []
+    for item in generate_news(n_docs):
+        ids.append(item["id"])
+        docs.append(item["document"])
+        metas.append(item["metadata"])
+        if len(ids) >= batch_size:
+            yield ids, docs, metas
+            ids, docs, metas = [], [], []
+    if ids:
+        yield ids, docs, metas
+
+
+def ground_truth(n_docs: int, queries: List[str], k: int, dim: int, batch_size: int = 2000) -> List[List[str]]:
+    """문서를 스트리밍하며 질의별 정확한 top-k(코사인)를 유지합니다 (전체 행렬을 메모리에 올리지 않음)."""
+    embedder = FakeEmbeddingService(dim)
+    q = embedder.create_embeddings(queries)
+    best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+    best_ids = np.empty((len(queries), 0), dtype=object)
+
+    for ids, docs, _ in _batches(n_docs, batch_size):
+        sims = q @ embedder.create_embeddings(docs).T
+        scores = np.concatenate([best_scores, sims], axis=1)
+        cand_ids = np.concatenate([best_ids, np.tile(np.array(ids, dtype=object), (len(queries), 1))], axis=1)
+        keep = min(k, scores.shape[1])
+        top = np.argpartition(-scores, keep - 1, axis=1)[:, :keep]
+        best_scores = np.take_along_axis(scores, top, axis=1)
+        best_ids = np.take_along_axis(cand_ids, top, axis=1)
+
+    return [list(row) for row in best_ids]
+
+
+def _build_repository(backend: str, hnsw, workdir: str, n_docs: int):
+    if backend == "numpy":
+        from app.repository.vector.numpy_repo import NumpyVectorRepository
+
+        return NumpyVectorRepository(initial_capacity=n_docs)
+
+    if backend == "numpy_int8":
+        from app.repository.vector.numpy_repo import QuantizedVectorRepository
+        from app.repository.vector.quantization import EmbeddingQuantizer
+
+        return QuantizedVectorRepository(EmbeddingQuantizer("int8"), initial_capacity=n_docs)
+
+    if backend == "chroma":
+        # ChromaDBConfig는 환경변수로 설정되므로 실제 설정 경로 그대로 임시 경로/HNSW 값을 지정
+        m, ef_construction, ef_searches = hnsw
+        os.environ.update(
+            {
+                "CHROMA_MODE": "local",
+                "CHROMA_PERSIST_PATH": workdir,
+                "CHROMA_COLLECTION_NAME": "bench_vector_store",
+                "CHROMA_SHARD_BY_DOC_TYPE": "false",
+                "CHROMA_STOCK_SHARDS": "0",
+                "CHROMA_HNSW_SPACE": "cosine",
+                "CHROMA_HNSW_M": str(m),
+                "CHROMA_HNSW_EF_CONSTRUCTION": str(ef_construction),
+                "CHROMA_HNSW_EF_SEARCH": str(ef_searches[0]),
+            }
+        )
+        from app.repository.vector.vector_repo import ChromaDBRepository
+
+        return ChromaDBRepository()
+
+    raise ValueError(f"Unknown backend: {backend}")
+
+
+def _set_ef_search(repo, ef_search: int):
+    from app.core.chroma_db import ChromaDBConfig, sync_ef_search
+
+    os.environ["CHROMA_HNSW_EF_SEARCH"] = str(ef_search)
+    sync_ef_search(repo.collection, ChromaDBConfig())
+
+
+def _measure_queries(service, queries: List[str], truth: List[List[str]], k: int) -> Dict[str, Any]:
+    latencies_ms, hits = [], 0
+    for query, expected in zip(queries, truth):
+        t0 = time.perf_counter()
+        result = service.search(query, n_results=k)
+        latencies_ms.append((time.perf_counter() - t0) * 1000)
+        hits += len(set(result["ids"]) & set(expected))
+    return {
+        "query_ms": {
+            "p50": round(statistics.median(latencies_ms), 3),
+            "p95": round(_percentile(latencies_ms, 95), 3),
+            "p99": round(_percentile(latencies_ms, 99), 3),
+        },
+        f"recall@{k}": round(hits / (k * len(queries)), 4),
+    }
+
+
+def run_case(case: Dict[str, Any], queries: List[str], truth: List[List[str]]) -> Dict[str, Any]:
+    from app.service.vector_service import VectorService
+
+    n_docs, k = case["n_docs"], case["k"]
+    with tempfile.TemporaryDirectory() as workdir:
+        rss_before = _rss_mb()
+        repo = _build_repository(case["backend"], case.get("hnsw"), workdir, n_docs)
+        embedder = FakeEmbeddingService(case["dim"])
+        service = VectorService(vector_repository=repo, embedding_service=embedder)
+
+        t0 = time.perf_counter()
+        for ids, docs, metas in _batches(n_docs, case["batch_size"]):
+            service.add_documents(docs, metas, ids=ids)
+        ingest_sec = time.perf_counter() - t0
+        embed_sec = embedder.elapsed_sec
+        rss_after_ingest = _rss_mb()
+
+        if case["backend"] == "chroma":
+            search = []
+            for ef_search in case["hnsw"][2]:
+                _set_ef_search(repo, ef_search)
+                search.append({"ef_search": ef_search, **_measure_queries(service, queries, truth, k)})
+        else:
+            search = [_measure_queries(service, queries, truth, k)]
+
+        return {
+            **case,
+            "ingest_docs_per_sec": round(n_docs / ingest_sec, 1),
+            "store_docs_per_sec": round(n_docs / max(ingest_sec - embed_sec, 1e-9), 1),
+            "search": search,
+            "rss_mb": {
+                "delta_after_ingest": round(rss_after_ingest - rss_before, 1),
+                "peak": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+            },
+            "disk_mb": round(_dir_size_mb(workdir), 1),
+        }
+
+
+def _case_worker(case, queries, truth, out_queue):
+    try:
+        out_queue.put(run_case(case, queries, truth))
+    except Exception as e:
+        out_queue.put({**case, "error": f"{type(e).__name__}: {e}"})
+
+
+def run(
+    sizes: List[int],
+    backends: List[str],
+    hnsw_grid: List[tuple],
+    dim: int,
+    n_queries: int,
+    k: int = 10,
+    batch_size: int = 1000,
+) -> Dict[str, Any]:
+    ctx = multiprocessing.get_context("spawn")
+    queries = generate_queries(n_queries)
+    results = []
+
+    for n_docs in sizes:
+        truth = ground_truth(n_docs, queries, k, dim)
+        for backend in backends:
+            for hnsw in hnsw_grid if backend == "chroma" else [None]:
+                case = {"backend": backend, "hnsw": hnsw, "n_docs": n_docs, "dim": dim, "k": k, "batch_size": batch_size}
+                out_queue = ctx.Queue()
+                proc = ctx.Process(target=_case_worker, args=(case, queries, truth, out_queue))
+                proc.start()
+                result = out_queue.get()
+                proc.join()
+                print(json.dumps(result, ensure_ascii=False))
+                results.append(result)
+
+    return {
+        "revision": _git_revision(),
+        "created_at": int(time.time()),
+        "n_queries": n_queries,
+        "results": results,
+    }
+
+
+def _parse_hnsw(text: str) -> List[tuple]:
+    grid = []
+    for item in text.split(","):
+        if not item:
+            continue
+        m, ef_construction, ef_searches = item.split(":")
+        grid.append((int(m), int(ef_construction), [int(v) for v in ef_searches.split("/")]))
+    return grid
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=str, default="10000,100000", help="예: 10000,100000,1000000")
+    parser.add_argument("--backends", type=str, default=",".join(BACKENDS))
+    parser.add_argument("--hnsw", type=str, default=None, help="M:ef_construction:ef_search[/ef_search...] 목록, 예: 16:100:10/50/100,32:200:100")
+    parser.add_argument("--dim", type=int, default=4096)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--out", type=str, default=None)
+    args = parser.parse_args()
+
+    result = run(
+        sizes=[int(s) for s in args.sizes.split(",")],
+        backends=args.backends.split(","),
+        hnsw_grid=_parse_hnsw(args.hnsw) if args.hnsw else DEFAULT_HNSW_GRID,
+        dim=args.dim,
+        n_queries=args.queries,
+        k=args.k,
+        batch_size=args.batch_size,
+    )
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
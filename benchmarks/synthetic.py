@@ -0,0 +1,179 @@
+# benchmarks/synthetic.py
+"""
+벤치마크용 합성 한국어 금융 뉴스 생성기.
+같은 seed면 항상 같은 문서 집합을 만들어 커밋 간 결과 비교가 가능합니다.
+"""
+import json
+import time
+import random
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Dict, Any, Iterator, Tuple
+
+import mmh3
+import numpy as np
+
+from app.repository.vector.lexical_index import tokenize_ko
+
+_STOCKS_PATH = Path(__file__).resolve().parent.parent / "DomesticStocks.json"
+
+_FALLBACK_STOCKS = [
+    {"Code": "005930", "Name": "삼성전자"},
+    {"Code": "000660", "Name": "SK하이닉스"},
+    {"Code": "373220", "Name": "LG에너지솔루션"},
+    {"Code": "005380", "Name": "현대차"},
+    {"Code": "035420", "Name": "NAVER"},
+]
+
+_EVENTS = [
+    "분기 실적 발표", "신규 공장 증설", "자사주 매입", "배당 확대", "대규모 수주",
+    "임원 인사", "해외 법인 설립", "인수합병 추진", "신제품 출시", "유상증자 결정",
+]
+_REACTIONS = ["주가 상승", "주가 하락", "보합세", "거래량 급증", "외국인 순매수", "기관 순매도"]
+_PUBLISHERS = ["연합뉴스", "한국경제", "매일경제", "머니투데이", "이데일리", "서울경제"]
+_SENTENCES = [
+    "{name}은(는) {event}을(를) 발표하며 시장의 관심을 모았다.",
+    "증권가는 {name}의 {quarter} 영업이익이 {profit}억원을 기록할 것으로 전망했다.",
+    "{name}({code}) 주가는 전일 대비 {pct}% 변동하며 {reaction}을(를) 보였다.",
+    "업계 관계자는 이번 {event}이(가) 중장기 성장에 긍정적이라고 평가했다.",
+    "{name}의 매출은 전년 동기 대비 {pct}% 증가한 {revenue}억원으로 집계됐다.",
+    "반도체와 2차전지 업황 회복 기대감이 {name} 투자 심리에 영향을 줬다.",
+]
+
+
+def load_stocks() -> List[Dict[str, str]]:
+    if _STOCKS_PATH.exists():
+        return json.loads(_STOCKS_PATH.read_text(encoding="utf-8"))
+    return list(_FALLBACK_STOCKS)
+
+
+def generate_news(n_docs: int, seed: int = 42) -> Iterator[Dict[str, Any]]:
+    """(id, document, metadata) 형태의 합성 뉴스 문서를 n_docs개 생성합니다."""
+    rng = random.Random(seed)
+    stocks = load_stocks()
+
+    for i in range(n_docs):
+        stock = rng.choice(stocks)
+        fields = {
+            "name": stock["Name"],
+            "code": stock["Code"],
+            "event": rng.choice(_EVENTS),
+            "reaction": rng.choice(_REACTIONS),
+            "quarter": f"{rng.randint(1, 4)}분기",
+            "pct": round(rng.uniform(0.1, 30.0), 1),
+            "profit": rng.randint(10, 90_000),
+            "revenue": rng.randint(100, 900_000),
+        }
+        title = f"{stock['Name']}, {fields['event']}… {fields['reaction']}"
+        body = " ".join(
+            rng.choice(_SENTENCES).format(**fields) for _ in range(rng.randint(4, 12))
+        )
+        doc_type = rng.choice(["news_snippet", "news_article", "financials"])
+        yield {
+            "id": f"synthetic_{seed}_{i}",
+            "document": f"[NEWS]\nTitle: {title}\n{body}",
+            "metadata": {
+                "type": doc_type,
+                "company_name": stock["Name"],
+                "stock_code": stock["Code"],
+                "publisher": rng.choice(_PUBLISHERS),
+                "published_at": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T09:00:00+09:00",
+            },
+        }
+
+
+def generate_queries(n_queries: int, seed: int = 7) -> List[str]:
+    rng = random.Random(seed)
+    stocks = load_stocks()
+    queries = []
+    for _ in range(n_queries):
+        stock = rng.choice(stocks)
+        kind = rng.random()
+        if kind < 0.4:
+            queries.append(f"{stock['Name']} {rng.choice(_EVENTS)}")
+        elif kind < 0.7:
+            queries.append(f"{stock['Code']} {rng.choice(_REACTIONS)}")
+        else:
+            queries.append(f"{stock['Name']} 최근 주요 뉴스 실적 재무제표 이슈")
+    return queries
+
+
+def generate_embeddings(
+    n_docs: int,
+    n_queries: int,
+    dim: int = 4096,
+    latent_dim: int = 64,
+    seed: int = 42,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    실제 임베딩처럼 저차원 구조(latent_dim)에 잡음을 더한 합성 벡터 (docs, queries).
+    질의는 임의 문서 벡터를 흔든 것이라 정답 근처 이웃이 존재합니다.
+    """
+    rng = np.random.RandomState(seed)
+    basis = rng.randn(latent_dim, dim).astype(np.float32) / np.sqrt(latent_dim)
+
+    docs = np.empty((n_docs, dim), dtype=np.float32)
+    for start in range(0, n_docs, 10000):
+        end = min(start + 10000, n_docs)
+        latent = rng.randn(end - start, latent_dim).astype(np.float32)
+        docs[start:end] = latent @ basis + 0.3 * rng.randn(end - start, dim).astype(np.float32)
+
+    picks = rng.randint(0, n_docs, size=n_queries)
+    queries = docs[picks] + 0.5 * rng.randn(n_queries, dim).astype(np.float32)
+    return docs, queries
+
+
+class FakeEmbeddingService:
+    """
+    EmbeddingService 대체용 결정적 임베딩 (API 호출 없음).
+    토큰마다 고정된 희소 부호 벡터(feature hashing)를 더한 뒤 정규화하므로,
+    토큰을 많이 공유하는 문서끼리 가깝고 같은 텍스트는 항상 같은 벡터가 됩니다.
+    """
+
+    NNZ_PER_TOKEN = 16
+
+    def __init__(self, dim: int = 4096):
+        self.dim = dim
+        # 벤치마크에서 저장소 시간과 분리하기 위한 누적 임베딩 시간
+        self.elapsed_sec = 0.0
+
+    @lru_cache(maxsize=200_000)
+    def _token_features(self, token: str) -> Tuple[np.ndarray, np.ndarray]:
+        rng = np.random.default_rng(mmh3.hash(token, signed=False))
+        idx = rng.integers(0, self.dim, size=self.NNZ_PER_TOKEN)
+        sign = rng.choice(np.array([-1.0, 1.0], dtype=np.float32), size=self.NNZ_PER_TOKEN)
+        return idx, sign
+
+    def _embed(self, text: str) -> np.ndarray:
+        features = [self._token_features(token) for token in tokenize_ko(text)]
+        if not features:
+            return np.zeros(self.dim, dtype=np.float32)
+        idx = np.concatenate([f[0] for f in features])
+        sign = np.concatenate([f[1] for f in features])
+        vec = np.bincount(idx, weights=sign, minlength=self.dim).astype(np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def create_embeddings(self, texts: List[str]) -> np.ndarray:
+        started = time.perf_counter()
+        vectors = np.stack([self._embed(t) for t in texts]) if texts else np.empty((0, self.dim), dtype=np.float32)
+        self.elapsed_sec += time.perf_counter() - started
+        return vectors
+
+    def create_embedding(self, text: str) -> np.ndarray:
+        started = time.perf_counter()
+        vector = self._embed(text)
+        self.elapsed_sec += time.perf_counter() - started
+        return vector
+
+    def create_query_embeddings(self, texts: List[str]) -> np.ndarray:
+        return self.create_embeddings(texts)
+
+    async def acreate_embeddings(self, texts: List[str]) -> np.ndarray:
+        return self.create_embeddings(texts)
+
+    async def acreate_embedding(self, text: str) -> np.ndarray:
+        return self._embed(text)
+
+    async def acreate_query_embeddings(self, texts: List[str]) -> np.ndarray:
+        return self.create_embeddings(texts)
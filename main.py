@@ -15,6 +15,8 @@ load_dotenv()
 from app.api.auth import router as auth_router
 from app.api.users import router as users_router
 from app.api.routes.user_stock import router as user_stock_router
+from app.api.routes.analysis import router as analysis_router
+from app.api.routes.metrics import router as metrics_router
 # from app.api.routes.agent_routers import router as agent_router  # 필요하면 나중에
 
 from app.core.firebase import init_firebase
@@ -52,5 +54,7 @@ def startup_event():
 app.include_router(auth_router, prefix="/api")
 app.include_router(users_router, prefix="/api")
 app.include_router(user_stock_router, prefix="/api")
+app.include_router(analysis_router, prefix="/api")
+app.include_router(metrics_router, prefix="/api")
 
 # app.include_router(agent_router)  # 에이전트 API 쓸 때만 활성화
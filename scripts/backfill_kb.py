@@ -0,0 +1,119 @@
+# scripts/backfill_kb.py
+"""
+상장 종목 전체(DomesticStocks.json)에 대해 뉴스 + 재무제표를 수집해 KB를 채우는 백필 스크립트.
+중단 후 같은 --progress 파일로 다시 실행하면 완료된 종목은 건너뜁니다.
+
+    python -m scripts.backfill_kb --limit 100 --concurrency 8
+    python -m scripts.backfill_kb --sink inline --articles 3
+    python -m scripts.backfill_kb --codes 005930,000660 --no-financials
+
+--sink outbox(기본): kb_outbox에 INSERT만 하고, 임베딩은 scripts.run_kb_outbox_worker가 처리
+--sink inline: 배치마다 중복 제거 + 임베딩 + upsert까지 바로 수행
+"""
+import os
+import json
+import asyncio
+import logging
+import argparse
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.service.backfill_service import BackfillService, BackfillProgress, load_corp_codes
+from app.service.vector_service import make_doc_id
+
+
+def build_sink(kind: str):
+    if kind == "outbox":
+        from app.core.db import SessionLocal
+        from app.repository.kb_outbox import enqueue_documents
+
+        def sink(contents, metadatas):
+            with SessionLocal() as db:
+                enqueue_documents(db, contents, metadatas, [make_doc_id(c) for c in contents])
+
+        return sink
+
+    from app.repository.vector.vector_repo import create_vector_repository
+    from app.repository.vector.lexical_index import get_lexical_index
+    from app.service.search_cache import get_search_cache
+    from app.service.embedding_service import EmbeddingService
+    from app.service.vector_service import VectorService
+    from app.service.dedup_service import get_near_duplicate_detector
+
+    vector_service = VectorService(
+        vector_repository=create_vector_repository(),
+        embedding_service=EmbeddingService(),
+        lexical_index=get_lexical_index(),
+        search_cache=get_search_cache(),
+    )
+    detector = get_near_duplicate_detector()
+
+    def sink(contents, metadatas):
+        vector_service.add_documents_deduped(detector, contents, metadatas)
+
+    return sink
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stocks", default="DomesticStocks.json")
+    parser.add_argument("--codes", help="쉼표로 구분한 종목코드만 처리")
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--naver-rps", type=float, default=8.0)
+    parser.add_argument("--dart-rps", type=float, default=5.0)
+    parser.add_argument("--web-rps", type=float, default=5.0)
+    parser.add_argument("--news", type=int, default=20, help="종목당 뉴스 스니펫 수")
+    parser.add_argument("--articles", type=int, default=0, help="종목당 본문까지 가져올 기사 수")
+    parser.add_argument("--no-news", action="store_true")
+    parser.add_argument("--no-financials", action="store_true")
+    parser.add_argument("--sink", choices=["outbox", "inline"], default="outbox")
+    parser.add_argument("--flush-size", type=int, default=256)
+    parser.add_argument("--progress", default="backfill_progress.jsonl")
+    parser.add_argument("--corp-codes", default="dart_corp_codes.json", help="DART 고유번호 매핑 캐시 파일")
+    parser.add_argument("--report-interval", type=float, default=30.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    stocks = json.loads(Path(args.stocks).read_text(encoding="utf-8"))
+    if args.codes:
+        wanted = set(args.codes.split(","))
+        stocks = [s for s in stocks if s["Code"] in wanted]
+    if args.limit:
+        stocks = stocks[: args.limit]
+
+    naver_credentials = None
+    if not args.no_news:
+        naver_credentials = {
+            "X-Naver-Client-Id": os.environ["NAVER_CLIENT_ID"],
+            "X-Naver-Client-Secret": os.environ["NAVER_CLIENT_SECRET"],
+        }
+
+    dart_api_key, corp_codes = None, {}
+    if not args.no_financials:
+        dart_api_key = os.environ["DART_API_KEY"]
+        corp_codes = load_corp_codes(dart_api_key, args.corp_codes)
+
+    service = BackfillService(
+        sink=build_sink(args.sink),
+        progress=BackfillProgress(args.progress),
+        naver_credentials=naver_credentials,
+        dart_api_key=dart_api_key,
+        corp_codes=corp_codes,
+        rate_limits={"naver": args.naver_rps, "dart": args.dart_rps, "web": args.web_rps},
+        concurrency=args.concurrency,
+        news_per_stock=args.news,
+        articles_per_stock=args.articles,
+        flush_size=args.flush_size,
+    )
+
+    report = asyncio.run(service.run(stocks, report_interval=args.report_interval))
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# scripts/build_daily_digests.py
+"""
+보유 유저가 1명 이상인 종목의 일일 다이제스트를 미리 생성해 stock_reports(generation="digest")에 저장합니다.
+장 마감 후 / 새벽 cron으로 실행하면 "요즘 어때?" 같은 일반 질문은 LLM 호출 없이 다이제스트로 응답합니다.
+
+    python -m scripts.build_daily_digests
+    python -m scripts.build_daily_digests --concurrency 2 --batch-size 10
+    python -m scripts.build_daily_digests --stocks 삼성전자,SK하이닉스
+"""
+import json
+import logging
+import argparse
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.core.db import SessionLocal
+from app.repository.vector.vector_repo import create_vector_repository
+from app.repository.vector.lexical_index import get_lexical_index
+from app.service.search_cache import get_search_cache
+from app.service.embedding_service import EmbeddingService
+from app.service.vector_service import VectorService
+from app.service.llm_cache import get_llm_response_cache
+from app.service.digest_service import DailyDigestService
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stocks", default=None, help="쉼표로 구분한 종목명 (기본: 보유 종목 전체)")
+    parser.add_argument("--batch-size", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4, help="배치 내 동시 LLM 호출 수")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    vector_service = VectorService(
+        vector_repository=create_vector_repository(),
+        embedding_service=EmbeddingService(),
+        lexical_index=get_lexical_index(),
+        search_cache=get_search_cache(),
+    )
+    service = DailyDigestService(
+        session_factory=SessionLocal,
+        vector_service=vector_service,
+        llm_cache=get_llm_response_cache(),
+        batch_size=args.batch_size,
+        max_concurrency=args.concurrency,
+    )
+
+    stock_names = args.stocks.split(",") if args.stocks else None
+    report = service.run(stock_names)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# scripts/kb_snapshot.py
+"""
+KB 스냅샷 내보내기/복원 스크립트 (Parquet, 임베딩 포함).
+
+    python -m scripts.kb_snapshot export ./kb_snapshot.parquet
+    python -m scripts.kb_snapshot restore ./kb_snapshot.parquet --batch-size 2000
+
+복원은 현재 환경설정(CHROMA_MODE, CHROMA_COLLECTION_NAME, VECTOR_BACKEND 등)의 저장소로 적재합니다.
+"""
+import json
+import argparse
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.repository.vector.vector_repo import create_vector_repository
+from app.repository.vector.lexical_index import get_lexical_index
+from app.service.search_cache import get_search_cache
+from app.service.embedding_service import EmbeddingService
+from app.service.vector_service import VectorService
+from app.service.dedup_service import get_near_duplicate_detector
+from app.service.snapshot_service import SnapshotService
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("command", choices=["export", "restore"])
+    parser.add_argument("path", help="Parquet 파일 경로")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    vector_service = VectorService(
+        vector_repository=create_vector_repository(),
+        embedding_service=EmbeddingService(),
+        lexical_index=get_lexical_index(),
+        search_cache=get_search_cache(),
+    )
+    service = SnapshotService(
+        vector_service,
+        signature_index=get_near_duplicate_detector().index,
+    )
+
+    if args.command == "export":
+        report = service.export(args.path, batch_size=args.batch_size)
+    else:
+        report = service.restore(args.path, batch_size=args.batch_size)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
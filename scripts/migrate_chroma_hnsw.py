@@ -0,0 +1,45 @@
+# scripts/migrate_chroma_hnsw.py
+"""
+CHROMA_HNSW_* 설정으로 기존 컬렉션(샤딩 시 모든 shard)을 다시 생성합니다.
+space/M/ef_construction 변경 시 필요하며, ef_search만 바꿀 때는 실행할 필요가 없습니다.
+
+    CHROMA_HNSW_SPACE=cosine CHROMA_HNSW_M=32 python -m scripts.migrate_chroma_hnsw
+    python -m scripts.migrate_chroma_hnsw --keep-backup --batch-size 2000
+"""
+import json
+import argparse
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.core.chroma_db import ChromaDBConnection, ChromaDBConfig
+from app.repository.vector.shard_router import ShardRouter
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--keep-backup", action="store_true", help="원본 컬렉션을 backup-<ts>-<name>으로 남김")
+    args = parser.parse_args()
+
+    config = ChromaDBConfig()
+    connection = ChromaDBConnection()
+    existing = [c if isinstance(c, str) else c.name for c in connection.client.list_collections()]
+
+    if config.sharding_enabled:
+        router = ShardRouter(config.collection_name, config.shard_by_doc_type, config.stock_shards)
+        targets = sorted(name for name in existing if router.is_shard(name))
+    else:
+        targets = [config.collection_name] if config.collection_name in existing else []
+
+    print(f"HNSW: {config.hnsw_configuration()}")
+    reports = [
+        connection.recreate_collection(name, batch_size=args.batch_size, keep_backup=args.keep_backup)
+        for name in targets
+    ]
+    print(json.dumps(reports, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
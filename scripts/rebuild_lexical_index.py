@@ -0,0 +1,51 @@
+# scripts/rebuild_lexical_index.py
+"""
+현재 벡터 저장소(Chroma 컬렉션/샤드 또는 NumPy 저장소)의 문서로 BM25 색인(LEXICAL_INDEX_PATH)을 다시 만듭니다.
+하이브리드 검색 도입 전에 적재된 문서를 색인에 넣거나, 색인 파일이 손상/유실되었을 때 사용합니다.
+
+    python -m scripts.rebuild_lexical_index
+    python -m scripts.rebuild_lexical_index --page-size 2000
+"""
+import json
+import time
+import argparse
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.repository.vector.vector_repo import create_vector_repository
+from app.repository.vector.lexical_index import get_lexical_index
+
+
+def iter_documents(repository, page_size: int):
+    offset = 0
+    while True:
+        page = repository.get_documents(include=["documents"], limit=page_size, offset=offset)
+        ids = page.get("ids") or []
+        if not ids:
+            break
+        yield ids, page.get("documents") or []
+        offset += len(ids)
+        print(f"  indexed {offset} docs")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--page-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    index = get_lexical_index()
+    count = index.rebuild(iter_documents(create_vector_repository(), args.page_size))
+
+    report = {
+        "indexed": count,
+        "lexical_index": index.get_info(),
+        "elapsed_sec": round(time.perf_counter() - started, 2),
+    }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# scripts/run_kb_outbox_worker.py
+"""
+kb_outbox 대기열을 비우는 워커.
+여러 개를 동시에 띄울 수 있지만, API 서버와 같은 LEXICAL_INDEX_PATH / NEAR_DUP_INDEX_PATH를
+(같은 호스트 또는 flock 지원 공유 볼륨에서) 가리켜야 BM25 검색과 중복 제거가 모든 프로세스에 반영됩니다.
+
+    python -m scripts.run_kb_outbox_worker                 # 계속 폴링
+    python -m scripts.run_kb_outbox_worker --drain         # 대기열이 빌 때까지만 실행
+    python -m scripts.run_kb_outbox_worker --batch-size 512
+"""
+import json
+import logging
+import argparse
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.core.db import SessionLocal
+from app.repository.vector.vector_repo import create_vector_repository
+from app.repository.vector.lexical_index import get_lexical_index
+from app.service.search_cache import get_search_cache
+from app.service.embedding_service import EmbeddingService
+from app.service.vector_service import VectorService
+from app.service.dedup_service import get_near_duplicate_detector
+from app.service.kb_outbox_worker import KbOutboxWorker
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--poll-interval", type=float, default=2.0)
+    parser.add_argument("--max-attempts", type=int, default=5)
+    parser.add_argument("--drain", action="store_true", help="대기열이 비면 종료")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    vector_service = VectorService(
+        vector_repository=create_vector_repository(),
+        embedding_service=EmbeddingService(),
+        lexical_index=get_lexical_index(),
+        search_cache=get_search_cache(),
+    )
+    worker = KbOutboxWorker(
+        SessionLocal,
+        vector_service,
+        get_near_duplicate_detector(),
+        batch_size=args.batch_size,
+        max_attempts=args.max_attempts,
+    )
+
+    print(f"Outbox status: {worker.get_stats()}")
+    report = worker.run_forever(poll_interval=args.poll_interval, stop_when_empty=args.drain)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
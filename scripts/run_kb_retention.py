@@ -0,0 +1,46 @@
+# scripts/run_kb_retention.py
+"""
+KB(Chroma) 보존 정책 실행 스크립트. cron 등으로 주기 실행합니다.
+만료된 LLM 응답 캐시(llm_response_cache) 행 삭제와 근접 중복 서명 색인 압축도 함께 합니다 (--dry-run이면 생략).
+
+    python -m scripts.run_kb_retention --dry-run
+    python -m scripts.run_kb_retention --batch-size 500
+"""
+import json
+import argparse
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.repository.vector.vector_repo import create_vector_repository
+from app.repository.vector.lexical_index import get_lexical_index
+from app.service.search_cache import get_search_cache
+from app.service.embedding_service import EmbeddingService
+from app.service.vector_service import VectorService
+from app.service.dedup_service import get_near_duplicate_detector
+from app.service.llm_cache import get_llm_response_cache
+from app.service.retention_service import RetentionService
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dry-run", action="store_true", help="삭제하지 않고 대상 건수만 집계")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    vector_service = VectorService(
+        vector_repository=create_vector_repository(),
+        embedding_service=EmbeddingService(),
+        lexical_index=get_lexical_index(),
+        search_cache=get_search_cache(),
+        signature_index=get_near_duplicate_detector().index,
+    )
+    service = RetentionService(vector_service, llm_cache=get_llm_response_cache())
+
+    report = service.run(dry_run=args.dry_run, batch_size=args.batch_size)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
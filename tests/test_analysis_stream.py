@@ -0,0 +1,106 @@
+# tests/test_analysis_stream.py
+import json
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessageChunk
+
+from app import deps
+from app.agents.tools import ANALYSIS_REPORT_TAG
+from app.api.routes import analysis
+from app.service.agents import info_analysis_service
+from app.service.agents.info_analysis_service import InfoAnalysisService
+
+STOCK_DONE = {
+    "type": "stock_analyzed", "index": 0, "total": 1,
+    "stock_name": "삼성전자", "stock_code": "005930", "analysis_report": "리포트", "source": "live",
+}
+
+
+class FakeGraph:
+    """info_analysis_graph.astream이 내보내는 (mode, chunk) 시퀀스를 재현"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def astream(self, state, config=None, stream_mode=None):
+        self.calls.append((state, config, stream_mode))
+        report_meta = {"tags": [ANALYSIS_REPORT_TAG], "stock_name": "삼성전자"}
+        yield "messages", (AIMessageChunk(content="Resolve Ticker"), {"tags": []})
+        yield "messages", (AIMessageChunk(content="실적"), report_meta)
+        yield "messages", (AIMessageChunk(content=""), report_meta)
+        yield "custom", STOCK_DONE
+        yield "updates", {"analyze_target": {}}
+        yield "updates", {"reduce_analysis": {"analysis_results": [{"stock_name": "삼성전자"}]}}
+
+
+async def _collect(agen):
+    return [event async for event in agen]
+
+
+def test_astream_forwards_only_report_tokens_and_final_results(monkeypatch):
+    graph = FakeGraph()
+    monkeypatch.setattr(info_analysis_service, "info_analysis_graph", graph)
+
+    events = asyncio.run(_collect(InfoAnalysisService().astream("삼성전자 분석", user_id="7", config={})))
+
+    assert [e["type"] for e in events] == ["report_token", "stock_analyzed", "done"]
+    assert events[0] == {"type": "report_token", "stock_name": "삼성전자", "token": "실적"}
+    assert events[2]["analysis_results"] == [{"stock_name": "삼성전자"}] and "total" in events[2]["usage"]
+    state, config, stream_mode = graph.calls[0]
+    assert state["user_id"] == "7" and config["metadata"]["user_id"] == "7"
+    assert set(stream_mode) == {"messages", "custom", "updates"}
+
+
+class FakeService:
+    def __init__(self, events, error=None):
+        self.events = events
+        self.error = error
+        self.configs = []
+
+    async def astream(self, query, user_id=None, config=None):
+        self.configs.append(config)
+        for event in self.events:
+            yield event
+        if self.error:
+            raise self.error
+
+
+def _client(service):
+    app = FastAPI()
+    app.include_router(analysis.router, prefix="/api")
+    app.dependency_overrides[deps.get_info_analysis_service] = lambda: service
+    app.dependency_overrides[deps.get_agent_config] = lambda: {"configurable": {}}
+    app.dependency_overrides[deps.get_current_user_id] = lambda: "7"
+    return TestClient(app)
+
+
+def _frames(response):
+    return [line[len("data: "):] for line in response.text.split("\n\n") if line.startswith("data: ")]
+
+
+def test_stream_endpoint_emits_sse_frames_and_done_marker():
+    service = FakeService([
+        {"type": "report_token", "stock_name": "삼성전자", "token": "실적"},
+        STOCK_DONE,
+        {"type": "done", "analysis_results": [{"stock_name": "삼성전자"}], "usage": None},
+    ])
+
+    response = _client(service).post("/api/analysis/stream", json={"query": "삼성전자", "report_mode": "delta"})
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.headers["x-accel-buffering"] == "no"
+    frames = _frames(response)
+    assert frames[-1] == "[DONE]"
+    assert [json.loads(f)["type"] for f in frames[:-1]] == ["report_token", "stock_analyzed", "done"]
+    assert service.configs[0]["configurable"]["report_mode"] == "delta"
+
+
+def test_stream_endpoint_reports_errors_as_event():
+    service = FakeService([{"type": "report_token", "stock_name": "삼성전자", "token": "실"}], error=RuntimeError("boom"))
+
+    frames = _frames(_client(service).post("/api/analysis/stream", json={"query": "삼성전자"}))
+
+    assert json.loads(frames[-1]) == {"type": "error", "error": "boom"}
+    assert "[DONE]" not in frames
@@ -0,0 +1,74 @@
+# tests/test_backfill_service.py
+import asyncio
+import threading
+
+from app.service.backfill_service import BackfillService, BackfillProgress
+
+
+def _doc(code, i=0):
+    return {"content": f"{code}-{i}", "metadata": {"stock_code": code}}
+
+
+def _stocks(*codes):
+    return [{"Code": c, "Name": f"name-{c}"} for c in codes]
+
+
+def test_resume_skips_done_stocks_and_retries_failed(tmp_path, monkeypatch):
+    path = str(tmp_path / "progress.jsonl")
+    first = BackfillProgress(path)
+    first.record("A", "done", docs=1)
+    first.record("B", "failed", error="timeout")
+
+    saved = []
+    service = BackfillService(sink=lambda c, m: saved.extend(c), progress=BackfillProgress(path), flush_size=10)
+
+    async def collect(client, stock):
+        return [_doc(stock["Code"])]
+
+    monkeypatch.setattr(service, "_collect_stock", collect)
+    report = asyncio.run(service.run(_stocks("A", "B", "C"), report_interval=60))
+
+    assert report["skipped_already_done"] == 1
+    assert sorted(saved) == ["B-0", "C-0"]
+    assert BackfillProgress(path).completed() == {"A", "B", "C"}
+
+
+def test_failed_sink_marks_batch_stocks_failed(tmp_path, monkeypatch):
+    def sink(contents, metadatas):
+        raise RuntimeError("db down")
+
+    service = BackfillService(sink=sink, progress=BackfillProgress(str(tmp_path / "p.jsonl")), flush_size=1)
+
+    async def collect(client, stock):
+        return [_doc(stock["Code"])]
+
+    monkeypatch.setattr(service, "_collect_stock", collect)
+    report = asyncio.run(service.run(_stocks("A", "B"), report_interval=60))
+
+    assert report["stocks_failed"] == 2 and report["stocks_done"] == 0
+    assert BackfillProgress(str(tmp_path / "p.jsonl")).completed() == set()
+
+
+def test_slow_sink_does_not_block_buffering(tmp_path):
+    release = threading.Event()
+    calls = []
+
+    def sink(contents, metadatas):
+        calls.append(list(contents))
+        release.wait(5)
+
+    service = BackfillService(sink=sink, progress=BackfillProgress(str(tmp_path / "p.jsonl")), flush_size=2)
+
+    async def scenario():
+        # 버퍼가 차서 sink가 도는 동안 다른 워커의 버퍼 추가는 바로 끝나야 함
+        flushing = asyncio.create_task(service._add_to_buffer("A", [_doc("A", 0), _doc("A", 1)]))
+        while not calls:
+            await asyncio.sleep(0.01)
+        await asyncio.wait_for(service._add_to_buffer("B", [_doc("B")]), timeout=1)
+        assert service._buffer_codes == {"B": 1}
+        release.set()
+        await flushing
+
+    asyncio.run(scenario())
+    assert calls == [["A-0", "A-1"]]
+    assert service.stats["stocks_done"] == 1
@@ -0,0 +1,40 @@
+# tests/test_bench_vector_store.py
+import numpy as np
+
+from benchmarks import bench_vector_store
+from benchmarks.synthetic import FakeEmbeddingService, generate_news, generate_queries
+
+
+def test_synthetic_corpus_is_deterministic_per_seed():
+    first = [doc["document"] for doc in generate_news(20, seed=1)]
+
+    assert first == [doc["document"] for doc in generate_news(20, seed=1)]
+    assert first != [doc["document"] for doc in generate_news(20, seed=2)]
+    assert generate_queries(5) == generate_queries(5)
+
+
+def test_fake_embedding_is_normalized_and_stable():
+    embedder = FakeEmbeddingService(dim=256)
+    vectors = embedder.create_embeddings(["삼성전자 실적 발표", "삼성전자 실적 발표", ""])
+
+    assert np.allclose(vectors[0], vectors[1])
+    assert np.isclose(np.linalg.norm(vectors[0]), 1.0)
+    assert not vectors[2].any()
+
+
+def test_parse_hnsw_grid():
+    assert bench_vector_store._parse_hnsw("16:100:10/50,32:200:100") == [
+        (16, 100, [10, 50]), (32, 200, [100]),
+    ]
+
+
+def test_exact_backend_reaches_full_recall():
+    queries = generate_queries(5)
+    case = {"backend": "numpy", "n_docs": 200, "k": 5, "dim": 256, "batch_size": 64}
+    truth = bench_vector_store.ground_truth(case["n_docs"], queries, case["k"], case["dim"], batch_size=64)
+
+    result = bench_vector_store.run_case(case, queries, truth)
+
+    assert all(len(ids) == 5 for ids in truth)
+    assert result["search"][0]["recall@5"] == 1.0
+    assert result["ingest_docs_per_sec"] > 0
@@ -0,0 +1,58 @@
+# tests/test_chat_model_pool.py
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.repository.client.llm_client import ChatModelPool, LLMQueueTimeout
+
+
+def test_instances_are_reused_per_model_and_params():
+    pool = ChatModelPool(api_key="test-key")
+
+    first = pool.get("solar-pro2", temperature=0)
+
+    assert pool.get("solar-pro2", temperature=0) is first
+    assert pool.get("solar-pro2", temperature=0.7) is not first
+    assert pool.get("solar-mini", temperature=0) is not first
+    assert pool.get_stats()["instances"] == 3
+
+
+def test_slot_limits_concurrent_calls_per_model(monkeypatch):
+    monkeypatch.setenv("LLM_MAX_CONCURRENCY_SOLAR_PRO2", "2")
+    pool = ChatModelPool(api_key="test-key", default_limit=4)
+    lock = threading.Lock()
+    running, peak = [0], [0]
+
+    def call(_):
+        with pool.slot("solar-pro2"):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.05)
+            with lock:
+                running[0] -= 1
+
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        list(executor.map(call, range(6)))
+
+    stats = pool.get_stats()["models"]["solar-pro2"]
+    assert peak[0] == 2
+    assert stats["limit"] == 2 and stats["calls"] == 6
+    assert stats["in_flight"] == 0 and stats["waiting"] == 0 and stats["max_wait_sec"] > 0
+
+
+def test_waiting_past_queue_timeout_raises():
+    pool = ChatModelPool(api_key="test-key", default_limit=1, queue_timeout=0.05)
+
+    with pool.slot("solar-pro2"):
+        with pytest.raises(LLMQueueTimeout):
+            with pool.slot("solar-pro2"):
+                pass
+        # 다른 모델은 별도 슬롯
+        with pool.slot("solar-mini"):
+            pass
+
+    stats = pool.get_stats()["models"]["solar-pro2"]
+    assert stats["timeouts"] == 1 and stats["calls"] == 1 and stats["in_flight"] == 0
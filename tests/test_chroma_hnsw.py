@@ -0,0 +1,60 @@
+# tests/test_chroma_hnsw.py
+import pytest
+
+from app.core.chroma_db import ChromaDBConfig, ChromaDBConnection
+
+HNSW_ENV = ("CHROMA_HNSW_SPACE", "CHROMA_HNSW_M", "CHROMA_HNSW_EF_CONSTRUCTION", "CHROMA_HNSW_EF_SEARCH")
+
+
+@pytest.fixture
+def connection(tmp_path, monkeypatch):
+    import chromadb
+    from chromadb.config import Settings
+
+    for name in HNSW_ENV:
+        monkeypatch.delenv(name, raising=False)
+    client = chromadb.PersistentClient(path=str(tmp_path / "chroma"), settings=Settings(anonymized_telemetry=False))
+    monkeypatch.setattr(ChromaDBConnection, "_instance", None)
+    monkeypatch.setattr(ChromaDBConnection, "_client", client)
+    return ChromaDBConnection()
+
+
+def _hnsw(collection):
+    return collection.configuration["hnsw"]
+
+
+def test_unset_env_keeps_chroma_defaults(monkeypatch):
+    for name in HNSW_ENV:
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("CHROMA_HNSW_M", "32")
+
+    assert ChromaDBConfig().hnsw_configuration() == {"max_neighbors": 32}
+    monkeypatch.delenv("CHROMA_HNSW_M")
+    assert ChromaDBConfig().collection_configuration() is None
+
+
+def test_new_collection_uses_configured_hnsw_and_ef_search_syncs(connection, monkeypatch):
+    monkeypatch.setenv("CHROMA_HNSW_SPACE", "cosine")
+    monkeypatch.setenv("CHROMA_HNSW_M", "24")
+    monkeypatch.setenv("CHROMA_HNSW_EF_SEARCH", "50")
+    hnsw = _hnsw(connection.get_collection("kb_test"))
+    assert (hnsw["space"], hnsw["max_neighbors"], hnsw["ef_search"]) == ("cosine", 24, 50)
+
+    # ef_search는 기존 컬렉션에도 바로 반영
+    monkeypatch.setenv("CHROMA_HNSW_EF_SEARCH", "120")
+    assert _hnsw(connection.get_collection("kb_test"))["ef_search"] == 120
+
+
+def test_recreate_collection_applies_space_without_reembedding(connection, monkeypatch):
+    collection = connection.get_collection("kb_test")
+    collection.add(ids=["a", "b"], embeddings=[[1.0, 0.0], [0.0, 1.0]], documents=["가", "나"], metadatas=[{"n": 1}, {"n": 2}])
+    assert _hnsw(collection)["space"] == "l2"
+
+    monkeypatch.setenv("CHROMA_HNSW_SPACE", "cosine")
+    report = connection.recreate_collection("kb_test", batch_size=1)
+
+    migrated = connection.client.get_collection("kb_test")
+    assert report["count"] == 2 and report["backup"] is None
+    assert _hnsw(migrated)["space"] == "cosine"
+    assert migrated.get(ids=["b"], include=["embeddings"])["embeddings"][0].tolist() == [0.0, 1.0]
+    assert sorted(c.name for c in connection.client.list_collections()) == ["kb_test"]
@@ -0,0 +1,69 @@
+# tests/test_context_assembler.py
+from datetime import datetime, timezone
+
+from app.agents.context_assembler import ContextAssembler, count_tokens
+
+NOW = datetime(2026, 3, 2, tzinfo=timezone.utc)
+
+
+def _news(title: str, url: str, published_at: str, body: str) -> str:
+    return f"[ARTICLE]\nTitle: {title}\nPublishedAt: {published_at}\nURL: {url}\n\n{body}"
+
+
+def _results(docs):
+    return {
+        "ids": [d[0] for d in docs],
+        "documents": [d[1] for d in docs],
+        "metadatas": [d[2] for d in docs],
+    }
+
+
+def test_same_url_keeps_longer_body_and_strips_headers():
+    snippet = _news("실적 발표", "https://n.example.com/1", "2026-03-01", "요약본.")
+    article = _news("실적 발표", "https://n.example.com/1", "2026-03-01", "기사 본문입니다. " * 20)
+    ctx = ContextAssembler().assemble(
+        _results([("s", snippet, {"type": "news_snippet"}), ("a", article, {"type": "news_article"})]), now=NOW
+    )
+
+    assert ctx.doc_ids == ["a"]
+    assert ctx.dropped_duplicates == 1
+    assert "URL:" not in ctx.text and "https://n.example.com/1" in ctx.text
+
+
+def test_near_duplicate_bodies_are_dropped():
+    body = "반도체 업황 회복으로 메모리 가격이 상승하고 있으며 주요 업체의 실적 개선이 기대된다. " * 3
+    ctx = ContextAssembler().assemble(
+        _results([
+            ("1", _news("A", "https://a.example.com", "2026-03-01", body), {}),
+            ("2", _news("B", "https://b.example.com", "2026-03-01", body + "(종합)"), {}),
+        ]),
+        now=NOW,
+    )
+    assert ctx.doc_ids == ["1"]
+
+
+def test_recency_reorders_results():
+    old = _news("오래된 기사", "https://a.example.com", "2025-01-01T00:00:00+00:00", "작년 소식입니다.")
+    new = _news("새 기사", "https://b.example.com", "2026-03-01T00:00:00+00:00", "이번 주 소식입니다.")
+    ctx = ContextAssembler(recency_weight=0.9).assemble(_results([("old", old, {}), ("new", new, {})]), now=NOW)
+    assert ctx.doc_ids == ["new", "old"]
+
+
+def test_token_budget_truncates_long_passages():
+    long_body = "이 문장은 예산 테스트를 위한 긴 문장입니다. " * 200
+    docs = [(str(i), _news(f"기사 {i}", f"https://x.example.com/{i}", "2026-03-01", long_body), {}) for i in range(3)]
+    ctx = ContextAssembler(token_budget=600, min_passage_tokens=50).assemble(_results(docs), now=NOW)
+
+    assert ctx.truncated >= 1
+    assert ctx.tokens <= 600
+    assert count_tokens(ctx.text) <= 600 + 10
+
+
+def test_financials_keep_body_and_build_title():
+    doc = "[FINANCIALS]\nCorpCode: 00126380\nYear: 2025\n매출액: 300조"
+    meta = {"type": "financials", "company_name": "삼성전자", "bsns_year": 2025, "report_type": "FY"}
+    ctx = ContextAssembler().assemble(_results([("f", doc, meta)]), now=NOW)
+
+    assert "삼성전자 2025 FY 재무제표" in ctx.text
+    assert "CorpCode: 00126380" in ctx.text
+    assert ctx.citations[0]["type"] == "financials"
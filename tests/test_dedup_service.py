@@ -0,0 +1,111 @@
+# tests/test_dedup_service.py
+from app.service.dedup_service import (
+    minhash,
+    jaccard_estimate,
+    add_alternate,
+    SignatureIndex,
+    NearDuplicateDetector,
+)
+
+ARTICLE = (
+    "[ARTICLE]\nTitle: 삼성전자, 3분기 영업이익 10조 돌파\nURL: https://a.example.com/1\n\n"
+    "삼성전자가 3분기 영업이익 10조원을 넘어서며 시장 예상치를 웃돌았다. "
+    "메모리 반도체 가격 회복과 HBM 출하 확대가 실적을 이끌었다는 분석이 나온다."
+)
+REPOST = ARTICLE.replace("https://a.example.com/1", "https://b.example.com/9")
+OTHER = "[ARTICLE]\nTitle: 카카오 신규 서비스 출시\n\n카카오가 새로운 AI 비서 서비스를 공개하고 연내 유료화를 예고했다."
+
+
+def test_minhash_ignores_volatile_lines():
+    assert jaccard_estimate(minhash(ARTICLE), minhash(REPOST)) == 1.0
+    assert jaccard_estimate(minhash(ARTICLE), minhash(OTHER)) < 0.3
+
+
+def test_add_alternate_records_urls_once():
+    meta = add_alternate({}, {"url": "https://b.example.com/9"})
+    meta = add_alternate(meta, {"url": "https://b.example.com/9"})
+    assert meta["duplicate_count"] == 2
+    assert meta["duplicate_urls"] == "https://b.example.com/9"
+
+
+def test_partition_skips_batch_and_existing_duplicates():
+    detector = NearDuplicateDetector(SignatureIndex(), threshold=0.8)
+
+    plan = detector.partition([ARTICLE, REPOST, OTHER], [{"url": "a"}, {"url": "b"}, {"url": "c"}], ["1", "2", "3"])
+    assert plan.ids == ["1", "3"]
+    assert plan.skipped == 1
+    assert plan.metadatas[0]["duplicate_urls"] == "b"
+    assert sorted(plan.reserved_ids) == ["1", "3"]
+
+    again = detector.partition([REPOST], [{"url": "b"}], ["2"])
+    assert again.ids == []
+    assert again.existing_alternates == {"1": [{"url": "b"}]}
+
+
+def test_release_frees_reserved_signatures():
+    detector = NearDuplicateDetector(SignatureIndex(), threshold=0.8)
+    plan = detector.partition([ARTICLE], [{}], ["1"])
+    detector.release(plan)
+    assert "1" not in detector.index
+    assert detector.partition([REPOST], [{}], ["2"]).ids == ["2"]
+
+
+def test_persisted_index_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "near_dup_index.jsonl")
+    api = NearDuplicateDetector(SignatureIndex(persist_path=path))
+    worker = NearDuplicateDetector(SignatureIndex(persist_path=path))
+
+    api.partition([ARTICLE], [{}], ["1"])
+    # 다른 인스턴스(프로세스)가 예약한 서명도 판정 전에 재생됨
+    assert worker.partition([REPOST], [{}], ["2"]).existing_alternates == {"1": [{}]}
+
+    worker.index.remove(["1"])
+    reloaded = SignatureIndex(persist_path=path)
+    assert "1" not in reloaded and len(reloaded) == 0
+
+
+def test_minhash_matches_exact_integer_arithmetic():
+    import mmh3
+    from app.service import dedup_service as ds
+
+    text = "정확도 검증용 문장입니다"
+    norm = ds._normalize(text)
+    shingles = {norm[i:i + 4] for i in range(len(norm) - 3)}
+    hashes = [mmh3.hash(sh, signed=False) for sh in shingles]
+    expected = [
+        min((int(a) * h + int(b)) % ds._MERSENNE_PRIME for h in hashes) & 0xFFFFFFFF
+        for a, b in zip(ds._PERM_A, ds._PERM_B)
+    ]
+    assert minhash(text).tolist() == expected
+
+
+def test_reingesting_same_id_is_skipped():
+    detector = NearDuplicateDetector(SignatureIndex(), threshold=0.8)
+    detector.partition([ARTICLE], [{"url": "a"}], ["1"])
+
+    again = detector.partition([ARTICLE, ARTICLE], [{"url": "a"}, {"url": "a"}], ["1", "1"])
+    assert again.ids == [] and again.reserved_ids == []
+    assert again.skipped == 2 and again.already_stored == 2
+    assert again.existing_alternates == {}
+
+
+def test_compact_drops_tombstones_and_other_instances_reload(tmp_path):
+    path = tmp_path / "near_dup_index.jsonl"
+    index = SignatureIndex(persist_path=str(path))
+    reader = SignatureIndex(persist_path=str(path))
+    index.add(["1", "2"], [minhash(ARTICLE), minhash(OTHER)])
+    index.remove(["1"])
+    index.add(["2"], [minhash(OTHER)])
+    assert len(path.read_text().splitlines()) == 4
+    with reader.locked():
+        assert "1" not in reader and "2" in reader
+
+    report = index.compact()
+    assert len(path.read_text().splitlines()) == 1
+    assert report["signatures"] == 1 and report["after_bytes"] < report["before_bytes"]
+
+    # 압축으로 파일이 교체되면 다른 인스턴스는 처음부터 다시 로드
+    index.add(["3"], [minhash(REPOST)])
+    with reader.locked():
+        assert "1" not in reader and "2" in reader and "3" in reader
+    assert len(SignatureIndex(persist_path=str(path))) == 2
@@ -0,0 +1,76 @@
+# tests/test_embedding_batcher.py
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.service.embedding_batcher import EmbeddingMicroBatcher
+
+
+class FakeEmbeddingService:
+    def __init__(self, error=None, block=None, short=False):
+        self.error = error
+        self.block = block
+        self.short = short
+        self.batches = []
+
+    def create_query_embeddings(self, texts):
+        self.batches.append(list(texts))
+        if self.block is not None:
+            self.block.wait()
+        if self.error is not None:
+            raise self.error
+        vectors = [[float(len(text))] for text in texts]
+        return vectors[:-1] if self.short else vectors
+
+
+def test_concurrent_sync_and_async_callers_share_one_batch():
+    service = FakeEmbeddingService()
+    batcher = EmbeddingMicroBatcher(service, window_ms=200)
+
+    async def scenario():
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            loop = asyncio.get_running_loop()
+            sync_calls = [loop.run_in_executor(pool, batcher.embed, text) for text in ("가", "가나")]
+            return await asyncio.gather(batcher.aembed("가나다"), batcher.aembed("가"), *sync_calls)
+
+    results = asyncio.run(scenario())
+
+    assert results == [[3.0], [1.0], [1.0], [2.0]]
+    # 같은 배치 안의 중복 쿼리("가")는 한 번만 임베딩
+    assert len(service.batches) == 1 and sorted(service.batches[0]) == ["가", "가나", "가나다"]
+    assert batcher.get_stats()["requests"] == 4 and batcher.get_stats()["embedded_texts"] == 3
+
+
+def test_full_batch_is_sent_without_waiting_for_window():
+    service = FakeEmbeddingService()
+    batcher = EmbeddingMicroBatcher(service, window_ms=1_000, max_batch=2, timeout_sec=5)
+
+    futures = [batcher.submit("a"), batcher.submit("bb")]
+
+    # 창(1초)이 끝나기 전에 결과가 나와야 함
+    assert [f.result(timeout=0.5) for f in futures] == [[1.0], [2.0]]
+
+
+@pytest.mark.parametrize("service", [FakeEmbeddingService(error=RuntimeError("503")), FakeEmbeddingService(short=True)])
+def test_batch_failure_is_raised_to_every_caller(service):
+    batcher = EmbeddingMicroBatcher(service, window_ms=1, max_batch=2, timeout_sec=5)
+
+    futures = [batcher.submit("a"), batcher.submit("bb")]
+
+    for future in futures:
+        with pytest.raises((RuntimeError, ValueError)):
+            future.result(timeout=5)
+
+
+def test_caller_times_out_instead_of_waiting_forever():
+    release = threading.Event()
+    batcher = EmbeddingMicroBatcher(FakeEmbeddingService(block=release), window_ms=1, timeout_sec=0.05)
+    try:
+        with pytest.raises(TimeoutError):
+            batcher.embed("a")
+        with pytest.raises(TimeoutError):
+            asyncio.run(batcher.aembed("b"))
+    finally:
+        release.set()
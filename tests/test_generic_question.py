@@ -0,0 +1,34 @@
+# tests/test_generic_question.py
+import pytest
+
+from app.agents.utils import is_generic_question
+
+STOCKS = ["삼성전자"]
+
+
+@pytest.mark.parametrize("query", [
+    "삼성전자 요즘 어때?",
+    "삼성전자는 요즘 어때요?",
+    "삼성전자 최근 뉴스 좀 알려줘",
+    "삼성전자 무슨 일이 있어?",
+    "삼성전자 주가는?",
+    "삼성전자 분석해줘",
+])
+def test_generic_questions(query):
+    assert is_generic_question(query, STOCKS)
+
+
+@pytest.mark.parametrize("query", [
+    # 단어 안의 '이'/'가'/'는'을 조사로 지우면 일반 질문으로 잘못 분류됨
+    "삼성전자 이익은?",
+    "가격은?",
+    "삼성전자 가치는?",
+    "삼성전자 배당 전망은?",
+    "삼성전자 HBM 수주 현황은?",
+])
+def test_specific_questions(query):
+    assert not is_generic_question(query, STOCKS)
+
+
+def test_longer_stock_name_removed_first():
+    assert is_generic_question("삼성전자우 요즘 어때?", ["삼성전자", "삼성전자우"])
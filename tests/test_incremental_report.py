@@ -0,0 +1,78 @@
+# tests/test_incremental_report.py
+from contextlib import nullcontext
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app.agents import tools
+
+
+@pytest.fixture
+def reports(monkeypatch):
+    """stock_reports 대신 메모리 dict + LLM 호출 기록"""
+    store = {"rows": {}, "since": None, "calls": []}
+
+    def fake_fresh(db, stock_name, since, generation=None):
+        store["since"] = since
+        row = store["rows"].get(stock_name)
+        return row if row is not None and row.report_date >= since else None
+
+    def fake_upsert(db, stock_name, report_date, report, doc_ids, model, prompt_version, generation="full"):
+        store["rows"][stock_name] = SimpleNamespace(
+            report=report, doc_ids=doc_ids, model=model, prompt_version=prompt_version,
+            report_date=report_date, generation=generation,
+        )
+
+    def fake_chain(inputs, config, prompt=tools.ANALYSIS_PROMPT):
+        store["calls"].append("delta" if prompt is tools.ANALYSIS_DELTA_PROMPT else "full")
+        return f"report-{len(store['calls'])}"
+
+    monkeypatch.setattr(tools, "Session", lambda engine: nullcontext())
+    monkeypatch.setattr(tools, "get_fresh_report", fake_fresh)
+    monkeypatch.setattr(tools, "upsert_report", fake_upsert)
+    monkeypatch.setattr(tools, "_run_analysis_chain", fake_chain)
+    return store
+
+
+def _stored(doc_ids, age_days=0, report="old report"):
+    return SimpleNamespace(
+        report=report, doc_ids=doc_ids, model=tools.ANALYSIS_MODEL, prompt_version=tools.ANALYSIS_PROMPT_VERSION,
+        report_date=date.today() - timedelta(days=age_days),
+    )
+
+
+def _run(doc_ids, delta=False):
+    results = {"ids": doc_ids, "documents": ["본문"] * len(doc_ids), "metadatas": [{}] * len(doc_ids)}
+    prepared = {"status": "pending", "stock_name": "삼성전자", "context": "ctx", "doc_ids": doc_ids, "cache_key": None}
+    return tools._incremental_report("삼성전자", results, prepared, object(), {}, None, delta=delta)
+
+
+def test_unchanged_docs_reuse_recent_report(reports):
+    reports["rows"]["삼성전자"] = _stored(["a", "b"])
+    assert _run(["a", "b"]) == "old report"
+    assert reports["calls"] == []
+    assert reports["since"] == date.today() - timedelta(days=tools.REPORT_MAX_AGE_DAYS)
+
+
+def test_stale_report_is_regenerated_with_fresh_doc_ids(reports):
+    reports["rows"]["삼성전자"] = _stored(["a", "b", "z"], age_days=tools.REPORT_MAX_AGE_DAYS + 1)
+    assert _run(["a", "b"], delta=True) == "report-1"
+    assert reports["calls"] == ["full"]
+    assert reports["rows"]["삼성전자"].doc_ids == ["a", "b"]
+
+
+def test_delta_accumulates_ids_up_to_cap(reports, monkeypatch):
+    monkeypatch.setattr(tools, "REPORT_MAX_DOC_IDS", 3)
+    reports["rows"]["삼성전자"] = _stored(["a", "b"])
+    _run(["a", "c", "d"], delta=True)
+    row = reports["rows"]["삼성전자"]
+    assert reports["calls"] == ["delta"] and row.generation == "delta"
+    assert row.doc_ids == ["b", "c", "d"]
+
+
+def test_full_regeneration_resets_accumulated_ids(reports):
+    reports["rows"]["삼성전자"] = _stored(["a", "b", "c"])
+    _run(["a", "d"])
+    assert reports["calls"] == ["full"]
+    assert reports["rows"]["삼성전자"].doc_ids == ["a", "d"]
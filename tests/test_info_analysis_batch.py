@@ -0,0 +1,73 @@
+# tests/test_info_analysis_batch.py
+import json
+
+from langchain_core.messages import ToolMessage
+from langgraph.types import Send
+
+from app.agents import tools
+from app.agents.subgraphs import info_analysis as ia
+
+HOLDINGS = {"status": "success", "holdings": [{"name": "삼성전자", "ticker": "005930"}, {"name": "카카오", "ticker": "035720"}]}
+
+
+def _setup_state(user_query="포트폴리오 분석해줘"):
+    return {
+        "messages": [ToolMessage(content=json.dumps(HOLDINGS), name="get_portfolio_stocks", tool_call_id="pf_call")],
+        "analysis_data": {"targets": [], "phase": "setup", "user_query": user_query},
+    }
+
+
+def _config(**configurable):
+    return {"configurable": {"serve_digests": False, **configurable}}
+
+
+def test_batch_mode_analyzes_all_targets_with_one_tool_call(monkeypatch):
+    streamed = []
+    monkeypatch.setattr(ia, "get_stream_writer", lambda: streamed.append)
+    config = _config(batch_analysis=True)
+    state = _setup_state()
+
+    update = ia.process_setup_result(state, config)
+    call = update["messages"][0].tool_calls[0]
+    assert call["name"] == "analyze_stocks_batch"
+    assert call["args"] == {"stock_names": ["삼성전자", "카카오"]}
+    assert ia.fan_out_targets({**state, **update}, config) == "tools"
+
+    result = {"status": "success", "results": [
+        {"stock_name": "삼성전자", "status": "success", "report": "리포트 A", "error": None},
+        {"stock_name": "카카오", "status": "error", "report": None, "error": "리포트 생성 중 오류 발생: timeout"},
+    ]}
+    state = {**state, "analysis_data": update["analysis_data"],
+             "messages": [ToolMessage(content=json.dumps(result), name="analyze_stocks_batch", tool_call_id="batch_call")]}
+    update = ia.process_setup_result(state, config)
+
+    assert [(p["index"], p["stock_code"], p["analysis_report"]) for p in update["analysis_partials"]] == [
+        (0, "005930", "리포트 A"), (1, "035720", "리포트 생성 중 오류 발생: timeout"),
+    ]
+    assert ia.fan_out_targets({**state, **update}, config) == "reduce_analysis"
+    assert [e["type"] for e in streamed] == ["stock_analyzed", "stock_analyzed"]
+
+
+def test_streaming_and_incremental_runs_keep_per_target_branches():
+    for config in (_config(), _config(batch_analysis=True, report_mode="incremental")):
+        state = _setup_state()
+        update = ia.process_setup_result(state, config)
+        assert "messages" not in update
+        sends = ia.fan_out_targets({**state, **update}, config)
+        assert [s.arg["target"]["name"] for s in sends if isinstance(s, Send)] == ["삼성전자", "카카오"]
+
+
+def test_analyze_stocks_batch_tool_reports_partial_failures(monkeypatch):
+    def fake_reports(stock_names, vector_service, llm_cache=None, config=None, max_concurrency=5):
+        return [
+            {"stock_name": n, "status": "error" if n == "카카오" else "success",
+             "report": None if n == "카카오" else f"{n} 리포트", "error": "실패" if n == "카카오" else None, "doc_ids": []}
+            for n in stock_names
+        ]
+
+    monkeypatch.setattr(tools, "generate_analysis_reports", fake_reports)
+    out = tools.analyze_stocks_batch.invoke(
+        {"stock_names": ["삼성전자", "카카오"]}, config={"configurable": {"vector_service": object()}}
+    )
+    assert out["status"] == "success" and out["succeeded"] == 1 and out["failed"] == 1
+    assert out["results"][0]["report"] == "삼성전자 리포트"
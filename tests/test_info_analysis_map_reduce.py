@@ -0,0 +1,84 @@
+# tests/test_info_analysis_map_reduce.py
+import json
+import time
+
+from langgraph.graph import StateGraph, END
+from langgraph.types import Send
+
+from app.agents.subgraphs import info_analysis as ia
+
+TARGETS = [{"name": "삼성전자", "code": "005930"}, {"name": "카카오", "code": "035720"}, {"name": "NAVER", "code": "035420"}]
+# 앞 종목일수록 늦게 끝나도록 해 완료 순서와 targets 순서를 다르게 만듦
+DELAYS = {"삼성전자": 0.3, "카카오": 0.15, "NAVER": 0.0}
+
+
+class FakeVectorService:
+    def __init__(self, error=None):
+        self.error = error
+        self.queries = []
+
+    def search_many(self, queries, n_results=5):
+        self.queries.append(queries)
+        if self.error:
+            raise self.error
+        return [{"ids": [q]} for q in queries]
+
+
+def _map_reduce_graph():
+    """setup 이후 구간(fan_out → analyze_target → reduce)만 실제 노드로 구성"""
+    workflow = StateGraph(ia.InfoAnalysisAgentState)
+    workflow.add_node("setup", lambda state: {})
+    workflow.add_node("analyze_target", ia.analyze_target)
+    workflow.add_node("reduce_analysis", ia.reduce_analysis)
+    workflow.set_entry_point("setup")
+    workflow.add_conditional_edges("setup", ia.fan_out_targets, ["analyze_target", "reduce_analysis"])
+    workflow.add_edge("analyze_target", "reduce_analysis")
+    workflow.add_edge("reduce_analysis", END)
+    return workflow.compile()
+
+
+def test_branches_run_concurrently_and_reduce_keeps_target_order(monkeypatch):
+    def fake_analyze(stock_name, context_query, config, results=None):
+        time.sleep(DELAYS[stock_name])
+        if stock_name == "카카오":
+            raise RuntimeError("timeout")
+        return f"{stock_name} 리포트 ({results['ids'][0]})"
+
+    monkeypatch.setattr(ia, "analyze_stock", fake_analyze)
+    vector_service = FakeVectorService()
+    state = {
+        "messages": [],
+        "analysis_data": {"targets": TARGETS, "phase": "analyzing", "user_query": "포트폴리오 분석해줘"},
+        "analysis_results": [],
+    }
+
+    started = time.perf_counter()
+    out = _map_reduce_graph().invoke(
+        state, {"configurable": {"vector_service": vector_service, "serve_digests": False}}
+    )
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < sum(DELAYS.values())
+    assert len(vector_service.queries) == 1 and len(vector_service.queries[0]) == 3
+    assert [r["stock_name"] for r in out["analysis_results"]] == ["삼성전자", "카카오", "NAVER"]
+    assert out["analysis_results"][1]["analysis_report"] == "리포트 생성 중 오류 발생: timeout"
+    assert out["analysis_results"][0]["analysis_report"].startswith("삼성전자 리포트 (삼성전자 ")
+    assert all("index" not in r for r in out["analysis_results"])
+    assert json.loads(out["messages"][-1].content) == out["analysis_results"]
+
+
+def test_failed_prefetch_falls_back_to_per_target_search():
+    state = {"analysis_data": {"targets": TARGETS[:2], "phase": "analyzing", "user_query": "q"}}
+    config = {"configurable": {"vector_service": FakeVectorService(error=RuntimeError("chroma down"))}}
+
+    sends = ia.fan_out_targets(state, config)
+
+    assert all(isinstance(s, Send) and s.arg["results"] is None for s in sends)
+    assert [(s.arg["index"], s.arg["total"]) for s in sends] == [(0, 2), (1, 2)]
+
+
+def test_no_targets_goes_straight_to_reduce():
+    state = {"analysis_data": {"targets": [], "phase": "analyzing"}, "analysis_results": []}
+
+    assert ia.fan_out_targets(state, {"configurable": {}}) == "reduce_analysis"
+    assert ia.reduce_analysis(state)["analysis_results"] == []
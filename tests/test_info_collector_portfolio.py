@@ -0,0 +1,80 @@
+# tests/test_info_collector_portfolio.py
+import json
+
+from langchain_core.messages import HumanMessage, ToolMessage
+from langgraph.graph.message import add_messages
+
+from app.agents.subgraphs import info_collector as ic
+
+HOLDINGS = [{"ticker": f"T{i}"} for i in range(3)]
+CONFIG = {"configurable": {"release_streamed_holdings": True}}
+
+
+class FakeTools:
+    def __init__(self):
+        self.company = None
+        self.kb_batches = []
+
+    def __call__(self, name, args):
+        if name == "get_portfolio_stocks":
+            return {"status": "success", "holdings": HOLDINGS}
+        if name == "resolve_ticker":
+            self.company = f"CO-{args['user_input']}"
+            return {"status": "success", "company_name": self.company, "stock_code": args["user_input"], "corp_code": "1"}
+        if name == "search_news":
+            items = [{"title": f"{self.company} 뉴스 {i}", "url": f"https://n.example.com/{self.company}/{i}"} for i in range(3)]
+            return {"status": "success", "items": items}
+        if name == "extract_urls_from_search_result":
+            return [it["url"] for it in args["result"]["items"]]
+        if name == "fetch_article_from_url":
+            return {"status": "success", "url": args["url"], "title": "t", "body": f"BODY::{self.company}::{args['url']}"}
+        if name == "add_many_to_invest_kb":
+            self.kb_batches.append(args["contents"])
+            return {"status": "success", "count": len(args["contents"])}
+        raise AssertionError(name)
+
+
+def _apply(state, update):
+    state["collected"] = update["collected"]
+    if "messages" in update:
+        state["messages"] = add_messages(state["messages"], update["messages"])
+
+
+def _state_text(state):
+    return json.dumps(state["collected"], ensure_ascii=False, default=str) + "".join(
+        str(m.content) + json.dumps(getattr(m, "tool_calls", None) or [], ensure_ascii=False)
+        for m in state["messages"]
+    )
+
+
+def test_each_holding_is_saved_and_released_before_the_next(monkeypatch):
+    streamed = []
+    monkeypatch.setattr(ic, "get_stream_writer", lambda: streamed.append)
+    tools = FakeTools()
+    state = {"messages": add_messages([], [HumanMessage(content="내 포트폴리오 종목 소식 알려줘")]), "user_id": "u1"}
+
+    for _ in range(100):
+        _apply(state, ic.plan_next_action(state))
+        last = state["messages"][-1]
+        if not last.tool_calls:
+            break
+        call = last.tool_calls[0]
+        result = tools(call["name"], call["args"])
+        tm = ToolMessage(content=json.dumps(result, ensure_ascii=False), name=call["name"], tool_call_id=call["id"])
+        state["messages"] = add_messages(state["messages"], [tm])
+        _apply(state, ic.accumulate(state, CONFIG))
+
+        # 다음 종목으로 넘어간 시점에는 이전 종목 본문이 state 어디에도 남아 있지 않아야 함
+        text = _state_text(state)
+        for done in HOLDINGS[: state["collected"]["portfolio_index"]]:
+            assert f"BODY::CO-{done['ticker']}" not in text
+
+    collected = state["collected"]
+    assert collected["portfolio_index"] == len(HOLDINGS)
+    assert len(streamed) == len(HOLDINGS)
+    # 종목마다 한 번씩, 그 종목 문서만 저장
+    assert len(tools.kb_batches) == len(HOLDINGS)
+    for holding, batch in zip(HOLDINGS, tools.kb_batches):
+        assert batch and all(f"CO-{holding['ticker']}" in c for c in batch)
+    assert collected["kb_save_queue"] == []
+    assert "BODY::" not in _state_text(state)
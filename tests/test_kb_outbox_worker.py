@@ -0,0 +1,93 @@
+# tests/test_kb_outbox_worker.py
+from contextlib import nullcontext
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.repository import kb_outbox
+from app.service import kb_outbox_worker
+from app.service.dedup_service import DedupPlan
+from app.service.kb_outbox_worker import KbOutboxWorker
+
+
+class FakeVectorService:
+    def __init__(self, error=None):
+        self.error = error
+        self.calls = []
+
+    def add_documents_deduped(self, detector, contents, metadatas, ids=None):
+        self.calls.append(ids)
+        if self.error:
+            raise self.error
+        return DedupPlan(contents=contents[:1], ids=ids[:1], skipped=len(ids) - 1)
+
+
+@pytest.fixture
+def outbox(monkeypatch):
+    calls = {"claim": [], "done": [], "failed": []}
+    rows = [SimpleNamespace(id=i, doc_id=f"d{i}", content=f"본문 {i}", doc_metadata={"n": i}) for i in (1, 2)]
+
+    def claim(db, limit, lease_seconds=300, max_attempts=5):
+        calls["claim"].append({"limit": limit, "lease_seconds": lease_seconds, "max_attempts": max_attempts})
+        return rows if len(calls["claim"]) == 1 else []
+
+    monkeypatch.setattr(kb_outbox_worker, "claim_batch", claim)
+    monkeypatch.setattr(kb_outbox_worker, "mark_done", lambda db, ids: calls["done"].append(ids))
+    monkeypatch.setattr(
+        kb_outbox_worker, "mark_failed",
+        lambda db, ids, error, max_attempts=5: calls["failed"].append((ids, error, max_attempts)),
+    )
+    return calls
+
+
+def _worker(vector_service):
+    return KbOutboxWorker(lambda: nullcontext(), vector_service, detector=None, batch_size=10, max_attempts=3, lease_seconds=60)
+
+
+def test_run_once_saves_and_deletes_claimed_rows(outbox):
+    vs = FakeVectorService()
+    assert _worker(vs).run_once() == {"claimed": 2, "saved": 1, "duplicates_skipped": 1}
+    assert vs.calls == [["d1", "d2"]]
+    assert outbox["claim"] == [{"limit": 10, "lease_seconds": 60, "max_attempts": 3}]
+    assert outbox["done"] == [[1, 2]] and outbox["failed"] == []
+
+
+def test_failed_batch_is_marked_for_retry(outbox):
+    result = _worker(FakeVectorService(error=RuntimeError("embedding 503"))).run_once()
+    assert result["error"] == "embedding 503" and result["saved"] == 0
+    assert outbox["failed"] == [([1, 2], "embedding 503", 3)] and outbox["done"] == []
+
+
+def test_run_forever_stops_when_empty(outbox):
+    totals = _worker(FakeVectorService()).run_forever(stop_when_empty=True)
+    assert totals["batches"] == 1 and totals["saved"] == 1
+
+
+class RecordingSession:
+    def __init__(self):
+        self.statements = []
+
+    def _record(self, stmt):
+        self.statements.append(str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})))
+
+    def execute(self, stmt):
+        self._record(stmt)
+
+    def scalars(self, stmt):
+        self._record(stmt)
+        return SimpleNamespace(all=lambda: [])
+
+    def commit(self):
+        pass
+
+
+def test_claim_batch_fails_exhausted_leases_instead_of_reclaiming():
+    db = RecordingSession()
+    kb_outbox.claim_batch(db, 5, lease_seconds=60, max_attempts=3)
+
+    fail_sql, claim_sql = db.statements
+    assert "SET status='failed'" in fail_sql and "kb_outbox.attempts >= 3" in fail_sql
+    assert "SKIP LOCKED" in fail_sql
+    # lease 만료 행은 시도 횟수가 남아 있을 때만 다시 선점
+    assert "kb_outbox.attempts < 3" in claim_sql and "SET status='processing'" in claim_sql
@@ -0,0 +1,70 @@
+# tests/test_lexical_index.py
+from app.repository.vector.lexical_index import BM25Index, tokenize_ko
+from app.repository.vector.numpy_repo import NumpyVectorRepository
+from app.service.vector_service import VectorService, RRF_K
+
+
+class _FixedEmbedding:
+    """쿼리와 무관하게 같은 벡터를 돌려주는 임베딩 (dense 순위를 테스트에서 고정)"""
+
+    def __init__(self, vector):
+        self.vector = vector
+
+    def create_embedding(self, text):
+        return self.vector
+
+
+def test_tokenize_ko_strips_josa_and_keeps_codes():
+    tokens = tokenize_ko("삼성전자가 005930 종목을 1,234원에 샀다 NVDA 3.5%")
+
+    assert "삼성전자" in tokens and "삼성" in tokens
+    assert "005930" in tokens and "1234" in tokens and "3.5%" in tokens
+    assert "nvda" in tokens and "종목" in tokens
+
+
+def test_bm25_ranks_exact_term_and_survives_reload(tmp_path):
+    path = str(tmp_path / "bm25")
+    index = BM25Index(persist_path=path)
+    index.add_documents(
+        ["a", "b", "c"],
+        ["삼성전자 005930 실적 발표", "카카오 신규 서비스 출시", "반도체 업황 전망"],
+    )
+    index.delete_documents(["c"])
+
+    assert index.search("005930")[0][0] == "a"
+    assert index.search("반도체") == []
+
+    reloaded = BM25Index(persist_path=path)
+    assert reloaded.doc_count == 2
+    assert [doc_id for doc_id, _ in reloaded.search("카카오 서비스")] == ["b"]
+
+
+def test_rank_fusion_rewards_documents_found_by_both():
+    top_ids, fused = VectorService._rank_fusion(["x", "y"], [("y", 3.0), ("z", 1.0)], n_results=3)
+
+    assert top_ids[0] == "y"
+    assert fused["y"] == 1.0 / (RRF_K + 2) + 1.0 / (RRF_K + 1)
+    assert set(top_ids) == {"x", "y", "z"}
+
+
+def test_hybrid_search_fetches_lexical_only_hits_and_applies_filter():
+    repo = NumpyVectorRepository()
+    repo.add_documents(
+        ["시장 전반 동향", "NVDA 실적 서프라이즈", "NVDA 가이던스 하향"],
+        [[1.0, 0.0], [0.0, 1.0], [0.1, 0.9]],
+        metadatas=[{"market": "kr"}, {"market": "us"}, {"market": "kr"}],
+        ids=["dense", "lex_us", "lex_kr"],
+    )
+    lexical = BM25Index()
+    lexical.add_documents(["lex_us", "lex_kr"], ["NVDA 실적 서프라이즈", "NVDA 가이던스 하향"])
+    service = VectorService(repo, _FixedEmbedding([1.0, 0.0]), lexical_index=lexical)
+
+    result = service.hybrid_search("NVDA", n_results=3, candidate_k=2)
+    # dense 후보 2개에 lex_us가 빠지므로 BM25로만 잡힌 문서는 저장소에서 본문을 다시 가져와야 함
+    assert set(result["ids"]) == {"dense", "lex_us", "lex_kr"}
+    by_id = dict(zip(result["ids"], result["documents"]))
+    assert by_id["lex_us"] == "NVDA 실적 서프라이즈"
+    assert result["distances"][result["ids"].index("lex_us")] is None
+
+    filtered = service.hybrid_search("NVDA", n_results=3, candidate_k=2, where={"market": "kr"})
+    assert "lex_us" not in filtered["ids"] and "lex_kr" in filtered["ids"]
@@ -0,0 +1,84 @@
+# tests/test_llm_cache.py
+from contextlib import nullcontext
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.repository import llm_cache as llm_cache_repo
+from app.service import llm_cache
+from app.service.llm_cache import LlmResponseCache, get_llm_response_cache
+
+
+class RecordingSession:
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, stmt):
+        self.statements.append(str(stmt.compile(dialect=postgresql.dialect())))
+
+    def commit(self):
+        pass
+
+
+@pytest.fixture
+def store(monkeypatch):
+    rows = {}
+    monkeypatch.setattr(llm_cache_repo, "get_response", lambda db, key: rows.get(key))
+    monkeypatch.setattr(
+        llm_cache_repo, "put_response",
+        lambda db, key, response, **fields: rows.__setitem__(key, response),
+    )
+    return rows
+
+
+def _cache():
+    return LlmResponseCache(lambda: nullcontext(), ttl_seconds=60)
+
+
+def test_key_changes_with_every_component():
+    base = LlmResponseCache.make_key("m", "v1", "삼성전자", LlmResponseCache.context_hash(["a", "b"]))
+
+    assert base == LlmResponseCache.make_key("m", "v1", "삼성전자", LlmResponseCache.context_hash(["a", "b"]))
+    assert base != LlmResponseCache.make_key("m2", "v1", "삼성전자", LlmResponseCache.context_hash(["a", "b"]))
+    assert base != LlmResponseCache.make_key("m", "v2", "삼성전자", LlmResponseCache.context_hash(["a", "b"]))
+    assert base != LlmResponseCache.make_key("m", "v1", "카카오", LlmResponseCache.context_hash(["a", "b"]))
+    # 프롬프트의 문서 순서가 바뀌거나 새 문서가 들어오면 다른 키
+    assert base != LlmResponseCache.make_key("m", "v1", "삼성전자", LlmResponseCache.context_hash(["b", "a"]))
+    assert base != LlmResponseCache.make_key("m", "v1", "삼성전자", LlmResponseCache.context_hash(["a", "b", "c"]))
+
+
+def test_lookup_miss_then_hit_after_store(store):
+    cache = _cache()
+
+    key, cached = cache.lookup("m", "v1", "삼성전자", ["a"])
+    assert cached is None
+    cache.store(key, "m", "v1", "삼성전자", ["a"], "리포트")
+
+    assert cache.lookup("m", "v1", "삼성전자", ["a"]) == (key, "리포트")
+    assert cache.lookup("m", "v1", "삼성전자", ["a", "b"])[1] is None
+    assert cache.get_stats()["hits"] == 1 and cache.get_stats()["misses"] == 2
+
+
+def test_db_errors_are_treated_as_miss(monkeypatch):
+    def broken(db, key):
+        raise RuntimeError("connection refused")
+
+    monkeypatch.setattr(llm_cache_repo, "get_response", broken)
+    cache = _cache()
+
+    assert cache.lookup("m", "v1", "삼성전자", ["a"])[1] is None
+    assert cache.get_stats()["errors"] == 1 and cache.get_stats()["misses"] == 1
+
+
+def test_put_response_upserts_on_cache_key():
+    db = RecordingSession()
+    llm_cache_repo.put_response(db, "k", "m", "v1", "삼성전자", "h", "리포트", ttl_seconds=60)
+
+    assert "ON CONFLICT (cache_key) DO UPDATE" in db.statements[0]
+
+
+def test_ttl_zero_disables_cache(monkeypatch):
+    monkeypatch.setattr(llm_cache, "_llm_cache", None)
+    monkeypatch.setenv("LLM_CACHE_TTL_SEC", "0")
+
+    assert get_llm_response_cache() is None
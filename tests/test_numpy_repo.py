@@ -0,0 +1,79 @@
+# tests/test_numpy_repo.py
+import numpy as np
+
+from app.repository.vector.numpy_repo import NumpyVectorRepository
+
+
+def _unit_vectors(n: int, dim: int = 16, seed: int = 0) -> np.ndarray:
+    v = np.random.RandomState(seed).randn(n, dim)
+    return (v / np.linalg.norm(v, axis=1, keepdims=True)).astype(np.float32)
+
+
+def _add(repo, vectors, start=0):
+    ids = [str(i) for i in range(start, start + len(vectors))]
+    repo.add_documents([f"doc {i}" for i in ids], vectors.tolist(), [{"n": int(i)} for i in ids], ids)
+
+
+def _assert_consistent(repo, vectors, expected_ids):
+    got = repo.get_documents(include=["documents", "metadatas", "embeddings"])
+    assert sorted(got["ids"], key=int) == sorted(expected_ids, key=int)
+    for doc_id, doc, meta, emb in zip(got["ids"], got["documents"], got["metadatas"], got["embeddings"]):
+        assert doc == f"doc {doc_id}" and meta["n"] == int(doc_id)
+        np.testing.assert_allclose(emb, vectors[int(doc_id)], atol=1e-6)
+
+
+def test_mmap_store_persists_in_place(tmp_path):
+    vectors = _unit_vectors(50)
+    repo = NumpyVectorRepository(persist_path=str(tmp_path), mmap=True, initial_capacity=8)
+    _add(repo, vectors)
+    repo.delete_documents(["3"])
+    repo.save()
+
+    reopened = NumpyVectorRepository(persist_path=str(tmp_path), mmap=True)
+    assert isinstance(reopened._matrix, np.memmap)
+    assert reopened.get_collection_info()["count"] == 49
+    assert reopened.query(vectors[10:11].tolist(), n_results=1)["ids"] == [["10"]]
+
+
+def test_unsaved_mmap_writes_are_recovered_from_journal(tmp_path):
+    vectors = _unit_vectors(40)
+    repo = NumpyVectorRepository(persist_path=str(tmp_path), mmap=True, initial_capacity=8)
+    _add(repo, vectors[:20])
+    repo.save()
+
+    # save 없이 추가/삭제(마지막 행 이동)/메타데이터 갱신 후 프로세스가 죽은 상황
+    _add(repo, vectors[20:], start=20)
+    repo.delete_documents(["0", "5", "39"])
+    repo.update_metadatas(["7"], [{"n": 7, "tag": "x"}])
+    del repo
+
+    reopened = NumpyVectorRepository(persist_path=str(tmp_path), mmap=True)
+    expected = [str(i) for i in range(40) if i not in (0, 5, 39)]
+    _assert_consistent(reopened, vectors, expected)
+    assert reopened.get_documents(ids=["7"])["metadatas"] == [{"n": 7, "tag": "x"}]
+    # 재생 결과는 records.json에 반영되고 저널은 비워짐
+    assert (tmp_path / NumpyVectorRepository.JOURNAL_FILE).read_text() == ""
+
+
+def test_journal_replay_is_idempotent_and_ignores_torn_tail(tmp_path):
+    vectors = _unit_vectors(12)
+    repo = NumpyVectorRepository(persist_path=str(tmp_path), mmap=True, initial_capacity=4)
+    _add(repo, vectors[:10])
+    repo.delete_documents(["2"])
+    journal = (tmp_path / NumpyVectorRepository.JOURNAL_FILE).read_bytes()
+    repo.save()
+
+    # records.json 교체 후 저널을 비우기 전에 죽은 상황 + 기록 도중 끊긴 마지막 줄
+    (tmp_path / NumpyVectorRepository.JOURNAL_FILE).write_bytes(journal + b'{"op": "put", "row": 3')
+    reopened = NumpyVectorRepository(persist_path=str(tmp_path), mmap=True)
+    _assert_consistent(reopened, vectors, [str(i) for i in range(10) if i != 2])
+
+
+def test_crash_before_first_save_is_recovered(tmp_path):
+    vectors = _unit_vectors(5)
+    repo = NumpyVectorRepository(persist_path=str(tmp_path), mmap=True, initial_capacity=2)
+    _add(repo, vectors)
+    del repo
+
+    reopened = NumpyVectorRepository(persist_path=str(tmp_path), mmap=True)
+    _assert_consistent(reopened, vectors, [str(i) for i in range(5)])
@@ -0,0 +1,76 @@
+# tests/test_quantization.py
+import numpy as np
+import pytest
+
+from app.repository.vector.quantization import EmbeddingQuantizer
+from app.repository.vector.numpy_repo import NumpyVectorRepository, QuantizedVectorRepository
+
+
+def _unit_vectors(n: int, dim: int = 64, seed: int = 0) -> np.ndarray:
+    rs = np.random.RandomState(seed)
+    basis = rs.randn(16, dim)
+    v = rs.randn(n, 16) @ basis + 0.1 * rs.randn(n, dim)
+    return (v / np.linalg.norm(v, axis=1, keepdims=True)).astype(np.float32)
+
+
+def _add(repo, vectors, start=0):
+    ids = [str(i) for i in range(start, start + len(vectors))]
+    repo.add_documents(ids, vectors.tolist(), [{} for _ in ids], ids)
+
+
+def test_unsupported_dtype():
+    with pytest.raises(ValueError):
+        EmbeddingQuantizer(dtype="int4")
+
+
+@pytest.mark.parametrize("dtype,dims,pca", [("int8", None, False), ("float16", None, False), ("int8", 16, True)])
+def test_scores_approximate_inner_product(dtype, dims, pca):
+    vectors = _unit_vectors(500)
+    quantizer = EmbeddingQuantizer(dtype=dtype, dims=dims, pca=pca).fit(vectors)
+    codes = quantizer.encode(vectors)
+
+    assert codes.dtype == np.dtype(dtype)
+    assert codes.shape[1] == (dims or vectors.shape[1])
+    approx = quantizer.scores(vectors[:10], codes)
+    exact = vectors[:10] @ vectors.T
+    assert np.abs(approx - exact).max() < 0.1
+
+
+def test_save_and_load_round_trip(tmp_path):
+    vectors = _unit_vectors(200)
+    quantizer = EmbeddingQuantizer(dtype="int8", dims=8, pca=True).fit(vectors)
+    quantizer.save(str(tmp_path))
+
+    loaded = EmbeddingQuantizer.load(str(tmp_path))
+    assert loaded.config() == quantizer.config()
+    np.testing.assert_array_equal(loaded.encode(vectors), quantizer.encode(vectors))
+    assert EmbeddingQuantizer.load(str(tmp_path / "missing")) is None
+
+
+def test_codec_waits_for_enough_rows_and_retrains_as_store_grows():
+    repo = QuantizedVectorRepository(EmbeddingQuantizer(dtype="int8", dims=16, pca=True), min_fit_rows=100)
+    vectors = _unit_vectors(450)
+
+    _add(repo, vectors[:2])
+    assert repo._codes is None  # 첫 배치로 학습하지 않고 원본 정밀도로 검색
+    assert repo.query(vectors[:1].tolist(), n_results=1)["ids"] == [["0"]]
+
+    _add(repo, vectors[2:120], start=2)
+    assert repo.get_collection_info()["metadata"]["codec_fitted_rows"] == 120
+
+    _add(repo, vectors[120:450], start=120)
+    assert repo.get_collection_info()["metadata"]["codec_fitted_rows"] == 450
+
+
+def test_quantized_search_matches_exact_search():
+    vectors = _unit_vectors(1000, seed=1)
+    exact = NumpyVectorRepository()
+    quantized = QuantizedVectorRepository(EmbeddingQuantizer(dtype="int8"), rerank_factor=4, min_fit_rows=100)
+    _add(exact, vectors)
+    _add(quantized, vectors)
+
+    queries = _unit_vectors(20, seed=2).tolist()
+    expected = exact.query(queries, n_results=5)["ids"]
+    actual = quantized.query(queries, n_results=5)["ids"]
+    recall = np.mean([len(set(e) & set(a)) / 5 for e, a in zip(expected, actual)])
+    assert recall >= 0.9
@@ -0,0 +1,97 @@
+# tests/test_retention_service.py
+import os
+
+from app.repository.vector.lexical_index import BM25Index
+from app.repository.vector.numpy_repo import NumpyVectorRepository
+from app.service.dedup_service import SignatureIndex, minhash
+from app.service.vector_service import VectorService
+from app.service.retention_service import RetentionService, parse_doc_timestamp
+
+DAY = 86400
+NOW = 1_750_000_000.0
+
+
+class _FakeLLMCache:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.calls = 0
+
+    def purge_expired(self):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("db down")
+        return 3
+
+
+def _service(tmp_path, llm_cache=None):
+    repo = NumpyVectorRepository()
+    docs = ["오래된 속보", "최근 속보", "오래된 재무제표", "시각 없는 속보"]
+    repo.add_documents(
+        docs,
+        [[1.0, 0.0], [0.0, 1.0], [0.6, 0.8], [0.8, 0.6]],
+        metadatas=[
+            {"type": "news_snippet", "ingested_at": NOW - 40 * DAY},
+            {"type": "news_snippet", "ingested_at": NOW - 1 * DAY},
+            {"type": "financials", "ingested_at": NOW - 900 * DAY},
+            {"type": "news_snippet"},
+        ],
+        ids=["old", "new", "fin", "unknown"],
+    )
+    lexical = BM25Index(persist_path=str(tmp_path / "bm25"))
+    lexical.add_documents(["old", "new", "fin", "unknown"], docs)
+    signatures = SignatureIndex(persist_path=str(tmp_path / "sig.jsonl"))
+    signatures.add(["old", "new"], [minhash(docs[0]), minhash(docs[1])])
+    vector_service = VectorService(
+        repo, embedding_service=None, lexical_index=lexical, signature_index=signatures
+    )
+    policies = {"news_snippet": 30, "financials": None}
+    return RetentionService(vector_service, policies=policies, llm_cache=llm_cache)
+
+
+def test_parse_doc_timestamp_prefers_published_at():
+    rfc = parse_doc_timestamp({"published_at": "Mon, 02 Jun 2025 09:00:00 +0900", "ingested_at": 1})
+    iso_kst = parse_doc_timestamp({"published_at": "2025-06-02T09:00:00"})
+
+    assert rfc == iso_kst
+    assert parse_doc_timestamp({"published_at": "not a date", "ingested_at": "12"}) == 12.0
+    assert parse_doc_timestamp({}) is None
+
+
+def test_dry_run_reports_without_deleting(tmp_path):
+    cache = _FakeLLMCache()
+    service = _service(tmp_path, llm_cache=cache)
+
+    report = service.run(dry_run=True, now=NOW)
+
+    assert report["expired"] == {"news_snippet": 1}
+    assert report["after"] == report["before"]
+    assert service.vector_service.vector_repository.get_collection_info()["count"] == 4
+    assert cache.calls == 0 and report["near_dup_index"] is None
+
+
+def test_run_deletes_expired_and_compacts_indexes(tmp_path):
+    service = _service(tmp_path, llm_cache=_FakeLLMCache())
+    vector_service = service.vector_service
+
+    report = service.run(now=NOW)
+
+    # 시각을 알 수 없는 문서와 영구 보존 타입은 남음
+    remaining = vector_service.vector_repository.get_documents(include=[])["ids"]
+    assert sorted(remaining) == ["fin", "new", "unknown"]
+    assert report["after"]["by_type"] == {"news_snippet": 2, "financials": 1}
+    assert report["llm_cache_purged"] == 3
+
+    assert "old" not in vector_service.lexical_index
+    assert os.path.getsize(tmp_path / "bm25" / BM25Index.OPS_FILE) == 0
+    assert "old" not in vector_service.signature_index and "new" in vector_service.signature_index
+    assert report["near_dup_index"]["signatures"] == 1
+    assert report["near_dup_index"]["after_bytes"] < report["near_dup_index"]["before_bytes"]
+
+
+def test_llm_cache_failure_does_not_abort_run(tmp_path):
+    service = _service(tmp_path, llm_cache=_FakeLLMCache(fail=True))
+
+    report = service.run(now=NOW)
+
+    assert report["expired"] == {"news_snippet": 1}
+    assert report["llm_cache_purged"] is None
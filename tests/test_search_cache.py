@@ -0,0 +1,86 @@
+# tests/test_search_cache.py
+from app.service.search_cache import SearchResultCache
+
+RESULT = {"ids": ["a"], "documents": ["doc"], "metadatas": [{}], "distances": [0.1]}
+
+
+class FakeVersionStore:
+    """여러 프로세스가 공유하는 kb_versions 테이블 대용"""
+
+    def __init__(self):
+        self.versions = {}
+        self.fail = False
+
+    def get(self, namespace):
+        if self.fail:
+            raise RuntimeError("db down")
+        return self.versions.get(namespace, 0)
+
+    def bump(self, namespace):
+        if self.fail:
+            raise RuntimeError("db down")
+        self.versions[namespace] = self.versions.get(namespace, 0) + 1
+        return self.versions[namespace]
+
+
+def test_hit_returns_copy():
+    cache = SearchResultCache()
+    key = cache.make_key("kb", "삼성전자", 5)
+    assert cache.get(key) is None
+    cache.set(key, RESULT)
+
+    hit = cache.get(key)
+    hit["ids"].append("b")
+    assert cache.get(key)["ids"] == ["a"]
+    assert cache.get_stats()["hits"] == 2
+
+
+def test_key_depends_on_filter_and_mode():
+    cache = SearchResultCache()
+    base = cache.make_key("kb", "q", 5)
+    assert base != cache.make_key("kb", "q", 5, where={"type": "news_article"})
+    assert base != cache.make_key("kb", "q", 5, mode="hybrid")
+    assert cache.make_key("kb", "q", 5, where={"a": 1, "b": 2}) == cache.make_key("kb", "q", 5, where={"b": 2, "a": 1})
+
+
+def test_ttl_and_lru_eviction():
+    cache = SearchResultCache(max_size=2, ttl_seconds=-1)
+    cache.set("k", RESULT)
+    assert cache.get("k") is None
+
+    cache = SearchResultCache(max_size=2)
+    cache.set("a", RESULT)
+    cache.set("b", RESULT)
+    cache.get("a")
+    cache.set("c", RESULT)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+
+def test_bump_invalidates_namespace():
+    cache = SearchResultCache()
+    key = cache.make_key("kb", "q", 5)
+    cache.set(key, RESULT)
+    cache.bump("kb")
+    assert cache.get(cache.make_key("kb", "q", 5)) is None
+    assert cache.make_key("other", "q", 5) == ("other", 0, "vector", "q", "null", 5)
+
+
+def test_shared_version_store_invalidates_other_process():
+    store = FakeVersionStore()
+    api = SearchResultCache(version_store=store, version_check_interval=0)
+    worker = SearchResultCache(version_store=store, version_check_interval=0)
+
+    api.set(api.make_key("kb", "q", 5), RESULT)
+    worker.bump("kb")
+    assert api.get(api.make_key("kb", "q", 5)) is None
+
+
+def test_version_store_failure_clears_entries():
+    store = FakeVersionStore()
+    cache = SearchResultCache(version_store=store, version_check_interval=0)
+    cache.set(cache.make_key("kb", "q", 5), RESULT)
+
+    store.fail = True
+    cache.make_key("kb", "q", 5)
+    assert cache.get_stats()["size"] == 0
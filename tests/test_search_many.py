@@ -0,0 +1,66 @@
+# tests/test_search_many.py
+import pytest
+
+from app.repository.vector.numpy_repo import NumpyVectorRepository
+from app.service.search_cache import SearchResultCache
+from app.service.vector_service import VectorService
+
+VECTORS = {"삼성전자": [1.0, 0.0], "카카오": [0.0, 1.0], "네이버": [0.6, 0.8]}
+
+
+class FakeEmbeddingService:
+    def __init__(self):
+        self.batches = []
+
+    def create_query_embeddings(self, texts):
+        self.batches.append(list(texts))
+        return [VECTORS[text] for text in texts]
+
+
+class CountingRepository(NumpyVectorRepository):
+    def __init__(self):
+        super().__init__()
+        self.queries = []
+
+    def query(self, query_embeddings, n_results=5, include=None, where=None):
+        self.queries.append((len(query_embeddings), where))
+        return super().query(query_embeddings, n_results=n_results, include=include, where=where)
+
+
+def _service(search_cache=None):
+    repo = CountingRepository()
+    repo.add_documents(
+        ["삼성전자 뉴스", "카카오 뉴스", "삼성전자 재무"],
+        [[1.0, 0.0], [0.0, 1.0], [0.9, 0.1]],
+        metadatas=[{"type": "news"}, {"type": "news"}, {"type": "financials"}],
+        ids=["s_news", "k_news", "s_fin"],
+    )
+    return VectorService(repo, FakeEmbeddingService(), search_cache=search_cache)
+
+
+def test_one_embedding_call_and_one_query_per_filter():
+    service = _service()
+    filters = [{"type": "news"}, {"type": "news"}, {"type": "financials"}]
+
+    results = service.search_many(["삼성전자", "카카오", "삼성전자"], filters, n_results=1)
+
+    assert [r["ids"] for r in results] == [["s_news"], ["k_news"], ["s_fin"]]
+    assert service.embedding_service.batches == [["삼성전자", "카카오", "삼성전자"]]
+    assert sorted(service.vector_repository.queries, key=lambda q: q[0]) == [
+        (1, {"type": "financials"}), (2, {"type": "news"}),
+    ]
+
+
+def test_cached_queries_are_not_embedded_again():
+    service = _service(search_cache=SearchResultCache())
+    service.search_many(["삼성전자"], n_results=1)
+
+    results = service.search_many(["삼성전자", "네이버"], n_results=1)
+
+    assert results[0]["ids"] == ["s_news"] and results[1]["ids"]
+    assert service.embedding_service.batches == [["삼성전자"], ["네이버"]]
+
+
+def test_filter_length_mismatch_raises():
+    with pytest.raises(ValueError):
+        _service().search_many(["삼성전자", "카카오"], [None])
@@ -0,0 +1,97 @@
+# tests/test_shard_router.py
+import pytest
+
+from app.repository.vector.shard_router import ShardRouter
+
+BASE = "upstage_embeddings"
+
+
+def test_requires_some_sharding_dimension():
+    with pytest.raises(ValueError):
+        ShardRouter(BASE, by_doc_type=False, stock_buckets=0)
+
+
+def test_shard_for_doc_type():
+    router = ShardRouter(BASE)
+    assert router.shard_for({"type": "news_article"}) == f"{BASE}__news_article"
+    assert router.shard_for({"type": "unknown"}) == f"{BASE}__other"
+    assert router.shard_for(None) == f"{BASE}__other"
+
+
+def test_stock_bucket_is_stable_and_in_range():
+    router = ShardRouter(BASE, by_doc_type=True, stock_buckets=8)
+    name = router.shard_for({"type": "financials", "stock_code": "005930"})
+    assert name == router.shard_for({"type": "financials", "stock_code": "005930"})
+    bucket = name.rsplit("__", 1)[-1]
+    assert bucket.startswith("s") and 0 <= int(bucket[1:]) < 8
+    assert router.shard_for({"type": "financials"}).endswith("__none")
+
+
+def test_candidate_shards_filters_by_type_and_stock():
+    router = ShardRouter(BASE, by_doc_type=True, stock_buckets=4)
+    samsung = router.shard_for({"type": "news_article", "stock_code": "005930"})
+    existing = sorted({
+        samsung,
+        router.shard_for({"type": "news_snippet", "stock_code": "005930"}),
+        router.shard_for({"type": "news_article", "stock_code": None}),
+        "unrelated_collection",
+    })
+
+    assert router.candidate_shards(None, existing) == [n for n in existing if n.startswith(BASE + "__")]
+    assert router.candidate_shards({"type": "news_article", "stock_code": "005930"}, existing) == [samsung]
+    assert router.candidate_shards(
+        {"$and": [{"type": {"$eq": "news_article"}}, {"stock_code": {"$in": ["005930"]}}]}, existing
+    ) == [samsung]
+
+
+def test_candidate_shards_does_not_narrow_on_or():
+    router = ShardRouter(BASE)
+    existing = [f"{BASE}__news_article", f"{BASE}__financials"]
+    where = {"$or": [{"type": "news_article"}, {"type": "financials"}]}
+    assert router.candidate_shards(where, existing) == sorted(existing)
+
+
+@pytest.fixture
+def chroma(tmp_path, monkeypatch):
+    import chromadb
+    from chromadb.config import Settings
+    from app.core.chroma_db import ChromaDBConnection
+
+    client = chromadb.PersistentClient(path=str(tmp_path / "chroma"), settings=Settings(anonymized_telemetry=False))
+    monkeypatch.setattr(ChromaDBConnection, "_instance", None)
+    monkeypatch.setattr(ChromaDBConnection, "_client", client)
+    return client
+
+
+def test_update_metadatas_finds_owning_shard_and_moves_on_type_change(chroma):
+    from app.repository.vector.vector_repo import ShardedChromaDBRepository
+
+    repo = ShardedChromaDBRepository(ShardRouter(BASE))
+    repo.add_documents(["본문"], [[1.0, 0.0]], metadatas=[{"type": "news_article"}], ids=["d1"])
+
+    # 라우팅 키가 그대로면 같은 shard에서 갱신
+    repo.update_metadatas(["d1"], [{"type": "news_article", "duplicate_count": 1}])
+    assert repo._shard(f"{BASE}__news_article").get(ids=["d1"])["metadatas"] == [
+        {"type": "news_article", "duplicate_count": 1}
+    ]
+
+    # 타입이 바뀌면 임베딩째 새 shard로 옮기고 이전 shard에서는 지움
+    repo.update_metadatas(["d1", "missing"], [{"type": "financials"}, {"type": "financials"}])
+    assert repo._shard(f"{BASE}__news_article").get(ids=["d1"])["ids"] == []
+    moved = repo._shard(f"{BASE}__financials").get(ids=["d1"], include=["documents", "embeddings"])
+    assert moved["documents"] == ["본문"] and list(moved["embeddings"][0]) == [1.0, 0.0]
+    assert repo.get_collection_info()["count"] == 1
+
+
+def test_sharded_repository_singleton_is_per_collection(chroma, monkeypatch):
+    from app.core.chroma_db import ChromaDBConfig
+    from app.repository.vector import vector_repo
+
+    monkeypatch.setattr(vector_repo, "_sharded_repositories", {})
+    monkeypatch.setenv("CHROMA_SHARD_BY_DOC_TYPE", "true")
+    config = ChromaDBConfig()
+
+    first = vector_repo._get_sharded_repository(config, "kb_a")
+    assert vector_repo._get_sharded_repository(config, "kb_a") is first
+    other = vector_repo._get_sharded_repository(config, "kb_b")
+    assert other is not first and other.router.base_name == "kb_b"
@@ -0,0 +1,50 @@
+# tests/test_snapshot_service.py
+import pyarrow.parquet as pq
+
+from app.repository.vector.lexical_index import BM25Index
+from app.repository.vector.numpy_repo import NumpyVectorRepository
+from app.service.vector_service import VectorService
+from app.service.snapshot_service import SnapshotService
+
+
+def _service(path=None):
+    vector_service = VectorService(
+        vector_repository=NumpyVectorRepository(persist_path=path),
+        embedding_service=None,
+        lexical_index=BM25Index(persist_path=path and f"{path}/bm25"),
+    )
+    return SnapshotService(vector_service)
+
+
+def test_empty_collection_exports_schema_only_file(tmp_path):
+    path = str(tmp_path / "empty.parquet")
+    report = _service().export(path)
+
+    assert report["count"] == 0
+    assert pq.ParquetFile(path).metadata.num_rows == 0
+    assert _service().restore(path)["count"] == 0
+
+
+def test_restore_overwrites_existing_ids_and_rebuilds_bm25_once(tmp_path):
+    source = _service()
+    source.vector_service.vector_repository.add_documents(
+        ["삼성전자 실적 발표", "카카오 신규 서비스"], [[1.0, 0.0], [0.0, 1.0]],
+        metadatas=[{"v": 2}, {"v": 2}], ids=["a", "b"],
+    )
+    path = str(tmp_path / "kb.parquet")
+    source.export(path, batch_size=1)
+
+    target = _service(str(tmp_path / "target"))
+    repo = target.vector_service.vector_repository
+    repo.add_documents(["오래된 본문"], [[0.5, 0.5]], metadatas=[{"v": 1}], ids=["a"])
+    repo.add_documents(["남아 있어야 하는 문서"], [[0.6, 0.8]], metadatas=[{"v": 1}], ids=["c"])
+
+    assert target.restore(path, batch_size=1)["count"] == 2
+
+    restored = repo.get_documents(ids=["a"])
+    assert restored["documents"] == ["삼성전자 실적 발표"] and restored["metadatas"] == [{"v": 2}]
+    lexical = target.vector_service.lexical_index
+    # 스냅샷에 없던 기존 문서도 색인에 남고, 재구축 후 연산 로그는 비어 있음
+    assert lexical.doc_count == 3 and "c" in lexical
+    assert (tmp_path / "target" / "bm25" / BM25Index.OPS_FILE).read_text() == ""
+    assert lexical.search("삼성전자")[0][0] == "a"
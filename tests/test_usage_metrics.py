@@ -0,0 +1,68 @@
+# tests/test_usage_metrics.py
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import deps
+from app.api.routes import metrics
+from app.core.usage_metrics import UsageMetrics, OTHER_USERS, ERROR_MESSAGE_MAX_CHARS, _error_text
+
+
+def test_by_user_keeps_recent_users_and_folds_the_rest():
+    usage = UsageMetrics(max_users=2)
+    for user_id in ("u1", "u2", "u1", "u3"):
+        usage.record_chat("solar-pro", 0.5, prompt_tokens=10, completion_tokens=5, user_id=user_id)
+
+    by_user = usage.summary()["chat"]["by_user"]
+    # u1은 다시 호출돼 최근으로 밀렸으므로 가장 오래된 u2가 _other에 합쳐짐
+    assert set(by_user) == {"u1", "u3", OTHER_USERS}
+    assert by_user["u1"]["calls"] == 2
+    assert by_user[OTHER_USERS]["calls"] == 1 and by_user[OTHER_USERS]["prompt_tokens"] == 10
+
+    usage.record_chat("solar-pro", 0.5, prompt_tokens=10, user_id="u4")
+    by_user = usage.summary()["chat"]["by_user"]
+    assert set(by_user) == {"u3", "u4", OTHER_USERS} and by_user[OTHER_USERS]["calls"] == 3
+    assert usage.summary()["chat"]["total"]["calls"] == 5
+
+
+def test_error_text_is_truncated():
+    text = _error_text(ValueError("x" * 10_000))
+    assert text.startswith("ValueError: ") and len(text) == ERROR_MESSAGE_MAX_CHARS
+
+
+@pytest.fixture
+def client(monkeypatch):
+    tokens = {
+        "admin-token": {"uid": "a", "admin": True},
+        "listed-token": {"uid": "ops"},
+        "user-token": {"uid": "u"},
+    }
+
+    def verify(token):
+        if token not in tokens:
+            raise ValueError("bad token")
+        return tokens[token]
+
+    monkeypatch.setattr(deps, "verify_firebase_token", verify)
+    monkeypatch.setenv("METRICS_API_TOKEN", "scraper-secret")
+    monkeypatch.setenv("METRICS_ADMIN_UIDS", "ops, other")
+    monkeypatch.setenv("LLM_CACHE_TTL_SEC", "0")
+
+    app = FastAPI()
+    app.include_router(metrics.router, prefix="/api")
+    return TestClient(app)
+
+
+def _get(client, token=None):
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    return client.get("/api/metrics/usage", headers=headers).status_code
+
+
+def test_metrics_require_admin_or_service_token(client):
+    assert _get(client) == 401
+    assert _get(client, "garbage") == 401
+    assert _get(client, "user-token") == 403
+
+    assert _get(client, "scraper-secret") == 200
+    assert _get(client, "admin-token") == 200
+    assert _get(client, "listed-token") == 200
@@ -0,0 +1,75 @@
+# tests/test_vector_service_async.py
+import asyncio
+
+from app.repository.vector.lexical_index import BM25Index
+from app.repository.vector.numpy_repo import NumpyVectorRepository
+from app.service.search_cache import SearchResultCache
+from app.service.vector_service import VectorService
+
+VECTORS = {
+    "삼성전자 반도체 실적": [1.0, 0.0],
+    "카카오 신규 서비스": [0.0, 1.0],
+    "삼성전자": [0.9, 0.1],
+}
+
+
+class FakeEmbeddingService:
+    def __init__(self):
+        self.calls = 0
+
+    def create_embedding(self, text):
+        self.calls += 1
+        return VECTORS[text]
+
+    async def acreate_embedding(self, text):
+        return self.create_embedding(text)
+
+    async def acreate_embeddings(self, texts):
+        return [self.create_embedding(text) for text in texts]
+
+
+def _service(search_cache=None):
+    return VectorService(
+        NumpyVectorRepository(), FakeEmbeddingService(), lexical_index=BM25Index(), search_cache=search_cache
+    )
+
+
+def test_async_add_search_and_delete_match_sync_api():
+    service = _service()
+
+    async def scenario():
+        await service.aadd_documents(
+            ["삼성전자 반도체 실적", "카카오 신규 서비스"], metadatas=[{"type": "news_snippet"}, None], ids=["s", "k"]
+        )
+        vector = await service.asearch("삼성전자", n_results=1)
+        hybrid = await service.asearch("삼성전자", n_results=2, mode="hybrid")
+        sync_hybrid = service.hybrid_search("삼성전자", n_results=2)
+        await service.adelete_document("s")
+        after = await service.asearch("삼성전자", n_results=2)
+        return vector, hybrid, sync_hybrid, after
+
+    vector, hybrid, sync_hybrid, after = asyncio.run(scenario())
+
+    assert vector["ids"] == ["s"] and "ingested_at" in vector["metadatas"][0]
+    assert hybrid["ids"] == sync_hybrid["ids"] == ["s", "k"]
+    assert hybrid["scores"] == sync_hybrid["scores"]
+    assert after["ids"] == ["k"] and "s" not in service.lexical_index
+
+
+def test_asearch_uses_search_cache_until_write():
+    service = _service(search_cache=SearchResultCache())
+
+    async def scenario():
+        await service.aadd_documents(["삼성전자 반도체 실적"], ids=["s"])
+        await service.asearch("삼성전자")
+        await service.asearch("삼성전자")
+        calls_before_write = service.embedding_service.calls
+        await service.aadd_documents(["카카오 신규 서비스"], ids=["k"])
+        result = await service.asearch("삼성전자")
+        return calls_before_write, result
+
+    calls_before_write, result = asyncio.run(scenario())
+
+    # 문서 임베딩 1 + 쿼리 1 (두 번째 검색은 캐시)
+    assert calls_before_write == 2
+    assert result["ids"] == ["s", "k"]